@@ -78,6 +78,14 @@ async def lifespan(app: FastAPI):
             app.state.config_manager.register_change_callback(on_config_change)
             await app.state.config_manager.start_watching()
             api_logger.info("Config file watcher started with change callback")
+
+        # Watch the project so checkpoints only re-examine touched paths
+        from agentsmithy.config import settings
+
+        if settings.checkpoint_watcher_enabled:
+            from agentsmithy.services.workdir_watcher import start_workdir_watcher
+
+            start_workdir_watcher(project.root)
     except Exception as e:
         api_logger.error("Startup initialization failed", exc_info=True, error=str(e))
         # Mark server as error on startup failure
@@ -106,6 +114,16 @@ async def lifespan(app: FastAPI):
                 # Shutdown was cancelled, but continue with other cleanup
                 api_logger.debug("Config watcher stop cancelled, continuing cleanup")
 
+        # Stop workdir watchers (checkpoints fall back to full scans)
+        from agentsmithy.services.workdir_watcher import stop_workdir_watchers
+
+        stop_workdir_watchers()
+
+        # Write staging changes still buffered by checkpoint trackers
+        from agentsmithy.services.versioning import flush_versioning_trackers
+
+        flush_versioning_trackers()
+
         # Shutdown background tasks (RAG reindexing, etc.)
         bg_manager = get_background_manager()
         try:
@@ -113,6 +131,16 @@ async def lifespan(app: FastAPI):
         except asyncio.CancelledError:
             api_logger.debug("Background tasks shutdown cancelled, continuing cleanup")
 
+        # Release the shared RAG vector stores (Chroma clients)
+        from agentsmithy.rag.vector_store import shutdown_vector_stores
+
+        shutdown_vector_stores()
+
+        # Stop checkpoint hashing worker processes
+        from agentsmithy.services.object_encoder import shutdown_object_encoder
+
+        shutdown_object_encoder()
+
         # Shutdown chat service
         chat_service = get_chat_service()
         try:
@@ -4,19 +4,24 @@ Provides endpoints to:
 - List all checkpoints for a dialog
 - Restore project state to a specific checkpoint
 - Reset dialog to initial checkpoint
+- Report checkpoint storage usage
 """
 
 from __future__ import annotations
 
 import asyncio
 
-from fastapi import APIRouter, Body, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException, Query
 from pydantic import BaseModel, Field
 
 from agentsmithy.api.deps import get_project
 from agentsmithy.core.background_tasks import get_background_manager
 from agentsmithy.core.project import Project
-from agentsmithy.services.versioning import FileChangeStatus, VersioningTracker
+from agentsmithy.services.checkpoint_maintenance import (
+    claim_background_maintenance,
+    run_maintenance_background,
+)
+from agentsmithy.services.versioning import FileChangeStatus, get_versioning_tracker
 from agentsmithy.utils.logger import get_logger
 
 logger = get_logger("api.checkpoints")
@@ -32,7 +37,7 @@ async def _reindex_files_background(
     Args:
         project: Project instance
         dialog_id: Dialog ID for logging
-        restored_files: List of file paths to reindex
+        restored_files: Paths changed by the restore (written or deleted)
     """
     try:
         vector_store = project.get_vector_store()
@@ -59,6 +64,10 @@ class CheckpointResponse(BaseModel):
 
     commit_id: str = Field(..., description="Checkpoint ID")
     message: str = Field(..., description="Checkpoint message")
+    seq: int | None = Field(
+        None, description="Position in the dialog (pagination cursor)"
+    )
+    created_at: str | None = Field(None, description="Creation time (ISO 8601)")
 
 
 class CheckpointsListResponse(BaseModel):
@@ -69,6 +78,9 @@ class CheckpointsListResponse(BaseModel):
     initial_checkpoint: str | None = Field(
         None, description="Initial checkpoint ID from dialog metadata"
     )
+    has_more: bool = Field(
+        False, description="Whether older checkpoints exist before this page"
+    )
 
 
 class RestoreRequest(BaseModel):
@@ -164,6 +176,23 @@ def _create_file_change_info(change: dict) -> FileChangeInfo:
     )
 
 
+class CheckpointStorageResponse(BaseModel):
+    """Disk usage and object counts of a dialog's checkpoint repository."""
+
+    dialog_id: str
+    loose_objects: int = Field(..., description="Objects stored as loose files")
+    packs: int = Field(..., description="Number of packfiles")
+    packed_objects: int = Field(..., description="Objects stored in packfiles")
+    object_bytes: int = Field(..., description="Size of the object database")
+    total_bytes: int = Field(..., description="Size of the whole checkpoints directory")
+    shared_objects: int = Field(
+        ..., description="Objects in the project-wide store shared by all dialogs"
+    )
+    shared_object_bytes: int = Field(
+        ..., description="Size of the project-wide shared object store"
+    )
+
+
 class SessionStatusResponse(BaseModel):
     """Response with current session status."""
 
@@ -185,16 +214,33 @@ class SessionStatusResponse(BaseModel):
 @router.get("/{dialog_id}/checkpoints", response_model=CheckpointsListResponse)
 async def list_checkpoints(
     dialog_id: str,
+    limit: int | None = Query(None, ge=1, le=1000),  # noqa: B008
+    before: int | None = None,
     project: Project = Depends(get_project),  # noqa: B008
 ) -> CheckpointsListResponse:
-    """List all checkpoints for a dialog in chronological order.
+    """List checkpoints for a dialog in chronological order.
+
+    Without ``limit`` all checkpoints are returned. With ``limit`` the newest
+    page is returned; use the ``seq`` of its first checkpoint as ``before``
+    to load the previous page.
+
+    Examples:
+        GET /api/dialogs/{dialog_id}/checkpoints?limit=50
+        GET /api/dialogs/{dialog_id}/checkpoints?limit=50&before=1234
+
+    Args:
+        dialog_id: Dialog ID
+        limit: Maximum number of checkpoints to return
+        before: Cursor - return checkpoints older than this seq
 
     Returns:
         CheckpointsListResponse with list of checkpoints and initial checkpoint ID
     """
     try:
-        tracker = VersioningTracker(str(project.root), dialog_id)
-        checkpoints = tracker.list_checkpoints()
+        tracker = get_versioning_tracker(project.root, dialog_id)
+        checkpoints, has_more = await asyncio.to_thread(
+            tracker.list_checkpoints_page, limit, before
+        )
 
         # Get initial checkpoint from dialog metadata
         initial_checkpoint_id = None
@@ -215,16 +261,51 @@ async def list_checkpoints(
         return CheckpointsListResponse(
             dialog_id=dialog_id,
             checkpoints=[
-                CheckpointResponse(commit_id=cp.commit_id, message=cp.message)
+                CheckpointResponse(
+                    commit_id=cp.commit_id,
+                    message=cp.message,
+                    seq=cp.seq,
+                    created_at=cp.created_at,
+                )
                 for cp in checkpoints
             ],
             initial_checkpoint=initial_checkpoint_id,
+            has_more=has_more,
         )
     except Exception as e:
         logger.error("Failed to list checkpoints", dialog_id=dialog_id, error=str(e))
         raise HTTPException(status_code=500, detail=str(e)) from e
 
 
+@router.get(
+    "/{dialog_id}/checkpoints/storage", response_model=CheckpointStorageResponse
+)
+async def get_checkpoint_storage(
+    dialog_id: str,
+    project: Project = Depends(get_project),  # noqa: B008
+) -> CheckpointStorageResponse:
+    """Report disk usage and object counts of a dialog's checkpoint repository.
+
+    Returns:
+        CheckpointStorageResponse with object counts and sizes in bytes
+    """
+    try:
+        tracker = get_versioning_tracker(project.root, dialog_id)
+        stats = await asyncio.to_thread(tracker.get_storage_stats)
+        shared = await asyncio.to_thread(tracker.get_shared_storage_stats)
+        return CheckpointStorageResponse(
+            dialog_id=dialog_id,
+            **stats,
+            shared_objects=shared["loose_objects"] + shared["packed_objects"],
+            shared_object_bytes=shared["object_bytes"],
+        )
+    except Exception as e:
+        logger.error(
+            "Failed to get checkpoint storage", dialog_id=dialog_id, error=str(e)
+        )
+        raise HTTPException(status_code=500, detail=str(e)) from e
+
+
 @router.get("/{dialog_id}/session", response_model=SessionStatusResponse)
 async def get_session_status(
     dialog_id: str,
@@ -250,69 +331,71 @@ async def get_session_status(
         # Check if there are unapproved changes
         # 1. Compare committed trees between main and session
         # 2. Check for uncommitted changes in working directory
-        tracker = VersioningTracker(str(project.root), dialog_id)
+        tracker = get_versioning_tracker(project.root, dialog_id)
         repo = tracker.ensure_repo()
 
         has_unapproved = False
         changed_files: list[FileChangeInfo] = []
         changed_files_paths = set()  # Track paths to avoid duplicates
 
-        # IMPORTANT: Process committed changes FIRST, then staged-only changes
-        # This ensures committed files show real diff stats, not additions=0
-
-        # Check committed but unapproved changes (session vs main)
-        if tracker.MAIN_BRANCH in repo.refs:
-            session_ref = tracker._get_session_ref(active_session)
-            if session_ref in repo.refs:
-                main_head = repo.refs[tracker.MAIN_BRANCH]
-                session_head = repo.refs[session_ref]
-
-                # Compare trees (file contents), not commit SHAs
-                main_commit = repo[main_head]
-                session_commit = repo[session_head]
-                main_tree = getattr(main_commit, "tree", None)
-                session_tree = getattr(session_commit, "tree", None)
-
-                # If trees are different, there are committed but unapproved changes
-                if main_tree != session_tree:
-                    has_unapproved = True
-
-                    # Get detailed diff (including diff text)
-                    try:
-                        diff_changes = tracker.get_tree_diff(
-                            "main", active_session, include_diff=True
-                        )
-                        for change in diff_changes:
-                            changed_files.append(_create_file_change_info(change))
-                            changed_files_paths.add(change["path"])
-                    except Exception as diff_err:
-                        logger.debug(
-                            "Failed to calculate file diff",
-                            dialog_id=dialog_id,
-                            error=str(diff_err),
-                        )
-
-        # Check staged (prepared) changes - add only if NOT already in committed list
-        if tracker.has_staged_changes():
-            has_unapproved = True
-
-            # Get staged files with diff information
-            try:
-                staged_files = tracker.get_staged_files(
-                    active_session, include_diff=True
-                )
-                for staged in staged_files:
-                    # Skip if file is already in committed changes
-                    # (file is both committed and has additional staged changes)
-                    if staged["path"] not in changed_files_paths:
-                        changed_files.append(_create_file_change_info(staged))
-                        changed_files_paths.add(staged["path"])
-            except Exception as staged_err:
-                logger.debug(
-                    "Failed to get staged files",
-                    dialog_id=dialog_id,
-                    error=str(staged_err),
-                )
+        # Staged-change checks below share one workdir walk
+        with tracker.shared_scan():
+            # IMPORTANT: Process committed changes FIRST, then staged-only changes
+            # This ensures committed files show real diff stats, not additions=0
+
+            # Check committed but unapproved changes (session vs main)
+            if tracker.MAIN_BRANCH in repo.refs:
+                session_ref = tracker._get_session_ref(active_session)
+                if session_ref in repo.refs:
+                    main_head = repo.refs[tracker.MAIN_BRANCH]
+                    session_head = repo.refs[session_ref]
+
+                    # Compare trees (file contents), not commit SHAs
+                    main_commit = repo[main_head]
+                    session_commit = repo[session_head]
+                    main_tree = getattr(main_commit, "tree", None)
+                    session_tree = getattr(session_commit, "tree", None)
+
+                    # If trees are different, there are committed but unapproved changes
+                    if main_tree != session_tree:
+                        has_unapproved = True
+
+                        # Get detailed diff (including diff text)
+                        try:
+                            diff_changes = tracker.get_tree_diff(
+                                "main", active_session, include_diff=True
+                            )
+                            for change in diff_changes:
+                                changed_files.append(_create_file_change_info(change))
+                                changed_files_paths.add(change["path"])
+                        except Exception as diff_err:
+                            logger.debug(
+                                "Failed to calculate file diff",
+                                dialog_id=dialog_id,
+                                error=str(diff_err),
+                            )
+
+            # Check staged (prepared) changes - add only if NOT already in committed list
+            if tracker.has_staged_changes():
+                has_unapproved = True
+
+                # Get staged files with diff information
+                try:
+                    staged_files = tracker.get_staged_files(
+                        active_session, include_diff=True
+                    )
+                    for staged in staged_files:
+                        # Skip if file is already in committed changes
+                        # (file is both committed and has additional staged changes)
+                        if staged["path"] not in changed_files_paths:
+                            changed_files.append(_create_file_change_info(staged))
+                            changed_files_paths.add(staged["path"])
+                except Exception as staged_err:
+                    logger.debug(
+                        "Failed to get staged files",
+                        dialog_id=dialog_id,
+                        error=str(staged_err),
+                    )
 
         # Sort changed files by path for consistent display order
         changed_files.sort(key=lambda f: f.path)
@@ -376,12 +459,10 @@ async def restore_checkpoint(
         RestoreResponse with restored checkpoint ID and new checkpoint ID
     """
     try:
-        tracker = VersioningTracker(str(project.root), dialog_id)
+        tracker = get_versioning_tracker(project.root, dialog_id)
 
         # Verify checkpoint exists
-        checkpoints = tracker.list_checkpoints()
-        checkpoint_ids = [cp.commit_id for cp in checkpoints]
-        if request.checkpoint_id not in checkpoint_ids:
+        if not tracker.has_checkpoint(request.checkpoint_id):
             raise HTTPException(
                 status_code=404,
                 detail=f"Checkpoint {request.checkpoint_id} not found in dialog {dialog_id}",
@@ -426,6 +507,14 @@ async def restore_checkpoint(
             f"Restored to checkpoint {request.checkpoint_id[:8]}",
         )
 
+        # Repack the shadow repo in background if it is due (restore abandons
+        # nothing: the restored state becomes a new checkpoint)
+        if claim_background_maintenance(str(project.root)):
+            get_background_manager().create_thread_task(
+                run_maintenance_background(str(project.root), dialog_id),
+                name=f"checkpoint_gc_{dialog_id[:8]}",
+            )
+
         return RestoreResponse(
             restored_to=request.checkpoint_id,
             new_checkpoint=new_checkpoint.commit_id,
@@ -458,7 +547,7 @@ async def approve_session(
         ApproveResponse with approved commit ID and new session name
     """
     try:
-        tracker = VersioningTracker(str(project.root), dialog_id)
+        tracker = get_versioning_tracker(project.root, dialog_id)
 
         # Approve session
         result = tracker.approve_all(message=request.message)
@@ -521,7 +610,7 @@ async def reset_to_approved(
         ResetResponse with reset commit ID, new session name, and optional pre-reset checkpoint
     """
     try:
-        tracker = VersioningTracker(str(project.root), dialog_id)
+        tracker = get_versioning_tracker(project.root, dialog_id)
 
         # Reset to approved (creates auto-checkpoint if needed)
         result = await asyncio.to_thread(tracker.reset_to_approved)
@@ -566,6 +655,13 @@ async def reset_to_approved(
                 dialog_id=dialog_id,
                 files_count=len(restored_files),
             )
+
+        # Repack the dialog repo in background to prune the dropped checkpoints
+        if claim_background_maintenance(str(project.root)):
+            get_background_manager().create_thread_task(
+                run_maintenance_background(str(project.root), dialog_id, force=True),
+                name=f"checkpoint_gc_{dialog_id[:8]}",
+            )
         return ResetResponse(**result)
     except Exception as e:
         logger.error("Failed to reset to approved", dialog_id=dialog_id, error=str(e))
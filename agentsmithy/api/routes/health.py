@@ -33,6 +33,16 @@ async def health(project: Project | None = Depends(get_project)):  # noqa: B008
         # Check configuration validity
         config_valid, config_errors = settings.validation_status()
 
+        rag_index_queue = None
+        if project:
+            from agentsmithy.rag.vector_store import get_index_queue_stats
+
+            rag_index_queue = get_index_queue_stats(project)
+
+        from agentsmithy.rag.store_executor import store_stats
+
+        rag_store = store_stats() or None
+
         return HealthResponse(
             status="ok",
             service="agentsmithy-server",
@@ -42,6 +52,8 @@ async def health(project: Project | None = Depends(get_project)):  # noqa: B008
             server_error=status_doc.get("server_error"),
             config_valid=config_valid,
             config_errors=config_errors if config_errors else None,
+            rag_index_queue=rag_index_queue,
+            rag_store=rag_store,
         )
     except Exception as e:
         # Log the error - this might indicate permissions issues, corrupt file, etc.
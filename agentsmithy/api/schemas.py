@@ -42,6 +42,10 @@ class HealthResponse(BaseModel):
         None  # Whether configuration is valid (has API keys, etc)
     )
     config_errors: list[str] | None = None  # List of configuration issues if any
+    # RAG indexing queue depth/lag (None until a file was queued)
+    rag_index_queue: dict[str, Any] | None = None
+    # Vector store operation timings (None until one ran)
+    rag_store: dict[str, Any] | None = None
 
 
 class DialogCreateRequest(BaseModel):
@@ -45,6 +45,14 @@ def _build_default_workloads() -> dict[str, Any]:
         # Fallback if import fails (shouldn't happen in normal operation)
         pass
 
+    # Offline embeddings computed in-process (no API key, no network)
+    workloads["local-hashing"] = {
+        "provider": "local",
+        "model": "local-hashing",
+        "kind": "embeddings",
+        "options": {},
+    }
+
     # TODO: Add Anthropic, Google, xAI model catalogs when implemented
 
     return workloads
@@ -63,6 +71,11 @@ def get_default_config() -> dict[str, Any]:
                 "base_url": "https://api.openai.com/v1",
                 "options": {},
             },
+            # In-process embeddings for offline use (see the local-hashing workload)
+            "local": {
+                "type": "local",
+                "options": {},
+            },
         },
         # Workloads auto-generated from model catalog
         # Each workload is named by its model (e.g., "gpt-5.1-codex")
@@ -74,6 +87,14 @@ def get_default_config() -> dict[str, Any]:
         "server_port": 8765,
         # Summarization
         "summary_trigger_token_budget": 20000,
+        # Checkpoints: watch the project instead of walking it on every checkpoint
+        "checkpoint_watcher": True,
+        # Checkpoints: store files of at least this many bytes as deduplicated
+        # chunks (0 disables chunking)
+        "checkpoint_chunk_min_size": 0,
+        # Checkpoints: worker processes hashing new files of large checkpoints
+        # (0 = one per CPU, 1 = hash in the server process)
+        "checkpoint_hash_processes": 0,
         # Models configuration - references workloads by model name
         "models": {
             "agents": {
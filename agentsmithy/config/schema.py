@@ -271,6 +271,9 @@ class AppConfig(BaseModel):
     server_host: str = "localhost"
     server_port: int = 8765
     summary_trigger_token_budget: int = 20000
+    checkpoint_watcher: bool = True
+    checkpoint_chunk_min_size: int = 0
+    checkpoint_hash_processes: int = 0
     web_user_agent: str = (
         "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
         "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
@@ -167,6 +167,19 @@ class Settings:
     def max_open_files(self) -> int:
         return DEFAULT_MAX_OPEN_FILES
 
+    # Checkpoints
+    @property
+    def checkpoint_watcher_enabled(self) -> bool:
+        return self._get("checkpoint_watcher", True, "CHECKPOINT_WATCHER")
+
+    @property
+    def checkpoint_chunk_min_size(self) -> int:
+        return self._get("checkpoint_chunk_min_size", 0, "CHECKPOINT_CHUNK_MIN_SIZE")
+
+    @property
+    def checkpoint_hash_processes(self) -> int:
+        return self._get("checkpoint_hash_processes", 0, "CHECKPOINT_HASH_PROCESSES")
+
     # Summarization
     @property
     def summary_trigger_token_budget(self) -> int:
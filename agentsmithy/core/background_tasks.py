@@ -30,7 +30,7 @@ class BackgroundTaskManager:
 
     def create_task(
         self, coro: Coroutine[Any, Any, None], name: str | None = None
-    ) -> None:
+    ) -> asyncio.Task[None]:
         """Create a background task and track it.
 
         This uses asyncio.ensure_future() to truly defer execution until after
@@ -40,6 +40,9 @@ class BackgroundTaskManager:
         Args:
             coro: Coroutine to run in background
             name: Optional name for the task (for debugging)
+
+        Returns:
+            The task; it ends without running coro if cancelled first
         """
 
         # Wrap in async function to defer execution
@@ -66,12 +69,15 @@ class BackgroundTaskManager:
 
         # Auto-cleanup when task completes
         task.add_done_callback(self._tasks.discard)
+        # Cancelled before it ran: close coro so it is not reported as never awaited
+        task.add_done_callback(lambda _task: coro.close())
 
         logger.debug(
             "Scheduled background task",
             task_name=name or "unnamed",
             active_tasks=len(self._tasks),
         )
+        return task
 
     def create_thread_task(
         self, coro: Coroutine[Any, Any, None], name: str | None = None
@@ -86,9 +92,13 @@ class BackgroundTaskManager:
             name: Optional task name for debugging
         """
 
+        handed_off = False
+
         async def _wrapped_thread_job() -> None:
+            nonlocal handed_off
             # Let the endpoint return first
             await asyncio.sleep(0)
+            handed_off = True
 
             def _runner() -> None:
                 try:
@@ -105,11 +115,17 @@ class BackgroundTaskManager:
             # Offload to a worker thread
             await asyncio.to_thread(_runner)
 
+        def _close_unstarted(_task: asyncio.Task[None]) -> None:
+            # Cancelled before the thread took coro: it is not reported as never awaited
+            if not handed_off:
+                coro.close()
+
         task: asyncio.Task[None] = asyncio.ensure_future(_wrapped_thread_job())
         if name:
             task.set_name(name)
         self._tasks.add(task)
         task.add_done_callback(self._tasks.discard)
+        task.add_done_callback(_close_unstarted)
         logger.debug(
             "Scheduled background thread task",
             task_name=name or "unnamed",
@@ -16,7 +16,10 @@ from pathlib import Path
 from typing import Any
 
 from agentsmithy.dialogs.history import DialogHistory
-from agentsmithy.services.versioning import VersioningTracker
+from agentsmithy.services.versioning import (
+    get_versioning_tracker,
+    release_versioning_tracker,
+)
 from agentsmithy.utils.logger import get_logger
 
 logger = get_logger("project")
@@ -184,8 +187,7 @@ class Project:
             create_initial_session(db_path, "session_1")
 
             # Now create checkpoint (this will use session_1 branch)
-            tracker = VersioningTracker(str(self.root), dialog_id)
-            tracker.ensure_repo()
+            tracker = get_versioning_tracker(self.root, dialog_id)
             initial_checkpoint = tracker.create_checkpoint(
                 f"Initial snapshot before dialog: {title or dialog_id[:8]}"
             )
@@ -335,6 +337,8 @@ class Project:
             DialogHistory(self, dialog_id).clear()
         except Exception:
             pass
+        # Drop buffered staging so it is not written into the removed directory
+        release_versioning_tracker(self.root, dialog_id)
         # Remove directory if exists
         ddir = self.get_dialog_dir(dialog_id)
         if ddir.exists():
@@ -371,14 +375,14 @@ class Project:
         (self.rag_dir / "chroma_db").mkdir(parents=True, exist_ok=True)
 
     def get_vector_store(self, collection_name: str = "agentsmithy_docs"):
-        """Return a project-scoped VectorStoreManager instance.
+        """Return the shared project-scoped VectorStoreManager instance.
 
         Lazy-import to avoid circular imports at module load time.
         """
-        from agentsmithy.rag.vector_store import VectorStoreManager
+        from agentsmithy.rag.vector_store import get_vector_store_manager
 
         self.ensure_rag_dirs()
-        return VectorStoreManager(self, collection_name=collection_name)
+        return get_vector_store_manager(self, collection_name=collection_name)
 
     async def rag_add_texts(
         self,
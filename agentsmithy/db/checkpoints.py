@@ -0,0 +1,255 @@
+"""Checkpoint metadata stored in the dialog journal.
+
+One row per checkpoint commit, in creation order (``seq``). A checkpoint is
+visible in a session if it was created in that session or is ``approved``:
+the initial checkpoint, approval merge commits and every checkpoint of a
+merged session. That is exactly the ancestry of the session branch, so
+listings never need to walk the commit graph.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+
+from agentsmithy.utils.logger import get_logger
+
+logger = get_logger("db.checkpoints")
+
+_initialized: set[str] = set()
+_initialized_lock = threading.Lock()
+
+
+@dataclass(frozen=True, slots=True)
+class CheckpointRecord:
+    """A checkpoint row; ``seq`` doubles as the pagination cursor."""
+
+    seq: int
+    commit_id: str
+    parent_id: str | None
+    session_name: str | None
+    message: str
+    created_at: str | None
+    files_count: int | None
+    approved: bool
+
+
+# (commit_id, parent_id, session_name, message, created_at, files_count, approved)
+CheckpointRow = tuple[str, str | None, str | None, str, str, int | None, bool]
+
+_COLUMNS = (
+    "seq, commit_id, parent_id, session_name, message, created_at, "
+    "files_count, approved"
+)
+
+
+def _row_to_record(row: tuple) -> CheckpointRecord:
+    return CheckpointRecord(
+        seq=row[0],
+        commit_id=row[1],
+        parent_id=row[2],
+        session_name=row[3],
+        message=row[4] or "",
+        created_at=row[5],
+        files_count=row[6],
+        approved=bool(row[7]),
+    )
+
+
+def ensure_checkpoints_table(db_path: Path) -> None:
+    """Ensure the checkpoints table and its indexes exist.
+
+    Args:
+        db_path: Path to the SQLite database file
+    """
+    key = str(db_path)
+    with _initialized_lock:
+        if key in _initialized and db_path.exists():
+            return
+
+    with sqlite3.connect(key) as conn:
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS checkpoints (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                commit_id TEXT UNIQUE NOT NULL,
+                parent_id TEXT,
+                session_name TEXT,
+                message TEXT,
+                created_at TEXT,
+                files_count INTEGER,
+                approved INTEGER DEFAULT 0
+            )
+        """
+        )
+        conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS ix_checkpoints_session_seq
+            ON checkpoints(session_name, seq)
+        """
+        )
+        conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS ix_checkpoints_approved_seq
+            ON checkpoints(approved, seq)
+        """
+        )
+        conn.commit()
+
+    with _initialized_lock:
+        _initialized.add(key)
+
+
+def record_checkpoints(db_path: Path, rows: list[CheckpointRow]) -> None:
+    """Insert checkpoint rows in the given (chronological) order.
+
+    Already recorded commits are left untouched.
+
+    Args:
+        db_path: Path to the SQLite database file
+        rows: (commit_id, parent_id, session_name, message, created_at,
+            files_count, approved) tuples
+    """
+    ensure_checkpoints_table(db_path)
+
+    with sqlite3.connect(str(db_path)) as conn:
+        conn.executemany(
+            """
+            INSERT OR IGNORE INTO checkpoints
+            (commit_id, parent_id, session_name, message, created_at,
+             files_count, approved)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+            [
+                (commit_id, parent, session, message, created, files, int(approved))
+                for commit_id, parent, session, message, created, files, approved in rows
+            ],
+        )
+        conn.commit()
+
+
+def record_checkpoint(
+    db_path: Path,
+    commit_id: str,
+    message: str,
+    session_name: str | None,
+    parent_id: str | None = None,
+    files_count: int | None = None,
+    approved: bool = False,
+) -> None:
+    """Record a single newly created checkpoint.
+
+    Args:
+        db_path: Path to the SQLite database file
+        commit_id: Checkpoint commit SHA
+        message: Checkpoint message
+        session_name: Session the checkpoint was created in
+        parent_id: First parent commit SHA
+        files_count: Number of files in the checkpoint tree
+        approved: Whether the checkpoint is already part of the approved line
+    """
+    now = datetime.now(UTC).isoformat()
+    record_checkpoints(
+        db_path,
+        [(commit_id, parent_id, session_name, message, now, files_count, approved)],
+    )
+
+
+def mark_session_approved(db_path: Path, session_name: str) -> None:
+    """Mark every checkpoint of a merged session as approved.
+
+    Args:
+        db_path: Path to the SQLite database file
+        session_name: Name of the merged session
+    """
+    ensure_checkpoints_table(db_path)
+
+    with sqlite3.connect(str(db_path)) as conn:
+        conn.execute(
+            "UPDATE checkpoints SET approved = 1 WHERE session_name = ?",
+            (session_name,),
+        )
+        conn.commit()
+
+
+def get_checkpoint(
+    db_path: Path, commit_id: str, session_name: str
+) -> CheckpointRecord | None:
+    """Get a checkpoint if it is visible in the given session.
+
+    Args:
+        db_path: Path to the SQLite database file
+        commit_id: Checkpoint commit SHA
+        session_name: Active session name
+
+    Returns:
+        CheckpointRecord or None if unknown or not in the session's history
+    """
+    ensure_checkpoints_table(db_path)
+
+    with sqlite3.connect(str(db_path)) as conn:
+        row = conn.execute(
+            f"""
+            SELECT {_COLUMNS} FROM checkpoints
+            WHERE commit_id = ? AND (session_name = ? OR approved = 1)
+        """,
+            (commit_id, session_name),
+        ).fetchone()
+        return _row_to_record(row) if row else None
+
+
+def list_checkpoints(
+    db_path: Path,
+    session_name: str,
+    limit: int | None = None,
+    before: int | None = None,
+) -> list[CheckpointRecord]:
+    """List checkpoints visible in a session, oldest first.
+
+    With a limit, returns the newest ``limit`` checkpoints older than the
+    ``before`` cursor (all of them if None), still oldest first.
+
+    Args:
+        db_path: Path to the SQLite database file
+        session_name: Active session name
+        limit: Maximum number of checkpoints to return (None for all)
+        before: Only return checkpoints with seq lower than this
+
+    Returns:
+        List of CheckpointRecord
+    """
+    ensure_checkpoints_table(db_path)
+
+    params: list[object] = [session_name]
+    cursor_clause = ""
+    if before is not None:
+        cursor_clause = "AND seq < ?"
+        params.append(before)
+
+    # UNION of two index range scans; an OR would force a full table scan
+    query = f"""
+        SELECT {_COLUMNS} FROM (
+            SELECT {_COLUMNS} FROM checkpoints
+            WHERE session_name = ? AND approved = 0 {cursor_clause}
+            UNION ALL
+            SELECT {_COLUMNS} FROM checkpoints
+            WHERE approved = 1 {cursor_clause}
+        )
+    """
+    params += params[1:]
+    if limit is not None:
+        query += " ORDER BY seq DESC LIMIT ?"
+        params.append(limit)
+    else:
+        query += " ORDER BY seq"
+
+    with sqlite3.connect(str(db_path)) as conn:
+        rows = conn.execute(query, params).fetchall()
+
+    records = [_row_to_record(row) for row in rows]
+    if limit is not None:
+        records.reverse()
+    return records
@@ -4,6 +4,7 @@ Exposes helper to register built-in provider adapters and catalog providers.
 """
 
 from .catalog import register_catalog_provider
+from .local.catalog import local_catalog_provider
 from .ollama.catalog import ollama_catalog_provider
 from .openai.adapter import factory as openai_factory
 from .openai.catalog import openai_catalog_provider
@@ -24,4 +25,5 @@ def register_builtin_catalog_providers() -> None:
         return
     register_catalog_provider(openai_catalog_provider)
     register_catalog_provider(ollama_catalog_provider)
+    register_catalog_provider(local_catalog_provider)
     _CATALOG_REGISTERED = True
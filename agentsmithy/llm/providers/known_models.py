@@ -29,6 +29,7 @@ KNOWN_EMBEDDING_MODELS: dict[Vendor, set[str]] = {
     Vendor.ANTHROPIC: set(),  # Anthropic doesn't have public embedding models yet
     Vendor.XAI: set(),
     Vendor.DEEPSEEK: set(),
+    Vendor.LOCAL: {"local-hashing"},
     Vendor.OTHER: set(),
 }
 
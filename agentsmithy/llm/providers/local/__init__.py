@@ -0,0 +1,8 @@
+"""Local provider package.
+
+Provides embeddings computed in-process, without a model download or network.
+"""
+
+from .embeddings import HASHING_EMBEDDINGS_MODEL, HashingEmbeddings
+
+__all__ = ["HASHING_EMBEDDINGS_MODEL", "HashingEmbeddings"]
@@ -0,0 +1,30 @@
+"""Local model catalog provider.
+
+Static: the built-in embeddings need no server to list them.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from agentsmithy.llm.providers.catalog import (
+    IModelCatalogProvider,
+    ModelCatalog,
+)
+from agentsmithy.llm.providers.types import Vendor
+
+from .embeddings import HASHING_EMBEDDINGS_MODEL
+
+
+class LocalModelCatalogProvider(IModelCatalogProvider):
+    """Model catalog for the in-process (local) provider."""
+
+    def vendor(self) -> Vendor:
+        return Vendor.LOCAL
+
+    def get_catalog(self, provider_config: dict[str, Any]) -> ModelCatalog:
+        return ModelCatalog(embeddings=[HASHING_EMBEDDINGS_MODEL])
+
+
+# Singleton instance
+local_catalog_provider = LocalModelCatalogProvider()
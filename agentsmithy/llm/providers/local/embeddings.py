@@ -0,0 +1,116 @@
+"""Feature-hashing embeddings computed locally with NumPy.
+
+Every text is turned into weighted features that are hashed into a
+fixed-dimension vector (the "hashing trick"):
+
+- code tokens (identifiers, words, numbers), lowercased;
+- the words of compound identifiers (``stage_file_deletion``, ``sendRequest``),
+  so prose queries meet code;
+- token bigrams, for phrases and call sites;
+- character trigrams of each token, for inflections and near-misses
+  (``restore`` / ``restored``).
+
+Counts are dampened with log1p and vectors are L2-normalized, so cosine and
+dot-product distances behave like with model embeddings. Quality is well below
+a neural model, but it needs no download or network and is deterministic
+across runs and machines (CRC-32, not Python's salted ``hash``), which makes
+it suitable for air-gapped installs and reproducible RAG benchmarks.
+"""
+
+from __future__ import annotations
+
+import re
+import zlib
+from functools import lru_cache
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+HASHING_EMBEDDINGS_MODEL = "local-hashing"
+
+DEFAULT_DIMENSIONS = 1024
+
+# Texts embedded per NumPy batch
+_BATCH_SIZE = 256
+
+_TOKEN = re.compile(r"[A-Za-z0-9_]+")
+_WORD_PART = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+")
+
+_PART_WEIGHT = 0.5
+_BIGRAM_WEIGHT = 0.5
+_TRIGRAM_WEIGHT = 0.2
+
+
+@lru_cache(maxsize=1 << 17)
+def _bucket(feature: str, dimensions: int) -> tuple[int, float]:
+    """Vector index and sign of a feature."""
+    h = zlib.crc32(feature.encode("utf-8"))
+    # The low bit picks the sign, so colliding features tend to cancel out
+    return (h >> 1) % dimensions, -1.0 if h & 1 else 1.0
+
+
+def text_features(text: str) -> dict[str, float]:
+    """Weighted features of a text (summed per feature), before hashing."""
+    features: dict[str, float] = {}
+
+    def add(feature: str, weight: float) -> None:
+        features[feature] = features.get(feature, 0.0) + weight
+
+    previous = ""
+    for raw in _TOKEN.findall(text):
+        token = raw.lower()
+        add(f"t:{token}", 1.0)
+        parts = [
+            part.lower()
+            for piece in raw.split("_")
+            for part in _WORD_PART.findall(piece)
+        ]
+        if len(parts) > 1:
+            for part in parts:
+                add(f"t:{part}", _PART_WEIGHT)
+        if previous:
+            add(f"b:{previous} {token}", _BIGRAM_WEIGHT)
+        previous = token
+        padded = f"<{token}>"
+        for i in range(len(padded) - 2):
+            add(f"c:{padded[i : i + 3]}", _TRIGRAM_WEIGHT)
+    return features
+
+
+class HashingEmbeddings(Embeddings):
+    """Embeddings from hashed token and n-gram features; no model, no network."""
+
+    def __init__(self, dimensions: int = DEFAULT_DIMENSIONS):
+        if dimensions <= 0:
+            raise ValueError("Hashing embeddings dimensions must be positive")
+        self.dimensions = dimensions
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        vectors: list[list[float]] = []
+        for i in range(0, len(texts), _BATCH_SIZE):
+            vectors.extend(self._embed_batch(texts[i : i + _BATCH_SIZE]).tolist())
+        return vectors
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._embed_batch([text])[0].tolist()
+
+    def _embed_batch(self, texts: list[str]) -> np.ndarray:
+        cells: list[int] = []
+        values: list[float] = []
+        for row, text in enumerate(texts):
+            offset = row * self.dimensions
+            for feature, weight in text_features(text).items():
+                column, sign = _bucket(feature, self.dimensions)
+                cells.append(offset + column)
+                values.append(sign * weight)
+
+        # Sum the features of every (row, column) cell in one pass
+        matrix = np.bincount(
+            np.asarray(cells, dtype=np.intp),
+            weights=np.asarray(values, dtype=np.float64),
+            minlength=len(texts) * self.dimensions,
+        ).reshape(len(texts), self.dimensions)
+        # Sublinear term frequency, then unit length (empty texts stay zero)
+        matrix = np.sign(matrix) * np.log1p(np.abs(matrix))
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return (matrix / np.where(norms == 0, 1.0, norms)).astype(np.float32)
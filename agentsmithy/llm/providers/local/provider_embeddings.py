@@ -0,0 +1,40 @@
+"""Local embeddings provider.
+
+Resolves the embeddings workload like OpenAIEmbeddingsProvider; the workload's
+``options.dimensions`` sets the vector size.
+"""
+
+from __future__ import annotations
+
+from langchain_core.embeddings import Embeddings
+
+from agentsmithy.config import settings
+
+from .embeddings import DEFAULT_DIMENSIONS, HASHING_EMBEDDINGS_MODEL, HashingEmbeddings
+
+
+class LocalEmbeddingsProvider:
+    def __init__(self, model: str | None = None):
+        embeddings_cfg = settings._get("models.embeddings", None)
+        workload_name = (
+            embeddings_cfg.get("workload") if isinstance(embeddings_cfg, dict) else None
+        )
+        workload_config = (
+            settings._get_workload_config(workload_name) if workload_name else None
+        )
+        if not isinstance(workload_config, dict):
+            workload_config = {}
+
+        self.model = model or workload_config.get("model") or HASHING_EMBEDDINGS_MODEL
+        if self.model != HASHING_EMBEDDINGS_MODEL:
+            raise ValueError(
+                f"Unknown local embeddings model '{self.model}'. "
+                f"Supported: {HASHING_EMBEDDINGS_MODEL}"
+            )
+
+        options = workload_config.get("options") or {}
+        self.dimensions = int(options.get("dimensions", DEFAULT_DIMENSIONS))
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return HashingEmbeddings(self.dimensions)
@@ -10,6 +10,7 @@ class Vendor(str, Enum):
     ANTHROPIC = "anthropic"
     XAI = "xai"
     DEEPSEEK = "deepseek"
+    LOCAL = "local"
     OTHER = "other"
 
 
@@ -0,0 +1,358 @@
+"""Code-aware chunking of source files for the RAG index.
+
+A generic character splitter cuts through functions and repeats 20% of every
+chunk as overlap. Source files are instead split along their structure:
+
+- Python is parsed with ``ast``; every top-level function and class is a unit
+  (with its decorators and leading comments), and classes too large for one
+  chunk are split into their methods (symbol ``Class.method``).
+- Other languages use a small scanner that tracks bracket depth while skipping
+  strings and comments. A unit starts at an unindented line at depth 0 after a
+  blank line, a closed block, or on a declaration; its symbol is taken from the
+  declaration (``function``, ``class``, ``fn``, ``func``, ``const x =``, ...).
+
+Consecutive small units are merged up to CODE_CHUNK_MAX_CHARS, and units
+larger than that are cut into line windows (very long lines into pieces).
+Chunks carry no overlap; every chunk records its symbol(s), 1-based line range
+and language, so a retrieved snippet can be cited and located without reading
+the file.
+
+Files of unknown languages (docs, config) keep the generic splitter.
+"""
+
+from __future__ import annotations
+
+import ast
+import re
+from dataclasses import dataclass
+from pathlib import PurePath
+
+# Largest code chunk; without overlap, a ~60-line function stays whole
+CODE_CHUNK_MAX_CHARS = 2400
+
+# Units smaller than this are merged with their neighbours
+CODE_CHUNK_MIN_CHARS = 400
+
+LANGUAGES_BY_SUFFIX = {
+    ".py": "python",
+    ".pyi": "python",
+    ".js": "javascript",
+    ".jsx": "javascript",
+    ".mjs": "javascript",
+    ".cjs": "javascript",
+    ".ts": "typescript",
+    ".tsx": "typescript",
+    ".go": "go",
+    ".rs": "rust",
+    ".java": "java",
+    ".kt": "kotlin",
+    ".scala": "scala",
+    ".swift": "swift",
+    ".c": "c",
+    ".h": "c",
+    ".cc": "cpp",
+    ".cpp": "cpp",
+    ".hpp": "cpp",
+    ".cs": "csharp",
+    ".php": "php",
+    ".rb": "ruby",
+    ".lua": "lua",
+    ".sh": "shell",
+    ".bash": "shell",
+}
+
+# Languages whose line comments start with '#'
+_HASH_COMMENTS = {"ruby", "shell"}
+
+_DECLARATION = re.compile(
+    r"^(?:export\s+)?(?:default\s+)?(?:pub(?:\([^)]*\))?\s+)?"
+    r"(?:(?:public|private|protected|internal|static|final|abstract|async|override"
+    r"|virtual|extern|inline|unsafe|open|sealed|data|local)\s+)*"
+    r"(?:function\*?|class|interface|struct|enum|trait|impl|fn|func|def|module"
+    r"|namespace|type|object|record|macro_rules!)\s+"
+    r"(?:\([^)]*\)\s*)?"  # Go method receiver
+    r"([A-Za-z_$][\w$]*)"
+)
+_VARIABLE = re.compile(
+    r"^(?:export\s+)?(?:(?:const|let|var|val|static|pub)\s+)+(?:mut\s+)?"
+    r"([A-Za-z_$][\w$]*)\s*[:=]"
+)
+# C-style definitions: "int main(void)", "static void Foo::bar() {"
+_C_FUNCTION = re.compile(r"^[\w\s\*&:<>,]*?\b([A-Za-z_][\w:]*)\s*\([^;]*$")
+_NOT_SYMBOLS = {"if", "for", "while", "switch", "return", "sizeof", "catch"}
+
+_COMMENT_PREFIXES = ("//", "/*", "*", "#", "--")
+
+
+@dataclass(frozen=True, slots=True)
+class CodeChunk:
+    """A chunk of a source file with the symbols it contains."""
+
+    text: str
+    symbol: str  # comma-separated names, "" for module-level code
+    start_line: int  # 1-based, inclusive
+    end_line: int
+
+
+@dataclass(slots=True)
+class _Unit:
+    start: int  # 0-based line index, inclusive
+    end: int  # exclusive
+    symbol: str
+
+
+def detect_language(path: str) -> str | None:
+    """Return the language chunked structurally for a path, if any."""
+    return LANGUAGES_BY_SUFFIX.get(PurePath(path).suffix.lower())
+
+
+def split_code(
+    text: str, language: str, max_chars: int = CODE_CHUNK_MAX_CHARS
+) -> list[CodeChunk]:
+    """Split source code into chunks along functions, classes and blocks."""
+    lines = text.splitlines(keepends=True)
+    units: list[_Unit] | None = None
+    if language == "python":
+        try:
+            tree = ast.parse(text)
+        except (SyntaxError, ValueError):
+            pass
+        else:
+            units = _python_units(tree.body, lines, 0, len(lines), "", max_chars)
+    if units is None:
+        units = _scanned_units(lines, language)
+    return _assemble(lines, units, max_chars)
+
+
+def _size(lines: list[str], start: int, end: int) -> int:
+    return sum(len(line) for line in lines[start:end])
+
+
+def _node_start(node: ast.stmt) -> int:
+    decorators = getattr(node, "decorator_list", [])
+    return min([node.lineno, *(d.lineno for d in decorators)]) - 1
+
+
+def _python_units(
+    body: list[ast.stmt],
+    lines: list[str],
+    start: int,
+    end: int,
+    prefix: str,
+    max_chars: int,
+) -> list[_Unit]:
+    """Units of a module or class body; gaps (comments) join the next unit."""
+    units: list[_Unit] = []
+    pos = start
+    for node in body:
+        node_end = node.end_lineno or node.lineno
+        if node_end <= pos:
+            continue  # shares a line with the previous statement
+        symbol = (
+            prefix + node.name
+            if isinstance(node, ast.FunctionDef | ast.AsyncFunctionDef | ast.ClassDef)
+            else ""
+        )
+        if (
+            isinstance(node, ast.ClassDef)
+            and _size(lines, pos, node_end) > max_chars
+            and _node_start(node.body[0]) > pos
+        ):
+            # Class header (and leading comments), then one unit per member
+            first = _node_start(node.body[0])
+            units.append(_Unit(pos, first, symbol))
+            units.extend(
+                _python_units(
+                    node.body, lines, first, node_end, symbol + ".", max_chars
+                )
+            )
+        else:
+            units.append(_Unit(pos, node_end, symbol))
+        pos = node_end
+    if pos < end:
+        units.append(_Unit(pos, end, ""))
+    return units
+
+
+def _scanned_units(lines: list[str], language: str) -> list[_Unit]:
+    """Units of a file in a brace language, found by tracking bracket depth."""
+    hash_comments = language in _HASH_COMMENTS
+    starts: list[int] = []
+    depth = 0
+    in_block_comment = False
+    closed_block = False  # previous line brought depth back to 0
+    previous = ""
+    for i, line in enumerate(lines):
+        stripped = line.strip()
+        if (
+            depth == 0
+            and not in_block_comment
+            and stripped
+            and not line[0].isspace()
+            and stripped[0] not in ")]}"
+            and (
+                not previous.strip()
+                or closed_block
+                or (
+                    _symbol_of(stripped)
+                    and not previous.strip().startswith(_COMMENT_PREFIXES)
+                )
+            )
+        ):
+            starts.append(i)
+        line_start_depth = depth
+        depth, in_block_comment = _scan_line(
+            line, depth, in_block_comment, hash_comments
+        )
+        closed_block = line_start_depth > 0 and depth == 0
+        previous = line
+
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+    bounds = [*starts, len(lines)]
+    units = []
+    for start, end in zip(bounds, bounds[1:], strict=False):
+        symbol = ""
+        for line in lines[start:end]:
+            stripped = line.strip()
+            if not stripped or stripped.startswith(_COMMENT_PREFIXES):
+                continue  # leading comments
+            symbol = _symbol_of(stripped)
+            break
+        units.append(_Unit(start, end, symbol))
+    return units
+
+
+def _scan_line(
+    line: str, depth: int, in_block_comment: bool, hash_comments: bool
+) -> tuple[int, bool]:
+    """Update bracket depth over one line, skipping strings and comments.
+
+    Strings are assumed not to span lines (template literals rarely matter for
+    top-level structure).
+    """
+    i = 0
+    n = len(line)
+    while i < n:
+        ch = line[i]
+        if in_block_comment:
+            end = line.find("*/", i)
+            if end == -1:
+                return depth, True
+            in_block_comment = False
+            i = end + 2
+            continue
+        if ch == "/" and line.startswith("//", i):
+            break
+        if ch == "#" and hash_comments:
+            break
+        if ch == "/" and line.startswith("/*", i):
+            in_block_comment = True
+            i += 2
+            continue
+        if ch in "\"'`":
+            i += 1
+            while i < n and line[i] != ch:
+                i += 2 if line[i] == "\\" else 1
+        elif ch in "([{":
+            depth += 1
+        elif ch in ")]}":
+            depth = max(depth - 1, 0)
+        i += 1
+    return depth, in_block_comment
+
+
+def _symbol_of(stripped: str) -> str:
+    for pattern in (_DECLARATION, _VARIABLE, _C_FUNCTION):
+        match = pattern.match(stripped)
+        if match and match.group(1) not in _NOT_SYMBOLS:
+            return match.group(1)
+    return ""
+
+
+def _assemble(lines: list[str], units: list[_Unit], max_chars: int) -> list[CodeChunk]:
+    """Merge small units, cut oversized ones into line windows."""
+    chunks: list[CodeChunk] = []
+    current: _Unit | None = None
+    current_symbols: list[str] = []
+    current_size = 0
+
+    def flush() -> None:
+        nonlocal current, current_symbols, current_size
+        if current is not None:
+            chunk = _make_chunk(lines, current.start, current.end, current_symbols)
+            if chunk is not None:
+                chunks.append(chunk)
+        current, current_symbols, current_size = None, [], 0
+
+    for unit in units:
+        size = _size(lines, unit.start, unit.end)
+        if size > max_chars:
+            flush()
+            chunks.extend(
+                _window_chunks(lines, unit.start, unit.end, max_chars, unit.symbol)
+            )
+            continue
+        mergeable = current is not None and (
+            size < CODE_CHUNK_MIN_CHARS
+            or current_size < CODE_CHUNK_MIN_CHARS
+            or (not unit.symbol and not any(current_symbols))
+        )
+        if current is not None and mergeable and current_size + size <= max_chars:
+            current.end = unit.end
+            current_symbols.append(unit.symbol)
+            current_size += size
+            continue
+        flush()
+        current = _Unit(unit.start, unit.end, unit.symbol)
+        current_symbols = [unit.symbol]
+        current_size = size
+    flush()
+    return chunks
+
+
+def _window_chunks(
+    lines: list[str], start: int, end: int, max_chars: int, symbol: str
+) -> list[CodeChunk]:
+    """Cut a unit into line windows of at most max_chars.
+
+    A single longer line (minified or generated code) is cut into pieces.
+    """
+    chunks: list[CodeChunk] = []
+
+    def add(chunk: CodeChunk | None) -> None:
+        if chunk is not None:
+            chunks.append(chunk)
+
+    window_start = start
+    size = 0
+    for i in range(start, end):
+        length = len(lines[i])
+        if size and size + length > max_chars:
+            add(_make_chunk(lines, window_start, i, [symbol]))
+            window_start, size = i, 0
+        if length > max_chars:
+            for offset in range(0, length, max_chars):
+                piece = lines[i][offset : offset + max_chars]
+                if piece.strip():
+                    add(CodeChunk(piece.rstrip("\n"), symbol, i + 1, i + 1))
+            window_start = i + 1
+            continue
+        size += length
+    add(_make_chunk(lines, window_start, end, [symbol]))
+    return chunks
+
+
+def _make_chunk(
+    lines: list[str], start: int, end: int, symbols: list[str]
+) -> CodeChunk | None:
+    # Leading and trailing blank lines are not part of the chunk
+    while start < end and not lines[start].strip():
+        start += 1
+    while end > start and not lines[end - 1].strip():
+        end -= 1
+    if start == end:
+        return None
+    text = "".join(lines[start:end]).rstrip("\n")
+    symbol = ", ".join(dict.fromkeys(s for s in symbols if s))
+    return CodeChunk(text, symbol, start + 1, end)
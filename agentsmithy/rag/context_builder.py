@@ -4,7 +4,7 @@ from typing import Any
 
 from agentsmithy.config import settings
 from agentsmithy.core.project import Project
-from agentsmithy.rag.vector_store import VectorStoreManager
+from agentsmithy.rag.vector_store import VectorStoreManager, get_vector_store_manager
 
 
 class ContextBuilder:
@@ -29,7 +29,7 @@ class ContextBuilder:
 
                 project = get_current_project()
                 project.root.mkdir(parents=True, exist_ok=True)
-            self.vector_store_manager = VectorStoreManager(project)
+            self.vector_store_manager = get_vector_store_manager(project)
             self.project = project
         self.max_context_length = settings.max_context_length
 
@@ -121,9 +121,7 @@ class ContextBuilder:
             k = min(k_documents, 2)
             rag_logger.debug("RAG similarity search", query=query[:100], k=k)
 
-            relevant_docs = await self.vector_store_manager.similarity_search(
-                query, k=k
-            )
+            relevant_docs = await self.vector_store_manager.hybrid_search(query, k=k)
 
             rag_logger.debug(
                 "RAG search completed",
@@ -221,8 +219,14 @@ class ContextBuilder:
             formatted_parts.append("=== Relevant Context from Knowledge Base ===")
             for i, doc in enumerate(context["relevant_documents"], 1):
                 formatted_parts.append(f"\n--- Document {i} ---")
-                if doc.get("metadata", {}).get("source"):
-                    formatted_parts.append(f"Source: {doc['metadata']['source']}")
+                metadata = doc.get("metadata", {})
+                if metadata.get("source"):
+                    location = metadata["source"]
+                    if metadata.get("start_line"):
+                        location += f":{metadata['start_line']}-{metadata['end_line']}"
+                    if metadata.get("symbol"):
+                        location += f" ({metadata['symbol']})"
+                    formatted_parts.append(f"Source: {location}")
                 formatted_parts.append(doc["content"])
             formatted_parts.append("")
 
@@ -0,0 +1,184 @@
+"""Persistent cache of chunk embeddings keyed by (model, chunk hash).
+
+Reindexing a file only embeds chunks the vector store does not hold yet (see
+VectorStoreManager.update_file_chunks), but content also comes back after it
+left the index: checkpoint restores and resets bring back file versions that
+were embedded moments earlier, and code moves between files. Embedding
+requests go through CachedEmbeddings, which looks every text up by its
+SHA-256 in an SQLite cache next to ``chroma_db`` and only sends the misses to
+the provider. The cache is per project, shared by all files and dialogs, and
+keeps the EMBEDDING_CACHE_MAX_ENTRIES most recently stored vectors.
+
+Entries are keyed by the embeddings model key as well (embeddings_model_key:
+provider type, model and options, never credentials or endpoints), so
+switching models never serves vectors of another model while an API key
+rotation keeps the cache.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+from array import array
+from pathlib import Path
+
+from langchain_core.embeddings import Embeddings
+
+from agentsmithy.rag.query_cache import (
+    QUERY_EMBEDDING_CACHE_SIZE,
+    LRUCache,
+    normalize_query,
+)
+from agentsmithy.utils.logger import rag_logger
+
+EMBEDDING_CACHE_FILENAME = "embedding_cache.db"
+
+# ~120 MB of 1536-dimensional vectors
+EMBEDDING_CACHE_MAX_ENTRIES = 20_000
+
+# SQLite limits the number of bound parameters per statement
+_LOOKUP_BATCH = 500
+
+_initialized: set[str] = set()
+_initialized_lock = threading.Lock()
+
+
+def chunk_hash(text: str) -> str:
+    """Content hash identifying a chunk (and its embedding)."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """(model, chunk hash) -> vector table, stored as float32."""
+
+    def __init__(self, db_path: Path) -> None:
+        self.db_path = db_path
+        self._ensure_table()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(str(self.db_path), timeout=30)
+
+    def _ensure_table(self) -> None:
+        key = str(self.db_path)
+        with _initialized_lock:
+            if key in _initialized and self.db_path.exists():
+                return
+
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    model TEXT NOT NULL,
+                    chunk_hash TEXT NOT NULL,
+                    vector BLOB NOT NULL,
+                    PRIMARY KEY (model, chunk_hash)
+                )
+            """
+            )
+            # Entries keyed by the full configuration (JSON, with API keys)
+            # were written before the model key was used
+            conn.execute("DELETE FROM embeddings WHERE model LIKE '[%'")
+            conn.commit()
+
+        with _initialized_lock:
+            _initialized.add(key)
+
+    def get_many(self, model: str, hashes: list[str]) -> dict[str, list[float]]:
+        """Return the cached vectors among the given chunk hashes."""
+        found: dict[str, list[float]] = {}
+        with self._connect() as conn:
+            for i in range(0, len(hashes), _LOOKUP_BATCH):
+                batch = hashes[i : i + _LOOKUP_BATCH]
+                rows = conn.execute(
+                    f"""
+                    SELECT chunk_hash, vector FROM embeddings
+                    WHERE model = ? AND chunk_hash IN ({",".join("?" * len(batch))})
+                """,
+                    [model, *batch],
+                ).fetchall()
+                for h, blob in rows:
+                    found[h] = array("f", blob).tolist()
+        return found
+
+    def put_many(self, model: str, vectors: dict[str, list[float]]) -> None:
+        """Store vectors, then drop the oldest entries beyond the size limit."""
+        if not vectors:
+            return
+        with self._connect() as conn:
+            conn.executemany(
+                """
+                INSERT OR REPLACE INTO embeddings (model, chunk_hash, vector)
+                VALUES (?, ?, ?)
+            """,
+                [(model, h, array("f", v).tobytes()) for h, v in vectors.items()],
+            )
+            # Rowids grow with every insert, so the smallest ones are the oldest
+            conn.execute(
+                """
+                DELETE FROM embeddings
+                WHERE rowid <= (SELECT MAX(rowid) FROM embeddings) - ?
+            """,
+                (EMBEDDING_CACHE_MAX_ENTRIES,),
+            )
+            conn.commit()
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that only sends uncached texts to the provider.
+
+    Documents go through the persistent cache; queries through an in-memory
+    LRU cache (see query_cache.py).
+    """
+
+    def __init__(self, embeddings: Embeddings, cache: EmbeddingCache, model: str):
+        self.embeddings = embeddings
+        self.cache = cache
+        self.model = model
+        self.query_cache: LRUCache[tuple[str, str], list[float]] = LRUCache(
+            QUERY_EMBEDDING_CACHE_SIZE
+        )
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        hashes = [chunk_hash(text) for text in texts]
+        try:
+            vectors = self.cache.get_many(self.model, list(dict.fromkeys(hashes)))
+        except sqlite3.Error as e:
+            rag_logger.warning("Embedding cache lookup failed", error=str(e))
+            vectors = {}
+
+        # Embed each missing text once, even if it repeats in the request
+        missing = {h: text for h, text in zip(hashes, texts, strict=True)}
+        missing = {h: text for h, text in missing.items() if h not in vectors}
+        if missing:
+            embedded = self.embeddings.embed_documents(list(missing.values()))
+            new_vectors = dict(zip(missing, embedded, strict=True))
+            vectors.update(new_vectors)
+            try:
+                self.cache.put_many(self.model, new_vectors)
+            except sqlite3.Error as e:
+                rag_logger.warning("Embedding cache update failed", error=str(e))
+
+        rag_logger.debug(
+            "Embedded documents",
+            texts=len(texts),
+            cached=len(texts) - len(missing),
+            embedded=len(missing),
+        )
+        return [vectors[h] for h in hashes]
+
+    def embed_query(self, text: str) -> list[float]:
+        query = normalize_query(text)
+        vector = self.query_cache.get((self.model, query))
+        if vector is None:
+            vector = self.embeddings.embed_query(query)
+            self.query_cache.put((self.model, query), vector)
+        return vector
+
+    async def aembed_query(self, text: str) -> list[float]:
+        query = normalize_query(text)
+        vector = self.query_cache.get((self.model, query))
+        if vector is None:
+            vector = await self.embeddings.aembed_query(query)
+            self.query_cache.put((self.model, query), vector)
+        return vector
@@ -1,7 +1,15 @@
 """Embeddings module for RAG system."""
 
+import hashlib
+import json
+from typing import Any
+
 from langchain_core.embeddings import Embeddings
 
+from agentsmithy.config import settings
+from agentsmithy.llm.providers.local.provider_embeddings import (
+    LocalEmbeddingsProvider,
+)
 from agentsmithy.llm.providers.openai.provider_embeddings import (
     OpenAIEmbeddingsProvider,
 )
@@ -21,14 +29,80 @@ except Exception:
 from agentsmithy.llm.providers.types import Vendor
 
 
+def _embeddings_config_chain() -> tuple[Any, Any, Any]:
+    """Return the models.embeddings -> workload -> provider config entries."""
+    embeddings_cfg = settings._get("models.embeddings", None)
+    workload_name = (
+        embeddings_cfg.get("workload") if isinstance(embeddings_cfg, dict) else None
+    )
+    workload_cfg = (
+        settings._get_workload_config(workload_name) if workload_name else None
+    )
+    provider_name = (
+        workload_cfg.get("provider") if isinstance(workload_cfg, dict) else None
+    )
+    provider_def = (
+        settings._get(f"providers.{provider_name}", None) if provider_name else None
+    )
+    return embeddings_cfg, workload_cfg, provider_def
+
+
+def embeddings_config_fingerprint() -> str:
+    """Return a string that changes whenever the embeddings configuration changes.
+
+    Covers the models.embeddings -> workload -> provider chain that the
+    embeddings providers resolve, so long-lived vector stores can tell
+    when their embeddings client is stale.
+    """
+    return json.dumps(list(_embeddings_config_chain()), sort_keys=True, default=str)
+
+
+def embeddings_model_key() -> str:
+    """Return a short key identifying the vectors the configuration produces.
+
+    Unlike the fingerprint it ignores credentials and endpoints: stored vectors
+    stay valid across an API key change, not across a model (or dimensions)
+    change.
+    """
+    return _model_key(vendor=None)
+
+
+def legacy_embeddings_model_key() -> str:
+    """Return the model key of collections indexed before keys were stamped.
+
+    Those were always embedded through OpenAI, whatever provider type the
+    configuration names, with the configured model and options.
+    """
+    return _model_key(vendor=Vendor.OPENAI.value)
+
+
+def _model_key(vendor: str | None) -> str:
+    _, workload_cfg, provider_def = _embeddings_config_chain()
+    workload = workload_cfg if isinstance(workload_cfg, dict) else {}
+    provider = provider_def if isinstance(provider_def, dict) else {}
+    identity = [
+        vendor or provider.get("type") or Vendor.OPENAI.value,
+        workload.get("model") or provider.get("model"),
+        workload.get("options") or {},
+    ]
+    encoded = json.dumps(identity, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+def configured_embeddings_vendor() -> str:
+    """Return the provider type of the configured embeddings workload."""
+    _, _, provider_def = _embeddings_config_chain()
+    if isinstance(provider_def, dict) and provider_def.get("type"):
+        return str(provider_def["type"])
+    return Vendor.OPENAI.value
+
+
 class EmbeddingsManager:
     """Manager for handling document embeddings."""
 
-    def __init__(
-        self, provider: Vendor | str = Vendor.OPENAI, model: str | None = None
-    ):
-        # Normalize provider to enum or string value
-        self.provider: Vendor | str = provider
+    def __init__(self, provider: Vendor | str | None = None, model: str | None = None):
+        # None: use the provider type of the configured embeddings workload
+        self.provider: Vendor | str | None = provider
         self.model = model
         self._embeddings: Embeddings | None = None
 
@@ -36,14 +110,18 @@ class EmbeddingsManager:
     def embeddings(self) -> Embeddings:
         """Get embeddings instance."""
         if self._embeddings is None:
-            provider_val = (
-                self.provider.value
-                if isinstance(self.provider, Vendor)
-                else self.provider
-            )
+            if self.provider is None:
+                provider_val = configured_embeddings_vendor()
+            elif isinstance(self.provider, Vendor):
+                provider_val = self.provider.value
+            else:
+                provider_val = self.provider
             if provider_val == Vendor.OPENAI.value:
                 # OpenAIEmbeddingsProvider resolves config via workload -> provider chain
                 self._embeddings = OpenAIEmbeddingsProvider(self.model).embeddings
+            elif provider_val == Vendor.LOCAL.value:
+                # Feature hashing in-process; no API key or network needed
+                self._embeddings = LocalEmbeddingsProvider(self.model).embeddings
             else:
                 raise ValueError(f"Unknown embeddings provider: {provider_val}")
 
@@ -0,0 +1,218 @@
+"""Manifest of files indexed in the RAG vector store.
+
+Chroma only knows chunks: listing indexed files meant pulling every chunk's
+metadata, and checking one file meant another metadata query. The manifest
+keeps one row per indexed file (content hash, size, mtime_ns, chunk ids,
+indexed_at) in a small SQLite database next to ``chroma_db``, so the pre-turn
+freshness check is one query plus a stat pass.
+
+Rows are written wherever chunks are added or deleted (see VectorStoreManager).
+A collection indexed before the manifest existed is backfilled from Chroma
+once, on first use.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+MANIFEST_FILENAME = "manifest.db"
+
+_initialized: set[str] = set()
+_initialized_lock = threading.Lock()
+
+
+@dataclass(frozen=True, slots=True)
+class ManifestEntry:
+    """Indexed state of one file; size/mtime_ns of 0 mean "unknown"."""
+
+    hash: str
+    size: int
+    mtime_ns: int
+    chunk_ids: list[str] = field(default_factory=list)
+    indexed_at: str | None = None
+
+
+class FileManifest:
+    """Path -> ManifestEntry table of one vector store collection."""
+
+    def __init__(self, db_path: Path, collection: str) -> None:
+        self.db_path = db_path
+        self.collection = collection
+        self._ensure_tables()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(str(self.db_path), timeout=30)
+
+    def _ensure_tables(self) -> None:
+        key = str(self.db_path)
+        with _initialized_lock:
+            if key in _initialized and self.db_path.exists():
+                return
+
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS rag_files (
+                    collection TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    hash TEXT NOT NULL,
+                    size INTEGER NOT NULL DEFAULT 0,
+                    mtime_ns INTEGER NOT NULL DEFAULT 0,
+                    chunk_ids TEXT NOT NULL DEFAULT '[]',
+                    indexed_at TEXT,
+                    PRIMARY KEY (collection, path)
+                )
+            """
+            )
+            # Collections whose pre-manifest chunks were already backfilled
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS rag_collections (
+                    collection TEXT PRIMARY KEY
+                )
+            """
+            )
+            conn.commit()
+
+        with _initialized_lock:
+            _initialized.add(key)
+
+    def is_backfilled(self) -> bool:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT 1 FROM rag_collections WHERE collection = ?",
+                (self.collection,),
+            ).fetchone()
+        return row is not None
+
+    def backfill(self, ids: list[str], metadatas: list[dict[str, Any] | None]) -> None:
+        """Build the manifest from the chunks already stored in Chroma.
+
+        Chunks stored before the manifest have no mtime_ns, so the next sync
+        hashes each file once and records its stat.
+        """
+        with self._connect() as conn:
+            self._upsert(conn, entries_from_metadata(ids, metadatas).items())
+            conn.execute(
+                "INSERT OR IGNORE INTO rag_collections (collection) VALUES (?)",
+                (self.collection,),
+            )
+            conn.commit()
+
+    def entries(self) -> dict[str, ManifestEntry]:
+        """All indexed files with hash and stat (chunk ids are not loaded)."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT path, hash, size, mtime_ns FROM rag_files WHERE collection = ?",
+                (self.collection,),
+            ).fetchall()
+        return {
+            path: ManifestEntry(h, size, mtime_ns) for path, h, size, mtime_ns in rows
+        }
+
+    def get(self, path: str) -> ManifestEntry | None:
+        with self._connect() as conn:
+            row = conn.execute(
+                """
+                SELECT hash, size, mtime_ns, chunk_ids, indexed_at FROM rag_files
+                WHERE collection = ? AND path = ?
+            """,
+                (self.collection, path),
+            ).fetchone()
+        if row is None:
+            return None
+        file_hash, size, mtime_ns, chunk_ids, indexed_at = row
+        return ManifestEntry(
+            file_hash, size, mtime_ns, json.loads(chunk_ids), indexed_at
+        )
+
+    def record(self, entries: dict[str, ManifestEntry]) -> None:
+        """Insert or replace the rows of freshly indexed files."""
+        if not entries:
+            return
+        with self._connect() as conn:
+            self._upsert(conn, entries.items())
+            conn.commit()
+
+    def _upsert(
+        self, conn: sqlite3.Connection, entries: Iterable[tuple[str, ManifestEntry]]
+    ) -> None:
+        conn.executemany(
+            """
+            INSERT OR REPLACE INTO rag_files
+            (collection, path, hash, size, mtime_ns, chunk_ids, indexed_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+            [
+                (
+                    self.collection,
+                    path,
+                    e.hash,
+                    e.size,
+                    e.mtime_ns,
+                    json.dumps(e.chunk_ids),
+                    e.indexed_at,
+                )
+                for path, e in entries
+            ],
+        )
+
+    def update_stats(self, stats: dict[str, tuple[int, int]]) -> None:
+        """Record (size, mtime_ns) of files whose content was verified unchanged."""
+        if not stats:
+            return
+        with self._connect() as conn:
+            conn.executemany(
+                """
+                UPDATE rag_files SET size = ?, mtime_ns = ?
+                WHERE collection = ? AND path = ?
+            """,
+                [
+                    (size, mtime_ns, self.collection, path)
+                    for path, (size, mtime_ns) in stats.items()
+                ],
+            )
+            conn.commit()
+
+    def remove(self, path: str) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM rag_files WHERE collection = ? AND path = ?",
+                (self.collection, path),
+            )
+            conn.commit()
+
+    def clear(self) -> None:
+        """Forget every file of the collection (the collection was dropped)."""
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM rag_files WHERE collection = ?", (self.collection,)
+            )
+            conn.commit()
+
+
+def entries_from_metadata(
+    ids: list[str], metadatas: list[dict[str, Any] | None]
+) -> dict[str, ManifestEntry]:
+    """Group stored chunk ids by the file they came from, as manifest rows."""
+    entries: dict[str, ManifestEntry] = {}
+    for chunk_id, metadata in zip(ids, metadatas, strict=False):
+        if not metadata or "source" not in metadata:
+            continue
+        source = str(metadata["source"])
+        entry = entries.get(source)
+        if entry is None:
+            entry = entries[source] = ManifestEntry(
+                hash=str(metadata.get("hash", "")),
+                size=int(metadata.get("size", 0) or 0),
+                mtime_ns=int(metadata.get("mtime_ns", 0) or 0),
+                indexed_at=metadata.get("indexed_at"),
+            )
+        entry.chunk_ids.append(chunk_id)
+    return entries
@@ -0,0 +1,335 @@
+"""Coalescing queue for RAG indexing requests.
+
+File tools used to start one background ``index_file`` task per call: a delete
+and an embeddings request per file, repeated for every write of the same file
+in a turn. Tools now enqueue the path with its latest content instead. The
+queue waits INDEX_DEBOUNCE_SECONDS so bursts of writes collapse into one entry
+per path, then packs the new chunks of many files into shared ``add_documents``
+calls (one embeddings request each, bounded by EMBED_BATCH_MAX_CHUNKS and
+EMBED_BATCH_MAX_CHARS) and runs up to INDEX_MAX_CONCURRENT_BATCHES of them at a
+time, on the store executor (see store_executor.py).
+
+A round that fails as a whole (e.g. the embeddings provider is down) puts its
+files back in the queue, unless newer requests for them arrived meanwhile, and
+is retried after INDEX_RETRY_DELAY_SECONDS, up to INDEX_MAX_ATTEMPTS times; files
+given up on are left for the next sync (see sync_files_if_needed).
+
+Each VectorStoreManager owns one queue (``manager.index_queue``); ``stats()``
+reports its depth and lag and is included in ``GET /health``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass, replace
+from typing import TYPE_CHECKING, Any
+
+from langchain_core.documents import Document
+
+from agentsmithy.rag.store_executor import run_in_store
+from agentsmithy.utils.logger import rag_logger
+
+if TYPE_CHECKING:
+    from agentsmithy.rag.vector_store import ChunkUpdate, VectorStoreManager
+
+# Seconds to wait for more writes of the same paths before indexing
+INDEX_DEBOUNCE_SECONDS = 0.1
+
+# Limits of a single embeddings request (~100k tokens at 4 chars per token)
+EMBED_BATCH_MAX_CHUNKS = 512
+EMBED_BATCH_MAX_CHARS = 400_000
+
+INDEX_MAX_CONCURRENT_BATCHES = 2
+
+# Rounds a file is tried in before it is left for the next sync
+INDEX_MAX_ATTEMPTS = 3
+INDEX_RETRY_DELAY_SECONDS = 2.0
+
+
+@dataclass(slots=True)
+class _PendingFile:
+    content: str | None  # None: read from disk when indexed
+    remove: bool
+    enqueued_at: float
+    attempts: int = 0  # failed rounds so far
+
+
+class IndexQueue:
+    """Per-project queue that coalesces and batches file indexing."""
+
+    def __init__(self, manager: VectorStoreManager) -> None:
+        self._manager = manager
+        self._pending: dict[str, _PendingFile] = {}
+        self._lock = threading.Lock()
+        self._worker_running = False
+        self._worker_task: asyncio.Task[None] | None = None
+        self._idle = threading.Event()
+        self._idle.set()
+        # Counters for stats()
+        self._files_indexed = 0
+        self._files_coalesced = 0
+        self._in_flight = 0
+        self._batches = 0
+        self._failed_rounds = 0
+        self._files_dropped = 0
+        self._last_lag: float | None = None
+
+    def rebind(self, manager: VectorStoreManager) -> None:
+        """Index into another manager (it replaced the current one).
+
+        Files of a round already running are queued again for the new manager.
+        """
+        with self._lock:
+            self._manager = manager
+
+    def enqueue(self, file_path: str, content: str | None = None) -> None:
+        """Index a file soon; a later enqueue of the same path replaces this one.
+
+        Must be called from a running event loop (the drain task runs there).
+
+        Args:
+            file_path: Path as stored in the index (relative to the project)
+            content: Latest file content, or None to read it from disk
+        """
+        self._put(file_path, _PendingFile(content, False, time.monotonic()))
+
+    def enqueue_removal(self, file_path: str) -> None:
+        """Drop a file from the index (and any pending indexing of it)."""
+        self._put(file_path, _PendingFile(None, True, time.monotonic()))
+
+    def _put(self, file_path: str, entry: _PendingFile) -> None:
+        with self._lock:
+            previous = self._pending.get(file_path)
+            if previous is not None:
+                # Lag counts from the first request that is still unserved
+                entry.enqueued_at = previous.enqueued_at
+                self._files_coalesced += 1
+            self._pending[file_path] = entry
+            if self._worker_running:
+                return
+            self._worker_running = True
+            self._idle.clear()
+
+        from agentsmithy.core.background_tasks import get_background_manager
+
+        drain = self._drain()
+        try:
+            task = get_background_manager().create_task(drain, name="rag_index_queue")
+        except BaseException:
+            drain.close()
+            with self._lock:
+                self._worker_running = False
+                self._idle.set()
+            raise
+        self._worker_task = task
+        task.add_done_callback(self._drain_done)
+
+    def _drain_done(self, task: asyncio.Task[None]) -> None:
+        """Let the next enqueue start a drain, however this one ended.
+
+        Covers drains that failed or were cancelled, also before they started.
+        """
+        with self._lock:
+            if self._worker_task is not task:
+                return
+            self._worker_task = None
+            self._worker_running = False
+            self._idle.set()
+
+    async def _drain(self) -> None:
+        """Index pending files in rounds until the queue is empty."""
+        while True:
+            await asyncio.sleep(INDEX_DEBOUNCE_SECONDS)
+            with self._lock:
+                if not self._pending:
+                    self._worker_running = False
+                    self._idle.set()
+                    return
+                batch, self._pending = self._pending, {}
+                self._in_flight = len(batch)
+                manager = self._manager
+            try:
+                await self._index_round(batch, manager)
+                if self._manager is not manager:
+                    # Rebound during the round: index again with the new manager
+                    self._requeue(batch, failed=False)
+            except Exception as e:
+                requeued = self._requeue(batch, failed=True)
+                rag_logger.warning(
+                    "RAG indexing round failed",
+                    files=len(batch),
+                    requeued=requeued,
+                    error=str(e),
+                )
+                if requeued:
+                    await asyncio.sleep(INDEX_RETRY_DELAY_SECONDS)
+            except BaseException:
+                # Cancelled: keep the files for the next drain
+                self._requeue(batch, failed=False)
+                raise
+            finally:
+                with self._lock:
+                    self._in_flight = 0
+
+    def _requeue(self, files: dict[str, _PendingFile], failed: bool) -> int:
+        """Put the files of an unfinished round back; newer requests win.
+
+        Returns:
+            Number of files put back
+        """
+        requeued = 0
+        with self._lock:
+            if failed:
+                self._failed_rounds += 1
+            for file_path, entry in files.items():
+                if file_path in self._pending:
+                    continue
+                attempts = entry.attempts + 1 if failed else entry.attempts
+                if attempts >= INDEX_MAX_ATTEMPTS:
+                    self._files_dropped += 1
+                    continue
+                self._pending[file_path] = replace(entry, attempts=attempts)
+                requeued += 1
+        return requeued
+
+    async def _index_round(
+        self, files: dict[str, _PendingFile], manager: VectorStoreManager
+    ) -> None:
+        oldest = min(entry.enqueued_at for entry in files.values())
+
+        updates: list[ChunkUpdate] = []
+        for file_path, entry in files.items():
+            if entry.remove or manager.is_ignored(file_path):
+                await manager.adelete_by_source(file_path)
+                continue
+            doc = await run_in_store(
+                "file_document", manager.file_document, file_path, entry.content
+            )
+            if doc is None:
+                await manager.adelete_by_source(file_path)
+                continue
+            # Drops stale chunks; unchanged chunks keep their stored vectors
+            updates.append(
+                await run_in_store(
+                    "update_file_chunks",
+                    manager.update_file_chunks,
+                    file_path,
+                    manager.split_documents([doc]),
+                )
+            )
+
+        new_chunks = [
+            pair
+            for update in updates
+            for pair in zip(update.new_chunks, update.new_ids, strict=True)
+        ]
+        batches = list(_iter_batches(new_chunks))
+        semaphore = asyncio.Semaphore(INDEX_MAX_CONCURRENT_BATCHES)
+
+        async def add_batch(batch: list[tuple[Document, str]]) -> None:
+            async with semaphore:
+                await run_in_store(
+                    "add_chunks",
+                    lambda: manager.vectorstore.add_documents(
+                        [chunk for chunk, _ in batch],
+                        ids=[chunk_id for _, chunk_id in batch],
+                    ),
+                )
+
+        results = await asyncio.gather(
+            *(add_batch(batch) for batch in batches), return_exceptions=True
+        )
+        failed = [r for r in results if isinstance(r, BaseException)]
+        failed_ids = {
+            chunk_id
+            for batch, result in zip(batches, results, strict=True)
+            if isinstance(result, BaseException)
+            for _, chunk_id in batch
+        }
+
+        # One manifest row per file, even when its chunks span batches
+        for update in updates:
+            try:
+                await run_in_store(
+                    "record_chunk_update",
+                    manager.record_chunk_update,
+                    update,
+                    failed_ids,
+                )
+            except Exception as e:
+                rag_logger.warning(
+                    "Failed to record queued RAG file",
+                    file=update.source,
+                    error=str(e),
+                )
+
+        lag = time.monotonic() - oldest
+        with self._lock:
+            self._files_indexed += len(files)
+            self._batches += len(batches)
+            self._last_lag = lag
+        rag_logger.debug(
+            "Indexed queued files in RAG",
+            files=len(files),
+            chunks=sum(len(update.ids) for update in updates),
+            added=len(new_chunks),
+            batches=len(batches),
+            failed_batches=len(failed),
+            lag_ms=int(lag * 1000),
+        )
+        if failed:
+            rag_logger.warning("Failed to add queued RAG chunks", error=str(failed[0]))
+
+    async def flush(self, timeout: float | None = None) -> bool:
+        """Wait until everything enqueued so far has been indexed.
+
+        Returns:
+            False if the timeout expired first
+        """
+        return await asyncio.to_thread(self._idle.wait, timeout)
+
+    def stats(self) -> dict[str, Any]:
+        """Queue depth and lag, for health reporting and logs."""
+        with self._lock:
+            now = time.monotonic()
+            oldest = min(
+                (entry.enqueued_at for entry in self._pending.values()), default=None
+            )
+            return {
+                "depth": len(self._pending),
+                "in_flight": self._in_flight,
+                "oldest_pending_seconds": (
+                    round(now - oldest, 3) if oldest is not None else None
+                ),
+                "last_lag_seconds": (
+                    round(self._last_lag, 3) if self._last_lag is not None else None
+                ),
+                "files_indexed": self._files_indexed,
+                "files_coalesced": self._files_coalesced,
+                "batches": self._batches,
+                "failed_rounds": self._failed_rounds,
+                "files_dropped": self._files_dropped,
+            }
+
+
+def _iter_batches(
+    chunks: list[tuple[Document, str]],
+) -> Iterator[list[tuple[Document, str]]]:
+    """Group (chunk, id) pairs into embeddings requests within the size limits."""
+    batch: list[tuple[Document, str]] = []
+    size = 0
+    for chunk, chunk_id in chunks:
+        length = len(chunk.page_content)
+        if batch and (
+            len(batch) >= EMBED_BATCH_MAX_CHUNKS
+            or size + length > EMBED_BATCH_MAX_CHARS
+        ):
+            yield batch
+            batch, size = [], 0
+        batch.append((chunk, chunk_id))
+        size += length
+    if batch:
+        yield batch
@@ -0,0 +1,308 @@
+"""Local lexical (BM25) index of the RAG chunks.
+
+Every chunk stored in the vector store is also written to an SQLite FTS5
+table in ``rag/lexical.db``, from the same indexing pipeline (see
+VectorStoreManager.record_chunk_update). Identifiers are kept whole
+(``stage_file_deletion`` is one token), and a separate column holds their
+parts (``stage file deletion``, ``camelCase`` -> ``camel case``) so prose
+queries match code too. Ranking is FTS5's BM25, weighted towards symbol
+names and paths.
+
+``VectorStoreManager.hybrid_search`` uses it to answer identifier questions
+("where is `stage_file_deletion` called") without an embeddings round-trip,
+to merge lexical and vector hits otherwise, and as a fallback when the
+embeddings provider fails.
+
+If the SQLite build lacks FTS5, the index disables itself and searches return
+nothing.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import sqlite3
+import threading
+from pathlib import Path
+
+from langchain_core.documents import Document
+
+from agentsmithy.utils.logger import rag_logger
+
+LEXICAL_FILENAME = "lexical.db"
+
+# Reciprocal rank fusion constant (standard value from the RRF paper)
+RRF_K = 60
+
+_IDENTIFIER = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+_WORD_PART = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+")
+_BACKTICKED = re.compile(r"`([^`]+)`")
+
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "does",
+    "for", "from", "how", "i", "if", "in", "is", "it", "of", "on", "or",
+    "the", "this", "to", "what", "when", "where", "which", "who", "why",
+    "with", "called", "used", "defined",
+}  # fmt: skip
+
+# bm25() weights per column: chunk_id, collection, source, symbol, content,
+# subtokens, metadata (unindexed columns are ignored)
+_BM25_WEIGHTS = "0.0, 0.0, 2.0, 4.0, 1.0, 0.5, 0.0"
+
+_initialized: dict[str, bool] = {}
+_initialized_lock = threading.Lock()
+
+
+def identifier_parts(identifier: str) -> list[str]:
+    """Lowercased words of an identifier (snake_case and camelCase)."""
+    return [
+        part.lower()
+        for piece in identifier.split("_")
+        for part in _WORD_PART.findall(piece)
+    ]
+
+
+def _is_compound(identifier: str) -> bool:
+    # Two or more words: snake_case, camelCase, HTTPServer (digits don't count)
+    words = [part for part in identifier_parts(identifier) if not part.isdigit()]
+    return len(words) > 1
+
+
+def subtokens(text: str) -> str:
+    """Parts of the compound identifiers in a text, for the subtokens column."""
+    parts: dict[str, None] = {}
+    for identifier in set(_IDENTIFIER.findall(text)):
+        if _is_compound(identifier):
+            parts.update(dict.fromkeys(identifier_parts(identifier)))
+    return " ".join(parts)
+
+
+def query_identifiers(query: str) -> list[str]:
+    """Code identifiers named in a query: backticked, snake_case or camelCase."""
+    found: dict[str, None] = {}
+    for span in _BACKTICKED.findall(query):
+        found.update(dict.fromkeys(_IDENTIFIER.findall(span)))
+    for identifier in _IDENTIFIER.findall(query):
+        if _is_compound(identifier):
+            found[identifier] = None
+    return list(found)
+
+
+def query_terms(query: str) -> list[str]:
+    """Search terms of a prose query: words and identifier parts, no stopwords."""
+    terms: dict[str, None] = {}
+    for identifier in _IDENTIFIER.findall(query):
+        if len(identifier) > 1 and identifier.lower() not in _STOPWORDS:
+            terms[identifier] = None
+        if _is_compound(identifier):
+            terms.update(dict.fromkeys(identifier_parts(identifier)))
+    return list(terms)
+
+
+def reciprocal_rank_fusion(rankings: list[list[Document]], k: int) -> list[Document]:
+    """Merge ranked result lists, identifying documents by id (or content)."""
+    scores: dict[str, float] = {}
+    docs: dict[str, Document] = {}
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking):
+            key = doc.id or f"{doc.metadata.get('source')}\0{doc.page_content}"
+            scores[key] = scores.get(key, 0.0) + 1.0 / (RRF_K + rank + 1)
+            docs.setdefault(key, doc)
+    ordered = sorted(scores, key=scores.__getitem__, reverse=True)
+    return [docs[key] for key in ordered[:k]]
+
+
+class LexicalIndex:
+    """FTS5 table of the chunks of one vector store collection."""
+
+    def __init__(self, db_path: Path, collection: str) -> None:
+        self.db_path = db_path
+        self.collection = collection
+        self.available = self._ensure_tables()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(str(self.db_path), timeout=30)
+
+    def _ensure_tables(self) -> bool:
+        key = str(self.db_path)
+        with _initialized_lock:
+            if key in _initialized and self.db_path.exists():
+                return _initialized[key]
+
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    """
+                    CREATE VIRTUAL TABLE IF NOT EXISTS chunks USING fts5(
+                        chunk_id UNINDEXED,
+                        collection UNINDEXED,
+                        source,
+                        symbol,
+                        content,
+                        subtokens,
+                        metadata UNINDEXED,
+                        tokenize = "unicode61 tokenchars '_'"
+                    )
+                """
+                )
+                # FTS5 rowids of each file's chunks (FTS5 columns have no index)
+                conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS chunk_rows (
+                        collection TEXT NOT NULL,
+                        source TEXT NOT NULL,
+                        chunk_rowid INTEGER NOT NULL
+                    )
+                """
+                )
+                conn.execute(
+                    """
+                    CREATE INDEX IF NOT EXISTS ix_chunk_rows_source
+                    ON chunk_rows(collection, source)
+                """
+                )
+                conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS lexical_collections (
+                        collection TEXT PRIMARY KEY
+                    )
+                """
+                )
+                conn.commit()
+            available = True
+        except sqlite3.OperationalError as e:
+            rag_logger.warning("Lexical index unavailable", error=str(e))
+            available = False
+
+        with _initialized_lock:
+            _initialized[key] = available
+        return available
+
+    def is_backfilled(self) -> bool:
+        if not self.available:
+            return True
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT 1 FROM lexical_collections WHERE collection = ?",
+                (self.collection,),
+            ).fetchone()
+        return row is not None
+
+    def backfill(self, files: dict[str, list[tuple[str, Document]]]) -> None:
+        """Index the chunks stored before the lexical index existed."""
+        if not self.available:
+            return
+        with self._connect() as conn:
+            for source, chunks in files.items():
+                self._replace(conn, source, chunks)
+            conn.execute(
+                "INSERT OR IGNORE INTO lexical_collections (collection) VALUES (?)",
+                (self.collection,),
+            )
+            conn.commit()
+
+    def replace_file(self, source: str, chunks: list[tuple[str, Document]]) -> None:
+        """Replace the indexed chunks of a file with (chunk id, chunk) pairs."""
+        if not self.available:
+            return
+        with self._connect() as conn:
+            self._replace(conn, source, chunks)
+            conn.commit()
+
+    def _replace(
+        self,
+        conn: sqlite3.Connection,
+        source: str,
+        chunks: list[tuple[str, Document]],
+    ) -> None:
+        self._delete(conn, source)
+        for chunk_id, chunk in chunks:
+            cursor = conn.execute(
+                """
+                INSERT INTO chunks
+                (chunk_id, collection, source, symbol, content, subtokens, metadata)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+                (
+                    chunk_id,
+                    self.collection,
+                    source,
+                    str(chunk.metadata.get("symbol", "")),
+                    chunk.page_content,
+                    subtokens(f"{source} {chunk.page_content}"),
+                    json.dumps(chunk.metadata, default=str),
+                ),
+            )
+            conn.execute(
+                """
+                INSERT INTO chunk_rows (collection, source, chunk_rowid)
+                VALUES (?, ?, ?)
+            """,
+                (self.collection, source, cursor.lastrowid),
+            )
+
+    def _delete(self, conn: sqlite3.Connection, source: str) -> None:
+        rowids = [
+            row[0]
+            for row in conn.execute(
+                "SELECT chunk_rowid FROM chunk_rows WHERE collection = ? AND source = ?",
+                (self.collection, source),
+            )
+        ]
+        if not rowids:
+            return
+        conn.executemany("DELETE FROM chunks WHERE rowid = ?", [(r,) for r in rowids])
+        conn.execute(
+            "DELETE FROM chunk_rows WHERE collection = ? AND source = ?",
+            (self.collection, source),
+        )
+
+    def remove(self, source: str) -> None:
+        if not self.available:
+            return
+        with self._connect() as conn:
+            self._delete(conn, source)
+            conn.commit()
+
+    def clear(self) -> None:
+        """Forget every chunk of the collection (the collection was dropped)."""
+        if not self.available:
+            return
+        with self._connect() as conn:
+            conn.execute(
+                """
+                DELETE FROM chunks WHERE rowid IN (
+                    SELECT chunk_rowid FROM chunk_rows WHERE collection = ?
+                )
+            """,
+                (self.collection,),
+            )
+            conn.execute(
+                "DELETE FROM chunk_rows WHERE collection = ?", (self.collection,)
+            )
+            conn.commit()
+
+    def search(self, terms: list[str], k: int = 4) -> list[Document]:
+        """Chunks matching any of the terms, best BM25 score first."""
+        if not self.available or not terms:
+            return []
+        # Quoted strings are literal tokens in FTS5 query syntax
+        expression = " OR ".join('"{}"'.format(t.replace('"', '""')) for t in terms)
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"""
+                SELECT chunk_id, content, metadata, bm25(chunks, {_BM25_WEIGHTS})
+                FROM chunks
+                WHERE chunks MATCH ? AND collection = ?
+                ORDER BY bm25(chunks, {_BM25_WEIGHTS})
+                LIMIT ?
+            """,
+                (expression, self.collection, k),
+            ).fetchall()
+        docs = []
+        for chunk_id, content, metadata, score in rows:
+            meta = json.loads(metadata)
+            # FTS5 bm25() is negative; larger magnitude is a better match
+            meta["lexical_score"] = -score
+            docs.append(Document(page_content=content, metadata=meta, id=chunk_id))
+        return docs
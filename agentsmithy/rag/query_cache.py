@@ -0,0 +1,77 @@
+"""In-memory caches for RAG queries.
+
+Retried and regenerated messages, identical follow-ups and several agents of
+one turn ask the vector store the same question. Two LRU caches, held by each
+VectorStoreManager, make the repeats free:
+
+- query embeddings, keyed by (embeddings model, normalized query), in
+  CachedEmbeddings.embed_query, so the provider is asked once;
+- retrieval results, keyed by (query embedding, k, filter, index generation),
+  in VectorStoreManager.similarity_search (and, with scores, in
+  asimilarity_search_with_score), so Chroma is searched once.
+
+The index generation is bumped by every write to the collection, so a result
+is never served after the index changed; entries of older generations simply
+age out.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Any
+
+QUERY_EMBEDDING_CACHE_SIZE = 256
+RETRIEVAL_CACHE_SIZE = 128
+
+
+def normalize_query(text: str) -> str:
+    """Query text as embedded and cached: whitespace runs collapsed."""
+    return " ".join(text.split())
+
+
+def retrieval_key(
+    embedding: list[float], k: int, filter: dict[str, Any] | None, generation: int
+) -> str:
+    """Key of a similarity search over one state of the index."""
+    digest = hashlib.sha256(array("f", embedding).tobytes())
+    digest.update(json.dumps([k, filter, generation], sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+class LRUCache[K, V]:
+    """Thread-safe mapping that keeps the most recently used entries."""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[K, V] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: K) -> V | None:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: K, value: V) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
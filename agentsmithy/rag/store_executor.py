@@ -0,0 +1,118 @@
+"""Dedicated thread pool for vector store I/O, with per-operation timing.
+
+Chroma, the manifest and lexical SQLite files and embeddings requests are all
+blocking calls. Async VectorStoreManager methods used to make them directly on
+the event loop, so one slow search or embeddings batch stalled every SSE
+stream of the server. They now go through ``run_in_store``, which runs them on
+a bounded pool of STORE_MAX_WORKERS threads shared by all projects: a burst of
+indexing cannot take over the loop's default executor (used by file reads,
+checkpoints and tools), and store work is never unbounded.
+
+Every call is timed per operation name (run time on the worker and time spent
+waiting for a free one); ``store_stats()`` reports the totals and is included
+in ``GET /health``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from agentsmithy.utils.logger import rag_logger
+
+# Index queue batches (INDEX_MAX_CONCURRENT_BATCHES) plus concurrent searches
+STORE_MAX_WORKERS = 4
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+# operation -> [calls, errors, total run seconds, max run seconds, max wait seconds]
+_timings: dict[str, list[float]] = {}
+_timings_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=STORE_MAX_WORKERS, thread_name_prefix="rag-store"
+            )
+        return _executor
+
+
+def _record(op: str, run: float, wait: float, failed: bool) -> None:
+    with _timings_lock:
+        timing = _timings.setdefault(op, [0, 0, 0.0, 0.0, 0.0])
+        timing[0] += 1
+        timing[1] += int(failed)
+        timing[2] += run
+        timing[3] = max(timing[3], run)
+        timing[4] = max(timing[4], wait)
+
+
+async def run_in_store[T](
+    op: str, fn: Callable[..., T], *args: Any, **kwargs: Any
+) -> T:
+    """Run a blocking store call on the store executor and time it.
+
+    Args:
+        op: Operation name the timing is recorded under
+        fn: Blocking callable; it must not wait on other store calls
+    """
+    submitted = time.perf_counter()
+    started = submitted
+
+    def call() -> T:
+        nonlocal started
+        started = time.perf_counter()
+        return fn(*args, **kwargs)
+
+    loop = asyncio.get_running_loop()
+    failed = True
+    try:
+        result = await loop.run_in_executor(_get_executor(), call)
+        failed = False
+        return result
+    finally:
+        finished = time.perf_counter()
+        run, wait = finished - started, started - submitted
+        _record(op, run, wait, failed)
+        rag_logger.debug(
+            "RAG store operation",
+            op=op,
+            ms=round(run * 1000, 1),
+            wait_ms=round(wait * 1000, 1),
+            failed=failed,
+        )
+
+
+def store_stats() -> dict[str, dict[str, Any]]:
+    """Timing of the store operations run so far, per operation name."""
+    with _timings_lock:
+        return {
+            op: {
+                "calls": int(calls),
+                "errors": int(errors),
+                "avg_ms": round(total * 1000 / calls, 1) if calls else 0.0,
+                "max_ms": round(max_run * 1000, 1),
+                "max_wait_ms": round(max_wait * 1000, 1),
+            }
+            for op, (calls, errors, total, max_run, max_wait) in _timings.items()
+        }
+
+
+def shutdown_store_executor() -> None:
+    """Stop the store threads; queued calls are cancelled (app shutdown).
+
+    A later run_in_store() starts a new pool.
+    """
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
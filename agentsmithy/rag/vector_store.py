@@ -5,7 +5,10 @@ project's hidden state directory.
 """
 
 import asyncio
+import hashlib
 import os
+import threading
+from dataclasses import dataclass, replace
 from pathlib import Path
 from typing import Any
 
@@ -20,11 +23,84 @@ from langchain_core.documents import Document
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
 from agentsmithy.core.project import Project
-from agentsmithy.rag.embeddings import EmbeddingsManager
+from agentsmithy.rag.chunker import detect_language, split_code
+from agentsmithy.rag.embedding_cache import (
+    EMBEDDING_CACHE_FILENAME,
+    CachedEmbeddings,
+    EmbeddingCache,
+    chunk_hash,
+)
+from agentsmithy.rag.embeddings import (
+    EmbeddingsManager,
+    embeddings_config_fingerprint,
+    embeddings_model_key,
+    legacy_embeddings_model_key,
+)
+from agentsmithy.rag.file_manifest import (
+    MANIFEST_FILENAME,
+    FileManifest,
+    entries_from_metadata,
+)
+from agentsmithy.rag.index_queue import IndexQueue
+from agentsmithy.rag.lexical_index import (
+    LEXICAL_FILENAME,
+    LexicalIndex,
+    query_identifiers,
+    query_terms,
+    reciprocal_rank_fusion,
+)
+from agentsmithy.rag.query_cache import RETRIEVAL_CACHE_SIZE, LRUCache, retrieval_key
+from agentsmithy.rag.store_executor import run_in_store, shutdown_store_executor
+
+# Chroma collection metadata key recording the embeddings model of the vectors
+EMBEDDINGS_MODEL_METADATA_KEY = "agentsmithy_embeddings_model"
+
+
+@dataclass(slots=True)
+class ChunkUpdate:
+    """New chunks of a file, diffed against the chunks already stored."""
+
+    source: str
+    chunks: list[Document]  # all chunks of the file, in order
+    ids: list[str]
+    added: list[int]  # positions of chunks the store does not hold yet
+
+    @property
+    def new_chunks(self) -> list[Document]:
+        return [self.chunks[i] for i in self.added]
+
+    @property
+    def new_ids(self) -> list[str]:
+        return [self.ids[i] for i in self.added]
+
+
+def chunk_ids(source: str, chunks: list[Document]) -> list[str]:
+    """Derive stable chunk ids from content; sets each chunk's ``chunk_hash``.
+
+    A chunk keeps its id (and stored vector) as long as its text is unchanged,
+    wherever it moves within the file.
+    """
+    ids = []
+    seen: dict[str, int] = {}
+    for chunk in chunks:
+        digest = chunk_hash(chunk.page_content)
+        chunk.metadata["chunk_hash"] = digest
+        occurrence = seen.get(digest, 0)
+        seen[digest] = occurrence + 1
+        ids.append(
+            hashlib.sha256(f"{source}\0{digest}\0{occurrence}".encode()).hexdigest()[
+                :32
+            ]
+        )
+    return ids
 
 
 class VectorStoreManager:
-    """Manager for vector store operations, scoped to a Project."""
+    """Manager for vector store operations, scoped to a Project.
+
+    Building one starts an embeddings client and, on first use, a Chroma
+    client; use get_vector_store_manager() for the long-lived shared instance.
+    """
 
     def __init__(
         self,
@@ -38,27 +114,258 @@ class VectorStoreManager:
         )
         self.collection_name = collection_name
         self.embeddings_manager = EmbeddingsManager()
+        # Embeddings configuration this manager was built with
+        self.embeddings_fingerprint = embeddings_config_fingerprint()
+        self.embeddings_model = embeddings_model_key()
+        self._embeddings: CachedEmbeddings | None = None
+        self._embeddings_lock = threading.Lock()
         self._vectorstore: Chroma | None = None
+        self._vectorstore_lock = threading.Lock()
+        self._index_queue: IndexQueue | None = None
+        self._manifest: FileManifest | None = None
+        self._manifest_lock = threading.Lock()
+        self._lexical_index: LexicalIndex | None = None
+        self._lexical_lock = threading.Lock()
+        # Bumped by every write; part of the retrieval cache key
+        self._index_generation = 0
+        self._generation_lock = threading.Lock()
+        self._retrieval_cache: LRUCache[str, list[Document]] = LRUCache(
+            RETRIEVAL_CACHE_SIZE
+        )
+        self._scored_retrieval_cache: LRUCache[str, list[tuple[Document, float]]] = (
+            LRUCache(RETRIEVAL_CACHE_SIZE)
+        )
 
         # Ensure project state and persist directory exist
         self.project.ensure_state_dir()
         os.makedirs(self.persist_directory, exist_ok=True)
 
+    @property
+    def embeddings(self) -> CachedEmbeddings:
+        """Embeddings of the collection, cached per chunk and per query."""
+        embeddings = self._embeddings
+        if embeddings is not None:
+            return embeddings
+        with self._embeddings_lock:
+            if self._embeddings is None:
+                cache = EmbeddingCache(
+                    Path(self.persist_directory).parent / EMBEDDING_CACHE_FILENAME
+                )
+                self._embeddings = CachedEmbeddings(
+                    self.embeddings_manager.embeddings,
+                    cache,
+                    self.embeddings_model,
+                )
+            return self._embeddings
+
     @property
     def vectorstore(self) -> Chroma:
         """Get or create vector store instance."""
-        if self._vectorstore is None:
-            self._vectorstore = Chroma(
-                collection_name=self.collection_name,
-                embedding_function=self.embeddings_manager.embeddings,
-                persist_directory=self.persist_directory,
-                # NOTE (PyInstaller): Keep anonymized_telemetry disabled to prevent Chroma from
-                # importing PostHog at runtime inside the frozen binary. If you must enable
-                # telemetry, ensure PyInstaller collects `chromadb.telemetry.product.posthog`
-                # and its dependencies.
-                client_settings=Settings(anonymized_telemetry=False),
+        vectorstore = self._vectorstore
+        if vectorstore is not None:
+            return vectorstore
+        with self._vectorstore_lock:
+            if self._vectorstore is None:
+                self._vectorstore = self._check_embeddings_model(
+                    self._open_vectorstore()
+                )
+            return self._vectorstore
+
+    def _open_vectorstore(self) -> Chroma:
+        return Chroma(
+            collection_name=self.collection_name,
+            embedding_function=self.embeddings,
+            persist_directory=self.persist_directory,
+            # NOTE (PyInstaller): Keep anonymized_telemetry disabled to prevent Chroma from
+            # importing PostHog at runtime inside the frozen binary. If you must enable
+            # telemetry, ensure PyInstaller collects `chromadb.telemetry.product.posthog`
+            # and its dependencies.
+            client_settings=Settings(anonymized_telemetry=False),
+        )
+
+    def _check_embeddings_model(self, vectorstore: Chroma) -> Chroma:
+        """Drop a collection embedded by another model, stamp the model on it.
+
+        Vectors of another model (often of another dimension, which Chroma
+        rejects on insert) cannot be searched or extended, so the index starts
+        over. Collections without a stamp predate it and were embedded through
+        OpenAI (see legacy_embeddings_model_key).
+        """
+        metadata = vectorstore._collection.metadata or {}
+        stored = metadata.get(EMBEDDINGS_MODEL_METADATA_KEY)
+        if stored == self.embeddings_model:
+            return vectorstore
+        if stored is None and vectorstore._collection.count():
+            stored = legacy_embeddings_model_key()
+        if stored is not None and stored != self.embeddings_model:
+            from agentsmithy.utils.logger import rag_logger
+
+            rag_logger.info(
+                "Embeddings model changed, dropping RAG index",
+                collection=self.collection_name,
             )
-        return self._vectorstore
+            vectorstore.delete_collection()
+            rag_dir = Path(self.persist_directory).parent
+            FileManifest(rag_dir / MANIFEST_FILENAME, self.collection_name).clear()
+            LexicalIndex(rag_dir / LEXICAL_FILENAME, self.collection_name).clear()
+            vectorstore = self._open_vectorstore()
+            metadata = vectorstore._collection.metadata or {}
+        vectorstore._collection.modify(
+            metadata={**metadata, EMBEDDINGS_MODEL_METADATA_KEY: self.embeddings_model}
+        )
+        return vectorstore
+
+    @property
+    def index_queue(self) -> IndexQueue:
+        """Queue that coalesces and batches indexing requests (see index_queue.py)."""
+        with self._vectorstore_lock:
+            if self._index_queue is None:
+                self._index_queue = IndexQueue(self)
+            return self._index_queue
+
+    @property
+    def manifest(self) -> FileManifest:
+        """Per-file index state of this collection (see file_manifest.py)."""
+        manifest = self._manifest
+        if manifest is not None:
+            return manifest
+        # Opening the collection first drops it (and the manifest) on a model change
+        vectorstore = self.vectorstore
+        with self._manifest_lock:
+            if self._manifest is None:
+                manifest = FileManifest(
+                    Path(self.persist_directory).parent / MANIFEST_FILENAME,
+                    self.collection_name,
+                )
+                if not manifest.is_backfilled():
+                    # Collection indexed before the manifest existed
+                    stored = vectorstore.get(include=["metadatas"])
+                    manifest.backfill(stored["ids"], stored["metadatas"])
+                self._manifest = manifest
+            return self._manifest
+
+    @property
+    def lexical_index(self) -> LexicalIndex:
+        """BM25 index of this collection's chunks (see lexical_index.py)."""
+        lexical = self._lexical_index
+        if lexical is not None:
+            return lexical
+        vectorstore = self.vectorstore
+        with self._lexical_lock:
+            if self._lexical_index is None:
+                lexical = LexicalIndex(
+                    Path(self.persist_directory).parent / LEXICAL_FILENAME,
+                    self.collection_name,
+                )
+                if not lexical.is_backfilled():
+                    # Collection indexed before the lexical index existed
+                    stored = vectorstore.get(include=["documents", "metadatas"])
+                    files: dict[str, list[tuple[str, Document]]] = {}
+                    for chunk_id, text, metadata in zip(
+                        stored["ids"],
+                        stored["documents"],
+                        stored["metadatas"],
+                        strict=False,
+                    ):
+                        if text is not None and metadata and "source" in metadata:
+                            files.setdefault(str(metadata["source"]), []).append(
+                                (
+                                    chunk_id,
+                                    Document(page_content=text, metadata=metadata),
+                                )
+                            )
+                    lexical.backfill(files)
+                self._lexical_index = lexical
+            return self._lexical_index
+
+    @property
+    def index_generation(self) -> int:
+        """Counter of writes to the collection (see query_cache.py)."""
+        return self._index_generation
+
+    def _index_changed(self) -> None:
+        with self._generation_lock:
+            self._index_generation += 1
+
+    def record_chunks(self, chunks: list[Document], ids: list[str]) -> None:
+        """Record stored chunks in the manifest and lexical index, per source file."""
+        self._index_changed()
+        self.manifest.record(
+            entries_from_metadata(ids, [chunk.metadata for chunk in chunks])
+        )
+        files: dict[str, list[tuple[str, Document]]] = {}
+        for chunk_id, chunk in zip(ids, chunks, strict=False):
+            if "source" in chunk.metadata:
+                files.setdefault(str(chunk.metadata["source"]), []).append(
+                    (chunk_id, chunk)
+                )
+        for source, file_chunks in files.items():
+            self.lexical_index.replace_file(source, file_chunks)
+
+    def update_file_chunks(self, file_path: str, chunks: list[Document]) -> ChunkUpdate:
+        """Drop a file's stale chunks and report which new chunks need adding.
+
+        Chunks whose text is unchanged stay in the store with their vectors;
+        only their metadata is refreshed. The caller adds ``new_chunks`` with
+        ``new_ids`` and then calls record_chunk_update().
+        """
+        ids = chunk_ids(file_path, chunks)
+        previous = self.manifest.get(file_path)
+        if previous is None:
+            # Not recorded: drop whatever the store holds for the file
+            self.delete_by_source(file_path)
+            stored: set[str] = set()
+        else:
+            stored = set(previous.chunk_ids)
+            stale = stored.difference(ids)
+            if stale:
+                self.vectorstore.delete(ids=list(stale))
+
+        kept = [i for i, chunk_id in enumerate(ids) if chunk_id in stored]
+        if kept:
+            # No documents or embeddings given: nothing is re-embedded
+            self.vectorstore._collection.update(
+                ids=[ids[i] for i in kept],
+                metadatas=[chunks[i].metadata for i in kept],
+            )
+        self._index_changed()
+        added = [i for i, chunk_id in enumerate(ids) if chunk_id not in stored]
+        return ChunkUpdate(file_path, chunks, ids, added)
+
+    def record_chunk_update(
+        self, update: ChunkUpdate, failed_ids: set[str] | None = None
+    ) -> None:
+        """Record a file's chunks in the manifest and lexical index after adding.
+
+        Args:
+            update: Result of update_file_chunks()
+            failed_ids: New chunk ids that could not be added; the file is then
+                recorded as stale so the next sync indexes it again
+        """
+        self._index_changed()
+        failed = failed_ids or set()
+        stored = [
+            (chunk_id, chunk)
+            for chunk_id, chunk in zip(update.ids, update.chunks, strict=True)
+            if chunk_id not in failed
+        ]
+        self.lexical_index.replace_file(update.source, stored)
+        entries = entries_from_metadata(
+            [chunk_id for chunk_id, _ in stored],
+            [chunk.metadata for _, chunk in stored],
+        )
+        entry = entries.get(update.source)
+        if entry is None:
+            self.manifest.remove(update.source)
+            return
+        if failed.intersection(update.ids):
+            entries[update.source] = replace(entry, hash="", mtime_ns=0)
+        self.manifest.record(entries)
+
+    def close(self) -> None:
+        """Drop the Chroma client; operations already running keep their reference."""
+        with self._vectorstore_lock:
+            self._vectorstore = None
 
     async def add_documents(
         self,
@@ -67,15 +374,14 @@ class VectorStoreManager:
         chunk_overlap: int = 200,
     ) -> list[str]:
         """Add documents to vector store."""
-        # Split documents into chunks
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=chunk_size,
-            chunk_overlap=chunk_overlap,
-            length_function=len,
-            separators=["\n\n", "\n", " ", ""],
+        return await run_in_store(
+            "add_documents", self._add_documents, documents, chunk_size, chunk_overlap
         )
 
-        chunks = text_splitter.split_documents(documents)
+    def _add_documents(
+        self, documents: list[Document], chunk_size: int, chunk_overlap: int
+    ) -> list[str]:
+        chunks = self.split_documents(documents, chunk_size, chunk_overlap)
 
         # If no chunks (e.g., empty documents), return empty list
         if not chunks:
@@ -83,33 +389,180 @@ class VectorStoreManager:
 
         # Add chunks to vector store
         ids = self.vectorstore.add_documents(chunks)
+        self.record_chunks(chunks, ids)
 
         return ids
 
+    def split_documents(
+        self,
+        documents: list[Document],
+        chunk_size: int = 1000,
+        chunk_overlap: int = 200,
+    ) -> list[Document]:
+        """Split documents into the chunks that are embedded and stored.
+
+        Source files (by ``source`` extension) are split along functions and
+        classes by the code-aware chunker, without overlap; chunk_size and
+        chunk_overlap apply to other text. Every chunk gets ``language``,
+        ``symbol``, ``start_line`` and ``end_line`` metadata.
+        """
+        text_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            length_function=len,
+            separators=["\n\n", "\n", " ", ""],
+            add_start_index=True,
+        )
+        chunks: list[Document] = []
+        for doc in documents:
+            language = detect_language(str(doc.metadata.get("source", "")))
+            if language is not None:
+                chunks.extend(
+                    Document(
+                        page_content=chunk.text,
+                        metadata={
+                            **doc.metadata,
+                            "language": language,
+                            "symbol": chunk.symbol,
+                            "start_line": chunk.start_line,
+                            "end_line": chunk.end_line,
+                        },
+                    )
+                    for chunk in split_code(doc.page_content, language)
+                )
+                continue
+            for chunk in text_splitter.split_documents([doc]):
+                start = chunk.metadata.pop("start_index", 0)
+                start_line = doc.page_content.count("\n", 0, max(start, 0)) + 1
+                chunk.metadata.update(
+                    language="text",
+                    symbol="",
+                    start_line=start_line,
+                    end_line=start_line + chunk.page_content.count("\n"),
+                )
+                chunks.append(chunk)
+        return chunks
+
     async def add_texts(
         self, texts: list[str], metadatas: list[dict[str, Any]] | None = None
     ) -> list[str]:
         """Add texts directly to vector store."""
+        return await run_in_store("add_texts", self._add_texts, list(texts), metadatas)
+
+    def _add_texts(
+        self, texts: list[str], metadatas: list[dict[str, Any]] | None
+    ) -> list[str]:
         ids = self.vectorstore.add_texts(texts, metadatas=metadatas)
+        self._index_changed()
+        if metadatas:
+            self.record_chunks(
+                [
+                    Document(page_content=text, metadata=metadata)
+                    for text, metadata in zip(texts, metadatas, strict=False)
+                ],
+                ids,
+            )
         return ids
 
     async def similarity_search(
         self, query: str, k: int = 4, filter: dict[str, Any] | None = None
     ) -> list[Document]:
-        """Search for similar documents."""
-        return self.vectorstore.similarity_search(query, k=k, filter=filter)
+        """Search for similar documents.
+
+        The query embedding and, while the index is unchanged, the results are
+        cached (see query_cache.py).
+        """
+        return await run_in_store(
+            "similarity_search", self._similarity_search, query, k, filter
+        )
+
+    def _similarity_search(
+        self, query: str, k: int, filter: dict[str, Any] | None
+    ) -> list[Document]:
+        vectorstore = self.vectorstore
+        embedding = self.embeddings.embed_query(query)
+        # Taken before searching: a write during the search bumps it past this key
+        key = retrieval_key(embedding, k, filter, self._index_generation)
+        docs = self._retrieval_cache.get(key)
+        if docs is None:
+            docs = vectorstore.similarity_search_by_vector(
+                embedding, k=k, filter=filter
+            )
+            self._retrieval_cache.put(key, docs)
+        return list(docs)
 
     async def asimilarity_search_with_score(
         self, query: str, k: int = 4, filter: dict[str, Any] | None = None
     ) -> list[tuple[Document, float]]:
-        """Search for similar documents with relevance scores."""
-        return self.vectorstore.similarity_search_with_score(query, k=k, filter=filter)
+        """Search for similar documents with their distances (lower is closer).
+
+        Cached like similarity_search(), in a cache of its own.
+        """
+        return await run_in_store(
+            "similarity_search_with_score",
+            self._similarity_search_with_score,
+            query,
+            k,
+            filter,
+        )
+
+    def _similarity_search_with_score(
+        self, query: str, k: int, filter: dict[str, Any] | None
+    ) -> list[tuple[Document, float]]:
+        vectorstore = self.vectorstore
+        embedding = self.embeddings.embed_query(query)
+        key = retrieval_key(embedding, k, filter, self._index_generation)
+        results = self._scored_retrieval_cache.get(key)
+        if results is None:
+            results = vectorstore.similarity_search_by_vector_with_relevance_scores(
+                embedding, k=k, filter=filter
+            )
+            self._scored_retrieval_cache.put(key, results)
+        return list(results)
+
+    async def hybrid_search(self, query: str, k: int = 4) -> list[Document]:
+        """Search with the lexical index and the vector store, merging results.
+
+        Queries naming code identifiers (backticked, snake_case, camelCase) are
+        answered from the lexical index alone when it finds them, without an
+        embeddings request. Otherwise lexical and vector hits are merged by
+        reciprocal rank fusion; if the embeddings provider fails, lexical hits
+        are returned on their own.
+        """
+        from agentsmithy.utils.logger import rag_logger
+
+        identifiers = query_identifiers(query)
+        if identifiers:
+            exact = await run_in_store(
+                "lexical_search", lambda: self.lexical_index.search(identifiers, k)
+            )
+            if exact:
+                rag_logger.debug(
+                    "RAG query answered lexically", identifiers=identifiers[:5]
+                )
+                return exact
+
+        terms = query_terms(query)
+        lexical = await run_in_store(
+            "lexical_search", lambda: self.lexical_index.search(terms, k)
+        )
+        try:
+            vector = await self.similarity_search(query, k=k)
+        except Exception as e:
+            rag_logger.warning(
+                "Vector search failed, using lexical results", error=str(e)
+            )
+            return lexical
+        return reciprocal_rank_fusion([vector, lexical], k)
 
     def delete_collection(self):
         """Delete the entire collection."""
         if self._vectorstore:
             self._vectorstore.delete_collection()
             self._vectorstore = None
+            self._index_changed()
+            self.manifest.clear()
+            self.lexical_index.clear()
 
     def persist(self):
         """Persist the vector store to disk."""
@@ -127,17 +580,63 @@ class VectorStoreManager:
             chunk_size: Size of chunks for splitting
 
         Returns:
-            List of chunk IDs added to the store
+            List of the file's chunk IDs in the store
+        """
+        return await run_in_store(
+            "index_file", self._index_file, file_path, content, chunk_size
+        )
+
+    def _index_file(
+        self, file_path: str, content: str | None, chunk_size: int
+    ) -> list[str]:
+        # Files excluded by .gitignore / DEFAULT_EXCLUDES are not worth indexing
+        if self.is_ignored(file_path):
+            self.delete_by_source(file_path)
+            return []
+
+        doc = self.file_document(file_path, content)
+        if doc is None:
+            self.delete_by_source(file_path)
+            return []
+
+        # Split, then only add chunks whose content the store does not hold
+        chunks = self.split_documents([doc], chunk_size=chunk_size)
+        update = self.update_file_chunks(file_path, chunks)
+        if update.added:
+            self.vectorstore.add_documents(update.new_chunks, ids=update.new_ids)
+        self.record_chunk_update(update)
+
+        from agentsmithy.utils.logger import rag_logger
+
+        rag_logger.debug(
+            "Indexed file in RAG",
+            file=file_path,
+            chunks=len(update.ids),
+            added=len(update.added),
+            hash=doc.metadata["hash"][:8],
+        )
+
+        return update.ids
+
+    def file_document(
+        self, file_path: str, content: str | None = None
+    ) -> Document | None:
+        """Build the document indexed for a file, with hash/size/mtime metadata.
+
+        Args:
+            file_path: Relative or absolute path to the file
+            content: File content (if None, will read from disk)
+
+        Returns:
+            Document, or None if the file can't be read
         """
         import hashlib
         from datetime import UTC, datetime
 
-        # Delete existing chunks for this file
-        self.delete_by_source(file_path)
-
         # Read content if not provided
         file_size = 0
         file_mtime = 0
+        file_mtime_ns = 0
         if content is None:
             try:
                 abs_path = (
@@ -145,14 +644,16 @@ class VectorStoreManager:
                     if Path(file_path).is_absolute()
                     else self.project.root / file_path
                 )
-                content = abs_path.read_text(encoding="utf-8")
-                # Get file stats for optimization
+                # Get file stats for optimization (before reading, so a later
+                # write is never hidden behind a matching stat)
                 stat = abs_path.stat()
+                content = abs_path.read_text(encoding="utf-8")
                 file_size = stat.st_size
                 file_mtime = int(stat.st_mtime)
+                file_mtime_ns = stat.st_mtime_ns
             except Exception:
                 # File doesn't exist or can't be read
-                return []
+                return None
         else:
             # Content provided, estimate size
             file_size = len(content.encode("utf-8"))
@@ -161,30 +662,36 @@ class VectorStoreManager:
         content_hash = hashlib.md5(content.encode("utf-8")).hexdigest()
 
         # Create document with metadata including hash, size, and mtime
-        doc = Document(
+        return Document(
             page_content=content,
             metadata={
                 "source": str(file_path),
                 "hash": content_hash,
                 "size": file_size,
                 "mtime": file_mtime,
+                "mtime_ns": file_mtime_ns,
                 "indexed_at": datetime.now(UTC).isoformat(),
             },
         )
 
-        # Split and add
-        ids = await self.add_documents([doc], chunk_size=chunk_size)
+    def is_ignored(self, file_path: str) -> bool:
+        """Check if a project file is excluded from indexing by the ignore rules.
 
-        from agentsmithy.utils.logger import rag_logger
+        Uses the same matcher as checkpoints (.gitignore files + DEFAULT_EXCLUDES).
+        Files outside the project root are never considered ignored.
 
-        rag_logger.debug(
-            "Indexed file in RAG",
-            file=file_path,
-            chunks=len(ids),
-            hash=content_hash[:8],
-        )
+        Args:
+            file_path: Relative or absolute path to the file
+        """
+        from agentsmithy.services.ignore_matcher import get_ignore_matcher
 
-        return ids
+        path = Path(file_path)
+        if path.is_absolute():
+            try:
+                path = path.resolve().relative_to(self.project.root.resolve())
+            except ValueError:
+                return False
+        return not get_ignore_matcher(self.project.root).is_visible(path.as_posix())
 
     async def has_file(self, file_path: str) -> bool:
         """Check if a file is indexed in the vector store.
@@ -196,11 +703,16 @@ class VectorStoreManager:
             True if file has indexed chunks
         """
         try:
-            # Try to find any documents with this source
-            results = self.vectorstore.get(where={"source": str(file_path)})
-            return len(results.get("ids", [])) > 0
+            entry = await run_in_store(
+                "has_file", lambda: self.manifest.get(str(file_path))
+            )
         except Exception:
             return False
+        return entry is not None
+
+    async def adelete_by_source(self, file_path: str) -> None:
+        """Delete all chunks for a specific file, off the event loop."""
+        await run_in_store("delete_by_source", self.delete_by_source, file_path)
 
     def delete_by_source(self, file_path: str) -> None:
         """Delete all chunks for a specific file.
@@ -211,6 +723,9 @@ class VectorStoreManager:
         try:
             # Chroma supports delete with filter
             self.vectorstore.delete(where={"source": str(file_path)})
+            self._index_changed()
+            self.manifest.remove(str(file_path))
+            self.lexical_index.remove(str(file_path))
         except Exception:
             # If delete fails (e.g., file not indexed), ignore
             pass
@@ -235,7 +750,7 @@ class VectorStoreManager:
             return await self.index_file(str(file_path))
         else:
             # File was deleted - remove from index
-            self.delete_by_source(str(file_path))
+            await self.adelete_by_source(str(file_path))
             return []
 
     async def reindex_files(self, file_paths: list[str]) -> int:
@@ -274,15 +789,22 @@ class VectorStoreManager:
             Metadata dict or None if file not indexed
         """
         try:
-            results = self.vectorstore.get(where={"source": str(file_path)})
-            if results and "metadatas" in results and results["metadatas"]:
-                # Return first matching metadata
-                return results["metadatas"][0]
-            return None
+            entry = self.manifest.get(str(file_path))
         except Exception:
             # Non-critical: failure to retrieve metadata just means the file is
             # not indexed or the store is unavailable; treat as missing.
             return None
+        if entry is None:
+            return None
+        return {
+            "source": str(file_path),
+            "hash": entry.hash,
+            "size": entry.size,
+            "mtime": entry.mtime_ns // 1_000_000_000,
+            "mtime_ns": entry.mtime_ns,
+            "indexed_at": entry.indexed_at,
+            "chunk_ids": entry.chunk_ids,
+        }
 
     def get_indexed_files(self) -> dict[str, str]:
         """Get all indexed files with their hashes.
@@ -291,22 +813,7 @@ class VectorStoreManager:
             Dictionary mapping file paths to their stored hashes
         """
         try:
-            # Get all documents from vector store
-            results = self.vectorstore.get()
-
-            # Extract unique files with their hashes
-            files_dict = {}
-            if results and "metadatas" in results:
-                for metadata in results["metadatas"]:
-                    if metadata and "source" in metadata:
-                        source = metadata["source"]
-                        file_hash = metadata.get("hash", "")
-                        # Only store if we haven't seen this file yet
-                        # (multiple chunks from same file will have same hash)
-                        if source not in files_dict:
-                            files_dict[source] = file_hash
-
-            return files_dict
+            return {path: entry.hash for path, entry in self.manifest.entries().items()}
         except Exception:
             return {}
 
@@ -316,7 +823,7 @@ class VectorStoreManager:
         stored_hash: str,
         abs_path: Path,
         semaphore: asyncio.Semaphore,
-    ) -> tuple[str, bool]:
+    ) -> tuple[str, os.stat_result | None]:
         """Check and reindex a single file if needed.
 
         Args:
@@ -326,21 +833,21 @@ class VectorStoreManager:
             semaphore: Semaphore for concurrency control
 
         Returns:
-            Tuple of (status, content) where status is "reindexed", "skipped", or "error"
+            Tuple of (status, stat) where status is "reindexed", "skipped", or
+            "error"; stat is set for skipped files, whose stored hash was verified
         """
         import hashlib
 
         async with semaphore:
             try:
+                # Stat before reading: a write after the stat changes the mtime,
+                # so a recorded stat never vouches for newer content
+                stat = await asyncio.to_thread(abs_path.stat)
                 # Read file in thread pool to avoid blocking
-                loop = asyncio.get_event_loop()
-                current_content = await loop.run_in_executor(
-                    None, abs_path.read_text, "utf-8"
-                )
+                current_content = await asyncio.to_thread(abs_path.read_text, "utf-8")
 
                 # Compute hash in thread pool (can be CPU intensive for large files)
-                current_hash = await loop.run_in_executor(
-                    None,
+                current_hash = await asyncio.to_thread(
                     lambda: hashlib.md5(current_content.encode("utf-8")).hexdigest(),
                 )
 
@@ -348,18 +855,57 @@ class VectorStoreManager:
                 if current_hash != stored_hash:
                     # Hash mismatch - reindex
                     await self.index_file(file_path, current_content)
-                    return ("reindexed", True)
+                    return ("reindexed", None)
                 else:
-                    return ("skipped", False)
+                    return ("skipped", stat)
             except Exception:
                 # Can't read file - skip
-                return ("error", False)
+                return ("error", None)
+
+    def _scan_indexed_files(
+        self,
+    ) -> tuple[list[str], list[tuple[str, str, Path]], int]:
+        """Stat every file in the manifest.
+
+        Returns:
+            (missing paths, (path, stored hash, absolute path) of files that may
+            have changed, number of files whose size and mtime_ns match)
+        """
+        missing: list[str] = []
+        to_read: list[tuple[str, str, Path]] = []
+        unchanged = 0
+        for file_path, entry in self.manifest.entries().items():
+            abs_path = (
+                Path(file_path)
+                if Path(file_path).is_absolute()
+                else self.project.root / file_path
+            )
+            try:
+                stat = abs_path.stat()
+            except FileNotFoundError:
+                missing.append(file_path)
+                continue
+            except OSError:
+                # Unreadable; let the read pass decide
+                to_read.append((file_path, entry.hash, abs_path))
+                continue
+            # mtime_ns 0: not recorded (content came from a tool or an old index)
+            if (
+                entry.mtime_ns
+                and entry.mtime_ns == stat.st_mtime_ns
+                and entry.size == stat.st_size
+            ):
+                unchanged += 1
+            else:
+                to_read.append((file_path, entry.hash, abs_path))
+        return missing, to_read, unchanged
 
     async def sync_files_if_needed(self) -> dict[str, int]:
         """Check all indexed files and reindex if hash mismatch.
 
-        Optimization: Only reads files that likely changed (based on mtime/size check).
-        Uses parallel processing with concurrency limits for efficient batch processing.
+        Lists indexed files with one manifest query and stats them; only files
+        whose size or mtime_ns differ from the manifest are read and hashed.
+        Uses parallel processing with concurrency limits for those reads.
 
         Returns:
             Dictionary with sync results:
@@ -370,56 +916,27 @@ class VectorStoreManager:
         """
         from agentsmithy.utils.logger import rag_logger
 
-        indexed_files = self.get_indexed_files()
-        stats = {"checked": 0, "reindexed": 0, "removed": 0, "skipped": 0}
-
-        if indexed_files:
-            rag_logger.debug("RAG sync started", files_to_check=len(indexed_files))
-
-        # First pass: check existence and quick mtime/size check
-        files_to_read: list[tuple[str, str, Path]] = []
-
-        for file_path, stored_hash in indexed_files.items():
-            stats["checked"] += 1
-
-            # Resolve file path
-            abs_path = (
-                Path(file_path)
-                if Path(file_path).is_absolute()
-                else self.project.root / file_path
+        try:
+            missing, files_to_read, unchanged = await run_in_store(
+                "scan_indexed_files", self._scan_indexed_files
             )
-
-            # Check if file exists
-            if not abs_path.exists():
-                # File was deleted - remove from index
-                self.delete_by_source(file_path)
-                stats["removed"] += 1
-                continue
-
-            # Quick optimization: check mtime and size from metadata
-            try:
-                # Get stored metadata for this file
-                metadata = self.get_file_metadata(file_path)
-                stored_mtime = metadata.get("mtime", 0) if metadata else 0
-                stored_size = metadata.get("size", 0) if metadata else 0
-
-                # Get current file stats (fast - no file read!)
-                stat = abs_path.stat()
-                current_mtime = int(stat.st_mtime)
-                current_size = stat.st_size
-
-                # If mtime and size unchanged, skip reading file
-                if current_mtime == stored_mtime and current_size == stored_size:
-                    stats["skipped"] += 1
-                    continue
-            except Exception:
-                # Metadata not available or stat failed, need to read
-                pass
-
-            # File potentially changed, need to read and verify
-            files_to_read.append((file_path, stored_hash, abs_path))
-
-        # Second pass: read and hash files in parallel with concurrency limit
+        except Exception as e:
+            rag_logger.warning("RAG sync failed to read manifest", error=str(e))
+            return {"checked": 0, "reindexed": 0, "removed": 0, "skipped": 0}
+
+        stats = {
+            "checked": len(missing) + len(files_to_read) + unchanged,
+            "reindexed": 0,
+            "removed": 0,
+            "skipped": unchanged,
+        }
+
+        # Files deleted from disk - remove from index
+        for file_path in missing:
+            await self.adelete_by_source(file_path)
+            stats["removed"] += 1
+
+        # Read and hash possibly changed files in parallel with concurrency limit
         if files_to_read:
             # Limit concurrent file operations to avoid overwhelming the system
             # 10 concurrent operations is a good balance for most systems
@@ -437,18 +954,26 @@ class VectorStoreManager:
             results = await asyncio.gather(*tasks, return_exceptions=True)
 
             # Aggregate results
-            for result in results:
+            verified: dict[str, tuple[int, int]] = {}
+            for (file_path, _, _), result in zip(files_to_read, results, strict=True):
                 if isinstance(result, BaseException):
                     # Skip exceptions (errors during file processing)
                     continue
-                # Now result is guaranteed to be tuple[str, bool]
-                status, _ = result
+                status, stat = result
                 if status == "reindexed":
                     stats["reindexed"] += 1
                 elif status == "skipped":
                     stats["skipped"] += 1
+                    if stat is not None:
+                        verified[file_path] = (stat.st_size, stat.st_mtime_ns)
                 # Errors are silently ignored (already counted as not reindexed)
 
+            # Content matched: remember the stat so the next sync needs no read
+            if verified:
+                await run_in_store(
+                    "update_stats", lambda: self.manifest.update_stats(verified)
+                )
+
         if stats["reindexed"] > 0 or stats["removed"] > 0:
             rag_logger.debug(
                 "RAG sync completed",
@@ -459,3 +984,57 @@ class VectorStoreManager:
             )
 
         return stats
+
+
+# (state dir, collection) -> shared manager
+_managers: dict[tuple[str, str], VectorStoreManager] = {}
+_managers_lock = threading.Lock()
+
+
+def get_vector_store_manager(
+    project: Project, collection_name: str = "agentsmithy_docs"
+) -> VectorStoreManager:
+    """Return the long-lived manager for a project collection.
+
+    Tools, the chat service and background reindexing all go through here, so
+    the embeddings and Chroma clients are created once instead of per call. The
+    manager is rebuilt when the embeddings configuration changes.
+    """
+    key = (str(Path(project.state_dir).resolve()), collection_name)
+    fingerprint = embeddings_config_fingerprint()
+    with _managers_lock:
+        manager = _managers.get(key)
+        if manager is None or manager.embeddings_fingerprint != fingerprint:
+            previous = manager
+            manager = VectorStoreManager(project, collection_name=collection_name)
+            if previous is not None:
+                previous.close()
+                # Pending files are indexed with the new embeddings
+                queue = previous._index_queue
+                if queue is not None:
+                    queue.rebind(manager)
+                    manager._index_queue = queue
+            _managers[key] = manager
+    return manager
+
+
+def get_index_queue_stats(project: Project) -> dict[str, Any] | None:
+    """Stats of the project's default indexing queue, if one was started."""
+    key = (str(Path(project.state_dir).resolve()), "agentsmithy_docs")
+    with _managers_lock:
+        manager = _managers.get(key)
+    queue = manager._index_queue if manager is not None else None
+    return queue.stats() if queue is not None else None
+
+
+def shutdown_vector_stores() -> None:
+    """Close every shared manager and release Chroma's cached clients (app shutdown)."""
+    from chromadb.api.client import SharedSystemClient
+
+    with _managers_lock:
+        managers = list(_managers.values())
+        _managers.clear()
+    for manager in managers:
+        manager.close()
+    shutdown_store_executor()
+    SharedSystemClient.clear_system_cache()
@@ -357,9 +357,9 @@ class ChatService:
 
         try:
             # Create checkpoint BEFORE adding user message (snapshot before AI work)
-            from agentsmithy.services.versioning import VersioningTracker
+            from agentsmithy.services.versioning import get_versioning_tracker
 
-            tracker = VersioningTracker(str(project.root), dialog_id)
+            tracker = get_versioning_tracker(project.root, dialog_id)
             checkpoint = tracker.create_checkpoint(
                 f"Before user message: {query[:50]}{"..." if len(query) > 50 else ""}"
             )
@@ -372,6 +372,19 @@ class ChatService:
                 session=session_id,
             )
 
+            # Consolidate per-checkpoint packs once enough have accumulated
+            from agentsmithy.core.background_tasks import get_background_manager
+            from agentsmithy.services.checkpoint_maintenance import (
+                claim_background_maintenance,
+                run_maintenance_background,
+            )
+
+            if claim_background_maintenance(str(project.root)):
+                get_background_manager().create_thread_task(
+                    run_maintenance_background(str(project.root), dialog_id),
+                    name=f"checkpoint_gc_{dialog_id[:8]}",
+                )
+
             history = project.get_dialog_history(dialog_id)
             history.add_user_message(
                 query, checkpoint=checkpoint_id, session=session_id
@@ -0,0 +1,662 @@
+"""Packing and garbage collection for shadow checkpoint repositories.
+
+Every checkpoint writes its new objects as a single packfile (see
+``write_objects_pack``): blobs and trees go to a project-wide shared store
+(``.agentsmithy/objects``, linked into each dialog repo as a git alternate) so
+content is stored once no matter how many dialogs reference it; commits stay in
+the dialog repo. Staged blobs from ``stage_file`` remain loose in the dialog repo.
+
+Maintenance consolidates a store into one delta-compressed pack and drops
+objects no longer reachable from any ref or staging index (e.g. blobs staged in
+an aborted transaction, or content only referenced by a deleted dialog).
+
+Maintenance runs in the background (see ``run_maintenance_background``) and is
+serialised with checkpoint creation through ``repository_lock`` so a repack
+never removes an object a concurrent checkpoint is about to reference.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from collections import deque
+from collections.abc import Iterable, Iterator
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+from dulwich.file import GitFile
+from dulwich.object_store import PACK_MODE
+from dulwich.objects import Commit, ShaFile, Tag, Tree, hex_to_sha
+from dulwich.pack import (
+    OFS_DELTA,
+    REF_DELTA,
+    PackFileDisappeared,
+    deltify_pack_objects,
+    pack_object_header,
+    write_pack_index,
+)
+
+from agentsmithy.services.object_encoder import EncodedObject, encode_object
+from agentsmithy.utils.logger import agent_logger
+
+# Automatic maintenance kicks in once this many packs / loose objects pile up
+AUTO_PACK_LIMIT = 20
+AUTO_LOOSE_LIMIT = 500
+
+# Unreachable objects younger than this are kept: they may belong to a
+# checkpoint or staging operation that has not updated its ref yet
+PRUNE_GRACE_PERIOD_SECONDS = 3600
+
+# Number of preceding objects considered as delta bases (git's default)
+DELTA_WINDOW_SIZE = 10
+
+# Least time between background runs for a project (from the last one's start or end)
+MAINTENANCE_MIN_INTERVAL_SECONDS = 300.0
+
+_locks: dict[str, threading.RLock] = {}
+_locks_guard = threading.Lock()
+
+# project root -> monotonic time the last background run was claimed or ended
+_last_run: dict[str, float] = {}
+_last_run_guard = threading.Lock()
+
+
+def repository_lock(git_dir: Path) -> threading.RLock:
+    """Return the process-wide lock guarding object writes for a shadow repo."""
+    key = str(git_dir.resolve())
+    with _locks_guard:
+        lock = _locks.get(key)
+        if lock is None:
+            lock = _locks[key] = threading.RLock()
+        return lock
+
+
+@dataclass(frozen=True, slots=True)
+class StorageStats:
+    """Disk usage and object counts of a shadow checkpoint repository."""
+
+    loose_objects: int
+    packs: int
+    packed_objects: int
+    object_bytes: int  # size of .git/objects
+    total_bytes: int  # size of the whole per-dialog checkpoints directory
+
+    def to_dict(self) -> dict[str, int]:
+        return asdict(self)
+
+    def needs_maintenance(self) -> bool:
+        return self.packs >= AUTO_PACK_LIMIT or self.loose_objects >= AUTO_LOOSE_LIMIT
+
+
+def _dir_size(path: Path) -> int:
+    total = 0
+    stack = [str(path)]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        else:
+                            total += entry.stat(follow_symlinks=False).st_size
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return total
+
+
+def _iter_loose_shas(objects_dir: Path) -> Iterator[bytes]:
+    """Yield SHAs of loose objects (``objects/xx/yyyy...`` files)."""
+    try:
+        fanout_dirs = list(os.scandir(objects_dir))
+    except OSError:
+        return
+    for fanout in fanout_dirs:
+        if len(fanout.name) != 2 or not fanout.is_dir():
+            continue
+        try:
+            with os.scandir(fanout.path) as it:
+                for entry in it:
+                    if len(entry.name) == 38:
+                        yield (fanout.name + entry.name).encode("ascii")
+        except OSError:
+            continue
+
+
+def collect_storage_stats(object_store: Any, root_dir: Path) -> StorageStats:
+    """Summarise object counts and disk usage of an object store.
+
+    Objects served by alternates are not counted.
+
+    Args:
+        object_store: Dialog repo or shared object store
+        root_dir: Directory whose total size is reported (e.g. the per-dialog
+            checkpoints directory)
+
+    Returns:
+        StorageStats snapshot
+    """
+    packs = list(object_store.packs)
+    return StorageStats(
+        loose_objects=sum(1 for _ in _iter_loose_shas(Path(object_store.path))),
+        packs=len(packs),
+        packed_objects=sum(len(pack) for pack in packs),
+        object_bytes=_dir_size(Path(object_store.path)),
+        total_bytes=_dir_size(root_dir),
+    )
+
+
+def write_objects_pack(
+    object_store: Any,
+    objects: Iterable[ShaFile | EncodedObject],
+    lookup_store: Any | None = None,
+) -> int:
+    """Write objects that are not yet stored as one packfile.
+
+    Duplicates (e.g. identical files in different directories) and objects
+    already present are skipped. Objects already encoded by worker processes
+    (see ``agentsmithy.services.object_encoder``) are copied into the pack
+    without being compressed or hashed again.
+
+    Args:
+        object_store: Object store to write the pack into
+        objects: Candidate objects of a single checkpoint
+        lookup_store: Store used for the existence check (defaults to
+            ``object_store``); a dialog repo's store also sees its alternates
+
+    Returns:
+        Number of objects written
+    """
+    lookup = object_store if lookup_store is None else lookup_store
+    new_objects: dict[bytes, ShaFile | EncodedObject] = {}
+    for obj in objects:
+        sha = obj.id
+        if sha not in new_objects and sha not in lookup:
+            new_objects[sha] = obj
+    if not new_objects:
+        return 0
+    if any(isinstance(obj, EncodedObject) for obj in new_objects.values()):
+        _write_encoded_pack(
+            object_store, [encode_object(obj) for obj in new_objects.values()]
+        )
+    else:
+        object_store.add_objects([(obj, None) for obj in new_objects.values()])
+    return len(new_objects)
+
+
+def _write_encoded_pack(object_store: Any, objects: list[EncodedObject]) -> None:
+    """Write already compressed objects as a pack plus index.
+
+    Unlike ``add_objects`` this neither deflates the content nor re-reads the
+    finished pack to index it: offsets and CRCs are recorded while writing.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=object_store.pack_dir, suffix=".pack")
+    index_entries: list[tuple[bytes, int, int]] = []
+    try:
+        with os.fdopen(fd, "wb") as f:
+            checksum = hashlib.sha1()
+
+            def write(data: bytes) -> None:
+                f.write(data)
+                checksum.update(data)
+
+            write(b"PACK" + struct.pack(">LL", 2, len(objects)))
+            offset = 12
+            for obj in objects:
+                header = bytes(pack_object_header(obj.type_num, None, obj.raw_length))
+                write(header)
+                write(obj.compressed)
+                crc = zlib.crc32(obj.compressed, zlib.crc32(header))
+                index_entries.append((hex_to_sha(obj.id), offset, crc))
+                offset += len(header) + len(obj.compressed)
+            pack_checksum = checksum.digest()
+            f.write(pack_checksum)
+
+        basename = os.path.join(object_store.pack_dir, f"pack-{pack_checksum.hex()}")
+        if os.path.exists(basename + ".idx"):
+            os.remove(tmp_path)
+            return
+        os.chmod(tmp_path, PACK_MODE)
+        os.replace(tmp_path, basename + ".pack")
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+    # Index last: a pack without index is invisible to readers
+    index_entries.sort()
+    with GitFile(basename + ".idx", "wb", mask=PACK_MODE) as index_file:
+        write_pack_index(index_file, index_entries, pack_checksum, version=2)
+    # Reading the pack list picks up the new pack
+    _ = object_store.packs
+
+
+def _read_varint(data: bytes, pos: int) -> tuple[int, int]:
+    """Decode a git delta-header varint (7 bits per byte, little-endian)."""
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            return value, pos
+
+
+class ObjectSizeReader:
+    """Reads object sizes from loose/pack headers without inflating content.
+
+    Loose objects and delta payloads only need their first few zlib bytes
+    decompressed; undeltified pack entries carry the size in the entry header.
+    Pack files are opened once per reader; use as a context manager.
+    """
+
+    # Enough for a pack entry header, a delta base reference and the
+    # compressed start of a delta payload
+    _HEADER_READ = 512
+
+    def __init__(self, object_store: Any) -> None:
+        self._stores: list[tuple[str, list[Any]]] = []
+        for store in [object_store, *getattr(object_store, "alternates", [])]:
+            # The first listing after a write drops dulwich's duplicate cache
+            # entry for the new pack (closing it); only the second is stable
+            _ = store.packs
+            self._stores.append((store.path, list(store.packs)))
+        self._files: dict[str, Any] = {}
+
+    def __enter__(self) -> ObjectSizeReader:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for f in self._files.values():
+            f.close()
+        self._files.clear()
+
+    def size(self, sha: bytes) -> int | None:
+        """Return the uncompressed size of an object, or None if unknown."""
+        for store_path, packs in self._stores:
+            for pack in packs:
+                try:
+                    offset = pack.index.object_offset(sha)
+                except (KeyError, PackFileDisappeared):
+                    continue
+                return self._packed_size(pack.data.path, offset)
+            loose_path = os.path.join(
+                store_path, sha[:2].decode("ascii"), sha[2:].decode("ascii")
+            )
+            if os.path.exists(loose_path):
+                return self._loose_size(loose_path)
+        return None
+
+    def _loose_size(self, path: str) -> int | None:
+        try:
+            with open(path, "rb") as f:
+                raw = f.read(self._HEADER_READ)
+            header = zlib.decompressobj().decompress(raw, 64).split(b"\0", 1)[0]
+            return int(header.split(b" ", 1)[1])
+        except (OSError, zlib.error, IndexError, ValueError):
+            return None
+
+    def _packed_size(self, path: str, offset: int) -> int | None:
+        try:
+            f = self._files.get(path)
+            if f is None:
+                f = self._files[path] = open(path, "rb")
+            f.seek(offset)
+            raw = f.read(self._HEADER_READ)
+
+            byte = raw[0]
+            type_num = (byte >> 4) & 0x07
+            size = byte & 0x0F
+            shift, pos = 4, 1
+            while byte & 0x80:
+                byte = raw[pos]
+                pos += 1
+                size |= (byte & 0x7F) << shift
+                shift += 7
+            if type_num == OFS_DELTA:
+                while raw[pos] & 0x80:
+                    pos += 1
+                pos += 1
+            elif type_num == REF_DELTA:
+                pos += 20
+            else:
+                return size
+
+            # Delta payload starts with base size and target size varints
+            delta = zlib.decompressobj().decompress(raw[pos:], 32)
+            _base_size, pos = _read_varint(delta, 0)
+            target_size, _pos = _read_varint(delta, pos)
+            return target_size
+        except (OSError, zlib.error, IndexError):
+            return None
+
+
+def _find_reachable(object_store: Any, roots: Iterable[bytes]) -> dict[bytes, bytes]:
+    """Walk commits and trees from roots; map each reachable SHA to a path hint.
+
+    Path hints let the delta search pair successive versions of the same file;
+    objects without a path (commits, staged blobs) get an empty hint.
+    """
+    reachable: dict[bytes, bytes] = {}
+    pending: deque[tuple[bytes, bytes]] = deque()
+    for sha in roots:
+        if sha not in reachable:
+            reachable[sha] = b""
+            pending.append((sha, b""))
+
+    while pending:
+        sha, path = pending.popleft()
+        try:
+            obj = object_store[sha]
+        except KeyError:
+            agent_logger.debug("Missing object during checkpoint GC", sha=sha[:8])
+            continue
+
+        children: list[tuple[bytes, bytes]] = []
+        if isinstance(obj, Commit):
+            children.append((obj.tree, b""))
+            children.extend((parent, b"") for parent in obj.parents)
+        elif isinstance(obj, Tree):
+            for entry in obj.items():
+                children.append(
+                    (entry.sha, path + b"/" + entry.path if path else entry.path)
+                )
+        elif isinstance(obj, Tag):
+            children.append((obj.object[1], b""))
+
+        for child_sha, child_path in children:
+            if child_sha not in reachable:
+                reachable[child_sha] = child_path
+                pending.append((child_sha, child_path))
+    return reachable
+
+
+def _remove_pack_files(object_store: Any, pack: Any) -> None:
+    """Delete a superseded pack; the store drops it from its cache on next scan."""
+    basename = os.path.join(object_store.pack_dir, f"pack-{pack.name().decode()}")
+    pack.close()
+    # Index first: a pack without index is invisible to concurrent readers
+    for suffix in (".idx", ".pack"):
+        try:
+            os.remove(basename + suffix)
+        except FileNotFoundError:
+            pass
+    # Reading the pack list drops vanished packs from the cache
+    _ = object_store.packs
+
+
+def _reachable_from_repo(
+    repo: Any, extra_roots: Iterable[bytes] = ()
+) -> dict[bytes, bytes]:
+    """Objects reachable from every ref of ``repo`` plus ``extra_roots``."""
+    roots: list[bytes] = []
+    for ref in repo.refs.allkeys():
+        try:
+            roots.append(repo.refs[ref])
+        except KeyError:
+            continue
+    roots.extend(extra_roots)
+    return _find_reachable(repo.object_store, roots)
+
+
+def _write_loose_object(object_store: Any, obj: ShaFile, mtime: float) -> None:
+    """Store obj as a loose object whose mtime is ``mtime`` (its age so far)."""
+    object_store.add_object(obj)
+    path = os.path.join(
+        object_store.path, obj.id[:2].decode("ascii"), obj.id[2:].decode("ascii")
+    )
+    os.utime(path, (mtime, mtime))
+
+
+def _repack_store(
+    object_store: Any,
+    reachable: dict[bytes, bytes],
+    prune: bool,
+    grace_period: int,
+) -> dict[str, int]:
+    """Rewrite the objects physically stored in ``object_store`` as one pack.
+
+    Objects served by alternates are not touched: only this store's own packs
+    and loose objects are consolidated. Unreachable objects still within the
+    grace period are left loose rather than packed.
+    """
+    objects_dir = Path(object_store.path)
+
+    # Snapshot what exists now; objects added later are left untouched
+    old_packs = list(object_store.packs)
+    loose_shas = set(_iter_loose_shas(objects_dir))
+    all_shas = set(loose_shas)
+    for pack in old_packs:
+        all_shas.update(pack)
+
+    now = time.time()
+    keep: list[tuple[ShaFile, bytes]] = []
+    # Young unreachable objects stay loose with their original mtime: a pack's
+    # mtime is the repack time, so packing them would restart the grace period
+    # on every repack and they would never be pruned
+    kept_loose: set[bytes] = set()
+    pruned = 0
+    for sha in all_shas:
+        if sha not in reachable and prune:
+            try:
+                mtime = object_store.get_object_mtime(sha)
+            except KeyError:
+                continue
+            if now - mtime >= grace_period:
+                pruned += 1
+                continue
+            if sha not in loose_shas:
+                try:
+                    _write_loose_object(object_store, object_store[sha], mtime)
+                except KeyError:
+                    continue
+            kept_loose.add(sha)
+            continue
+        try:
+            keep.append((object_store[sha], reachable.get(sha, b"")))
+        except KeyError:
+            continue
+
+    new_pack = None
+    if keep:
+        new_pack = object_store.add_pack_data(
+            len(keep),
+            deltify_pack_objects(iter(keep), window_size=DELTA_WINDOW_SIZE),
+        )
+
+    # Everything from the snapshot is now in the new pack (or pruned)
+    new_pack_name = new_pack.name() if new_pack is not None else None
+    for pack in old_packs:
+        if pack.name() != new_pack_name:
+            _remove_pack_files(object_store, pack)
+    for sha in loose_shas - kept_loose:
+        try:
+            object_store.delete_loose_object(sha)
+        except OSError:
+            pass
+    # Drop temporary files left behind by interrupted pack writes
+    object_store.prune(grace_period=grace_period)
+
+    return {"packed": len(keep), "pruned": pruned, "kept_loose": len(kept_loose)}
+
+
+def repack_repository(
+    repo: Any,
+    extra_roots: Iterable[bytes] = (),
+    prune: bool = True,
+    grace_period: int = PRUNE_GRACE_PERIOD_SECONDS,
+) -> dict[str, int]:
+    """Consolidate a repo's own packs and loose objects into one delta pack.
+
+    Objects reachable from refs or ``extra_roots`` are always kept. With
+    ``prune`` enabled, unreachable objects older than ``grace_period`` are
+    dropped. Like dulwich's own repack, the kept objects are held in memory
+    while the new pack is written. Objects living in the shared project store
+    are left alone (see ``repack_shared_store``). Callers must hold
+    ``repository_lock``.
+
+    Args:
+        repo: Shadow repository
+        extra_roots: Additional SHAs to keep (e.g. staged blobs in the index)
+        prune: Whether to drop old unreachable objects
+        grace_period: Minimum age in seconds before an unreachable object is pruned
+
+    Returns:
+        Dict with packed, pruned and kept_loose (young unreachable) object counts
+    """
+    reachable = _reachable_from_repo(repo, extra_roots)
+    return _repack_store(repo.object_store, reachable, prune, grace_period)
+
+
+def open_shared_store(path: Path) -> Any:
+    """Open (creating if needed) the project-wide shared object store."""
+    from dulwich.object_store import DiskObjectStore
+
+    (path / "pack").mkdir(parents=True, exist_ok=True)
+    (path / "info").mkdir(exist_ok=True)
+    return DiskObjectStore(str(path))
+
+
+def link_shared_store(repo: Any, shared_path: Path) -> None:
+    """Register the shared store as an alternate of a dialog repo (idempotent).
+
+    The alternates entry is relative, so moving the project keeps it valid.
+    """
+    object_store = repo.object_store
+    target = os.path.normpath(str(shared_path))
+    for alternate in object_store.alternates:
+        if os.path.normpath(alternate.path) == target:
+            return
+    object_store.add_alternate_path(os.path.relpath(target, object_store.path))
+
+
+def iter_dialog_repo_dirs(state_dir: Path) -> Iterator[Path]:
+    """Yield checkpoint repo roots of every dialog under a project state dir."""
+    legacy = state_dir / "checkpoints"
+    if (legacy / ".git").is_dir():
+        yield legacy
+    dialogs_dir = state_dir / "dialogs"
+    try:
+        dialog_dirs = sorted(dialogs_dir.iterdir())
+    except OSError:
+        return
+    for dialog_dir in dialog_dirs:
+        shadow_root = dialog_dir / "checkpoints"
+        if (shadow_root / ".git").is_dir():
+            yield shadow_root
+
+
+def repack_shared_store(
+    shared_path: Path,
+    repo_dirs: Iterable[Path],
+    prune: bool = True,
+    grace_period: int = PRUNE_GRACE_PERIOD_SECONDS,
+) -> dict[str, int]:
+    """Consolidate the shared store and drop content no dialog references.
+
+    Reachability is computed over the refs and staging indexes of every dialog
+    repo. If any repo cannot be read, pruning is disabled for this run so a
+    damaged dialog never loses its objects. Callers must hold
+    ``repository_lock(shared_path)``.
+
+    Args:
+        shared_path: Shared object store directory
+        repo_dirs: Checkpoint repo roots of all dialogs in the project
+        prune: Whether to drop old unreachable objects
+        grace_period: Minimum age in seconds before an object is pruned
+
+    Returns:
+        Dict with packed, pruned and kept_loose (young unreachable) object counts
+    """
+    from dulwich.repo import Repo
+
+    reachable: dict[bytes, bytes] = {}
+    for repo_dir in repo_dirs:
+        try:
+            repo = Repo(str(repo_dir))
+            try:
+                staged = [
+                    sha
+                    for _path, entry in repo.open_index().items()
+                    if (sha := getattr(entry, "sha", None)) is not None
+                ]
+            except (FileNotFoundError, OSError):
+                staged = []
+            for sha, path in _reachable_from_repo(repo, staged).items():
+                if path or sha not in reachable:
+                    reachable[sha] = path
+        except Exception as e:
+            agent_logger.warning(
+                "Skipping shared object pruning: unreadable checkpoint repo",
+                repo=str(repo_dir),
+                error=str(e),
+            )
+            prune = False
+
+    return _repack_store(open_shared_store(shared_path), reachable, prune, grace_period)
+
+
+def claim_background_maintenance(project_root: str) -> bool:
+    """Return True if the caller should schedule a background run now.
+
+    A repack holds every kept object in memory, so busy chats must not start
+    overlapping ones: a project gets a new run only MAINTENANCE_MIN_INTERVAL_SECONDS
+    after the last one was claimed and after it ended. The run itself still
+    checks the pack/loose-object thresholds.
+    """
+    key = str(Path(project_root).resolve())
+    now = time.monotonic()
+    with _last_run_guard:
+        last = _last_run.get(key)
+        if last is not None and now - last < MAINTENANCE_MIN_INTERVAL_SECONDS:
+            return False
+        _last_run[key] = now
+        return True
+
+
+async def run_maintenance_background(
+    project_root: str, dialog_id: str, force: bool = False
+) -> None:
+    """Background task: repack a dialog's checkpoint repository.
+
+    Intended for ``BackgroundTaskManager.create_thread_task`` after
+    ``claim_background_maintenance`` returned True. The shared store is only
+    repacked once its own thresholds are reached: it holds every dialog's
+    objects, and its repack blocks checkpoints in all of them.
+
+    Args:
+        project_root: Project root directory
+        dialog_id: Dialog whose checkpoints should be maintained
+        force: Repack the dialog repo even if its pack/loose-object thresholds
+            are not reached
+    """
+    from agentsmithy.services.versioning import get_versioning_tracker
+
+    try:
+        tracker = get_versioning_tracker(project_root, dialog_id)
+        if force or tracker.needs_maintenance():
+            tracker.run_maintenance()
+        if tracker.shared_store_needs_maintenance():
+            tracker.run_shared_maintenance()
+    except Exception as e:
+        # Best-effort: a failed repack leaves the existing packs intact
+        agent_logger.warning(
+            "Checkpoint maintenance failed", dialog_id=dialog_id, error=str(e)
+        )
+    finally:
+        with _last_run_guard:
+            _last_run[str(Path(project_root).resolve())] = time.monotonic()
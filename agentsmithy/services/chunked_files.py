@@ -0,0 +1,260 @@
+"""Content-defined chunking of large files in checkpoints.
+
+Large text artefacts that change slightly between checkpoints (SQL dumps,
+snapshots, generated JSON fixtures) would otherwise be stored as a whole new
+blob every time. Above a configurable size such a file is split into chunks
+whose boundaries depend on the content rather than on offsets: an edit only
+changes the chunks around it, and an insertion does not shift the boundaries
+after it. Chunks that did not change are shared with earlier checkpoints.
+
+A chunked file is stored as a git tree (the "manifest") in place of its blob::
+
+    <file name>         mode 040000 in the parent tree
+        .asm-chunked    marker blob: format version, file size, whole-file blob SHA
+        00000000        chunk blobs in file order
+        00000001
+        ...
+
+Keeping the manifest a tree makes the chunks reachable for maintenance and
+lets packing delta successive versions of each chunk. Readers recognise a
+manifest by its marker entry, a regular blob starting with MANIFEST_MAGIC, and
+reassemble the file from its chunks. Project files named like the marker are
+never checkpointed (see is_reserved_path), so a real directory is never read
+back as a chunked file.
+
+Boundaries are placed at line ends, the natural unit of the text files this
+is meant for: once a chunk holds CHUNK_MIN_SIZE bytes it ends after the first
+line whose CRC32 has its low CHUNK_BOUNDARY_BITS bits clear, and after
+CHUNK_MAX_SIZE bytes at the latest (files without newlines get fixed-size
+chunks). Hashing whole lines keeps the per-byte work in C.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import stat
+import zlib
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, BinaryIO
+
+from dulwich.objects import Blob, ShaFile, Tree
+
+# Tree entry mode of a chunked file in its parent tree
+CHUNKED_FILE_MODE = stat.S_IFDIR
+
+# Name of the marker entry that distinguishes a manifest from a directory
+MANIFEST_MARKER = b".asm-chunked"
+
+MANIFEST_VERSION = 1
+
+# First bytes of every marker blob
+MANIFEST_MAGIC = b"agentsmithy-chunked "
+
+CHUNK_MIN_SIZE = 32 * 1024
+CHUNK_MAX_SIZE = 512 * 1024
+
+# A line ends a chunk with probability 1 / 2**CHUNK_BOUNDARY_BITS
+CHUNK_BOUNDARY_BITS = 8
+
+# Bytes read from the file at a time while chunking
+_READ_SIZE = 4 * 1024 * 1024
+
+
+@dataclass(frozen=True, slots=True)
+class ManifestInfo:
+    """Contents of a manifest's marker blob."""
+
+    size: int
+    blob_sha: bytes  # hex SHA the file would have as a single blob
+
+
+@dataclass(slots=True)
+class ChunkedFile:
+    """Manifest built for a file, plus the objects it needs that are not stored yet."""
+
+    manifest: Tree
+    info: ManifestInfo
+    new_objects: list[ShaFile]
+    reused_chunks: int
+
+
+def _find_boundary(buf: bytes, view: memoryview, start: int, end: int) -> int:
+    """Return the end offset of the chunk starting at start (buf[start:end] is available)."""
+    limit = min(end, start + CHUNK_MAX_SIZE)
+    if limit - start <= CHUNK_MIN_SIZE:
+        return limit
+    mask = (1 << CHUNK_BOUNDARY_BITS) - 1
+    newline = buf.find(b"\n", start + CHUNK_MIN_SIZE - 1, limit)
+    if newline == -1:
+        return limit
+    line_start = buf.rfind(b"\n", start, newline) + 1 or start
+    while newline != -1:
+        if not zlib.crc32(view[line_start : newline + 1]) & mask:
+            return newline + 1
+        line_start = newline + 1
+        newline = buf.find(b"\n", line_start, limit)
+    return limit
+
+
+def iter_content_chunks(stream: BinaryIO) -> Iterator[bytes]:
+    """Split a stream into content-defined chunks (see module docstring)."""
+    buf = b""
+    start = 0
+    eof = False
+    while True:
+        if not eof and len(buf) - start < CHUNK_MAX_SIZE:
+            block = stream.read(_READ_SIZE)
+            if block:
+                buf = buf[start:] + block
+                start = 0
+                continue
+            eof = True
+        if start >= len(buf):
+            return
+        # Without eof, buf holds at least CHUNK_MAX_SIZE bytes past start
+        end = _find_boundary(buf, memoryview(buf), start, len(buf))
+        yield buf[start:end]
+        start = end
+
+
+def _marker_blob(info: ManifestInfo) -> Blob:
+    return Blob.from_string(
+        MANIFEST_MAGIC
+        + b"%d\nsize %d\nblob %s\n" % (MANIFEST_VERSION, info.size, info.blob_sha)
+    )
+
+
+def chunk_file(file_path: Path, object_store: Any) -> ChunkedFile:
+    """Chunk a file and build its manifest.
+
+    Args:
+        file_path: File to chunk
+        object_store: Store checked for chunks that already exist (deduplicated)
+
+    Returns:
+        ChunkedFile whose new_objects (new chunks, marker, manifest) the caller
+        writes, e.g. with the rest of the checkpoint's pack
+    """
+    manifest = Tree()
+    new_objects: list[ShaFile] = []
+    seen: set[bytes] = set()
+    reused = 0
+    size = 0
+    with open(file_path, "rb") as f:
+        # Whole-file blob SHA, so the file can be compared with plain blobs
+        expected_size = os.fstat(f.fileno()).st_size
+        digest = hashlib.sha1(b"blob %d\0" % expected_size)
+        for index, data in enumerate(iter_content_chunks(f)):
+            blob = Blob.from_string(data)
+            digest.update(data)
+            size += len(data)
+            manifest.add(b"%08d" % index, 0o100644, blob.id)
+            if blob.id in seen or blob.id in object_store:
+                reused += 1
+            else:
+                seen.add(blob.id)
+                new_objects.append(blob)
+
+    if size != expected_size:
+        # File changed size while being read: hash the chunks actually stored
+        digest = hashlib.sha1(b"blob %d\0" % size)
+        for blob in _iter_chunk_blobs(object_store, manifest, new_objects):
+            digest.update(blob.data)
+    info = ManifestInfo(size, digest.hexdigest().encode("ascii"))
+
+    marker = _marker_blob(info)
+    manifest.add(MANIFEST_MARKER, 0o100644, marker.id)
+    new_objects.extend([marker, manifest])
+    return ChunkedFile(manifest, info, new_objects, reused)
+
+
+def _iter_chunk_blobs(
+    object_store: Any, manifest: Tree, pending: list[ShaFile] | None = None
+) -> Iterator[Blob]:
+    """Yield a manifest's chunk blobs in file order (pending objects first)."""
+    local = {obj.id: obj for obj in pending or ()}
+    for name, _mode, sha in manifest.items():
+        if name == MANIFEST_MARKER:
+            continue
+        blob = local.get(sha)
+        if blob is None:
+            blob = object_store[sha]
+        if not isinstance(blob, Blob):
+            raise ValueError(f"Chunk {sha.decode('ascii')} is not a blob")
+        yield blob
+
+
+def is_reserved_path(rel_path: str) -> bool:
+    """Return True for project files named like the manifest marker.
+
+    Such files are left out of checkpoints: stored in a directory tree, they
+    would make it look like a manifest.
+    """
+    return rel_path.rsplit("/", 1)[-1].encode() == MANIFEST_MARKER
+
+
+def is_manifest(object_store: Any, obj: Any, mode: int = CHUNKED_FILE_MODE) -> bool:
+    """Return True if a tree entry is a chunked-file manifest.
+
+    Args:
+        object_store: Store holding the marker blob
+        obj: Object the entry points to
+        mode: Mode of the entry in its parent tree
+    """
+    if mode != CHUNKED_FILE_MODE or not isinstance(obj, Tree):
+        return False
+    if MANIFEST_MARKER not in obj:
+        return False
+    marker_mode, marker_sha = obj[MANIFEST_MARKER]
+    if not stat.S_ISREG(marker_mode):
+        return False
+    try:
+        marker = object_store[marker_sha]
+    except KeyError:
+        return False
+    return isinstance(marker, Blob) and marker.data.startswith(MANIFEST_MAGIC)
+
+
+def read_manifest_info(object_store: Any, manifest: Tree) -> ManifestInfo:
+    """Parse the marker blob of a manifest."""
+    _mode, marker_sha = manifest[MANIFEST_MARKER]
+    fields = dict(
+        line.split(b" ", 1)
+        for line in object_store[marker_sha].data.splitlines()
+        if b" " in line
+    )
+    return ManifestInfo(int(fields[b"size"]), fields[b"blob"])
+
+
+def iter_file_chunks(object_store: Any, manifest: Tree) -> Iterator[bytes]:
+    """Yield the content of a chunked file, chunk by chunk."""
+    for blob in _iter_chunk_blobs(object_store, manifest):
+        yield blob.data
+
+
+def read_file_content(object_store: Any, sha: bytes) -> bytes | None:
+    """Return a stored file's content, reassembling chunked files.
+
+    Returns:
+        File bytes, or None if sha is neither a blob nor a manifest
+    """
+    obj = object_store[sha]
+    if isinstance(obj, Blob):
+        return obj.data
+    if is_manifest(object_store, obj):
+        return b"".join(iter_file_chunks(object_store, obj))
+    return None
+
+
+def file_content_id(object_store: Any, mode: int, sha: bytes) -> bytes:
+    """Return the blob SHA a stored file has as a single blob.
+
+    Lets a chunked tree entry be compared with a plain blob entry (e.g. a
+    staged version of the same file).
+    """
+    if not stat.S_ISDIR(mode):
+        return sha
+    return read_manifest_info(object_store, object_store[sha]).blob_sha
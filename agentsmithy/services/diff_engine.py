@@ -0,0 +1,268 @@
+"""Line diffs between checkpoint blobs, with a persistent per-project cache.
+
+Counts are computed with the same ``difflib.SequenceMatcher`` that produces
+the unified diff text, so a count-only request and a full diff always agree.
+Lines are interned to integer ids first: the matcher then compares and hashes
+small ints instead of strings, and no diff text is built unless asked for.
+
+Blobs are immutable, so a result keyed by (from_sha, to_sha) never goes stale.
+``DiffCache`` keeps results in a bounded SQLite table (least recently used
+entries are evicted), which lets repeated ``GET /session`` polls skip both
+blob decompression and diffing.
+"""
+
+from __future__ import annotations
+
+import difflib
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+
+from agentsmithy.utils.logger import agent_logger
+
+DIFF_CACHE_FILENAME = "diff_cache.sqlite"
+
+# Upper bound on cached blob pairs; oldest entries are evicted beyond it
+DIFF_CACHE_MAX_ENTRIES = 20_000
+
+# Diff text larger than this is not cached (counts still are)
+DIFF_CACHE_MAX_TEXT_BYTES = 256 * 1024
+
+# last_used is refreshed at most this often per entry (avoids a write per hit)
+_TOUCH_INTERVAL_SECONDS = 60
+
+# Eviction is checked once per this many insertions
+_EVICT_EVERY = 100
+
+# Same threshold the rest of the checkpoint code uses to call content binary
+BINARY_SNIFF_BYTES = 8192
+
+
+@dataclass(frozen=True, slots=True)
+class DiffResult:
+    """Line statistics and optional unified diff body between two blobs.
+
+    ``hunks`` excludes the ``---``/``+++`` header lines, which depend on the
+    file path; see ``unified_diff_text``.
+    """
+
+    additions: int
+    deletions: int
+    hunks: str | None = None
+
+
+def decode_text(data: bytes) -> str | None:
+    """Return data as text, or None if it looks binary or is not UTF-8."""
+    if b"\x00" in data[:BINARY_SNIFF_BYTES]:
+        return None
+    try:
+        return data.decode("utf-8")
+    except UnicodeDecodeError:
+        return None
+
+
+def diff_texts(from_text: str, to_text: str, include_text: bool) -> DiffResult:
+    """Diff two texts line by line.
+
+    Args:
+        from_text: Old content
+        to_text: New content
+        include_text: Whether to render the unified diff body
+
+    Returns:
+        DiffResult; ``hunks`` is None when not requested or nothing changed
+    """
+    from_lines = from_text.splitlines(keepends=True)
+    to_lines = to_text.splitlines(keepends=True)
+
+    if include_text:
+        diff_lines = list(difflib.unified_diff(from_lines, to_lines, lineterm=""))[2:]
+        additions = sum(1 for line in diff_lines if line.startswith("+"))
+        deletions = sum(1 for line in diff_lines if line.startswith("-"))
+        return DiffResult(additions, deletions, "\n".join(diff_lines) or None)
+
+    # Intern lines so the matcher works on ints
+    ids: dict[str, int] = {}
+    from_ids = [ids.setdefault(line, len(ids)) for line in from_lines]
+    to_ids = [ids.setdefault(line, len(ids)) for line in to_lines]
+
+    additions = deletions = 0
+    matcher = difflib.SequenceMatcher(None, from_ids, to_ids)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag != "equal":
+            deletions += i2 - i1
+            additions += j2 - j1
+    return DiffResult(additions, deletions)
+
+
+def unified_diff_text(result: DiffResult, path: str | None) -> str | None:
+    """Render a cached diff body with the file headers clients expect."""
+    if result.hunks is None:
+        return None
+    name = path or "unknown"
+    return f"--- a/{name}\n+++ b/{name}\n{result.hunks}"
+
+
+class DiffCache:
+    """Bounded, persistent LRU of DiffResults keyed by (from_sha, to_sha).
+
+    Also caches line counts of single blobs (for added/deleted files). All
+    errors are swallowed: a broken cache only costs a recomputation.
+    """
+
+    def __init__(self, path: Path, max_entries: int = DIFF_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._inserts = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=5, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS diff_stats (
+                    key TEXT PRIMARY KEY,
+                    additions INTEGER NOT NULL,
+                    deletions INTEGER NOT NULL,
+                    has_text INTEGER NOT NULL,
+                    hunks BLOB,
+                    last_used INTEGER NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_diff_stats_last_used "
+                "ON diff_stats(last_used)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def _pair_key(from_sha: bytes, to_sha: bytes) -> str:
+        return f"{from_sha.decode('ascii')}:{to_sha.decode('ascii')}"
+
+    @staticmethod
+    def _lines_key(sha: bytes) -> str:
+        return f"lines:{sha.decode('ascii')}"
+
+    def _get(self, key: str, with_text: bool) -> DiffResult | None:
+        try:
+            with self._lock:
+                conn = self._connect()
+                row = conn.execute(
+                    "SELECT additions, deletions, has_text, hunks, last_used "
+                    "FROM diff_stats WHERE key = ?",
+                    (key,),
+                ).fetchone()
+                if row is None:
+                    return None
+                additions, deletions, has_text, hunks, last_used = row
+                if with_text and not has_text:
+                    return None
+                now = int(time.time())
+                if now - last_used > _TOUCH_INTERVAL_SECONDS:
+                    conn.execute(
+                        "UPDATE diff_stats SET last_used = ? WHERE key = ?",
+                        (now, key),
+                    )
+                    conn.commit()
+            text = (
+                zlib.decompress(hunks).decode("utf-8") if with_text and hunks else None
+            )
+            return DiffResult(additions, deletions, text)
+        except Exception as e:
+            agent_logger.debug("Diff cache read failed", error=str(e))
+            return None
+
+    def _put(self, key: str, result: DiffResult, has_text: bool) -> None:
+        hunks = None
+        if has_text and result.hunks is not None:
+            encoded = result.hunks.encode("utf-8")
+            if len(encoded) > DIFF_CACHE_MAX_TEXT_BYTES:
+                has_text = False
+            else:
+                hunks = zlib.compress(encoded)
+        try:
+            with self._lock:
+                conn = self._connect()
+                # A counts-only result never replaces a stored diff body
+                conn.execute(
+                    "INSERT INTO diff_stats "
+                    "(key, additions, deletions, has_text, hunks, last_used) "
+                    "VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET has_text = excluded.has_text, "
+                    "hunks = excluded.hunks, last_used = excluded.last_used "
+                    "WHERE excluded.has_text >= diff_stats.has_text",
+                    (
+                        key,
+                        result.additions,
+                        result.deletions,
+                        int(has_text),
+                        hunks,
+                        int(time.time()),
+                    ),
+                )
+                self._inserts += 1
+                if self._inserts % _EVICT_EVERY == 0:
+                    self._evict(conn)
+                conn.commit()
+        except Exception as e:
+            agent_logger.debug("Diff cache write failed", error=str(e))
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        (count,) = conn.execute("SELECT COUNT(*) FROM diff_stats").fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            conn.execute(
+                "DELETE FROM diff_stats WHERE key IN "
+                "(SELECT key FROM diff_stats ORDER BY last_used, rowid LIMIT ?)",
+                (excess,),
+            )
+
+    def get(self, from_sha: bytes, to_sha: bytes, with_text: bool) -> DiffResult | None:
+        """Return a cached diff, or None (also if text is wanted but not stored)."""
+        return self._get(self._pair_key(from_sha, to_sha), with_text)
+
+    def put(
+        self, from_sha: bytes, to_sha: bytes, result: DiffResult, with_text: bool
+    ) -> None:
+        """Store a diff; with_text marks result.hunks as the complete diff body."""
+        self._put(self._pair_key(from_sha, to_sha), result, with_text)
+
+    def get_lines(self, sha: bytes) -> int | None:
+        """Return the cached line count of a blob."""
+        result = self._get(self._lines_key(sha), with_text=False)
+        return None if result is None else result.additions
+
+    def put_lines(self, sha: bytes, lines: int) -> None:
+        self._put(self._lines_key(sha), DiffResult(lines, 0), has_text=False)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_caches: dict[str, DiffCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_diff_cache(state_dir: Path) -> DiffCache:
+    """Return the shared diff cache of a project state dir (.agentsmithy)."""
+    path = state_dir / DIFF_CACHE_FILENAME
+    key = str(path)
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = _caches[key] = DiffCache(path)
+        return cache
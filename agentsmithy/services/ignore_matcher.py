@@ -0,0 +1,568 @@
+"""Shared, precompiled gitignore matcher for project scans.
+
+Checkpoint scans, change detection, the file tools and RAG indexing all ask the
+same question - "is this project path ignored?" - so they share one engine:
+
+- Each pattern list (root .gitignore, every nested .gitignore, DEFAULT_EXCLUDES)
+  is compiled once into a single regex whose alternatives are ordered so the
+  first match is the last matching pattern (gitignore's "last match wins").
+- Matchers are cached per project (see ``get_ignore_matcher``); a pattern list
+  is recompiled only when its .gitignore file's stat changes. Nested .gitignore
+  files are discovered lazily, one stat per directory per refresh.
+- Patterns from ``dir/.gitignore`` apply relative to ``dir``, and deeper files
+  override shallower ones. DEFAULT_EXCLUDES are evaluated last, as before.
+- Walkers prune ignored directories instead of matching every file below them.
+  Like git, a basename negation (``!.gitignore``) cannot re-include files inside
+  an excluded directory; a negation naming a path (``!.idea/workspace.xml``)
+  keeps the directories on its way walkable.
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import os
+import re
+import threading
+from fnmatch import fnmatchcase
+from pathlib import Path
+
+from pathspec.patterns import GitWildMatchPattern
+
+GITIGNORE_FILENAME = ".gitignore"
+
+# Distinct path segments remembered per pattern list
+_SEGMENT_CACHE_SIZE = 50_000
+
+# Comprehensive list of build artifacts, caches, and dependencies across languages
+DEFAULT_EXCLUDES = [
+    # Version control
+    ".git/",
+    ".svn/",
+    ".hg/",
+    # Agent state
+    ".agentsmithy/",
+    "chroma_db/",
+    # Python
+    ".venv/",
+    "venv/",
+    "env/",
+    ".env/",
+    "__pycache__/",
+    "*.pyc",
+    "*.pyo",
+    "*.pyd",
+    ".pytest_cache/",
+    ".mypy_cache/",
+    ".ruff_cache/",
+    ".tox/",
+    ".coverage",
+    ".coverage.*",
+    "coverage/",
+    "coverage.xml",
+    "htmlcov/",
+    "*.egg-info/",
+    "dist/",
+    "build/",
+    "Build/",
+    "build-*/",
+    ".eggs/",
+    "pip-wheel-metadata/",
+    "__pypackages__/",
+    ".ipynb_checkpoints/",
+    ".hypothesis/",
+    ".nox/",
+    ".benchmarks/",
+    ".python-version",
+    # Node.js / JavaScript / TypeScript
+    "node_modules/",
+    ".npm/",
+    ".yarn/",
+    ".pnpm-store/",
+    "npm-debug.log*",
+    "pnpm-debug.log*",
+    "yarn-error.log*",
+    "lerna-debug.log*",
+    ".eslintcache",
+    "*.tsbuildinfo",
+    ".parcel-cache/",
+    ".turbo/",
+    ".vite/",
+    ".svelte-kit/",
+    ".angular/cache/",
+    "jspm_packages/",
+    "bower_components/",
+    ".next/",
+    ".nuxt/",
+    "out/",
+    ".cache/",
+    ".expo/",
+    ".vercel/",
+    ".firebase/",
+    # Java / Kotlin / Scala
+    "target/",
+    ".gradle/",
+    ".m2/",
+    ".settings/",
+    ".classpath",
+    ".project",
+    "*.class",
+    "*.jar",
+    "*.war",
+    "*.ear",
+    # Java/Scala IDE & tooling
+    "*.iml",
+    ".bsp/",
+    ".bloop/",
+    ".metals/",
+    ".scala-build/",
+    ".coursier/",
+    ".nb-gradle/",
+    "nbbuild/",
+    "nbproject/private/",
+    # JVM crash logs
+    "hs_err_pid*.log",
+    "replay_pid*.log",
+    # C / C++ / MSVC
+    "*.o",
+    "*.obj",
+    "*.exe",
+    "*.out",
+    "*.a",
+    "*.lib",
+    "*.so",
+    "*.dylib",
+    "*.dll",
+    "cmake-build-*/",
+    "CMakeFiles/",
+    "CMakeCache.txt",
+    "Debug/",
+    "Release/",
+    "x64/",
+    "x86/",
+    ".vs/",
+    # Rust
+    "target/",
+    "Cargo.lock",  # often auto-generated
+    # Go
+    "vendor/",
+    "*.test",
+    # .NET / C#
+    "bin/",
+    "obj/",
+    "*.dll",
+    "*.exe",
+    "*.pdb",
+    # Ruby
+    ".bundle/",
+    "vendor/bundle/",
+    "*.gem",
+    # PHP
+    "vendor/",
+    "composer.lock",  # often auto-generated
+    # Swift / iOS
+    ".build/",
+    "DerivedData/",
+    "*.xcworkspace",
+    "Pods/",
+    "*.ipa",
+    "*.xcassets/",  # Asset catalogs (images)
+    "*.app/",
+    "*.framework/",
+    "*.dSYM/",
+    # Android
+    ".gradle/",
+    "build/",
+    "*.apk",
+    "*.aab",
+    "local.properties",
+    # Databases
+    "*.db",
+    "*.sqlite",
+    "*.sqlite3",
+    # IDEs and editors (user-specific, often in .gitignore)
+    ".idea/",
+    # Keep most of .idea/ ignored, but allow project-level text settings
+    "!.idea/codeStyles/**",
+    "!.idea/inspectionProfiles/**",
+    "!.idea/runConfigurations/**",
+    "!.idea/dictionaries/**",
+    "!.idea/workspace.xml",
+    # CI/CD and VCS text configs should be tracked
+    "!.github/",
+    "!.github/workflows/**",
+    "!.github/ISSUE_TEMPLATE/**",
+    "!.github/PULL_REQUEST_TEMPLATE/**",
+    "!.github/dependabot.yml",
+    "!.github/CODEOWNERS",
+    "!.gitlab-ci.yml",
+    "!.circleci/config.yml",
+    # Common repo-level config files
+    "!.editorconfig",
+    "!.gitattributes",
+    "!.gitignore",
+    "!.dockerignore",
+    "!.pre-commit-config.yaml",
+    "!.prettier*",
+    "!.eslintrc*",
+    "!.stylelintrc*",
+    # VS Code project settings are useful to track
+    # (settings.json, tasks.json, launch.json, extensions.json, etc.)
+    # So we do NOT exclude .vscode/ by default.
+    ".fleet/",
+    ".history/",
+    ".vs/",
+    ".DS_Store",
+    "Thumbs.db",
+    "ehthumbs.db",
+    "desktop.ini",
+    "Icon?",
+    # Logs
+    "*.log",
+    "logs/",
+    ".nyc_output/",
+    # Temporary files
+    "tmp/",
+    ".tmp/",
+    "temp/",
+    "*.tmp",
+    "*.bak",
+    "*.swp",
+    "*.swo",
+    "*~",
+    "*.orig",
+    "*.rej",
+    # Data science / ML
+    ".dvc/",
+    ".dvc/cache/",
+    ".jupyter_cache/",
+    # Infra
+    ".terraform/",
+    ".terragrunt-cache/",
+]
+
+
+def read_gitignore_patterns(path: Path) -> list[str]:
+    """Read the patterns of a .gitignore file (comments and blanks dropped).
+
+    Args:
+        path: .gitignore file (missing or unreadable files yield no patterns)
+
+    Returns:
+        List of pattern lines
+    """
+    try:
+        text = path.read_text(encoding="utf-8", errors="replace")
+    except OSError:
+        return []
+    patterns = []
+    for line in text.splitlines():
+        line = line.strip()
+        if line and not line.startswith("#"):
+            patterns.append(line)
+    return patterns
+
+
+def _rebase_pattern(pattern: str, rel_dir: str) -> str:
+    """Rewrite a pattern from ``rel_dir/.gitignore`` relative to the project root."""
+    negate = pattern.startswith("!")
+    body = pattern[1:] if negate else pattern
+    dir_only = body.endswith("/")
+    core = body.rstrip("/")
+    if "/" in core:
+        # A slash anywhere but the end anchors the pattern to its .gitignore
+        rebased = f"{rel_dir}/{core.lstrip('/')}"
+    else:
+        rebased = f"{rel_dir}/**/{core}"
+    return f"{'!' if negate else ''}{rebased}{'/' if dir_only else ''}"
+
+
+def _path_negation_segments(pattern: str) -> list[str] | None:
+    """Segments of a negation that names a path; None for other patterns."""
+    if not pattern.startswith("!"):
+        return None
+    core = pattern[1:].rstrip("/")
+    if "/" not in core:
+        return None
+    return core.lstrip("/").split("/")
+
+
+_GLOB_CHARS = frozenset("*?[")
+
+
+class _CompiledPatterns:
+    """One gitignore pattern list, compiled for fast last-match-wins lookups.
+
+    Most patterns name a single path segment (``node_modules/``, ``*.pyc``):
+    literal names and ``*.ext`` globs become dict lookups per segment, other
+    segment globs one combined regex. Only patterns containing a slash are
+    matched against the whole path, through one regex whose alternatives are
+    reversed so the first alternative that matches is the last pattern.
+    """
+
+    __slots__ = (
+        "_includes",
+        "_names",
+        "_exts",
+        "_globs",
+        "_glob_ids",
+        "_paths",
+        "_path_ids",
+        "_negations",
+        "_segment_cache",
+    )
+
+    def __init__(self, patterns: list[str]) -> None:
+        self._includes: list[bool] = []
+        # segment -> [(index, dir_only)]
+        self._names: dict[str, list[tuple[int, bool]]] = {}
+        self._exts: dict[str, list[tuple[int, bool]]] = {}
+        globs: list[tuple[int, bool, str]] = []
+        paths: list[tuple[int, str]] = []
+
+        for line in patterns:
+            pattern = GitWildMatchPattern(line)
+            if pattern.include is None or pattern.regex is None:
+                continue
+            index = len(self._includes)
+            self._includes.append(bool(pattern.include))
+
+            body = line[1:] if line.startswith("!") else line
+            dir_only = body.endswith("/")
+            core = body[:-1] if dir_only else body
+            if "/" in core or "\\" in core or "**" in core or not core:
+                # pathspec's named groups are made anonymous to allow the union
+                paths.append(
+                    (index, re.sub(r"\(\?P<\w+>", "(?:", pattern.regex.pattern))
+                )
+            elif not _GLOB_CHARS.intersection(core):
+                self._names.setdefault(core, []).append((index, dir_only))
+            elif (
+                core.startswith("*.")
+                and "." not in core[2:]
+                and not _GLOB_CHARS.intersection(core[1:])
+            ):
+                self._exts.setdefault(core[1:], []).append((index, dir_only))
+            else:
+                globs.append((index, dir_only, fnmatch.translate(core)))
+
+        self._glob_ids = [(index, dir_only) for index, dir_only, _ in reversed(globs)]
+        self._globs = (
+            re.compile("|".join(f"({rx})" for _, _, rx in reversed(globs)))
+            if globs
+            else None
+        )
+        self._path_ids = [index for index, _ in reversed(paths)]
+        self._paths = (
+            re.compile("|".join(f"({rx})" for _, rx in reversed(paths)))
+            if paths
+            else None
+        )
+        self._negations = [
+            segments
+            for segments in map(_path_negation_segments, patterns)
+            if segments is not None
+        ]
+        self._segment_cache: dict[str, tuple[int, int]] = {}
+
+    def _match_segment(self, segment: str) -> tuple[int, int]:
+        """Highest matching pattern index for a segment: (any, dir-only)."""
+        cached = self._segment_cache.get(segment)
+        if cached is not None:
+            return cached
+        best_any = best_dir = -1
+        candidates = list(self._names.get(segment, ()))
+        dot = segment.rfind(".")
+        if dot >= 0:
+            candidates += self._exts.get(segment[dot:], ())
+        if self._globs is not None:
+            match = self._globs.match(segment)
+            if match is not None and match.lastindex is not None:
+                candidates.append(self._glob_ids[match.lastindex - 1])
+        for index, dir_only in candidates:
+            if dir_only:
+                best_dir = max(best_dir, index)
+            else:
+                best_any = max(best_any, index)
+        if len(self._segment_cache) >= _SEGMENT_CACHE_SIZE:
+            self._segment_cache.clear()
+        self._segment_cache[segment] = (best_any, best_dir)
+        return best_any, best_dir
+
+    def check(self, path: str) -> bool | None:
+        """Return True (ignored), False (re-included) or None (no pattern matched).
+
+        A trailing slash marks the path as a directory.
+        """
+        is_dir = path.endswith("/")
+        segments = (path[:-1] if is_dir else path).split("/")
+        best = -1
+        last = len(segments) - 1
+        for i, segment in enumerate(segments):
+            best_any, best_dir = self._match_segment(segment)
+            best = max(best, best_any)
+            if i < last or is_dir:
+                best = max(best, best_dir)
+        if self._paths is not None:
+            match = self._paths.match(path)
+            if match is not None and match.lastindex is not None:
+                best = max(best, self._path_ids[match.lastindex - 1])
+        return self._includes[best] if best >= 0 else None
+
+    def may_reinclude_below(self, dir_parts: list[str]) -> bool:
+        """Return True if a path negation could match something inside the dir."""
+        for segments in self._negations:
+            for i, part in enumerate(dir_parts):
+                if i >= len(segments) or segments[i] == "**":
+                    return True
+                if not fnmatchcase(part, segments[i]):
+                    break
+            else:
+                return True
+        return False
+
+
+def _stat_key(path: Path) -> tuple[int, int, int] | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+class IgnoreMatcher:
+    """Gitignore matcher for a project tree (thread-safe, see module docstring).
+
+    Paths are slash-separated and relative to the project root.
+    """
+
+    def __init__(self, root: Path, include_defaults: bool = True) -> None:
+        self.root = Path(root).resolve()
+        self._lock = threading.Lock()
+        self._defaults = (
+            _CompiledPatterns(DEFAULT_EXCLUDES) if include_defaults else None
+        )
+        self._root_key: tuple[int, int, int] | None = None
+        self._root_patterns = _CompiledPatterns([])
+        self._generation = 0
+        # rel_dir -> (generation checked, stat key, compiled patterns or None)
+        self._nested: dict[
+            str, tuple[int, tuple[int, int, int] | None, _CompiledPatterns | None]
+        ] = {}
+        self._pruned: dict[str, bool] = {}
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Pick up .gitignore changes; call once per scan or check.
+
+        The root .gitignore is stat'ed immediately, nested ones again lazily.
+        """
+        key = _stat_key(self.root / GITIGNORE_FILENAME)
+        with self._lock:
+            if key != self._root_key:
+                self._root_patterns = _CompiledPatterns(
+                    read_gitignore_patterns(self.root / GITIGNORE_FILENAME)
+                    if key is not None
+                    else []
+                )
+                self._root_key = key
+            self._generation += 1
+            self._pruned = {}
+
+    def _nested_patterns(self, rel_dir: str) -> _CompiledPatterns | None:
+        cached = self._nested.get(rel_dir)
+        if cached is not None and cached[0] == self._generation:
+            return cached[2]
+        path = self.root / rel_dir / GITIGNORE_FILENAME
+        key = _stat_key(path)
+        if cached is not None and cached[1] == key:
+            compiled = cached[2]
+        elif key is None:
+            compiled = None
+        else:
+            compiled = _CompiledPatterns(
+                [_rebase_pattern(p, rel_dir) for p in read_gitignore_patterns(path)]
+            )
+        self._nested[rel_dir] = (self._generation, key, compiled)
+        return compiled
+
+    def _pattern_lists(self, parent_parts: list[str]) -> list[_CompiledPatterns]:
+        """Pattern lists that apply inside the given directory, in precedence order."""
+        lists = [self._root_patterns]
+        for i in range(1, len(parent_parts) + 1):
+            nested = self._nested_patterns("/".join(parent_parts[:i]))
+            if nested is not None:
+                lists.append(nested)
+        if self._defaults is not None:
+            lists.append(self._defaults)
+        return lists
+
+    def is_ignored(self, rel_path: str, is_dir: bool = False) -> bool:
+        """Return True if the patterns exclude the path itself.
+
+        Parent directories are not considered; see ``is_visible``.
+        """
+        parts = rel_path.split("/")
+        target = f"{rel_path}/" if is_dir else rel_path
+        result: bool | None = None
+        for patterns in self._pattern_lists(parts[:-1]):
+            checked = patterns.check(target)
+            if checked is not None:
+                result = checked
+        return bool(result)
+
+    def prunes_dir(self, rel_dir: str) -> bool:
+        """Return True if a walk can skip the directory and everything below it."""
+        pruned = self._pruned.get(rel_dir)
+        if pruned is None:
+            pruned = self.is_ignored(rel_dir, is_dir=True)
+            if pruned:
+                parts = rel_dir.split("/")
+                pruned = not any(
+                    patterns.may_reinclude_below(parts)
+                    for patterns in self._pattern_lists(parts[:-1])
+                )
+            self._pruned[rel_dir] = pruned
+        return pruned
+
+    def is_visible(self, rel_path: str, is_dir: bool = False) -> bool:
+        """Return True if a pruning walk would report the path (or enter the dir)."""
+        parts = rel_path.split("/")
+        for i in range(1, len(parts)):
+            if self.prunes_dir("/".join(parts[:i])):
+                return False
+        if is_dir:
+            return not self.prunes_dir(rel_path)
+        return not self.is_ignored(rel_path)
+
+
+_matchers: dict[tuple[str, bool], IgnoreMatcher] = {}
+_matchers_lock = threading.Lock()
+
+
+def get_ignore_matcher(
+    project_root: str | Path, include_defaults: bool = True
+) -> IgnoreMatcher:
+    """Return the cached matcher for a project, refreshed against .gitignore changes.
+
+    Args:
+        project_root: Project root directory
+        include_defaults: Also apply DEFAULT_EXCLUDES (checkpoints, RAG); the
+            file tools only honour the project's own .gitignore files
+
+    Returns:
+        IgnoreMatcher shared by all callers with the same arguments
+    """
+    key = (str(Path(project_root).resolve()), include_defaults)
+    with _matchers_lock:
+        matcher = _matchers.get(key)
+        if matcher is None:
+            matcher = IgnoreMatcher(Path(key[0]), include_defaults)
+            _matchers[key] = matcher
+            return matcher
+    matcher.refresh()
+    return matcher
+
+
+def is_gitignore_path(rel_path: str) -> bool:
+    """Return True if rel_path is a .gitignore file (at any depth)."""
+    return rel_path.rpartition("/")[2] == GITIGNORE_FILENAME
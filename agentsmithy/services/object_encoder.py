@@ -0,0 +1,135 @@
+"""Hashing and compression of new checkpoint blobs in worker processes.
+
+Checkpoints read new files on a thread pool, but computing blob SHAs and
+deflating the content for the pack is CPU-bound and runs under the GIL. On the
+first checkpoint of a large project that serialises the whole job on one core.
+
+When a checkpoint has more than PROCESS_POOL_MIN_BYTES of files to hash, each
+file is handed to a process pool instead: a worker reads it, computes the blob
+SHA and compresses the content exactly as a pack entry stores it, and returns
+an ``EncodedObject``. The parent only writes the finished entries into the
+checkpoint's pack (see ``checkpoint_maintenance.write_objects_pack``). Smaller
+checkpoints keep the in-process thread pool, which avoids the cost of moving
+file content between processes.
+
+Workers are started with the ``spawn`` method (the server is multi-threaded,
+so forking is unsafe) and only import this module.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import multiprocessing
+import os
+import threading
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+
+# Total size of files to hash above which a checkpoint uses worker processes
+PROCESS_POOL_MIN_BYTES = 32 * 1024 * 1024
+
+# Git object type number of blobs (dulwich.objects.Blob.type_num)
+BLOB_TYPE_NUM = 3
+
+
+@dataclass(frozen=True, slots=True)
+class EncodedObject:
+    """A git object hashed and compressed for a pack entry.
+
+    Stands in for a dulwich object wherever only ``id`` is needed (tree
+    building, existence checks) and is written into packs as-is.
+    """
+
+    id: bytes  # hex SHA
+    type_num: int
+    raw_length: int
+    compressed: bytes  # zlib stream of the object content (no loose header)
+
+
+def encode_file(path: str) -> EncodedObject:
+    """Read a file and encode it as a blob (runs in worker processes)."""
+    with open(path, "rb") as f:
+        data = f.read()
+    digest = hashlib.sha1(b"blob %d\0" % len(data))
+    digest.update(data)
+    return EncodedObject(
+        digest.hexdigest().encode("ascii"),
+        BLOB_TYPE_NUM,
+        len(data),
+        zlib.compress(data),
+    )
+
+
+def encode_object(obj: Any) -> EncodedObject:
+    """Encode a dulwich object in-process (trees and commits are small)."""
+    if isinstance(obj, EncodedObject):
+        return obj
+    data = obj.as_raw_string()
+    return EncodedObject(obj.id, obj.type_num, len(data), zlib.compress(data))
+
+
+class ObjectEncoderPool:
+    """Process pool that encodes files; workers start on first use."""
+
+    def __init__(self, processes: int) -> None:
+        self.processes = processes
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.processes,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def encode_file(self, path: str) -> EncodedObject:
+        """Encode a file in a worker process and wait for the result."""
+        return self._get_executor().submit(encode_file, path).result()
+
+    def shutdown(self) -> None:
+        """Stop the worker processes (they are restarted on next use)."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+_pool: ObjectEncoderPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_object_encoder(processes: int) -> ObjectEncoderPool | None:
+    """Return the shared encoder pool, or None when it is disabled.
+
+    Args:
+        processes: Worker count; 0 uses one per CPU, 1 disables the pool
+            (files are hashed in the server process)
+    """
+    global _pool
+
+    if processes == 0:
+        processes = os.cpu_count() or 1
+    if processes <= 1:
+        return None
+    with _pool_lock:
+        if _pool is not None and _pool.processes != processes:
+            _pool.shutdown()
+            _pool = None
+        if _pool is None:
+            _pool = ObjectEncoderPool(processes)
+        return _pool
+
+
+def shutdown_object_encoder() -> None:
+    """Stop the shared encoder pool's worker processes (server shutdown)."""
+    global _pool
+
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown()
@@ -0,0 +1,260 @@
+"""Persistent stat cache for checkpoint workdir scans.
+
+Maps project-relative paths to the stat tuple observed when the file was last
+hashed (mtime_ns, ctime_ns, size, inode) together with the resulting blob SHA.
+A later checkpoint only needs to open files whose stat tuple changed.
+
+Racily-clean entries are handled the same way git handles its index: an entry
+whose mtime is not strictly older than the cache file itself cannot be trusted,
+because the file may have been modified again within the same timestamp tick.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from agentsmithy.utils.logger import agent_logger
+
+# Bump when the on-disk layout changes; older caches are discarded on load
+STAT_CACHE_VERSION = 1
+
+STAT_CACHE_FILENAME = "stat_cache.json"
+
+# Git stores inode and size as 32-bit values in its index
+_UINT32_MASK = 0xFFFFFFFF
+
+
+@dataclass(frozen=True, slots=True)
+class StatEntry:
+    """Stat tuple of a file together with the blob SHA of its content."""
+
+    mtime_ns: int
+    ctime_ns: int
+    size: int
+    inode: int
+    sha: bytes  # hex blob id, as used by dulwich
+    mode: int = 0o100644  # tree entry mode (chunked files are stored as trees)
+
+    @classmethod
+    def from_stat(
+        cls, st: os.stat_result, sha: bytes, mode: int = 0o100644
+    ) -> StatEntry:
+        return cls(
+            mtime_ns=st.st_mtime_ns,
+            ctime_ns=st.st_ctime_ns,
+            size=st.st_size,
+            inode=st.st_ino,
+            sha=sha,
+            mode=mode,
+        )
+
+    def matches(self, st: os.stat_result) -> bool:
+        """Return True if the stat result describes the same file state."""
+        return (
+            self.mtime_ns == st.st_mtime_ns
+            and self.ctime_ns == st.st_ctime_ns
+            and self.size == st.st_size
+            and self.inode == st.st_ino
+        )
+
+
+class StatCache:
+    """Path -> StatEntry mapping persisted as JSON next to the shadow repo.
+
+    Lookups are read-only against the entries loaded from disk; a checkpoint
+    records the entries of the current scan and ``save()`` replaces the file, so
+    paths that disappeared or became ignored drop out automatically.
+    """
+
+    def __init__(self, path: Path | None) -> None:
+        self.path = path
+        self._entries: dict[str, StatEntry] = {}
+        self._pending: dict[str, StatEntry] = {}
+        # Filesystem timestamp of the cache file; entries at or after it are racy
+        self._racy_after_ns: int | None = None
+        # Git index entries hold inode and size truncated to 32 bits
+        self._git_truncated = False
+
+    @classmethod
+    def load(cls, path: Path) -> StatCache:
+        """Load cache from disk; a missing or corrupt file yields an empty cache."""
+        cache = cls(path)
+        try:
+            st = path.stat()
+            raw = json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return cache
+        except Exception as e:
+            agent_logger.debug("Discarding unreadable stat cache", error=str(e))
+            return cache
+
+        if not isinstance(raw, dict) or raw.get("version") != STAT_CACHE_VERSION:
+            return cache
+
+        entries: dict[str, StatEntry] = {}
+        for rel_path, values in (raw.get("entries") or {}).items():
+            try:
+                mtime_ns, ctime_ns, size, inode, sha, *rest = values
+                entries[rel_path] = StatEntry(
+                    int(mtime_ns),
+                    int(ctime_ns),
+                    int(size),
+                    int(inode),
+                    sha.encode(),
+                    int(rest[0]) if rest else 0o100644,
+                )
+            except (TypeError, ValueError, AttributeError):
+                continue
+
+        cache._entries = entries
+        cache._racy_after_ns = st.st_mtime_ns
+        return cache
+
+    @classmethod
+    def from_git_index(cls, index: Any, index_path: Path) -> StatCache:
+        """Build a read-only cache from a git index (e.g. the project's own .git).
+
+        Git keeps exactly the stat data we need, so a clean project index lets
+        the first checkpoint of a dialog skip reading unchanged tracked files.
+        """
+        cache = cls(None)
+        try:
+            cache._racy_after_ns = index_path.stat().st_mtime_ns
+        except OSError:
+            return cache
+
+        for path_bytes, entry in index.items():
+            sha = getattr(entry, "sha", None)
+            if sha is None:
+                # Conflicted entries carry no single blob
+                continue
+            try:
+                cache._entries[path_bytes.decode("utf-8")] = StatEntry(
+                    mtime_ns=_git_time_to_ns(entry.mtime),
+                    ctime_ns=_git_time_to_ns(entry.ctime),
+                    size=int(entry.size),
+                    inode=int(entry.ino),
+                    sha=sha,
+                )
+            except (TypeError, ValueError, UnicodeDecodeError):
+                continue
+        cache._git_truncated = True
+        return cache
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, rel_path: str, st: os.stat_result) -> bytes | None:
+        """Return the cached blob SHA if the file's stat tuple is unchanged."""
+        entry = self._entries.get(rel_path)
+        if entry is None:
+            return None
+        if self._racy_after_ns is None or entry.mtime_ns >= self._racy_after_ns:
+            return None
+        if self._git_truncated:
+            matches = (
+                entry.mtime_ns == st.st_mtime_ns
+                and entry.ctime_ns == st.st_ctime_ns
+                and entry.size == st.st_size & _UINT32_MASK
+                and entry.inode == st.st_ino & _UINT32_MASK
+            )
+        else:
+            matches = entry.matches(st)
+        return entry.sha if matches else None
+
+    def record(
+        self, rel_path: str, st: os.stat_result, sha: bytes, mode: int = 0o100644
+    ) -> None:
+        """Record the stat tuple observed *before* hashing a file."""
+        self._pending[rel_path] = StatEntry.from_stat(st, sha, mode)
+
+    def mode_of(self, rel_path: str) -> int:
+        """Tree entry mode stored with a loaded entry (regular file by default)."""
+        entry = self._entries.get(rel_path)
+        return entry.mode if entry is not None else 0o100644
+
+    def paths(self) -> list[str]:
+        """Paths of all loaded entries (the files seen by the previous scan)."""
+        return list(self._entries)
+
+    def carry_over(self, rel_path: str) -> bytes | None:
+        """Keep a loaded entry for a file known to be unchanged, without stat().
+
+        Used when a filesystem watcher vouches that the file was not touched.
+        Racily-clean entries are smudged (size -1, like git does) so that a later
+        lookup re-hashes the file instead of trusting a same-tick stat tuple
+        against the newer cache timestamp.
+
+        Returns:
+            The entry's blob SHA, or None if the path is not in the cache
+        """
+        entry = self._entries.get(rel_path)
+        if entry is None:
+            return None
+        if self._racy_after_ns is None or entry.mtime_ns >= self._racy_after_ns:
+            entry = StatEntry(
+                entry.mtime_ns, entry.ctime_ns, -1, entry.inode, entry.sha, entry.mode
+            )
+        self._pending[rel_path] = entry
+        return entry.sha
+
+    def save(self) -> bool:
+        """Atomically replace the on-disk cache with the recorded entries.
+
+        Returns:
+            True if the cache file was written
+        """
+        if self.path is None:
+            return False
+        payload = {
+            "version": STAT_CACHE_VERSION,
+            "entries": {
+                rel_path: [
+                    e.mtime_ns,
+                    e.ctime_ns,
+                    e.size,
+                    e.inode,
+                    e.sha.decode(),
+                    e.mode,
+                ]
+                for rel_path, e in self._pending.items()
+            },
+        }
+        tmp_path = self.path.with_suffix(".tmp")
+        try:
+            tmp_path.write_text(json.dumps(payload, separators=(",", ":")))
+            tmp_path.replace(self.path)
+        except OSError as e:
+            # Non-critical: next checkpoint simply hashes more files
+            agent_logger.debug("Failed to write stat cache", error=str(e))
+            return False
+        self._entries = self._pending
+        self._pending = {}
+        try:
+            self._racy_after_ns = self.path.stat().st_mtime_ns
+        except OSError:
+            self._racy_after_ns = None
+        return True
+
+    def invalidate(self) -> None:
+        """Drop all entries and remove the on-disk cache."""
+        self._entries = {}
+        self._pending = {}
+        self._racy_after_ns = None
+        if self.path is not None:
+            try:
+                self.path.unlink(missing_ok=True)
+            except OSError:
+                pass
+
+
+def _git_time_to_ns(value: Any) -> int:
+    """Convert a dulwich index timestamp ((sec, nsec) tuple or number) to ns."""
+    if isinstance(value, tuple):
+        sec, nsec = value
+        return int(sec) * 1_000_000_000 + int(nsec)
+    return int(float(value) * 1_000_000_000)
@@ -1,24 +1,74 @@
 from __future__ import annotations
 
-import difflib
 import hashlib
 import json
 import os
 import shutil
+import stat
 import tempfile
+import threading
 from collections import deque
-from collections.abc import Iterable
+from collections.abc import Collection, Iterable, Iterator
+from contextlib import contextmanager
 from dataclasses import dataclass
+from datetime import UTC, datetime
 from enum import Enum
 from pathlib import Path
-from typing import Any, cast
+from typing import Any
 
-import pathspec
 from dulwich import porcelain
-from dulwich.diff_tree import CHANGE_ADD, CHANGE_DELETE, CHANGE_MODIFY, tree_changes
+from dulwich.index import IndexEntry
 from dulwich.objects import Blob, Commit, Tree
 from dulwich.repo import Repo
 
+from agentsmithy.services import object_encoder
+from agentsmithy.services.checkpoint_maintenance import (
+    ObjectSizeReader,
+    collect_storage_stats,
+    iter_dialog_repo_dirs,
+    link_shared_store,
+    open_shared_store,
+    repack_repository,
+    repack_shared_store,
+    repository_lock,
+    write_objects_pack,
+)
+from agentsmithy.services.chunked_files import (
+    CHUNKED_FILE_MODE,
+    MANIFEST_MARKER,
+    chunk_file,
+    file_content_id,
+    is_manifest,
+    is_reserved_path,
+    iter_file_chunks,
+    read_file_content,
+    read_manifest_info,
+)
+from agentsmithy.services.diff_engine import (
+    DiffCache,
+    DiffResult,
+    decode_text,
+    diff_texts,
+    get_diff_cache,
+    unified_diff_text,
+)
+from agentsmithy.services.ignore_matcher import (
+    DEFAULT_EXCLUDES,
+    IgnoreMatcher,
+    get_ignore_matcher,
+    is_gitignore_path,
+    read_gitignore_patterns,
+)
+from agentsmithy.services.object_encoder import ObjectEncoderPool, get_object_encoder
+from agentsmithy.services.stat_cache import STAT_CACHE_FILENAME, StatCache
+from agentsmithy.services.workdir_scan import (
+    WorkdirEntry,
+    WorkdirScan,
+    invalidate_workdir_scans,
+    scan_generation,
+)
+from agentsmithy.services.workdir_watcher import DirtyPaths, get_workdir_watcher
+
 # Note: This module uses dulwich (pure Python git implementation) for all git operations.
 # Git binary is not required - everything works through dulwich API.
 
@@ -37,7 +87,7 @@ File Include/Exclude Logic
 
 This module implements a comprehensive file tracking and exclusion system for checkpoints:
 
-1. DEFAULT_EXCLUDES (defined below):
+1. DEFAULT_EXCLUDES (defined in ignore_matcher.py):
    - Hardcoded list of patterns that are ALWAYS excluded from automatic checkpoint scans
    - Includes build artifacts, caches, dependencies, virtual environments, etc.
    - Uses gitignore-style patterns (via pathspec library): directories (dir/), globs (*.pyc), etc.
@@ -45,6 +95,9 @@ This module implements a comprehensive file tracking and exclusion system for ch
 
 2. Project .gitignore:
    - If project has .gitignore file, patterns are loaded and combined with DEFAULT_EXCLUDES
+   - Nested .gitignore files apply to their directory, as in git
+   - Patterns are compiled once per project and recompiled only when a .gitignore
+     changes; ignored directories are pruned during the walk (see ignore_matcher.py)
    - Uses full gitignore specification (via pathspec library):
      * Directory patterns: .venv/ - matches directory and all its contents
      * Wildcards: *.log - matches all .log files
@@ -55,14 +108,23 @@ This module implements a comprehensive file tracking and exclusion system for ch
 3. Git Staging Area (Index):
    - Files created or modified by agent tools (write_file, edit_file) are staged immediately
    - Each tool calls tracker.stage_file(path) which adds file to git index (staging area)
+   - Tools share one long-lived tracker per dialog (get_versioning_tracker); its staging
+     writes are buffered in memory and written to the index once per transaction or after
+     a short debounce, and are flushed before anything reads the index
    - This is equivalent to "git add -f" - stages file even if it matches ignore patterns
    - Staged files persist in .agentsmithy/<dialog_id>/checkpoints/.git/index
    - Purpose: Force-add intentionally created files even if they match ignore patterns
    
 4. Checkpoint Creation:
    - Step 1: Scan working directory, add all files EXCEPT those matching ignore patterns
+     (files whose stat tuple matches the per-dialog stat cache are added by their cached
+     blob SHA without being read - see stat_cache.py; when the workdir watcher vouches
+     for everything else, only paths touched since the last scan are examined - see
+     workdir_watcher.py)
    - Step 2: Merge staging area (index) into tree - adds staged files even if ignored
    - Step 3: Commit tree (staging area is NOT cleared here - see note below)
+     (new blobs/trees go as one packfile into the project-wide .agentsmithy/objects store,
+     shared by all dialogs as a git alternate - see checkpoint_maintenance.py)
    - Rationale: If agent explicitly calls write_file(".venv/config.py"), it's staged immediately,
      then force-added to checkpoint despite matching DEFAULT_EXCLUDES
    - Uses standard git staging workflow instead of custom tracking file
@@ -76,9 +138,11 @@ This module implements a comprehensive file tracking and exclusion system for ch
      * Files in HEAD checkpoint tree
      * Files in staging area (index) - uncommitted but agent-created
    - Deletes files in (HEAD_files ∪ staged_files - target_files)
-   - Restores files from target checkpoint tree
+   - Writes only target files whose on-disk content differs from the target blob
+     (stat cache hit or size + content compare means the file is left untouched)
    - Clears staging area after restore
-   - Cleans up empty directories left after file deletion
+   - Cleans up empty parent directories of deleted files
+   - Returns written + deleted paths so callers reindex only what changed
    - Example scenario (non-ignored files):
      * Checkpoint 1: main.py, README.md
      * Agent creates: .github/workflows/ci.yaml (via write_file → staged to git index immediately)
@@ -98,8 +162,10 @@ This module implements a comprehensive file tracking and exclusion system for ch
      * Reset to checkpoint 1: .github/workflows/ci.yaml deleted (staged but not in checkpoint 1)
      * Staging cleared after restore
 
-6. Uncommitted Changes Detection (has_uncommitted_changes):
+6. Uncommitted Changes Detection (has_uncommitted_changes / iter_changes):
    - Compares current working directory against HEAD checkpoint
+   - iter_changes() yields (path, status) lazily; has_uncommitted_changes() stops at
+     the first change, get_staged_files() consumes only the deletions
    - Uses CURRENT ignore spec (from .gitignore + DEFAULT_EXCLUDES)
    - Filters committed files by current ignore spec before comparison
    - Prevents false positives when files become ignored after being committed
@@ -114,216 +180,36 @@ Key Design Principles:
 - Clean up after ourselves: Clear staging after checkpoint, delete outdated files on restore
 """
 
-# Comprehensive list of build artifacts, caches, and dependencies across languages
-DEFAULT_EXCLUDES = [
-    # Version control
-    ".git/",
-    ".svn/",
-    ".hg/",
-    # Agent state
-    ".agentsmithy/",
-    "chroma_db/",
-    # Python
-    ".venv/",
-    "venv/",
-    "env/",
-    ".env/",
-    "__pycache__/",
-    "*.pyc",
-    "*.pyo",
-    "*.pyd",
-    ".pytest_cache/",
-    ".mypy_cache/",
-    ".ruff_cache/",
-    ".tox/",
-    ".coverage",
-    ".coverage.*",
-    "coverage/",
-    "coverage.xml",
-    "htmlcov/",
-    "*.egg-info/",
-    "dist/",
-    "build/",
-    "Build/",
-    "build-*/",
-    ".eggs/",
-    "pip-wheel-metadata/",
-    "__pypackages__/",
-    ".ipynb_checkpoints/",
-    ".hypothesis/",
-    ".nox/",
-    ".benchmarks/",
-    ".python-version",
-    # Node.js / JavaScript / TypeScript
-    "node_modules/",
-    ".npm/",
-    ".yarn/",
-    ".pnpm-store/",
-    "npm-debug.log*",
-    "pnpm-debug.log*",
-    "yarn-error.log*",
-    "lerna-debug.log*",
-    ".eslintcache",
-    "*.tsbuildinfo",
-    ".parcel-cache/",
-    ".turbo/",
-    ".vite/",
-    ".svelte-kit/",
-    ".angular/cache/",
-    "jspm_packages/",
-    "bower_components/",
-    ".next/",
-    ".nuxt/",
-    "out/",
-    ".cache/",
-    ".expo/",
-    ".vercel/",
-    ".firebase/",
-    # Java / Kotlin / Scala
-    "target/",
-    ".gradle/",
-    ".m2/",
-    ".settings/",
-    ".classpath",
-    ".project",
-    "*.class",
-    "*.jar",
-    "*.war",
-    "*.ear",
-    # Java/Scala IDE & tooling
-    "*.iml",
-    ".bsp/",
-    ".bloop/",
-    ".metals/",
-    ".scala-build/",
-    ".coursier/",
-    ".nb-gradle/",
-    "nbbuild/",
-    "nbproject/private/",
-    # JVM crash logs
-    "hs_err_pid*.log",
-    "replay_pid*.log",
-    # C / C++ / MSVC
-    "*.o",
-    "*.obj",
-    "*.exe",
-    "*.out",
-    "*.a",
-    "*.lib",
-    "*.so",
-    "*.dylib",
-    "*.dll",
-    "cmake-build-*/",
-    "CMakeFiles/",
-    "CMakeCache.txt",
-    "Debug/",
-    "Release/",
-    "x64/",
-    "x86/",
-    ".vs/",
-    # Rust
-    "target/",
-    "Cargo.lock",  # often auto-generated
-    # Go
-    "vendor/",
-    "*.test",
-    # .NET / C#
-    "bin/",
-    "obj/",
-    "*.dll",
-    "*.exe",
-    "*.pdb",
-    # Ruby
-    ".bundle/",
-    "vendor/bundle/",
-    "*.gem",
-    # PHP
-    "vendor/",
-    "composer.lock",  # often auto-generated
-    # Swift / iOS
-    ".build/",
-    "DerivedData/",
-    "*.xcworkspace",
-    "Pods/",
-    "*.ipa",
-    "*.xcassets/",  # Asset catalogs (images)
-    "*.app/",
-    "*.framework/",
-    "*.dSYM/",
-    # Android
-    ".gradle/",
-    "build/",
-    "*.apk",
-    "*.aab",
-    "local.properties",
-    # Databases
-    "*.db",
-    "*.sqlite",
-    "*.sqlite3",
-    # IDEs and editors (user-specific, often in .gitignore)
-    ".idea/",
-    # Keep most of .idea/ ignored, but allow project-level text settings
-    "!.idea/codeStyles/**",
-    "!.idea/inspectionProfiles/**",
-    "!.idea/runConfigurations/**",
-    "!.idea/dictionaries/**",
-    "!.idea/workspace.xml",
-    # CI/CD and VCS text configs should be tracked
-    "!.github/",
-    "!.github/workflows/**",
-    "!.github/ISSUE_TEMPLATE/**",
-    "!.github/PULL_REQUEST_TEMPLATE/**",
-    "!.github/dependabot.yml",
-    "!.github/CODEOWNERS",
-    "!.gitlab-ci.yml",
-    "!.circleci/config.yml",
-    # Common repo-level config files
-    "!.editorconfig",
-    "!.gitattributes",
-    "!.gitignore",
-    "!.dockerignore",
-    "!.pre-commit-config.yaml",
-    "!.prettier*",
-    "!.eslintrc*",
-    "!.stylelintrc*",
-    # VS Code project settings are useful to track
-    # (settings.json, tasks.json, launch.json, extensions.json, etc.)
-    # So we do NOT exclude .vscode/ by default.
-    ".fleet/",
-    ".history/",
-    ".vs/",
-    ".DS_Store",
-    "Thumbs.db",
-    "ehthumbs.db",
-    "desktop.ini",
-    "Icon?",
-    # Logs
-    "*.log",
-    "logs/",
-    ".nyc_output/",
-    # Temporary files
-    "tmp/",
-    ".tmp/",
-    "temp/",
-    "*.tmp",
-    "*.bak",
-    "*.swp",
-    "*.swo",
-    "*~",
-    "*.orig",
-    "*.rej",
-    # Data science / ML
-    ".dvc/",
-    ".dvc/cache/",
-    ".jupyter_cache/",
-    # Infra
-    ".terraform/",
-    ".terragrunt-cache/",
-]
-
 # Number of failure entries to include in error messages
 MAX_FAILURE_SAMPLES = 5
 
+# Read size for streaming file hashes
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Linux ioctl that makes dst share src's extents (btrfs, XFS, ...)
+FICLONE = 0x40049409
+
+# Files larger than this are snapshotted to disk instead of memory before edits
+PREEDIT_MEMORY_LIMIT = 4 * 1024 * 1024
+
+# Seconds shared trackers wait before writing buffered staging changes to the index
+STAGING_FLUSH_DELAY = 0.5
+
+
+def _clone_file(src: Path, dst: Path) -> None:
+    """Copy a file, sharing its data blocks (reflink) when the filesystem allows."""
+    try:
+        import fcntl
+
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+        shutil.copystat(src, dst)
+        return
+    except (ImportError, OSError):
+        pass
+    # copy2 streams the file (copy_file_range/sendfile where available)
+    shutil.copy2(src, dst)
+
 
 def stable_hash(text: str) -> str:
     """Generate stable 13-character SHA1 hash of text.
@@ -337,44 +223,33 @@ def stable_hash(text: str) -> str:
     return hashlib.sha1(text.encode("utf-8")).hexdigest()[:13]
 
 
-def _build_gitignore_spec(gitignore_path: Path) -> pathspec.PathSpec:
-    """Build PathSpec from .gitignore file and DEFAULT_EXCLUDES.
-
-    Uses pathspec library for full gitignore specification support including:
-    - Negation patterns (!pattern)
-    - Anchored patterns (/pattern)
-    - Directory patterns (foo/)
-    - Wildcards and globs (*, ?, **)
-    - All standard gitignore matching rules
+def _hash_file_as_blob(file_path: Path, size: int) -> bytes | None:
+    """Compute a file's git blob SHA without loading it into memory.
 
     Args:
-        gitignore_path: Path to .gitignore file
+        file_path: File to hash
+        size: Expected size in bytes (the blob header precedes the content)
 
     Returns:
-        PathSpec object that can match paths against gitignore patterns
+        Hex blob SHA, or None if the file's size no longer matches
     """
-    patterns = []
-
-    # Load patterns from .gitignore if exists
-    if gitignore_path.exists():
-        for line in gitignore_path.read_text().splitlines():
-            line = line.strip()
-            # Skip comments and empty lines
-            if not line or line.startswith("#"):
-                continue
-            patterns.append(line)
-
-    # Add default excludes
-    patterns.extend(DEFAULT_EXCLUDES)
-
-    # Build PathSpec using gitwildmatch pattern (standard gitignore)
-    return pathspec.PathSpec.from_lines("gitwildmatch", patterns)
+    digest = hashlib.sha1(b"blob %d\0" % size)
+    read = 0
+    with open(file_path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+            read += len(chunk)
+    if read != size:
+        return None
+    return digest.hexdigest().encode("ascii")
 
 
 @dataclass
 class CheckpointInfo:
     commit_id: str
     message: str
+    seq: int | None = None  # Position in the dialog journal (pagination cursor)
+    created_at: str | None = None
 
 
 class VersioningTracker:
@@ -391,9 +266,31 @@ class VersioningTracker:
 
     MAIN_BRANCH = b"refs/heads/main"
 
-    def __init__(self, project_root: str, dialog_id: str | None = None) -> None:
+    def __init__(
+        self,
+        project_root: str,
+        dialog_id: str | None = None,
+        staging_flush_delay: float | None = None,
+        chunk_min_size: int = 0,
+        hash_processes: int = 1,
+    ) -> None:
+        """Create a tracker for a project (and dialog).
+
+        Args:
+            project_root: Project directory
+            dialog_id: Dialog whose shadow repo to use
+            staging_flush_delay: Seconds to buffer staging changes before writing
+                the index; None writes every change through immediately
+            chunk_min_size: Files of at least this many bytes are stored in
+                content-defined chunks (see chunked_files.py); 0 disables it
+            hash_processes: Worker processes that hash and compress new files
+                of large checkpoints (see object_encoder.py); 0 uses one per
+                CPU, 1 keeps the work in this process
+        """
         self.project_root = Path(project_root).resolve()
         self.dialog_id = dialog_id
+        self._chunk_min_size = chunk_min_size
+        self._hash_processes = hash_processes
 
         # Use dialog-specific directory if dialog_id provided
         if dialog_id:
@@ -409,8 +306,21 @@ class VersioningTracker:
             self.shadow_root = self.project_root / ".agentsmithy" / "checkpoints"
 
         self.shadow_root.mkdir(parents=True, exist_ok=True)
+        # Project-wide object store shared by all dialogs (git alternates)
+        self._shared_store: Any | None = None
         self._tmp_dir: Path | None = None
-        self._preedit_snapshots: dict[Path, bytes] = {}
+        # Pre-edit contents: bytes for small files, snapshot file path for large ones
+        self._preedit_snapshots: dict[Path, bytes | Path] = {}
+        self._repo: Repo | None = None
+        # Workdir walk shared by the operations inside shared_scan()
+        self._scan: WorkdirScan | None = None
+        self._scan_scopes = 0
+
+        # Staging index changes not yet written: path -> entry (None = removal)
+        self._pending_staging: dict[bytes, IndexEntry | None] = {}
+        self._staging_lock = threading.RLock()
+        self._staging_flush_delay = staging_flush_delay
+        self._staging_timer: threading.Timer | None = None
 
         # Transaction support - group multiple file operations into one checkpoint
         self._transaction_active: bool = False
@@ -422,9 +332,14 @@ class VersioningTracker:
         """Ensure shadow git repository exists.
 
         Uses dulwich.porcelain.init() - pure Python, git binary not required.
+        The opened repo is kept for the lifetime of the tracker; later calls only
+        re-check the session branches.
         """
         # Use a non-bare repository that can track files in project directory
         git_dir = self.shadow_root / ".git"
+        if self._repo is not None and git_dir.exists():
+            self._ensure_branches_exist(self._repo)
+            return self._repo
         if git_dir.exists():
             repo = Repo(str(self.shadow_root))
         else:
@@ -456,9 +371,33 @@ class VersioningTracker:
             pass
 
         self._write_excludes(repo)
+        self._link_shared_store(repo)
         self._ensure_branches_exist(repo)
+        self._repo = repo
         return repo
 
+    @property
+    def _shared_objects_path(self) -> Path:
+        """Project-wide object store shared by all dialog repos."""
+        return self.project_root / ".agentsmithy" / "objects"
+
+    def _link_shared_store(self, repo: Repo) -> None:
+        """Attach the shared object store to the dialog repo as an alternate.
+
+        Blobs and trees are written there, so content already stored by any
+        dialog is referenced rather than copied. On failure the dialog repo
+        keeps working standalone and stores everything itself.
+        """
+        try:
+            if self._shared_store is None:
+                self._shared_store = open_shared_store(self._shared_objects_path)
+            link_shared_store(repo, self._shared_objects_path)
+        except OSError as e:
+            from agentsmithy.utils.logger import agent_logger
+
+            agent_logger.debug("Shared object store unavailable", error=str(e))
+            self._shared_store = None
+
     def _write_excludes(self, repo: Repo) -> None:
         """Write exclude patterns to shadow repository's info/exclude file.
 
@@ -471,16 +410,7 @@ class VersioningTracker:
         info_dir.mkdir(parents=True, exist_ok=True)
         exclude_file = info_dir / "exclude"
         # merge project .gitignore if exists
-        patterns: list[str] = []
-        gitignore = self.project_root / ".gitignore"
-        if gitignore.exists():
-            patterns.extend(
-                [
-                    line.strip()
-                    for line in gitignore.read_text().splitlines()
-                    if line.strip()
-                ]
-            )
+        patterns = read_gitignore_patterns(self.project_root / ".gitignore")
         patterns.extend(DEFAULT_EXCLUDES)
         exclude_file.write_text("\n".join(sorted(set(patterns))) + "\n")
 
@@ -488,22 +418,46 @@ class VersioningTracker:
     def start_edit(self, paths: Iterable[str]) -> None:
         """Snapshot files before editing to allow rollback on failure.
 
+        Files up to PREEDIT_MEMORY_LIMIT bytes are kept in memory; larger files
+        are cloned (reflink where supported, otherwise copied) into a temp dir
+        inside the shadow repo so the server never holds their bytes.
+
         Args:
             paths: Relative paths to files to snapshot
         """
-        self._preedit_snapshots.clear()
+        self._cleanup_edit()
+        invalidate_workdir_scans(self.project_root)
         for p in paths:
             abs_path = (self.project_root / p).resolve()
-            if abs_path.is_file():
+            if not abs_path.is_file():
+                continue
+            if abs_path.stat().st_size <= PREEDIT_MEMORY_LIMIT:
                 self._preedit_snapshots[abs_path] = abs_path.read_bytes()
-        if self._preedit_snapshots:
-            self._tmp_dir = Path(tempfile.mkdtemp(prefix="asm_preedit_"))
+                continue
+            if self._tmp_dir is None:
+                self._tmp_dir = Path(
+                    tempfile.mkdtemp(prefix="asm_preedit_", dir=self.shadow_root)
+                )
+            snapshot = self._tmp_dir / str(len(self._preedit_snapshots))
+            _clone_file(abs_path, snapshot)
+            self._preedit_snapshots[abs_path] = snapshot
 
     def abort_edit(self) -> None:
-        """Restore files from pre-edit snapshots and clean up."""
-        for abs_path, content in self._preedit_snapshots.items():
+        """Restore files from pre-edit snapshots and clean up.
+
+        Disk snapshots are moved back over the edited file with a rename.
+        """
+        for abs_path, snapshot in self._preedit_snapshots.items():
             abs_path.parent.mkdir(parents=True, exist_ok=True)
-            abs_path.write_bytes(content)
+            if isinstance(snapshot, bytes):
+                abs_path.write_bytes(snapshot)
+                continue
+            try:
+                os.replace(snapshot, abs_path)
+            except OSError:
+                # Different filesystem (e.g. symlinked project dir) - copy back
+                shutil.copy2(snapshot, abs_path)
+        invalidate_workdir_scans(self.project_root)
         self._cleanup_edit()
 
     def finalize_edit(self) -> None:
@@ -518,7 +472,11 @@ class VersioningTracker:
 
     # ---- transactions ----
     def begin_transaction(self) -> None:
-        """Start a transaction to group multiple file operations into one checkpoint."""
+        """Start a transaction to group multiple file operations into one checkpoint.
+
+        Staging changes made during the transaction are written to the index once,
+        when it is committed or aborted.
+        """
         self._transaction_active = True
         self._transaction_files = []
         self._transaction_message_parts = []
@@ -555,38 +513,31 @@ class VersioningTracker:
                 return
 
             # Read file content and create blob
-            from dulwich.objects import Blob
-
             content = abs_path.read_bytes()
             blob = Blob.from_string(content)
             repo.object_store.add_object(blob)
 
-            # Add to git index (staging area)
-            from dulwich.index import IndexEntry
-
-            index = repo.open_index()
-
             # Get file stats for index entry
-            stat = abs_path.stat()
+            file_stat = abs_path.stat()
 
             # Create index entry
             entry = IndexEntry(
-                ctime=(int(stat.st_ctime), 0),
-                mtime=(int(stat.st_mtime), 0),
-                dev=stat.st_dev,
-                ino=stat.st_ino,
-                mode=stat.st_mode,
-                uid=stat.st_uid,
-                gid=stat.st_gid,
-                size=stat.st_size,
+                ctime=(int(file_stat.st_ctime), 0),
+                mtime=(int(file_stat.st_mtime), 0),
+                dev=file_stat.st_dev,
+                ino=file_stat.st_ino,
+                mode=file_stat.st_mode,
+                uid=file_stat.st_uid,
+                gid=file_stat.st_gid,
+                size=file_stat.st_size,
                 sha=blob.id,
                 flags=0,
             )
 
             # IMPORTANT: Always use normalized relative path in index
             # This prevents duplicate entries with absolute/relative paths
-            index[normalized_path.encode("utf-8")] = entry
-            index.write()
+            self._buffer_staging(normalized_path.encode("utf-8"), entry)
+            invalidate_workdir_scans(self.project_root)
 
         except Exception as e:
             # Best effort - don't fail if staging fails
@@ -604,8 +555,6 @@ class VersioningTracker:
             file_path: Path to deleted file (can be absolute or relative to project root)
         """
         try:
-            repo = self.ensure_repo()
-
             # Normalize path: convert to Path and make relative to project_root
             file_path_obj = Path(file_path)
             if file_path_obj.is_absolute():
@@ -621,13 +570,8 @@ class VersioningTracker:
                 normalized_path = file_path
 
             # Remove from git index (staging area)
-            index = repo.open_index()
-            path_bytes = normalized_path.encode("utf-8")
-
-            # Only remove if file exists in index
-            if path_bytes in index:
-                del index[path_bytes]
-                index.write()
+            self._buffer_staging(normalized_path.encode("utf-8"), None)
+            invalidate_workdir_scans(self.project_root)
 
         except Exception as e:
             # Best effort - don't fail if staging fails
@@ -637,6 +581,58 @@ class VersioningTracker:
                 "Failed to stage file deletion", file=file_path, error=str(e)
             )
 
+    def _buffer_staging(self, path: bytes, entry: IndexEntry | None) -> None:
+        """Record a staging change and schedule the index write."""
+        with self._staging_lock:
+            self._pending_staging[path] = entry
+            if self._transaction_active:
+                return  # Written by commit_transaction()/abort_transaction()
+            if self._staging_flush_delay is None:
+                self.flush_staging()
+            elif self._staging_timer is None:
+                self._staging_timer = threading.Timer(
+                    self._staging_flush_delay, self.flush_staging
+                )
+                self._staging_timer.daemon = True
+                self._staging_timer.start()
+
+    def flush_staging(self) -> None:
+        """Write buffered staging changes to the index with a single rewrite."""
+        with self._staging_lock:
+            if self._staging_timer is not None:
+                self._staging_timer.cancel()
+                self._staging_timer = None
+            if not self._pending_staging:
+                return
+            pending, self._pending_staging = self._pending_staging, {}
+            try:
+                index = self.ensure_repo().open_index()
+                for path, entry in pending.items():
+                    if entry is not None:
+                        index[path] = entry
+                    elif path in index:
+                        del index[path]
+                index.write()
+            except Exception as e:
+                from agentsmithy.utils.logger import agent_logger
+
+                agent_logger.debug(
+                    "Failed to write staging index", files=len(pending), error=str(e)
+                )
+
+    def discard_staging_buffer(self) -> None:
+        """Drop buffered staging changes without writing them."""
+        with self._staging_lock:
+            if self._staging_timer is not None:
+                self._staging_timer.cancel()
+                self._staging_timer = None
+            self._pending_staging.clear()
+
+    def _open_index(self, repo: Repo) -> Any:
+        """Open the staging index after writing any buffered changes to it."""
+        self.flush_staging()
+        return repo.open_index()
+
     def track_file_change(self, file_path: str, operation: str) -> None:
         """Track a file change within the current transaction.
 
@@ -675,35 +671,42 @@ class VersioningTracker:
         else:
             commit_msg = "Empty transaction"
 
-        # Create checkpoint
-        checkpoint = self.create_checkpoint(commit_msg)
-
-        # Reset transaction state
+        # Reset transaction state; the checkpoint reads the flushed index
         self._transaction_active = False
         self._transaction_files = []
         self._transaction_message_parts = []
+        self.flush_staging()
 
-        return checkpoint
+        return self.create_checkpoint(commit_msg)
 
     def abort_transaction(self) -> None:
-        """Abort the current transaction without creating a checkpoint."""
+        """Abort the current transaction without creating a checkpoint.
+
+        Files written during the transaction stay on disk, so their staging
+        changes are still written to the index.
+        """
         self._transaction_active = False
         self._transaction_files = []
         self._transaction_message_parts = []
+        self.flush_staging()
 
     def is_transaction_active(self) -> bool:
         """Check if a transaction is currently active."""
         return self._transaction_active
 
     # ---- helper methods for checkpoint creation ----
-    def _get_ignore_spec(self) -> pathspec.PathSpec:
-        """Load and build PathSpec from gitignore patterns and defaults.
+    @property
+    def _stat_cache_path(self) -> Path:
+        """Location of the per-dialog stat cache (next to metadata.json)."""
+        return self.shadow_root / STAT_CACHE_FILENAME
+
+    def _get_ignore_spec(self) -> IgnoreMatcher:
+        """Return the project's cached ignore matcher (.gitignore files + defaults).
 
         Returns:
-            PathSpec object for matching paths against gitignore patterns
+            IgnoreMatcher refreshed against .gitignore changes
         """
-        gitignore = self.project_root / ".gitignore"
-        return _build_gitignore_spec(gitignore)
+        return get_ignore_matcher(self.project_root)
 
     def _open_project_git(self) -> tuple[Any | None, Any | None]:
         """Try to open project git repository for blob reuse optimization.
@@ -741,12 +744,37 @@ class VersioningTracker:
             # Project is not a git repo
             return None, None
 
+    def _load_project_stat_cache(self, project_git_repo: Any) -> StatCache | None:
+        """Expose the project git index as a read-only stat cache.
+
+        Git already records stat data and blob SHAs for tracked files, so a clean
+        project index tells us which files are unchanged without reading them.
+
+        Args:
+            project_git_repo: Project git repository (or None)
+
+        Returns:
+            StatCache built from the project index, or None if unavailable
+        """
+        if project_git_repo is None:
+            return None
+        try:
+            index_path = Path(project_git_repo.index_path())
+            if not index_path.exists():
+                return None
+            return StatCache.from_git_index(project_git_repo.open_index(), index_path)
+        except Exception:
+            # Unreadable or unsupported index format - fall back to tree lookup
+            return None
+
     def _try_reuse_blob(
         self,
         file_path: Path,
         file_path_str: str,
         project_git_repo: Any,
         project_git_tree: Any,
+        project_stat_cache: StatCache | None = None,
+        stat_info: os.stat_result | None = None,
     ) -> Any | None:
         """Try to reuse blob from project git if file unchanged.
 
@@ -755,14 +783,26 @@ class VersioningTracker:
             file_path_str: Relative path as string
             project_git_repo: Project git repository
             project_git_tree: Project git HEAD tree
+            project_stat_cache: Stat cache built from the project git index
+            stat_info: Stat result captured during the workdir scan
 
         Returns:
             Blob object if reused, None otherwise
         """
-        if project_git_tree is None or project_git_repo is None:
+        if project_git_repo is None:
             return None
 
         try:
+            # Fast path: project index stat data matches, trust git's blob SHA
+            # without opening the file (same check `git status` performs)
+            if project_stat_cache is not None and stat_info is not None:
+                indexed_sha = project_stat_cache.lookup(file_path_str, stat_info)
+                if indexed_sha is not None:
+                    return project_git_repo[indexed_sha]
+
+            if project_git_tree is None:
+                return None
+
             # Look up file in project git tree
             tree_entry = project_git_tree.lookup_path(
                 project_git_repo.__getitem__,
@@ -773,39 +813,20 @@ class VersioningTracker:
 
                 # Fast check: compare file size first
                 existing_blob = project_git_repo[existing_blob_sha]
-                stat_info = file_path.stat()
-                file_size = stat_info.st_size
+                file_size = (
+                    stat_info.st_size
+                    if stat_info is not None
+                    else file_path.stat().st_size
+                )
 
                 if len(existing_blob.data) != file_size:
                     # Size mismatch - file changed, cannot reuse
                     return None
 
-                # Optimization: Check mtime before reading file
-                # If file hasn't been modified recently, likely unchanged
-                try:
-                    # Get commit time of existing blob from project git
-                    # Walk commits to find when this file was last committed
-                    import time
-
-                    current_time = time.time()
-                    file_mtime = stat_info.st_mtime
-
-                    # Heuristic: if file was modified more than 1 second ago and size matches,
-                    # very likely unchanged (git operations usually complete within 1s)
-                    # This catches the common case of "just committed, immediately creating checkpoint"
-                    if current_time - file_mtime > 1.0:
-                        # File hasn't been touched recently, size matches -> assume unchanged
-                        return existing_blob
-                except Exception:
-                    # mtime check failed, fallback to hash verification
-                    pass
-
-                # Size matches but file was recently modified - verify content hash to avoid size collisions
+                # Size matches - verify content hash to avoid size collisions
                 # (files can have same size but different content, e.g. after formatting)
                 #
                 # Use streaming hash calculation to avoid loading entire file into memory
-                import hashlib
-
                 # Git blob hash format: "blob {size}\0{content}"
                 hasher = hashlib.sha1()
                 hasher.update(f"blob {file_size}\0".encode())
@@ -815,7 +836,8 @@ class VersioningTracker:
                     while chunk := f.read(1048576):  # 1MB chunks
                         hasher.update(chunk)
 
-                computed_sha = hasher.digest()
+                # Tree entries carry hex SHAs, so compare hex digests
+                computed_sha = hasher.hexdigest().encode("ascii")
 
                 if computed_sha == existing_blob_sha:
                     # Content hash matches - file unchanged, reuse blob
@@ -837,6 +859,9 @@ class VersioningTracker:
         repo: Any,
         project_git_repo: Any,
         project_git_tree: Any,
+        project_stat_cache: StatCache | None = None,
+        stat_info: os.stat_result | None = None,
+        encoder: ObjectEncoderPool | None = None,
     ) -> tuple[Any, bool]:
         """Create or reuse blob for a file.
 
@@ -846,6 +871,10 @@ class VersioningTracker:
             repo: Shadow repository
             project_git_repo: Project git repository (or None)
             project_git_tree: Project git HEAD tree (or None)
+            project_stat_cache: Stat cache built from the project git index
+            stat_info: Stat result captured during the workdir scan
+            encoder: Process pool that reads and encodes new blobs (the blob is
+                then an EncodedObject), or None to read the file here
 
         Returns:
             Tuple of (blob, was_reused)
@@ -854,116 +883,306 @@ class VersioningTracker:
 
         # Try to reuse blob from project git
         blob = self._try_reuse_blob(
-            file_path, file_path_str, project_git_repo, project_git_tree
+            file_path,
+            file_path_str,
+            project_git_repo,
+            project_git_tree,
+            project_stat_cache,
+            stat_info,
         )
 
         if blob is not None:
             return blob, True  # Don't add to repo yet, will batch later
 
+        if encoder is not None:
+            return encoder.encode_file(str(file_path)), False
+
         # Create new blob by reading file
         content = file_path.read_bytes()
         blob = Blob.from_string(content)
         return blob, False  # Don't add to repo yet, will batch later
 
+    def _iter_workdir_files(
+        self, ignore_spec: IgnoreMatcher, start: str = ""
+    ) -> Iterator[tuple[str, str, os.stat_result | None]]:
+        """Walk the project with os.scandir, pruning ignored directories early.
+
+        Mirrors os.walk(followlinks=False): symlinked directories are not entered,
+        symlinks to files are reported like regular files.
+
+        Args:
+            ignore_spec: Project ignore matcher
+            start: Relative directory to walk instead of the whole project
+
+        Yields:
+            Tuples of (relative_path, absolute_path, stat_result or None if stat failed)
+        """
+        stack: list[tuple[str, str]] = [
+            (str(self.project_root / start), f"{start}/" if start else "")
+        ]
+        while stack:
+            dir_path, rel_prefix = stack.pop()
+            try:
+                with os.scandir(dir_path) as it:
+                    entries = list(it)
+            except OSError:
+                continue
+
+            for entry in entries:
+                rel_path = f"{rel_prefix}{entry.name}"
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+
+                if is_dir:
+                    if ignore_spec.prunes_dir(rel_path):
+                        continue
+                    try:
+                        if entry.is_symlink():
+                            continue
+                    except OSError:
+                        continue
+                    stack.append((entry.path, f"{rel_path}/"))
+                    continue
+
+                if ignore_spec.is_ignored(rel_path):
+                    continue
+                if is_reserved_path(rel_path):
+                    from agentsmithy.utils.logger import agent_logger
+
+                    agent_logger.warning(
+                        "File name is reserved for checkpoints, not tracked",
+                        path=rel_path,
+                    )
+                    continue
+
+                try:
+                    stat_info: os.stat_result | None = entry.stat()
+                except OSError:
+                    # Let blob creation surface the error with file context
+                    stat_info = None
+                yield rel_path, entry.path, stat_info
+
+    def _is_walk_visible(
+        self, ignore_spec: IgnoreMatcher, rel_path: str, is_dir: bool = False
+    ) -> bool:
+        """Return True if the workdir walk would reach rel_path (not ignored).
+
+        Applies the same rules as _iter_workdir_files(): no parent directory is
+        pruned, the path itself is not ignored and is not a reserved file name.
+
+        Args:
+            ignore_spec: Project ignore matcher
+            rel_path: Slash-separated path relative to project root
+            is_dir: Whether rel_path is a directory the walk would enter
+        """
+        if not is_dir and is_reserved_path(rel_path):
+            return False
+        return ignore_spec.is_visible(rel_path, is_dir)
+
+    def _has_symlinked_parent(self, rel_path: str) -> bool:
+        """Return True if a parent directory of rel_path is a symlink (not walked)."""
+        parts = rel_path.split("/")[:-1]
+        current = self.project_root
+        for part in parts:
+            current = current / part
+            if current.is_symlink():
+                return True
+        return False
+
+    def _iter_dirty_files(
+        self, ignore_spec: IgnoreMatcher, dirty: DirtyPaths
+    ) -> Iterator[tuple[str, str, os.stat_result | None]]:
+        """Yield the current state of paths reported by the workdir watcher.
+
+        Dirty directories are walked; dirty files are yielded if they still exist
+        and the full walk would report them. Deleted paths are simply not yielded.
+
+        Args:
+            ignore_spec: Project ignore matcher
+            dirty: Paths touched since the last full view of the workdir
+
+        Yields:
+            Same tuples as _iter_workdir_files()
+        """
+        seen: set[str] = set()
+        for rel_dir in sorted(dirty.dirs):
+            abs_dir = self.project_root / rel_dir
+            if (
+                not self._is_walk_visible(ignore_spec, rel_dir, is_dir=True)
+                or abs_dir.is_symlink()
+                or not abs_dir.is_dir()
+                or self._has_symlinked_parent(rel_dir)
+            ):
+                continue
+            for item in self._iter_workdir_files(ignore_spec, rel_dir):
+                if item[0] not in seen:
+                    seen.add(item[0])
+                    yield item
+
+        for rel_path in sorted(dirty.files):
+            if rel_path in seen or not self._is_walk_visible(ignore_spec, rel_path):
+                continue
+            abs_path = self.project_root / rel_path
+            if not os.path.lexists(abs_path) or abs_path.is_dir():
+                continue
+            if self._has_symlinked_parent(rel_path):
+                continue
+            try:
+                stat_info: os.stat_result | None = abs_path.stat()
+            except OSError:
+                stat_info = None
+            yield rel_path, str(abs_path), stat_info
+
     def _build_tree_from_workdir(
         self,
         repo: Any,
-        ignore_spec: pathspec.PathSpec,
+        ignore_spec: IgnoreMatcher,
         project_git_repo: Any,
         project_git_tree: Any,
-    ) -> tuple[Any, int, int]:
-        """Build git tree by scanning project working directory.
+        stat_cache: StatCache | None = None,
+        pending_objects: list[Any] | None = None,
+        scan: WorkdirScan | None = None,
+    ) -> tuple[dict[bytes, tuple[int, bytes]], int, int]:
+        """Collect tree entries by scanning project working directory.
+
+        Files whose stat tuple matches the dialog's stat cache are added by their
+        cached blob SHA without being opened. Remaining files are processed in
+        parallel and recorded in the cache for the next checkpoint.
 
-        Uses parallel file processing for better performance with many files.
+        When the scan was limited to the workdir watcher's dirty set, files the
+        previous scan saw (the stat cache) and nobody touched since are carried
+        over as-is, and only the dirty paths are examined.
 
         Args:
             repo: Shadow repository
-            ignore_spec: PathSpec object for gitignore pattern matching
+            ignore_spec: Project ignore matcher
             project_git_repo: Project git repository (or None)
             project_git_tree: Project git HEAD tree (or None)
+            stat_cache: Per-dialog stat cache (or None to hash every file)
+            pending_objects: If given, new blobs are appended here instead of
+                being written immediately (caller packs them with the commit)
+            scan: Workdir scan to consume (see _scan_workdir()), or None for a
+                fresh full walk; a dirty-set scan requires stat_cache
 
         Returns:
-            Tuple of (tree, blobs_reused, blobs_created)
+            Tuple of (entries, blobs_reused, blobs_created) where entries maps
+            slash-joined paths to (mode, blob_sha); see _write_nested_tree()
         """
-        import os
         from concurrent.futures import ThreadPoolExecutor, as_completed
 
-        from dulwich.objects import Tree
-
-        tree: Tree = Tree()
+        entries: dict[bytes, tuple[int, bytes]] = {}
         blobs_reused = 0
         blobs_created = 0
 
-        # Collect all files first
-        files_to_process: list[tuple[Path, str]] = []
-
-        for root, dirs, files in os.walk(self.project_root):
-            root_path = Path(root)
-            rel_root = (
-                root_path.relative_to(self.project_root)
-                if root_path != self.project_root
-                else Path(".")
-            )
-
-            # Filter directories
-            filtered_dirs = []
-            for d in dirs:
-                dir_rel_path = (rel_root / d) if rel_root != Path(".") else Path(d)
-                dir_path_str = str(dir_rel_path).replace("\\", "/")
+        # Collect files that need reading; stat-cache hits go straight into the tree
+        files_to_process: list[tuple[Path, str, os.stat_result | None]] = []
+        total_files = 0
 
-                if not ignore_spec.match_file(dir_path_str):
-                    filtered_dirs.append(d)
-
-            dirs[:] = filtered_dirs
+        workdir_files: Iterable[WorkdirEntry]
+        if scan is None:
+            workdir_files = self._iter_workdir_files(ignore_spec)
+        else:
+            workdir_files = scan
+            if scan.dirty is not None and stat_cache is not None:
+                for file_path_str in stat_cache.paths():
+                    if scan.dirty.covers(file_path_str):
+                        continue
+                    cached_sha = stat_cache.carry_over(file_path_str)
+                    if cached_sha is not None:
+                        entries[file_path_str.encode("utf-8")] = (
+                            stat_cache.mode_of(file_path_str),
+                            cached_sha,
+                        )
+                        blobs_reused += 1
+                        total_files += 1
+
+        for file_path_str, abs_path, stat_info in workdir_files:
+            total_files += 1
+            if stat_cache is not None and stat_info is not None:
+                cached_sha = stat_cache.lookup(file_path_str, stat_info)
+                if cached_sha is not None:
+                    mode = stat_cache.mode_of(file_path_str)
+                    entries[file_path_str.encode("utf-8")] = (mode, cached_sha)
+                    stat_cache.record(file_path_str, stat_info, cached_sha, mode)
+                    blobs_reused += 1
+                    continue
+            files_to_process.append((Path(abs_path), file_path_str, stat_info))
 
-            # Collect files for parallel processing
-            for filename in files:
-                file_path = Path(root) / filename
-                file_rel_path = file_path.relative_to(self.project_root)
-                file_path_str = str(file_rel_path).replace("\\", "/")
+        # Project index is only parsed when some files actually need hashing
+        project_stat_cache = (
+            self._load_project_stat_cache(project_git_repo)
+            if files_to_process
+            else None
+        )
 
-                if not ignore_spec.match_file(file_path_str):
-                    files_to_process.append((file_path, file_path_str))
+        # Large batches are hashed and compressed in worker processes
+        encoder = None
+        if self._hash_processes != 1:
+            pending_bytes = sum(
+                stat_info.st_size
+                for _path, _rel, stat_info in files_to_process
+                if stat_info is not None
+            )
+            if pending_bytes >= object_encoder.PROCESS_POOL_MIN_BYTES:
+                encoder = get_object_encoder(self._hash_processes)
 
         # Process files in parallel with thread pool
         blobs_to_add: list[Any] = []
         failed_files: list[tuple[str, str]] = []  # (file_path, error_msg)
 
         def process_file(
-            file_info: tuple[Path, str],
-        ) -> tuple[Any, str, bool] | tuple[None, str, str]:
+            file_info: tuple[Path, str, os.stat_result | None],
+        ) -> tuple[list[Any], tuple[int, bytes], bool] | tuple[None, None, str]:
             """Process single file and return a tagged union:
-            - (blob, path, was_reused: bool) on success
-            - (None, path, error_msg: str) on failure
+            - (objects, (mode, sha), was_reused: bool) on success
+            - (None, None, error_msg: str) on failure
             """
-            file_path, file_path_str = file_info
+            file_path, file_path_str, stat_info = file_info
             try:
+                size = (
+                    stat_info.st_size
+                    if stat_info is not None
+                    else file_path.stat().st_size
+                )
+                if self._chunk_min_size and size >= self._chunk_min_size:
+                    chunked = chunk_file(file_path, repo.object_store)
+                    manifest_id = chunked.manifest.id
+                    return (
+                        chunked.new_objects,
+                        (CHUNKED_FILE_MODE, manifest_id),
+                        manifest_id in repo.object_store,
+                    )
                 blob, was_reused = self._create_blob_for_file(
                     file_path,
                     file_path_str,
                     repo,
                     project_git_repo,
                     project_git_tree,
+                    project_stat_cache,
+                    stat_info,
+                    encoder,
                 )
-                return blob, file_path_str, was_reused
+                return [blob], (0o100644, blob.id), was_reused
             except Exception as e:
-                return None, file_path_str, str(e)
+                return None, None, str(e)
 
         # Use thread pool for I/O parallelism
         max_workers = min(32, (len(files_to_process) or 1))
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = [
-                executor.submit(process_file, file_info)
+            futures = {
+                executor.submit(process_file, file_info): file_info
                 for file_info in files_to_process
-            ]
+            }
 
             for future in as_completed(futures):
-                result = future.result()
-                blob, file_path_str, third = result
+                objects, entry, third = future.result()
+                _file_path, file_path_str, stat_info = futures[future]
 
-                if blob is not None:
+                if objects is not None and entry is not None:
                     # Success case: third is bool (was_reused)
-                    blobs_to_add.append(blob)
+                    blobs_to_add.extend(objects)
 
                     if third:  # was_reused is True
                         blobs_reused += 1
@@ -971,8 +1190,12 @@ class VersioningTracker:
                         blobs_created += 1
 
                     # Add to tree
-                    tree_path = file_path_str.encode("utf-8")
-                    tree.add(tree_path, 0o100644, blob.id)
+                    entries[file_path_str.encode("utf-8")] = entry
+
+                    # Stat was captured before reading, so a concurrent edit
+                    # leaves a mismatching tuple and is re-hashed next time
+                    if stat_cache is not None and stat_info is not None:
+                        stat_cache.record(file_path_str, stat_info, entry[1], entry[0])
                 else:
                     # Failure case: third is str (error_msg)
                     error_msg = str(third)
@@ -985,7 +1208,7 @@ class VersioningTracker:
             agent_logger.error(
                 "Failed to process files during checkpoint creation",
                 failed_count=len(failed_files),
-                total_files=len(files_to_process),
+                total_files=total_files,
             )
             # Show first few failures in error message
             sample_failures = failed_files[:MAX_FAILURE_SAMPLES]
@@ -1003,26 +1226,141 @@ class VersioningTracker:
             )
 
         # Batch add all blobs to object store
-        if blobs_to_add:
-            repo.object_store.add_objects([(blob, None) for blob in blobs_to_add])
+        if pending_objects is not None:
+            pending_objects.extend(blobs_to_add)
+        elif blobs_to_add:
+            write_objects_pack(repo.object_store, blobs_to_add)
+
+        return entries, blobs_reused, blobs_created
+
+    @property
+    def _watch_key(self) -> str:
+        """Key of this dialog's baseline in the project workdir watcher."""
+        return str(self.shadow_root)
+
+    def _workdir_changes_since_baseline(
+        self, tree_id: bytes | None
+    ) -> DirtyPaths | None:
+        """Paths touched since the last full view of the workdir produced tree_id.
+
+        Returns None (caller falls back to a full scan) when no watcher is running,
+        the baseline belongs to a different tree (restore, reset, other session),
+        the watcher lost events, or a .gitignore changed.
+
+        Args:
+            tree_id: Tree the caller compares the workdir against
+        """
+        watcher = get_workdir_watcher(self.project_root)
+        if watcher is None or tree_id is None:
+            return None
+        baseline = watcher.get_baseline(self._watch_key)
+        if baseline is None or baseline.tree_id != tree_id:
+            return None
+        dirty = watcher.changes_since(baseline.token)
+        if dirty is None or any(is_gitignore_path(p) for p in dirty.files):
+            return None
+        return dirty
+
+    @contextmanager
+    def shared_scan(self) -> Iterator[None]:
+        """Let the operations inside the block share one workdir walk.
+
+        Used where change checks and checkpoint creation run back to back
+        (approve, reset, the /session route). The walk is still redone if a
+        tool may have written files in between or it is older than
+        WORKDIR_SCAN_TTL.
+        """
+        self._scan_scopes += 1
+        try:
+            yield
+        finally:
+            self._scan_scopes -= 1
+            if not self._scan_scopes:
+                self._scan = None
+
+    def _scan_workdir(
+        self, ignore_spec: IgnoreMatcher, tree_id: bytes | None
+    ) -> WorkdirScan:
+        """Return a walk of the workdir, reusing the shared one while still valid.
+
+        Inside shared_scan() consecutive operations reuse one walk (see
+        agentsmithy.services.workdir_scan); outside it every call walks anew.
+        Only the watcher's dirty paths are walked when its baseline matches
+        tree_id.
+
+        Args:
+            ignore_spec: Project ignore matcher
+            tree_id: Tree the caller compares the workdir against
+        """
+        watcher = get_workdir_watcher(self.project_root)
+        generation = scan_generation(self.project_root)
+        scan = self._scan
+        if (
+            self._scan_scopes
+            and scan is not None
+            and scan.is_valid_for(tree_id, generation, watcher)
+        ):
+            return scan
+
+        # Token first, so events during the walk count as dirty
+        watch_token = watcher.token() if watcher is not None else None
+        dirty = self._workdir_changes_since_baseline(tree_id)
+        if dirty is not None:
+            source = self._iter_dirty_files(ignore_spec, dirty)
+        else:
+            source = self._iter_workdir_files(ignore_spec)
+        scan = WorkdirScan(source, dirty, tree_id, watch_token, generation)
+        if self._scan_scopes:
+            self._scan = scan
+        return scan
+
+    def _staging_matches_scan(
+        self,
+        repo: Any,
+        entries: dict[bytes, tuple[int, bytes]],
+        ignore_spec: IgnoreMatcher,
+    ) -> bool:
+        """Return True if merging the index changes no visible scanned path.
 
-        return tree, blobs_reused, blobs_created
+        Staged files that the walk would not see (ignored) are fine; a staged
+        version that differs from the file on disk is not.
+        """
+        try:
+            index = self._open_index(repo)
+        except (FileNotFoundError, OSError):
+            return True
+        try:
+            for path, entry in index.items():
+                sha = getattr(entry, "sha", None)
+                scanned = entries.get(path)
+                if scanned is not None:
+                    if scanned[1] != sha and (
+                        file_content_id(repo.object_store, *scanned) != sha
+                    ):
+                        return False
+                elif self._is_walk_visible(ignore_spec, path.decode("utf-8")):
+                    return False
+        except Exception:
+            return False
+        return True
 
-    def _merge_staging_into_tree(self, tree: Any, repo: Any) -> int:
-        """Merge staging area (index) into tree.
+    def _merge_staging_into_tree(
+        self, entries: dict[bytes, tuple[int, bytes]], repo: Any
+    ) -> int:
+        """Merge staging area (index) into tree entries.
 
         Files in staging area were explicitly added via stage_file() (git add -f).
         Add them to tree even if they would be ignored by normal scan.
 
         Args:
-            tree: Tree to merge staged files into
+            entries: Tree entries (path -> (mode, sha)) to merge staged files into
             repo: Repository object
 
         Returns:
             Number of files merged from staging
         """
         try:
-            index = repo.open_index()
+            index = self._open_index(repo)
         except (FileNotFoundError, OSError) as e:
             # No index file - nothing to merge
             from agentsmithy.utils.logger import agent_logger
@@ -1038,8 +1376,17 @@ class VersioningTracker:
                 blob_id = entry.sha
                 mode = entry.mode
 
+                # Keep a chunked scan result that holds the same content
+                scanned = entries.get(path)
+                if (
+                    scanned is not None
+                    and stat.S_ISDIR(scanned[0])
+                    and file_content_id(repo.object_store, *scanned) == blob_id
+                ):
+                    continue
+
                 # Add to tree (overwrites if already exists)
-                tree.add(path, mode, blob_id)
+                entries[path] = (mode, blob_id)
                 forced_count += 1
             except Exception as e:
                 # Best effort - skip entries that can't be processed
@@ -1051,6 +1398,207 @@ class VersioningTracker:
 
         return forced_count
 
+    def _write_nested_tree(
+        self,
+        repo: Any,
+        entries: dict[bytes, tuple[int, bytes]],
+        pending_objects: list[Any] | None = None,
+    ) -> bytes:
+        """Write tree entries as git-style nested subtrees.
+
+        Each directory becomes its own tree object, so unchanged directories keep
+        the same SHA across checkpoints. Subtrees that already exist in the object
+        store (e.g. written by the parent checkpoint) are reused, not rewritten,
+        and diff/restore can skip them by SHA comparison.
+
+        Args:
+            repo: Shadow repository
+            entries: Mapping of slash-joined paths to (mode, blob_sha)
+            pending_objects: If given, new trees are appended here instead of
+                being written immediately
+
+        Returns:
+            SHA of the root tree
+        """
+        # Build directory skeleton: name -> (mode, sha) for files, dict for dirs
+        root: dict[bytes, Any] = {}
+        for path, entry in entries.items():
+            parts = path.split(b"/")
+            if parts[-1] == MANIFEST_MARKER:
+                # Would turn its directory into a chunked-file manifest
+                from agentsmithy.utils.logger import agent_logger
+
+                agent_logger.warning(
+                    "File name is reserved for checkpoints, not tracked",
+                    path=path.decode("utf-8", "replace"),
+                )
+                continue
+            node = root
+            for part in parts[:-1]:
+                child = node.get(part)
+                if not isinstance(child, dict):
+                    # Later entries win on file/directory conflicts (staging is merged last)
+                    child = node[part] = {}
+                node = child
+            node[parts[-1]] = entry
+
+        object_store = repo.object_store
+        new_trees: list[Tree] = []
+
+        def build(node: dict[bytes, Any]) -> bytes:
+            tree = Tree()
+            for name, child in node.items():
+                if isinstance(child, dict):
+                    tree.add(name, stat.S_IFDIR, build(child))
+                else:
+                    mode, sha = child
+                    tree.add(name, mode, sha)
+            tree_id = tree.id
+            if tree_id not in object_store:
+                new_trees.append(tree)
+            return tree_id
+
+        root_id = build(root)
+        if pending_objects is not None:
+            pending_objects.extend(new_trees)
+        elif new_trees:
+            write_objects_pack(object_store, new_trees)
+        return root_id
+
+    def _collect_tree_entries(
+        self, repo: Any, tree_id: bytes | None, prefix: str = ""
+    ) -> dict[str, tuple[int, bytes]]:
+        """Flatten a tree into path -> (mode, blob_sha).
+
+        Directories are detected by entry mode, so blobs are never loaded.
+        Works for both nested trees and legacy flat trees (slash-joined names).
+        Chunked files are reported as (CHUNKED_FILE_MODE, manifest_sha).
+
+        Args:
+            repo: Repository object
+            tree_id: Tree SHA (None yields an empty mapping)
+            prefix: Path prefix for recursion
+
+        Returns:
+            Mapping of file paths to (mode, blob_sha)
+        """
+        files: dict[str, tuple[int, bytes]] = {}
+        if not tree_id:
+            return files
+
+        stack: list[tuple[bytes, str, int]] = [(tree_id, prefix, stat.S_IFDIR)]
+        while stack:
+            current_id, current_prefix, current_mode = stack.pop()
+            tree_obj = repo[current_id]
+            if current_prefix != prefix and is_manifest(
+                repo.object_store, tree_obj, current_mode
+            ):
+                files[current_prefix] = (CHUNKED_FILE_MODE, current_id)
+                continue
+            for name, mode, sha in tree_obj.items():
+                decoded_name = name.decode("utf-8")
+                full_path = (
+                    f"{current_prefix}/{decoded_name}"
+                    if current_prefix
+                    else decoded_name
+                )
+                if stat.S_ISDIR(mode):
+                    stack.append((sha, full_path, mode))
+                else:
+                    files[full_path] = (mode, sha)
+        return files
+
+    def _is_flat_tree(self, repo: Any, tree_id: bytes) -> bool:
+        """Return True for legacy checkpoints that stored all files in one tree."""
+        try:
+            tree_obj = repo[tree_id]
+        except KeyError:
+            return False
+        return any(b"/" in name for name, _mode, _sha in tree_obj.items())
+
+    def _iter_tree_changes(
+        self, repo: Any, from_tree_id: bytes, to_tree_id: bytes
+    ) -> Iterator[tuple[str, tuple[int, bytes] | None, tuple[int, bytes] | None]]:
+        """Yield changed files between two trees, pruning identical subtrees.
+
+        Nested trees are compared level by level and directories with equal SHAs
+        are skipped entirely. Legacy flat trees cannot be pruned, so a diff that
+        involves one falls back to comparing flattened path maps.
+
+        Args:
+            repo: Repository object
+            from_tree_id: Source tree SHA
+            to_tree_id: Target tree SHA
+
+        Yields:
+            Tuples of (path, old (mode, sha) or None, new (mode, sha) or None)
+        """
+        if from_tree_id == to_tree_id:
+            return
+
+        if self._is_flat_tree(repo, from_tree_id) or self._is_flat_tree(
+            repo, to_tree_id
+        ):
+            old_files = self._collect_tree_entries(repo, from_tree_id)
+            new_files = self._collect_tree_entries(repo, to_tree_id)
+            for path in sorted(old_files.keys() | new_files.keys()):
+                old_entry = old_files.get(path)
+                new_entry = new_files.get(path)
+                if old_entry != new_entry:
+                    yield path, old_entry, new_entry
+            return
+
+        yield from self._iter_level_changes(repo, from_tree_id, to_tree_id, "")
+
+    def _iter_level_changes(
+        self, repo: Any, old_id: bytes | None, new_id: bytes | None, prefix: str
+    ) -> Iterator[tuple[str, tuple[int, bytes] | None, tuple[int, bytes] | None]]:
+        """Recursive part of _iter_tree_changes(); yields in path order.
+
+        Chunked files (manifest trees) are compared as files, not descended into.
+        """
+        old_items = self._tree_items(repo, old_id)
+        new_items = self._tree_items(repo, new_id)
+        for name in sorted(old_items.keys() | new_items.keys()):
+            old = old_items.get(name)
+            new = new_items.get(name)
+            if old == new:
+                continue
+            path = f"{prefix}/{name}" if prefix else name
+            old_dir = old is not None and self._is_directory_entry(repo, *old)
+            new_dir = new is not None and self._is_directory_entry(repo, *new)
+            if not old_dir and not new_dir:
+                yield path, old, new
+                continue
+            # A file replaced by a directory (or vice versa) is reported on both sides
+            if old is not None and not old_dir:
+                yield path, old, None
+            if new is not None and not new_dir:
+                yield path, None, new
+            yield from self._iter_level_changes(
+                repo,
+                old[1] if old is not None and old_dir else None,
+                new[1] if new is not None and new_dir else None,
+                path,
+            )
+
+    def _tree_items(
+        self, repo: Any, tree_id: bytes | None
+    ) -> dict[str, tuple[int, bytes]]:
+        """Entries of one tree level as name -> (mode, sha); empty for None."""
+        if tree_id is None:
+            return {}
+        return {
+            name.decode("utf-8"): (mode, sha)
+            for name, mode, sha in repo[tree_id].items()
+        }
+
+    def _is_directory_entry(self, repo: Any, mode: int, sha: bytes) -> bool:
+        """Return True for a real directory (not a file or a chunked-file manifest)."""
+        return stat.S_ISDIR(mode) and not is_manifest(
+            repo.object_store, repo[sha], mode
+        )
+
     # ---- session management ----
     def _get_session_ref(self, session_name: str) -> bytes:
         """Get git ref for a session."""
@@ -1144,12 +1692,25 @@ class VersioningTracker:
     def create_checkpoint(self, message: str) -> CheckpointInfo:
         """Create a checkpoint of current project state.
 
+        New blobs and trees are written as a single packfile to the project's
+        shared object store (content already stored by any dialog is reused);
+        the commit goes to the dialog repo. Runs under the repository locks so
+        background maintenance cannot prune objects this checkpoint reuses.
+
         Args:
             message: Checkpoint message
 
         Returns:
             CheckpointInfo with commit ID and message
         """
+        with (
+            repository_lock(self.shadow_root / ".git"),
+            repository_lock(self._shared_objects_path),
+        ):
+            return self._create_checkpoint(message)
+
+    def _create_checkpoint(self, message: str) -> CheckpointInfo:
+        """Create a checkpoint; caller holds the repository lock."""
         import time
 
         from dulwich.objects import Commit, parse_timezone
@@ -1174,15 +1735,42 @@ class VersioningTracker:
         # Try to open project git for blob reuse optimization
         project_git_repo, project_git_tree = self._open_project_git()
 
-        # Build tree by scanning working directory
-        tree, blobs_reused, blobs_created = self._build_tree_from_workdir(
-            repo, ignore_spec, project_git_repo, project_git_tree
+        # Stat cache from previous checkpoints: unchanged files are not re-read
+        stat_cache = StatCache.load(self._stat_cache_path)
+
+        # Walk of the workdir (or its dirty paths), shared with a change check
+        # that ran just before (approve, reset)
+        watcher = get_workdir_watcher(self.project_root)
+        scan = self._scan_workdir(
+            ignore_spec,
+            parent_commit.tree if parent_commit is not None else None,  # type: ignore[attr-defined]
+        )
+        watch_token = scan.watch_token
+
+        # Objects created by this checkpoint, written as one packfile at the end
+        pending_objects: list[Any] = []
+
+        # Build tree by scanning working directory (or only its dirty paths)
+        entries, blobs_reused, blobs_created = self._build_tree_from_workdir(
+            repo,
+            ignore_spec,
+            project_git_repo,
+            project_git_tree,
+            stat_cache,
+            pending_objects,
+            scan,
+        )
+
+        # The result can seed the next incremental scan only if every visible
+        # path in the tree really reflects the workdir (staging may override)
+        can_set_baseline = watch_token is not None and self._staging_matches_scan(
+            repo, entries, ignore_spec
         )
 
         # Merge staging area (index) into tree
         # Files in staging were explicitly added via stage_file() (git add -f equivalent)
         # Include them even if they match ignore patterns
-        forced_count = self._merge_staging_into_tree(tree, repo)
+        forced_count = self._merge_staging_into_tree(entries, repo)
         if forced_count > 0:
             blobs_created += forced_count
 
@@ -1197,12 +1785,12 @@ class VersioningTracker:
                 total=blobs_reused + blobs_created,
             )
 
-        # Save tree to repository
-        repo.object_store.add_object(tree)
+        # Save nested trees to repository (unchanged subtrees are reused)
+        tree_id = self._write_nested_tree(repo, entries, pending_objects)
 
         # Create commit object
         commit: Commit = Commit()
-        commit.tree = tree.id
+        commit.tree = tree_id
         commit.parents = [parent_commit.id] if parent_commit else []
         commit.author = commit.committer = (
             b"AgentSmithy Versioning <versioning@agentsmithy.local>"
@@ -1211,8 +1799,15 @@ class VersioningTracker:
         commit.commit_timezone = commit.author_timezone = parse_timezone(b"+0000")[0]
         commit.message = message.encode("utf-8")
 
-        # Save commit and update session branch
-        repo.object_store.add_object(commit)
+        # Save all new objects as one pack, then update session branch
+        if self._shared_store is not None:
+            write_objects_pack(
+                self._shared_store, pending_objects, lookup_store=repo.object_store
+            )
+            repo.object_store.add_object(commit)
+        else:
+            pending_objects.append(commit)
+            write_objects_pack(repo.object_store, pending_objects)
 
         # Update session branch ref
         old_value = (
@@ -1236,12 +1831,28 @@ class VersioningTracker:
             pass  # Non-critical
 
         # Initialize main branch if this is first commit
-        if not commit.parents and self.MAIN_BRANCH not in repo.refs:
+        is_initial = not commit.parents and self.MAIN_BRANCH not in repo.refs
+        if is_initial:
             repo.refs[self.MAIN_BRANCH] = commit.id
 
+        # Persist stat cache only once the checkpoint referencing its blobs exists
+        saved = stat_cache.save()
+        if watcher is not None:
+            if saved and can_set_baseline and watch_token is not None:
+                watcher.set_baseline(self._watch_key, watch_token, tree_id)
+            else:
+                watcher.clear_baseline(self._watch_key)
+
         # Record metadata
         commit_id = commit.id.decode("utf-8")
-        self._record_metadata(commit_id, message)
+        self._record_metadata(
+            commit_id,
+            message,
+            active_session,
+            parent_id=parent_commit.id.decode() if parent_commit else None,
+            files_count=len(entries),
+            approved=is_initial,
+        )
 
         # IMPORTANT: Staging area is NOT cleared after checkpoint creation
         #
@@ -1259,38 +1870,6 @@ class VersioningTracker:
 
         return CheckpointInfo(commit_id=commit_id, message=message)
 
-    def _collect_tree_files(
-        self, tree_obj: Tree, repo: Any, prefix: str = ""
-    ) -> set[str]:
-        """Recursively collect all file paths from a git tree.
-
-        Uses pure dulwich API - git binary not required.
-        Replaces subprocess-based 'git ls-tree -r --name-only'.
-
-        Args:
-            tree_obj: Tree object to traverse
-            repo: Repository object
-            prefix: Path prefix for recursion
-
-        Returns:
-            Set of file paths
-        """
-        files: set[str] = set()
-
-        for name, _mode, sha in tree_obj.items():
-            decoded_name = name.decode("utf-8")
-            full_path = f"{prefix}/{decoded_name}" if prefix else decoded_name
-
-            obj = repo[sha]
-            if isinstance(obj, Tree):
-                # Recurse into subdirectory
-                files.update(self._collect_tree_files(obj, repo, full_path))
-            else:
-                # It's a file (blob)
-                files.add(full_path)
-
-        return files
-
     def restore_checkpoint(self, commit_id: str) -> list[str]:
         """Restore project files to a specific checkpoint.
 
@@ -1298,12 +1877,18 @@ class VersioningTracker:
         Deletes files that exist in HEAD checkpoint but not in target checkpoint.
 
         Uses standard git semantics: diff HEAD vs target, delete added files.
+        Only files whose on-disk content differs from the target blob are
+        written; unchanged files are recognised via the stat cache (or a
+        size + content compare) and left untouched.
 
         Uses pure dulwich API for all operations - git binary not required.
 
         Returns:
-            List of file paths that were restored (relative to project root)
+            List of file paths that were changed on disk (written or deleted),
+            relative to project root
         """
+        from agentsmithy.utils.logger import agent_logger
+
         repo = self.ensure_repo()
 
         # Get target checkpoint tree
@@ -1311,11 +1896,10 @@ class VersioningTracker:
         target_tree_id = getattr(target_commit, "tree", None)
         if target_tree_id is None:
             return []
-        target_tree = cast(Tree, repo[target_tree_id])
-        target_files = self._collect_tree_files(target_tree, repo)
+        target_entries = self._collect_tree_entries(repo, target_tree_id)
 
-        # Get HEAD checkpoint tree (current state)
-        head_files: set[str] = set()
+        # Files present in HEAD but absent from target (identical subtrees pruned)
+        files_to_delete: set[str] = set()
         try:
             active_session = self._get_active_session_name()
             session_ref = self._get_session_ref(active_session)
@@ -1326,122 +1910,209 @@ class VersioningTracker:
 
             head_tree_id = getattr(head_commit, "tree", None)
             if head_tree_id:
-                head_tree = cast(Tree, repo[head_tree_id])
-                head_files = self._collect_tree_files(head_tree, repo)
+                for path_str, _old, new in self._iter_tree_changes(
+                    repo, head_tree_id, target_tree_id
+                ):
+                    if new is None:
+                        files_to_delete.add(path_str)
         except Exception:
             # No HEAD commit yet or error - nothing to delete
-            head_files = set()
+            files_to_delete = set()
 
         # Also include staged files (in index) - these are uncommitted but agent-created
         # They should be deleted if not in target checkpoint
         try:
-            index = repo.open_index()
+            index = self._open_index(repo)
             for path, _entry in index.items():
-                head_files.add(path.decode("utf-8"))
+                path_str = path.decode("utf-8")
+                if path_str not in target_entries:
+                    files_to_delete.add(path_str)
         except (FileNotFoundError, OSError):
             # No index - nothing staged
             pass
 
-        # Standard git diff: files in HEAD (+ staged) but not in target = files to delete
-        deleted_count = 0
-        files_to_delete = head_files - target_files
-
-        for file_path_str in files_to_delete:
+        deleted_files: list[str] = []
+        for file_path_str in sorted(files_to_delete):
             target = self.project_root / file_path_str
             try:
                 if target.exists():
                     target.unlink()
-                    deleted_count += 1
+                    deleted_files.append(file_path_str)
             except (OSError, PermissionError):
                 # Skip files that cannot be deleted
                 pass
 
-        # Clean up empty directories left after file deletion
-        # Walk bottom-up so we delete child dirs before parents
-        for root, dirs, _files in os.walk(self.project_root, topdown=False):
-            for dir_name in dirs:
-                dir_path = Path(root) / dir_name
-                try:
-                    # Only delete if empty (no files, no subdirs)
-                    if not any(dir_path.iterdir()):
-                        dir_path.rmdir()
-                except (OSError, PermissionError, ValueError):
-                    # Skip dirs that cannot be deleted or are outside project root
-                    pass
+        # Clean up directories emptied by the deletions above (and nothing else)
+        self._remove_empty_parents(deleted_files)
 
-        # Now restore files from checkpoint
-        restored_count = 0
+        # Now write files whose on-disk content differs from the target
+        stat_cache = StatCache.load(self._stat_cache_path)
+        unchanged_count = 0
         skipped_count = 0
         restored_files: list[str] = []
 
-        def restore_tree(tree_obj: Tree, path_prefix: str = "") -> None:
-            nonlocal restored_count, skipped_count
+        for file_path_str, (mode, sha) in sorted(target_entries.items()):
+            target = self.project_root / file_path_str
+            try:
+                file_stat = target.stat()
+            except OSError:
+                file_stat = None
 
-            for name, _mode, sha in tree_obj.items():
-                decoded_name = name.decode("utf-8")
-                full_path = (
-                    f"{path_prefix}/{decoded_name}" if path_prefix else decoded_name
-                )
+            if file_stat is not None and stat.S_ISREG(file_stat.st_mode):
+                if stat_cache.lookup(file_path_str, file_stat) == sha:
+                    unchanged_count += 1
+                    continue
 
-                obj = repo[sha]
-                # Check if it's a subtree (directory)
-                if isinstance(obj, Tree):
-                    restore_tree(obj, full_path)
-                else:
-                    # It's a blob (file)
-                    data = getattr(obj, "data", None)
-                    if data is not None:
-                        target = self.project_root / full_path
-                        try:
-                            target.parent.mkdir(parents=True, exist_ok=True)
-                            target.write_bytes(data)
-                            restored_count += 1
-                            restored_files.append(full_path)
-                        except (OSError, PermissionError) as e:
-                            # Skip files that cannot be written (in use, permission denied, etc)
-                            skipped_count += 1
-                            from agentsmithy.utils.logger import agent_logger
-
-                            agent_logger.debug(
-                                "Skipped file during restore (in use or no permission)",
-                                file=str(target),
-                                error=str(e),
-                            )
-
-        restore_tree(target_tree)
+            if stat.S_ISDIR(mode):
+                try:
+                    if self._restore_chunked_file(repo, sha, target, file_stat):
+                        restored_files.append(file_path_str)
+                    else:
+                        unchanged_count += 1
+                except (OSError, PermissionError) as e:
+                    skipped_count += 1
+                    agent_logger.debug(
+                        "Skipped file during restore (in use or no permission)",
+                        file=str(target),
+                        error=str(e),
+                    )
+                continue
+
+            data = getattr(repo[sha], "data", None)
+            if data is None:
+                continue
+
+            try:
+                if (
+                    file_stat is not None
+                    and stat.S_ISREG(file_stat.st_mode)
+                    and file_stat.st_size == len(data)
+                    and target.read_bytes() == data
+                ):
+                    unchanged_count += 1
+                    continue
+                target.parent.mkdir(parents=True, exist_ok=True)
+                target.write_bytes(data)
+                restored_files.append(file_path_str)
+            except (OSError, PermissionError) as e:
+                # Skip files that cannot be written (in use, permission denied, etc)
+                skipped_count += 1
+                agent_logger.debug(
+                    "Skipped file during restore (in use or no permission)",
+                    file=str(target),
+                    error=str(e),
+                )
 
         # Clear staging area after restore
         # Staged files were either deleted (not in target) or will be committed later
         self.clear_staging()
-
-        from agentsmithy.utils.logger import agent_logger
+        invalidate_workdir_scans(self.project_root)
 
         agent_logger.info(
             "Checkpoint restore completed",
             commit_id=commit_id[:8],
-            restored=restored_count,
-            deleted=deleted_count,
+            restored=len(restored_files),
+            deleted=len(deleted_files),
+            unchanged=unchanged_count,
             skipped=skipped_count,
         )
 
-        return restored_files
+        return restored_files + deleted_files
+
+    def _restore_chunked_file(
+        self,
+        repo: Repo,
+        manifest_sha: bytes,
+        target: Path,
+        file_stat: os.stat_result | None,
+    ) -> bool:
+        """Write a chunked file chunk by chunk unless the file already matches.
+
+        Returns:
+            True if the file was written, False if it was already up to date
+        """
+        manifest = repo[manifest_sha]
+        info = read_manifest_info(repo.object_store, manifest)  # type: ignore[arg-type]
+        if (
+            file_stat is not None
+            and stat.S_ISREG(file_stat.st_mode)
+            and file_stat.st_size == info.size
+            and _hash_file_as_blob(target, info.size) == info.blob_sha
+        ):
+            return False
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with open(target, "wb") as f:
+            for data in iter_file_chunks(repo.object_store, manifest):  # type: ignore[arg-type]
+                f.write(data)
+        return True
+
+    def _remove_empty_parents(self, deleted_files: list[str]) -> None:
+        """Remove directories left empty after deleting the given files.
+
+        Only ancestors of deleted paths are considered, deepest first, so large
+        untouched trees (node_modules, .venv) are never walked.
+
+        Args:
+            deleted_files: Deleted file paths relative to project root
+        """
+        candidates: set[Path] = set()
+        for file_path_str in deleted_files:
+            parent = (self.project_root / file_path_str).parent
+            while parent != self.project_root and self.project_root in parent.parents:
+                candidates.add(parent)
+                parent = parent.parent
+
+        for dir_path in sorted(candidates, key=lambda p: len(p.parts), reverse=True):
+            try:
+                # Only delete if empty (no files, no subdirs)
+                if not any(dir_path.iterdir()):
+                    dir_path.rmdir()
+            except (OSError, PermissionError, ValueError):
+                # Skip dirs that are missing, non-empty or cannot be deleted
+                pass
 
-    def _record_metadata(self, commit_id: str, message: str) -> None:
-        """Record checkpoint metadata (commit ID and message) to metadata.json.
+    def _record_metadata(
+        self,
+        commit_id: str,
+        message: str,
+        session_name: str,
+        parent_id: str | None = None,
+        files_count: int | None = None,
+        approved: bool = False,
+    ) -> None:
+        """Record checkpoint metadata in the dialog journal (best-effort).
+
+        A checkpoint missing from the journal is re-imported from the commit
+        graph by the next listing, so failures only cost that walk.
 
         Args:
             commit_id: Git commit SHA
             message: Checkpoint message
+            session_name: Session the checkpoint belongs to
+            parent_id: First parent commit SHA
+            files_count: Number of files in the checkpoint tree
+            approved: Whether the checkpoint is on the approved (main) line
         """
-        meta_file = self.shadow_root / "metadata.json"
-        data: dict[str, dict] = {}
-        if meta_file.exists():
-            try:
-                data = json.loads(meta_file.read_text())
-            except Exception:
-                data = {}
-        data[commit_id] = {"message": message}
-        meta_file.write_text(json.dumps(data, indent=2))
+        from agentsmithy.db.checkpoints import record_checkpoint
+
+        try:
+            record_checkpoint(
+                self._get_db_path(),
+                commit_id,
+                message,
+                session_name,
+                parent_id=parent_id,
+                files_count=files_count,
+                approved=approved,
+            )
+        except Exception as e:
+            from agentsmithy.utils.logger import agent_logger
+
+            agent_logger.warning(
+                "Failed to record checkpoint metadata",
+                commit_id=commit_id[:8],
+                error=str(e),
+            )
 
     def approve_all(self, message: str | None = None) -> dict:
         """Approve current session by merging into main and creating new session.
@@ -1453,6 +2124,7 @@ class VersioningTracker:
 
         from dulwich.objects import Commit, parse_timezone
 
+        from agentsmithy.db.checkpoints import mark_session_approved
         from agentsmithy.db.sessions import (
             close_session,
             create_new_session,
@@ -1464,10 +2136,12 @@ class VersioningTracker:
         # First, commit any pending changes before approving
         # - Uncommitted changes in working directory
         # - Or staged entries in the index (force-added files)
-        if self.has_uncommitted_changes() or self.has_staged_changes():
-            self.create_checkpoint("Auto-commit before approval")
-            # Defensive: ensure staging is clear in case of index leftovers
-            self.clear_staging()
+        # The change check and the checkpoint share one workdir walk
+        with self.shared_scan():
+            if self.has_uncommitted_changes() or self.has_staged_changes():
+                self.create_checkpoint("Auto-commit before approval")
+                # Defensive: ensure staging is clear in case of index leftovers
+                self.clear_staging()
 
         # Get current session and main
         active_session = self._get_active_session_name()
@@ -1531,10 +2205,22 @@ class VersioningTracker:
         commits_approved = self._count_commits_between(repo, main_head, session_head)
 
         merge_commit_id = merge_commit.id.decode()
-        self._record_metadata(merge_commit_id, merge_msg)
+        self._record_metadata(
+            merge_commit_id,
+            merge_msg,
+            active_session,
+            parent_id=main_head.decode(),
+            approved=True,
+        )
 
         # Update database
         db_path = self._get_db_path()
+        try:
+            mark_session_approved(db_path, active_session)
+        except Exception as e:
+            from agentsmithy.utils.logger import agent_logger
+
+            agent_logger.warning("Failed to mark approved checkpoints", error=str(e))
         close_session(db_path, active_session, "merged", merge_commit_id)
         create_new_session(db_path, new_session)
         update_branch_head(db_path, "main", merge_commit_id)
@@ -1577,26 +2263,28 @@ class VersioningTracker:
         active_session = self._get_active_session_name()
 
         # Safety: Create checkpoint if there are uncommitted or staged changes
+        # (the change check and the checkpoint share one workdir walk)
         pre_reset_checkpoint = None
-        if self.has_staged_changes() or self.has_uncommitted_changes():
-            from agentsmithy.utils.logger import agent_logger
+        with self.shared_scan():
+            if self.has_staged_changes() or self.has_uncommitted_changes():
+                from agentsmithy.utils.logger import agent_logger
 
-            try:
-                checkpoint = self.create_checkpoint(
-                    "Auto-save before reset (can be restored if needed)"
-                )
-                pre_reset_checkpoint = checkpoint.commit_id
+                try:
+                    checkpoint = self.create_checkpoint(
+                        "Auto-save before reset (can be restored if needed)"
+                    )
+                    pre_reset_checkpoint = checkpoint.commit_id
 
-                agent_logger.info(
-                    "Created auto-save checkpoint before reset",
-                    checkpoint_id=checkpoint.commit_id[:8],
-                )
-            except Exception as e:
-                agent_logger.warning(
-                    "Failed to create auto-save checkpoint before reset",
-                    error=str(e),
-                )
-                # Continue with reset even if checkpoint fails
+                    agent_logger.info(
+                        "Created auto-save checkpoint before reset",
+                        checkpoint_id=checkpoint.commit_id[:8],
+                    )
+                except Exception as e:
+                    agent_logger.warning(
+                        "Failed to create auto-save checkpoint before reset",
+                        error=str(e),
+                    )
+                    # Continue with reset even if checkpoint fails
 
         # Create new session from main
         new_session_num = int(active_session.split("_")[1]) + 1
@@ -1628,7 +2316,7 @@ class VersioningTracker:
         """
         repo = self.ensure_repo()
         try:
-            index = repo.open_index()
+            index = self._open_index(repo)
             # Any entry indicates staged changes
             for _ in index.items():
                 return True
@@ -1666,7 +2354,7 @@ class VersioningTracker:
             # Try to open index (may not exist or be empty)
             index = None
             try:
-                index = repo.open_index()
+                index = self._open_index(repo)
             except (FileNotFoundError, OSError):
                 # No index file - will process only workdir changes
                 pass
@@ -1681,23 +2369,9 @@ class VersioningTracker:
             if not head_tree_id:
                 return []
 
-            head_tree = repo[head_tree_id]
-
-            # Collect files from HEAD
-            def collect_head_files(tree: Tree, prefix: str = "") -> dict[str, bytes]:
-                """Recursively collect all files from HEAD tree."""
-                files: dict[str, bytes] = {}
-                for name, _mode, sha in tree.items():
-                    decoded_name = name.decode("utf-8")
-                    full_path = f"{prefix}/{decoded_name}" if prefix else decoded_name
-                    obj = repo[sha]
-                    if isinstance(obj, Tree):
-                        files.update(collect_head_files(obj, full_path))
-                    else:
-                        files[full_path] = sha
-                return files
-
-            head_files = collect_head_files(cast(Tree, head_tree))
+            # Collect files from HEAD (directories detected by mode, blobs not loaded)
+            head_entries = self._collect_tree_entries(repo, head_tree_id)
+            head_files = {path: sha for path, (_mode, sha) in head_entries.items()}
 
             # Process staged files (in index)
             staged: list[dict[str, Any]] = []
@@ -1713,7 +2387,11 @@ class VersioningTracker:
 
                     if path in head_files:
                         # File exists in HEAD
-                        if head_files[path] != staged_sha:
+                        # Staged blobs are whole files; HEAD may hold a chunked one
+                        if (
+                            file_content_id(repo.object_store, *head_entries[path])
+                            != staged_sha
+                        ):
                             # Different SHA = modified
                             file_info: dict[str, Any] = {
                                 "path": path,
@@ -1776,59 +2454,18 @@ class VersioningTracker:
 
             # Handle deleted files (in HEAD but not in workdir and not in index)
             # This catches files that were removed from disk but not staged for deletion
-            import os
-
-            # Collect current files in working directory
-            current_workdir_files: set[str] = set()
-            ignore_spec = self._get_ignore_spec()
-
-            for root, dirs, files in os.walk(self.project_root):
-                root_path = Path(root)
-                rel_root = (
-                    root_path.relative_to(self.project_root)
-                    if root_path != self.project_root
-                    else Path(".")
-                )
-
-                # Filter directories
-                filtered_dirs = []
-                for d in dirs:
-                    # Skip .agentsmithy directory
-                    if d == ".agentsmithy":
-                        continue
-
-                    dir_rel_path = (rel_root / d) if rel_root != Path(".") else Path(d)
-                    dir_path_str = str(dir_rel_path).replace("\\", "/")
-                    if ignore_spec.match_file(dir_path_str):
-                        continue
-                    filtered_dirs.append(d)
-
-                dirs[:] = filtered_dirs
-
-                for filename in files:
-                    file_path = Path(root) / filename
-                    file_rel_path = file_path.relative_to(self.project_root)
-                    file_path_str = str(file_rel_path).replace("\\", "/")
-
-                    if ignore_spec.match_file(file_path_str):
-                        continue
-
-                    current_workdir_files.add(file_path_str)
-
-            # Collect files currently in index
             index_files: set[str] = set()
             if index is not None:
                 index_files = set(
                     path_bytes.decode("utf-8") for path_bytes, _ in index.items()
                 )
 
-            # Find deleted files: in HEAD but not in workdir and not in index
+            # Only deletions are requested, so existing files are not compared
             # (if file is in index, it's already handled above as modified/added)
-            for head_path in head_files.keys():
-                if (
-                    head_path not in current_workdir_files
-                    and head_path not in index_files
-                ):
+            for head_path, _status in self.iter_changes(
+                session_name, statuses={FileChangeStatus.DELETED}
+            ):
+                if head_path not in index_files:
                     # File was deleted from workdir but deletion not staged
                     file_info = {
                         "path": head_path,
@@ -1867,11 +2504,12 @@ class VersioningTracker:
 
     def clear_staging(self) -> None:
         """Clear staging area (index) entries and remove index file if present."""
+        self.discard_staging_buffer()
         repo = self.ensure_repo()
         try:
             # Try to clear via dulwich API first
             try:
-                index = repo.open_index()
+                index = self._open_index(repo)
                 # Remove all entries
                 for key in list(index._byname.keys()):
                     try:
@@ -1903,132 +2541,265 @@ class VersioningTracker:
             # Best-effort cleanup
             pass
 
-    def has_uncommitted_changes(self) -> bool:
-        """Check if there are uncommitted changes in working directory.
+    # ---- storage maintenance ----
+    def get_storage_stats(self) -> dict[str, int]:
+        """Return disk usage and object counts of this dialog's shadow repo.
 
-        Compares current files on disk with the latest checkpoint in active session.
-        Uses optimized mtime+size check first, falls back to content hash only when needed.
-        Uses pure dulwich API - git binary not required.
+        Returns:
+            Dict with loose_objects, packs, packed_objects, object_bytes, total_bytes
         """
         repo = self.ensure_repo()
+        return collect_storage_stats(repo.object_store, self.shadow_root).to_dict()
 
-        try:
-            # Get current session HEAD
-            active_session = self._get_active_session_name()
-            session_ref = self._get_session_ref(active_session)
+    def get_shared_storage_stats(self) -> dict[str, int]:
+        """Return disk usage and object counts of the project's shared store."""
+        shared = open_shared_store(self._shared_objects_path)
+        return collect_storage_stats(shared, self._shared_objects_path).to_dict()
 
-            if session_ref not in repo.refs:
-                return False
+    def needs_maintenance(self) -> bool:
+        """Check whether enough packs/loose objects piled up to warrant a repack."""
+        repo = self.ensure_repo()
+        stats = collect_storage_stats(repo.object_store, self.shadow_root)
+        return stats.needs_maintenance()
 
-            session_head = repo.refs[session_ref]
-            session_commit = repo[session_head]
-            committed_tree_id = session_commit.tree  # type: ignore[attr-defined]
-            committed_tree = repo[committed_tree_id]
+    def shared_store_needs_maintenance(self) -> bool:
+        """Same as needs_maintenance(), for the project's shared object store."""
+        shared = open_shared_store(self._shared_objects_path)
+        stats = collect_storage_stats(shared, self._shared_objects_path)
+        return stats.needs_maintenance()
 
-            # Build map of committed files: path -> (mode, sha)
-            import os
+    def run_maintenance(self, prune: bool = True) -> dict[str, Any]:
+        """Repack the shadow repo into one delta-compressed pack.
 
-            committed_files: dict[str, tuple[int, bytes]] = {}
+        Objects reachable from any branch or from the staging index are kept;
+        with ``prune`` enabled, older unreachable objects (e.g. blobs from
+        aborted transactions) are dropped.
 
-            def collect_tree_entries(tree: Any, prefix: str = "") -> None:
-                """Recursively collect all entries from tree."""
-                for name, mode, sha in tree.items():
-                    decoded_name = name.decode("utf-8")
-                    full_path = f"{prefix}/{decoded_name}" if prefix else decoded_name
-                    obj = repo[sha]
-                    if isinstance(obj, Tree):
-                        collect_tree_entries(obj, full_path)
-                    else:
-                        committed_files[full_path] = (mode, sha)
+        Args:
+            prune: Whether to drop unreachable objects past the grace period
 
-            collect_tree_entries(committed_tree)
+        Returns:
+            Dict with packed/pruned counts and storage stats before and after
+        """
+        from agentsmithy.utils.logger import agent_logger
 
-            # Scan working directory and compare
-            ignore_spec = self._get_ignore_spec()
+        repo = self.ensure_repo()
+        # Shared lock too: the reachability walk reads shared trees
+        with (
+            repository_lock(self.shadow_root / ".git"),
+            repository_lock(self._shared_objects_path),
+        ):
+            before = collect_storage_stats(repo.object_store, self.shadow_root)
+
+            # Staged blobs are not referenced by any commit yet
+            staged_roots: list[bytes] = []
+            try:
+                index = self._open_index(repo)
+                staged_roots = [
+                    sha
+                    for _path, entry in index.items()
+                    if (sha := getattr(entry, "sha", None)) is not None
+                ]
+            except (FileNotFoundError, OSError):
+                pass
 
-            # Filter out committed files that are NOW ignored
-            # (to handle case where ignore patterns changed after checkpoint)
-            non_ignored_committed = {
-                path
-                for path in committed_files.keys()
-                if not ignore_spec.match_file(path)
-            }
+            result: dict[str, Any] = repack_repository(repo, staged_roots, prune=prune)
+            after = collect_storage_stats(repo.object_store, self.shadow_root)
 
-            current_files: set[str] = set()
+        result["before"] = before.to_dict()
+        result["after"] = after.to_dict()
+        agent_logger.info(
+            "Checkpoint repository maintenance completed",
+            dialog_id=self.dialog_id,
+            packed=result["packed"],
+            pruned=result["pruned"],
+            packs_before=before.packs,
+            loose_before=before.loose_objects,
+            bytes_before=before.object_bytes,
+            bytes_after=after.object_bytes,
+        )
+        return result
 
-            for root, dirs, files in os.walk(self.project_root):
-                root_path = Path(root)
-                rel_root = (
-                    root_path.relative_to(self.project_root)
-                    if root_path != self.project_root
-                    else Path(".")
-                )
+    def run_shared_maintenance(self, prune: bool = True) -> dict[str, Any]:
+        """Repack the project's shared object store.
 
-                # Filter directories
-                filtered_dirs = []
-                for d in dirs:
-                    dir_rel_path = (rel_root / d) if rel_root != Path(".") else Path(d)
-                    dir_path_str = str(dir_rel_path).replace("\\", "/")
-                    if ignore_spec.match_file(dir_path_str):
-                        continue
-                    filtered_dirs.append(d)
+        Content is kept while any dialog (ref or staging index) references it,
+        so objects only used by deleted dialogs are eventually dropped.
 
-                dirs[:] = filtered_dirs
+        Args:
+            prune: Whether to drop unreferenced objects past the grace period
 
-                for filename in files:
-                    file_path = Path(root) / filename
-                    file_rel_path = file_path.relative_to(self.project_root)
-                    file_path_str = str(file_rel_path).replace("\\", "/")
+        Returns:
+            Dict with packed and pruned object counts
+        """
+        from agentsmithy.utils.logger import agent_logger
 
-                    if ignore_spec.match_file(file_path_str):
-                        continue
+        shared_path = self._shared_objects_path
+        with repository_lock(shared_path):
+            result = repack_shared_store(
+                shared_path,
+                iter_dialog_repo_dirs(self.project_root / ".agentsmithy"),
+                prune=prune,
+            )
+        agent_logger.info(
+            "Shared checkpoint store maintenance completed",
+            packed=result["packed"],
+            pruned=result["pruned"],
+        )
+        return result
 
-                    try:
-                        current_files.add(file_path_str)
+    def has_uncommitted_changes(self) -> bool:
+        """Check if there are uncommitted changes in working directory.
 
-                        # Check if file exists in commit (among non-ignored files)
-                        if file_path_str not in non_ignored_committed:
-                            # New file - uncommitted change
-                            return True
+        Compares current files on disk with the latest checkpoint in active session
+        and stops at the first difference (see iter_changes()).
+        Uses pure dulwich API - git binary not required.
 
-                        _mode, committed_sha = committed_files[file_path_str]
-                        committed_blob = repo[committed_sha]
+        Returns:
+            True if any file was added, modified or deleted. Also True if the
+            comparison itself failed, so callers checkpoint rather than lose work.
+        """
+        try:
+            for _path, _status in self.iter_changes():
+                return True
+            return False
+        except Exception as e:
+            from agentsmithy.utils.logger import agent_logger
 
-                        # Fast check: compare sizes first (avoids reading file content)
-                        stat = file_path.stat()
-                        file_size = stat.st_size
-                        blob_data = getattr(committed_blob, "data", b"")
-                        blob_size = len(blob_data)
+            agent_logger.warning(
+                "Failed to check uncommitted changes, assuming there are some",
+                dialog_id=self.dialog_id,
+                error=str(e),
+            )
+            return True
 
-                        if file_size != blob_size:
-                            # Size mismatch - file changed
-                            return True
+    def iter_changes(
+        self,
+        session_name: str | None = None,
+        statuses: Collection[FileChangeStatus] | None = None,
+    ) -> Iterator[tuple[str, FileChangeStatus]]:
+        """Lazily yield working directory files that differ from a session HEAD.
 
-                        # Sizes match, but we need to check content hash to be sure
-                        # (size collision is possible but rare)
-                        from dulwich.objects import Blob
+        Added and modified files are yielded while the workdir is walked, deleted
+        files (sorted) once the walk is complete, so a consumer that only needs
+        to know whether anything changed can stop at the first item. When the
+        workdir watcher vouches for the rest of the project only dirty paths are
+        examined. The walk is shared with operations that follow shortly after
+        (see _scan_workdir()).
 
-                        content = file_path.read_bytes()
-                        current_blob = Blob.from_string(content)
+        Modification checks are cheapest-first: per-dialog stat cache, then the
+        blob size read from the object header (content is not inflated), then
+        a streaming SHA-1 of the file.
 
-                        if current_blob.id != committed_sha:
-                            # Content hash mismatch - file changed
-                            return True
+        Uses the CURRENT ignore spec; committed files that are now ignored are
+        not reported as deleted.
 
-                    except Exception:
-                        # If we can't read file, assume no change
-                        continue
+        Args:
+            session_name: Session to compare against (defaults to the active one)
+            statuses: Only yield these statuses; file contents are not compared
+                unless MODIFIED is requested
 
-            # Check if any non-ignored committed files were deleted
-            # (only check files that are not now ignored by current patterns)
-            deleted_files = non_ignored_committed - current_files
-            if deleted_files:
-                return True
+        Yields:
+            Tuples of (relative_path, FileChangeStatus)
+        """
+        repo = self.ensure_repo()
+        session_ref = self._get_session_ref(
+            session_name or self._get_active_session_name()
+        )
+        if session_ref not in repo.refs:
+            return
 
-            return False
+        committed_tree_id = repo[repo.refs[session_ref]].tree  # type: ignore[attr-defined]
+        committed_files = self._collect_tree_entries(repo, committed_tree_id)
+        ignore_spec = self._get_ignore_spec()
+        wanted = set(FileChangeStatus) if statuses is None else set(statuses)
 
-        except Exception:
-            return False
+        scan = self._scan_workdir(ignore_spec, committed_tree_id)
+        dirty = scan.dirty
+
+        stat_cache = (
+            StatCache.load(self._stat_cache_path)
+            if FileChangeStatus.MODIFIED in wanted
+            else None
+        )
+        seen: set[str] = set()
+        with ObjectSizeReader(repo.object_store) as sizes:
+            for rel_path, abs_path, stat_info in scan:
+                seen.add(rel_path)
+                committed = committed_files.get(rel_path)
+                if committed is None:
+                    if FileChangeStatus.ADDED in wanted:
+                        yield rel_path, FileChangeStatus.ADDED
+                elif stat_cache is not None and self._workdir_file_differs(
+                    repo,
+                    sizes,
+                    stat_cache,
+                    rel_path,
+                    Path(abs_path),
+                    stat_info,
+                    committed[1],
+                    committed[0],
+                ):
+                    yield rel_path, FileChangeStatus.MODIFIED
+
+        if FileChangeStatus.DELETED not in wanted:
+            return
+
+        # With a dirty set, clean committed paths are still on disk (or were
+        # never visible to the walk), so only dirty ones can have been deleted
+        candidates = set(committed_files) if dirty is None else set(dirty.files)
+        if dirty is not None and dirty.dirs:
+            candidates.update(p for p in committed_files if dirty.covers(p))
+
+        for rel_path in sorted(candidates):
+            if (
+                rel_path in committed_files
+                and rel_path not in seen
+                and self._is_walk_visible(ignore_spec, rel_path)
+            ):
+                yield rel_path, FileChangeStatus.DELETED
+
+    def _workdir_file_differs(
+        self,
+        repo: Repo,
+        sizes: ObjectSizeReader,
+        stat_cache: StatCache,
+        rel_path: str,
+        file_path: Path,
+        stat_info: os.stat_result | None,
+        committed_sha: bytes,
+        committed_mode: int = 0o100644,
+    ) -> bool:
+        """Return True if a workdir file's content differs from a committed blob.
+
+        For a chunked file (committed_mode is a tree) the file is compared with
+        the size and whole-file blob SHA recorded in its manifest.
+        """
+        try:
+            if stat_info is None:
+                stat_info = file_path.stat()
+            cached_sha = stat_cache.lookup(rel_path, stat_info)
+            if cached_sha is not None:
+                return cached_sha != committed_sha
+
+            if stat.S_ISDIR(committed_mode):
+                info = read_manifest_info(repo.object_store, repo[committed_sha])  # type: ignore[arg-type]
+                committed_size, committed_blob = info.size, info.blob_sha
+            else:
+                committed_blob = committed_sha
+                known_size = sizes.size(committed_sha)
+                # Size unknown to the reader: read the blob
+                committed_size = (
+                    known_size
+                    if known_size is not None
+                    else len(repo[committed_sha].as_raw_string())
+                )
+            if stat_info.st_size != committed_size:
+                return True
+            return _hash_file_as_blob(file_path, committed_size) != committed_blob
+        except OSError:
+            # Vanished or unreadable since the walk: report it rather than hide it
+            return True
 
     def _count_commits_between(
         self, repo: Repo, base_sha: bytes, head_sha: bytes
@@ -2064,77 +2835,180 @@ class VersioningTracker:
     def list_checkpoints(self) -> list[CheckpointInfo]:
         """List all checkpoints in chronological order (oldest first).
 
-        Uses pure dulwich API - git binary not required.
-        Uses BFS traversal with deque for O(1) queue operations.
+        Reads the checkpoint index in the dialog journal; see
+        ``list_checkpoints_page`` for paginated access.
 
         Returns:
             List of CheckpointInfo objects from active session
         """
+        checkpoints, _ = self.list_checkpoints_page()
+        return checkpoints
+
+    def list_checkpoints_page(
+        self, limit: int | None = None, before: int | None = None
+    ) -> tuple[list[CheckpointInfo], bool]:
+        """List checkpoints of the active session, newest page first.
+
+        Each page is in chronological order. To load older checkpoints, pass
+        the ``seq`` of the first returned checkpoint as ``before``.
+
+        Args:
+            limit: Maximum number of checkpoints to return (None for all)
+            before: Cursor - only return checkpoints older than this seq
+
+        Returns:
+            Tuple of (checkpoints, has_more)
+        """
+        from agentsmithy.db.checkpoints import list_checkpoints
+
         try:
-            repo = self.ensure_repo()
-            checkpoints: list[CheckpointInfo] = []
+            active_session = self._sync_checkpoint_metadata()
+            if active_session is None:
+                return [], False
+
+            records = list_checkpoints(
+                self._get_db_path(),
+                active_session,
+                limit=limit + 1 if limit is not None else None,
+                before=before,
+            )
+        except Exception as e:
+            from agentsmithy.utils.logger import agent_logger
 
-            # Read metadata for messages
-            meta_file = self.shadow_root / "metadata.json"
-            metadata: dict[str, dict] = {}
-            if meta_file.exists():
-                try:
-                    metadata = json.loads(meta_file.read_text())
-                except Exception:
-                    # Non-critical: corrupted or unreadable metadata file is treated as empty.
-                    # This allows recovery from malformed JSON without blocking checkpoint restore.
-                    metadata = {}
+            agent_logger.warning("Failed to list checkpoints", error=str(e))
+            return [], False
+
+        has_more = limit is not None and len(records) > limit
+        if has_more:
+            records = records[1:]
+        return [
+            CheckpointInfo(
+                commit_id=r.commit_id,
+                message=r.message,
+                seq=r.seq,
+                created_at=r.created_at,
+            )
+            for r in records
+        ], has_more
 
-            # Get active session branch (not HEAD which might be on different branch)
-            active_session = self._get_active_session_name()
-            session_ref = self._get_session_ref(active_session)
+    def has_checkpoint(self, commit_id: str) -> bool:
+        """Check whether a checkpoint belongs to the active session's history.
 
-            # Walk commit history from active session backwards using BFS
-            try:
-                if session_ref in repo.refs:
-                    current_id = repo.refs[session_ref]
-                else:
-                    # Fallback to HEAD if session doesn't exist yet
-                    current_id = repo.head()
-            except Exception:
-                # No commits yet
-                return []
+        Args:
+            commit_id: Checkpoint commit SHA
+
+        Returns:
+            True if the checkpoint can be listed (and restored)
+        """
+        from agentsmithy.db.checkpoints import get_checkpoint
+
+        try:
+            active_session = self._sync_checkpoint_metadata()
+            if active_session is None:
+                return False
+            return (
+                get_checkpoint(self._get_db_path(), commit_id, active_session)
+                is not None
+            )
+        except Exception:
+            return False
+
+    def _sync_checkpoint_metadata(self) -> str | None:
+        """Make sure the journal knows every checkpoint of the active session.
 
-            visited = set()
-            to_visit = deque([current_id])
+        The common case costs one indexed lookup of the session head. Dialogs
+        created before checkpoints were journaled (or a failed record) are
+        imported once by walking the commit graph; messages then come from
+        the legacy metadata.json file if present.
 
+        Returns:
+            Active session name, or None if the dialog has no checkpoints yet
+        """
+        from agentsmithy.db.checkpoints import (
+            CheckpointRow,
+            get_checkpoint,
+            record_checkpoints,
+        )
+
+        repo = self.ensure_repo()
+        active_session = self._get_active_session_name()
+        session_ref = self._get_session_ref(active_session)
+        try:
+            if session_ref in repo.refs:
+                head_id = repo.refs[session_ref]
+            else:
+                # Fallback to HEAD if session doesn't exist yet
+                head_id = repo.head()
+        except Exception:
+            # No commits yet
+            return None
+
+        db_path = self._get_db_path()
+        if get_checkpoint(db_path, head_id.decode(), active_session) is not None:
+            return active_session
+
+        def ancestors(start: bytes) -> list[bytes]:
+            # BFS; reversed result is (roughly) chronological
+            visited: set[bytes] = set()
+            order: list[bytes] = []
+            to_visit = deque([start])
             while to_visit:
                 commit_id = to_visit.popleft()
                 if commit_id in visited:
                     continue
                 visited.add(commit_id)
-
                 try:
-                    commit_obj = repo[commit_id]
-                    commit_id_str = commit_id.decode("utf-8")
-
-                    # Get message from metadata or commit
-                    if commit_id_str in metadata:
-                        message = metadata[commit_id_str].get("message", "")
-                    else:
-                        message = getattr(commit_obj, "message", b"").decode("utf-8")
-
-                    checkpoints.append(
-                        CheckpointInfo(commit_id=commit_id_str, message=message)
-                    )
-
-                    # Add parents to visit
-                    parents = getattr(commit_obj, "parents", [])
-                    to_visit.extend(parents)
+                    to_visit.extend(getattr(repo[commit_id], "parents", []))
                 except Exception:
                     continue
+                order.append(commit_id)
+            return order
 
-            # Reverse to get chronological order (oldest first)
-            checkpoints.reverse()
-            return checkpoints
+        approved: set[bytes] = set()
+        if self.MAIN_BRANCH in repo.refs:
+            approved = set(ancestors(repo.refs[self.MAIN_BRANCH]))
 
-        except Exception:
-            return []
+        legacy: dict[str, dict] = {}
+        meta_file = self.shadow_root / "metadata.json"
+        if meta_file.exists():
+            try:
+                legacy = json.loads(meta_file.read_text())
+            except Exception:
+                # Corrupted legacy metadata: fall back to commit messages
+                legacy = {}
+
+        rows: list[CheckpointRow] = []
+        for commit_id in reversed(ancestors(head_id)):
+            commit_obj = repo[commit_id]
+            commit_id_str = commit_id.decode()
+            parents = getattr(commit_obj, "parents", [])
+            message = legacy.get(commit_id_str, {}).get("message")
+            if message is None:
+                message = getattr(commit_obj, "message", b"").decode("utf-8")
+            created_at = datetime.fromtimestamp(
+                getattr(commit_obj, "commit_time", 0), UTC
+            ).isoformat()
+            rows.append(
+                (
+                    commit_id_str,
+                    parents[0].decode() if parents else None,
+                    active_session,
+                    message,
+                    created_at,
+                    None,
+                    commit_id in approved,
+                )
+            )
+        record_checkpoints(db_path, rows)
+
+        from agentsmithy.utils.logger import agent_logger
+
+        agent_logger.info(
+            "Imported checkpoint metadata into journal",
+            dialog_id=self.dialog_id,
+            checkpoints=len(rows),
+        )
+        return active_session
 
     def get_tree_diff(
         self, from_ref: bytes | str, to_ref: bytes | str, include_diff: bool = True
@@ -2185,22 +3059,16 @@ class VersioningTracker:
             if not from_tree_id or not to_tree_id:
                 return []
 
-            # Use dulwich's tree_changes to get diff
+            # Walk only changed subtrees (identical directories are pruned by SHA)
             changes: list[dict[str, Any]] = []
 
-            for change in tree_changes(repo.object_store, from_tree_id, to_tree_id):
-                # Get path from new or old entry (at least one should exist)
-                path_bytes = (change.new.path if change.new else None) or (
-                    change.old.path if change.old else None
-                )
-                if not path_bytes:
-                    continue
-                path_str = path_bytes.decode("utf-8")
-
-                if change.type == CHANGE_ADD and change.new:
+            for path_str, old_entry, new_entry in self._iter_tree_changes(
+                repo, from_tree_id, to_tree_id
+            ):
+                if old_entry is None and new_entry is not None:
                     # File added - no base content (file didn't exist in main)
                     # _count_lines returns (lines, 0), we only need the first value
-                    additions, _ = self._count_lines(repo, change.new.sha)
+                    additions, _ = self._count_lines(repo, new_entry[1])
                     change_dict = {
                         "path": path_str,
                         "status": FileChangeStatus.ADDED.value,
@@ -2212,12 +3080,12 @@ class VersioningTracker:
                         "is_too_large": False,
                     }
                     changes.append(change_dict)
-                elif change.type == CHANGE_DELETE and change.old:
+                elif new_entry is None and old_entry is not None:
                     # File deleted - provide base content so client can show what was deleted
                     # _count_lines returns (lines, 0), so use first value for deletion count
-                    lines, _ = self._count_lines(repo, change.old.sha)
+                    lines, _ = self._count_lines(repo, old_entry[1])
                     base_content, is_binary, is_too_large = self._extract_blob_content(
-                        repo, change.old.sha
+                        repo, old_entry[1]
                     )
                     change_dict = {
                         "path": path_str,
@@ -2230,13 +3098,13 @@ class VersioningTracker:
                         "is_too_large": is_too_large,
                     }
                     changes.append(change_dict)
-                elif change.type == CHANGE_MODIFY and change.old and change.new:
+                elif old_entry is not None and new_entry is not None:
                     # File modified - extract base content from main/from_ref
                     additions, deletions, diff_text = self._diff_blobs_with_text(
-                        repo, change.old.sha, change.new.sha, include_diff, path_str
+                        repo, old_entry[1], new_entry[1], include_diff, path_str
                     )
                     base_content, is_binary, is_too_large = self._extract_blob_content(
-                        repo, change.old.sha
+                        repo, old_entry[1]
                     )
                     change_dict = {
                         "path": path_str,
@@ -2264,18 +3132,23 @@ class VersioningTracker:
         if not blob_sha:
             return (0, 0)
 
+        cached = self._diff_cache.get_lines(blob_sha)
+        if cached is not None:
+            return (cached, 0)
+
         try:
-            blob_obj = repo[blob_sha]
-            if not isinstance(blob_obj, Blob):
+            content = read_file_content(repo.object_store, blob_sha)
+            if content is None:
                 return (0, 0)
-            content = blob_obj.data
             # Check if binary
             if b"\x00" in content[:8192]:
-                return (0, 0)  # Binary file
-            lines = len(content.splitlines())
-            return (lines, 0)
+                lines = 0  # Binary file
+            else:
+                lines = len(content.splitlines())
         except Exception:
             return (0, 0)
+        self._diff_cache.put_lines(blob_sha, lines)
+        return (lines, 0)
 
     def _extract_blob_content(
         self, repo: Repo, blob_sha: bytes | None
@@ -2296,12 +3169,17 @@ class VersioningTracker:
             return (None, False, False)
 
         try:
-            blob_obj = repo[blob_sha]
-            if not isinstance(blob_obj, Blob):
+            obj = repo[blob_sha]
+            if is_manifest(repo.object_store, obj):
+                # Don't reassemble chunked files that exceed the size limit
+                if read_manifest_info(repo.object_store, obj).size > 1048576:  # type: ignore[arg-type]
+                    return (None, False, True)
+                content = b"".join(iter_file_chunks(repo.object_store, obj))  # type: ignore[arg-type]
+            elif isinstance(obj, Blob):
+                content = obj.data
+            else:
                 return (None, False, False)
 
-            content = blob_obj.data
-
             # Check if binary (look for null bytes in first 8KB)
             if b"\x00" in content[:8192]:
                 return (None, True, False)
@@ -2334,6 +3212,11 @@ class VersioningTracker:
         )
         return (additions, deletions)
 
+    @property
+    def _diff_cache(self) -> DiffCache:
+        """Project-wide diff cache (blob SHAs are shared by all dialogs)."""
+        return get_diff_cache(self.project_root / ".agentsmithy")
+
     def _diff_blobs_with_text(
         self,
         repo: Repo,
@@ -2355,54 +3238,81 @@ class VersioningTracker:
             Tuple of (additions, deletions, diff_text)
             diff_text is None if include_text=False or for binary files
         """
+        # Blob pairs are immutable: repeated polls are answered from the cache
+        cached = self._diff_cache.get(from_sha, to_sha, include_text)
+        if cached is not None:
+            diff_text = unified_diff_text(cached, path) if include_text else None
+            return (cached.additions, cached.deletions, diff_text)
+
         try:
-            from_blob_obj = repo[from_sha]
-            to_blob_obj = repo[to_sha]
+            # Chunked files are reassembled
+            from_data = read_file_content(repo.object_store, from_sha)
+            to_data = read_file_content(repo.object_store, to_sha)
 
-            if not isinstance(from_blob_obj, Blob) or not isinstance(to_blob_obj, Blob):
+            if from_data is None or to_data is None:
                 return (0, 0, None)
 
-            from_content = from_blob_obj.data
-            to_content = to_blob_obj.data
+            # Binary or non-UTF-8 content has no line diff
+            from_text = decode_text(from_data)
+            to_text = decode_text(to_data)
+            if from_text is None or to_text is None:
+                result = DiffResult(0, 0)
+            else:
+                # Count-only requests skip building the unified diff text
+                result = diff_texts(from_text, to_text, include_text)
 
-            # Check if binary
-            if b"\x00" in from_content[:8192] or b"\x00" in to_content[:8192]:
-                return (0, 0, None)  # Binary file
+        except Exception:
+            return (0, 0, None)
 
-            # Decode to text for difflib
-            try:
-                from_text = from_content.decode("utf-8")
-                to_text = to_content.decode("utf-8")
-            except UnicodeDecodeError:
-                # Treat as binary if can't decode
-                return (0, 0, None)
+        self._diff_cache.put(from_sha, to_sha, result, with_text=include_text)
+        diff_text = unified_diff_text(result, path) if include_text else None
+        return (result.additions, result.deletions, diff_text)
 
-            # Use difflib for proper diff calculation
-            from_lines = from_text.splitlines(keepends=True)
-            to_lines = to_text.splitlines(keepends=True)
-
-            # Generate unified diff with proper file headers for client compatibility
-            diff_gen = difflib.unified_diff(
-                from_lines,
-                to_lines,
-                fromfile=f"a/{path}" if path else "a/unknown",
-                tofile=f"b/{path}" if path else "b/unknown",
-                lineterm="",
-            )
-            diff_lines = list(diff_gen)
 
-            additions = 0
-            deletions = 0
-            for line in diff_lines:
-                if line.startswith("+") and not line.startswith("+++"):
-                    additions += 1
-                elif line.startswith("-") and not line.startswith("---"):
-                    deletions += 1
+_trackers: dict[tuple[str, str | None], VersioningTracker] = {}
+_trackers_lock = threading.Lock()
 
-            # Join with newlines to create proper unified diff format
-            diff_text = "\n".join(diff_lines) if include_text and diff_lines else None
 
-            return (additions, deletions, diff_text)
+def get_versioning_tracker(
+    project_root: str | Path, dialog_id: str | None = None
+) -> VersioningTracker:
+    """Return the long-lived tracker for a dialog, creating it on first use.
 
-        except Exception:
-            return (0, 0, None)
+    Shared trackers keep their shadow repo open and buffer staging changes, so
+    a turn that touches many files does not reopen the repo and rewrite the
+    index for every tool call.
+    """
+    from agentsmithy.config import settings
+
+    key = (str(Path(project_root).resolve()), dialog_id)
+    with _trackers_lock:
+        tracker = _trackers.get(key)
+        if tracker is None:
+            tracker = VersioningTracker(
+                key[0],
+                dialog_id,
+                staging_flush_delay=STAGING_FLUSH_DELAY,
+                chunk_min_size=settings.checkpoint_chunk_min_size,
+                hash_processes=settings.checkpoint_hash_processes,
+            )
+            _trackers[key] = tracker
+    return tracker
+
+
+def release_versioning_tracker(
+    project_root: str | Path, dialog_id: str | None = None
+) -> None:
+    """Forget a dialog's shared tracker and drop its buffered staging (dialog deleted)."""
+    key = (str(Path(project_root).resolve()), dialog_id)
+    with _trackers_lock:
+        tracker = _trackers.pop(key, None)
+    if tracker is not None:
+        tracker.discard_staging_buffer()
+
+
+def flush_versioning_trackers() -> None:
+    """Write buffered staging changes of all shared trackers (server shutdown)."""
+    with _trackers_lock:
+        trackers = list(_trackers.values())
+    for tracker in trackers:
+        tracker.flush_staging()
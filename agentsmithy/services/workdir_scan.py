@@ -0,0 +1,116 @@
+"""Workdir scan results shared by consecutive checkpoint operations.
+
+Approving a session checks for uncommitted changes, then creates a checkpoint;
+resetting and the ``/session`` route do similar work back to back. Each of these
+used to walk the project on its own. A ``WorkdirScan`` records one walk and is
+handed to every operation that runs shortly afterwards, so a burst of operations
+costs a single walk.
+
+The walk is consumed lazily: an operation that stops at the first change only
+pays for the part of the walk it looked at, and the next operation replays those
+entries before continuing the walk where the first one stopped.
+
+Scans are shared only inside ``VersioningTracker.shared_scan()``. There a scan
+stays valid for ``WORKDIR_SCAN_TTL`` seconds, and only while nothing may have
+written project files: write tools and shell commands call
+``invalidate_workdir_scans()``, and a running workdir watcher must not have
+seen any event since the walk started.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+from agentsmithy.services.workdir_watcher import DirtyPaths, WorkdirWatcher
+
+# Seconds a scan is reused by later operations
+WORKDIR_SCAN_TTL = 2.0
+
+WorkdirEntry = tuple[str, str, os.stat_result | None]
+
+# Project root -> counter bumped whenever project files may have been written
+_generations: dict[str, int] = {}
+_generations_lock = threading.Lock()
+
+
+def scan_generation(project_root: str | Path) -> int:
+    """Return the project's current scan generation."""
+    return _generations.get(str(Path(project_root).resolve()), 0)
+
+
+def invalidate_workdir_scans(project_root: str | Path) -> None:
+    """Make every cached scan of a project stale (files may have been written)."""
+    key = str(Path(project_root).resolve())
+    with _generations_lock:
+        _generations[key] = _generations.get(key, 0) + 1
+
+
+class WorkdirScan:
+    """One (possibly partial) walk of the working directory, replayable.
+
+    Attributes:
+        dirty: Watcher dirty set the walk was limited to, or None for a full walk
+        tree_id: Tree the dirty set is relative to (a full walk fits any tree)
+        watch_token: Watcher token taken before the walk started
+        generation: Project scan generation at the time of the walk
+        created_at: time.monotonic() of the walk
+    """
+
+    def __init__(
+        self,
+        source: Iterator[WorkdirEntry],
+        dirty: DirtyPaths | None,
+        tree_id: bytes | None,
+        watch_token: int | None,
+        generation: int,
+    ) -> None:
+        self.dirty = dirty
+        self.tree_id = tree_id
+        self.watch_token = watch_token
+        self.generation = generation
+        self.created_at = time.monotonic()
+        self._source: Iterator[WorkdirEntry] | None = source
+        self._entries: list[WorkdirEntry] = []
+        self._lock = threading.Lock()
+
+    def __iter__(self) -> Iterator[WorkdirEntry]:
+        """Yield (relative_path, absolute_path, stat_result or None) entries."""
+        i = 0
+        while True:
+            with self._lock:
+                if i >= len(self._entries):
+                    if self._source is None:
+                        return
+                    try:
+                        self._entries.append(next(self._source))
+                    except StopIteration:
+                        self._source = None
+                        return
+                item = self._entries[i]
+            i += 1
+            yield item
+
+    def is_valid_for(
+        self,
+        tree_id: bytes | None,
+        generation: int,
+        watcher: WorkdirWatcher | None,
+    ) -> bool:
+        """Return True if the scan can stand in for a new walk against tree_id."""
+        if generation != self.generation:
+            return False
+        if time.monotonic() - self.created_at >= WORKDIR_SCAN_TTL:
+            return False
+        if self.dirty is not None and tree_id != self.tree_id:
+            return False
+        if watcher is not None:
+            if self.watch_token is None:
+                return False
+            changes = watcher.changes_since(self.watch_token)
+            if changes is None or changes:
+                return False
+        return True
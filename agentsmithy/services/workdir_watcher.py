@@ -0,0 +1,385 @@
+"""Filesystem watcher that records project paths touched between checkpoints.
+
+One watcher runs per project (see ``start_workdir_watcher``). Every event bumps a
+sequence number and records the touched path with it; a consumer (a dialog's
+VersioningTracker) remembers the sequence number ("token") at which it last
+scanned the whole working directory, and later asks for everything recorded
+after that token instead of walking the project again.
+
+The answer is ``None`` - meaning "do a full scan" - whenever the watcher cannot
+vouch for completeness: it is not running (or one of its emitter threads died),
+it was restarted, the kernel dropped events (inotify queue overflow), or it
+dropped its history because too many distinct paths changed (e.g. ``npm
+install``).
+
+Events reach the watcher asynchronously, so before answering ``changes_since``
+flushes them: it creates a barrier file under ``.agentsmithy`` and waits for its
+event. Events are delivered in order, so once the barrier is seen every change
+made before the call has been recorded; if it is not seen in time the history
+is dropped instead.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from watchdog.events import FileSystemEvent, FileSystemEventHandler
+from watchdog.observers import Observer
+
+from agentsmithy.utils.logger import agent_logger
+
+# History is compacted beyond this many distinct paths, then dropped (overflow)
+MAX_TRACKED_PATHS = 50_000
+
+# Top-level directories whose events never matter for checkpoints
+_SKIPPED_ROOTS = frozenset({".agentsmithy", ".git"})
+
+# How long changes_since() waits for its barrier event before giving up
+BARRIER_TIMEOUT_SECONDS = 1.0
+
+# Consecutive lost barriers after which the watcher is stopped as broken
+MAX_BARRIER_FAILURES = 3
+
+_BARRIER_DIR = ".agentsmithy"
+_BARRIER_PREFIX = "watch-barrier-"
+
+
+@dataclass
+class DirtyPaths:
+    """Paths touched since a token.
+
+    ``dirs`` holds directories that were created, deleted or moved; everything
+    below them must be re-examined.
+    """
+
+    files: set[str] = field(default_factory=set)
+    dirs: set[str] = field(default_factory=set)
+
+    def __bool__(self) -> bool:
+        return bool(self.files or self.dirs)
+
+    def covers(self, rel_path: str) -> bool:
+        """Return True if rel_path itself or one of its parent dirs is dirty."""
+        if rel_path in self.files:
+            return True
+        return any(rel_path.startswith(f"{d}/") for d in self.dirs)
+
+
+@dataclass(frozen=True, slots=True)
+class WatchBaseline:
+    """Token taken right before a full scan and the tree that scan produced."""
+
+    token: int
+    tree_id: bytes
+
+
+class WorkdirWatcher:
+    """Records paths touched under a project root (thread-safe)."""
+
+    def __init__(self, project_root: Path) -> None:
+        self.project_root = project_root.resolve()
+        self._lock = threading.Lock()
+        self._seq = 0
+        # Tokens older than this predate a restart/overflow and are unusable
+        self._epoch = 0
+        self._files: dict[str, int] = {}
+        self._dirs: dict[str, int] = {}
+        self._baselines: dict[str, WatchBaseline] = {}
+        self._observer: Any = None  # Observer from watchdog
+        # One barrier at a time; _barrier_path is the file whose event it awaits
+        self._barrier_lock = threading.Lock()
+        self._barrier_seen = threading.Event()
+        self._barrier_path: str | None = None
+        self._barrier_count = 0
+        self._barrier_failures = 0
+
+    # ---- lifecycle ----
+    def start(self) -> None:
+        """Start watching the project recursively."""
+        watcher = self
+
+        class _Handler(FileSystemEventHandler):
+            def on_any_event(self, event: FileSystemEvent) -> None:
+                watcher._handle_event(event)
+
+        _install_overflow_hook()
+        (self.project_root / _BARRIER_DIR).mkdir(exist_ok=True)
+        observer = Observer()
+        observer.schedule(_Handler(), str(self.project_root), recursive=True)
+        observer.start()
+        with self._lock:
+            self._observer = observer
+            self._invalidate_locked()
+
+    def stop(self) -> None:
+        """Stop watching; subsequent queries fall back to full scans."""
+        observer = self._observer
+        self._observer = None
+        if observer is None:
+            return
+        try:
+            observer.stop()
+            observer.join(timeout=1.0)
+        except Exception as e:
+            agent_logger.debug("Workdir watcher stop failed", error=str(e))
+
+    @property
+    def running(self) -> bool:
+        observer = self._observer
+        if observer is None or not observer.is_alive():
+            return False
+        emitters = list(observer.emitters)
+        if emitters and all(emitter.is_alive() for emitter in emitters):
+            return True
+        # An emitter thread died (error, or the project root was removed):
+        # events are no longer produced, so history cannot be trusted
+        agent_logger.warning(
+            "Workdir watcher emitter stopped, using full scans",
+            project=str(self.project_root),
+        )
+        self.invalidate()
+        self.stop()
+        return False
+
+    # ---- recording ----
+    def _relative(self, path: Any) -> str | None:
+        if isinstance(path, bytes):
+            path = path.decode("utf-8", "surrogateescape")
+        try:
+            rel = Path(path).relative_to(self.project_root).as_posix()
+        except ValueError:
+            return None
+        if rel in ("", ".") or rel.split("/", 1)[0] in _SKIPPED_ROOTS:
+            return None
+        return rel
+
+    def _handle_event(self, event: FileSystemEvent) -> None:
+        barrier = self._barrier_path
+        if barrier is not None and os.fsdecode(event.src_path) == barrier:
+            self._barrier_seen.set()
+            return
+        if event.event_type in ("opened", "closed_no_write"):
+            return
+        if event.is_directory and event.event_type in ("modified", "closed"):
+            # Directory mtime changes accompany child events we already record
+            return
+
+        paths = [event.src_path]
+        dest = getattr(event, "dest_path", "")
+        if dest:
+            paths.append(dest)
+
+        with self._lock:
+            for path in paths:
+                rel = self._relative(path)
+                if rel is None:
+                    continue
+                self._seq += 1
+                if event.is_directory:
+                    self._dirs[rel] = self._seq
+                else:
+                    self._files[rel] = self._seq
+            if len(self._files) + len(self._dirs) > MAX_TRACKED_PATHS:
+                self._compact_locked()
+
+    def _compact_locked(self) -> None:
+        """Forget history no baseline needs; overflow if that is not enough."""
+        if self._baselines:
+            floor = min(b.token for b in self._baselines.values())
+            self._files = {p: s for p, s in self._files.items() if s > floor}
+            self._dirs = {p: s for p, s in self._dirs.items() if s > floor}
+        if len(self._files) + len(self._dirs) > MAX_TRACKED_PATHS:
+            agent_logger.info(
+                "Workdir watcher overflow, next checkpoint does a full scan",
+                project=str(self.project_root),
+            )
+            self._invalidate_locked()
+
+    def _flush(self) -> bool:
+        """Wait until every event that happened before this call was recorded.
+
+        Creates a barrier file and waits for its event; returns False if the
+        event did not arrive (lost in a kernel overflow, or a stuck emitter).
+        """
+        with self._barrier_lock:
+            self._barrier_count += 1
+            path = (
+                self.project_root
+                / _BARRIER_DIR
+                / f"{_BARRIER_PREFIX}{os.getpid()}-{self._barrier_count}"
+            )
+            self._barrier_seen.clear()
+            self._barrier_path = str(path)
+            try:
+                path.touch()
+                seen = self._barrier_seen.wait(BARRIER_TIMEOUT_SECONDS)
+            except OSError as e:
+                agent_logger.debug("Workdir watcher barrier failed", error=str(e))
+                seen = False
+            finally:
+                self._barrier_path = None
+                try:
+                    path.unlink(missing_ok=True)
+                except OSError:
+                    pass
+
+            self._barrier_failures = 0 if seen else self._barrier_failures + 1
+            return seen
+
+    def _invalidate_locked(self) -> None:
+        self._seq += 1
+        self._epoch = self._seq
+        self._files.clear()
+        self._dirs.clear()
+        self._baselines.clear()
+
+    def invalidate(self) -> None:
+        """Drop all history; every consumer falls back to a full scan once."""
+        with self._lock:
+            self._invalidate_locked()
+
+    # ---- queries ----
+    def token(self) -> int:
+        """Current sequence number; take it *before* scanning the workdir."""
+        with self._lock:
+            return self._seq
+
+    def changes_since(self, token: int) -> DirtyPaths | None:
+        """Paths touched after token, or None if a full scan is required."""
+        if not self.running:
+            return None
+        if not self._flush():
+            agent_logger.info(
+                "Workdir watcher lost events, next checkpoint does a full scan",
+                project=str(self.project_root),
+            )
+            self.invalidate()
+            if self._barrier_failures >= MAX_BARRIER_FAILURES:
+                agent_logger.warning(
+                    "Workdir watcher does not deliver events, using full scans",
+                    project=str(self.project_root),
+                )
+                self.stop()
+            return None
+        with self._lock:
+            if token < self._epoch:
+                return None
+            return DirtyPaths(
+                files={p for p, s in self._files.items() if s > token},
+                dirs={p for p, s in self._dirs.items() if s > token},
+            )
+
+    def get_baseline(self, key: str) -> WatchBaseline | None:
+        with self._lock:
+            return self._baselines.get(key)
+
+    def set_baseline(self, key: str, token: int, tree_id: bytes) -> None:
+        """Remember that a full view of the workdir at token produced tree_id."""
+        with self._lock:
+            if token >= self._epoch:
+                self._baselines[key] = WatchBaseline(token, tree_id)
+
+    def clear_baseline(self, key: str) -> None:
+        with self._lock:
+            self._baselines.pop(key, None)
+
+
+_watchers: dict[str, WorkdirWatcher] = {}
+_watchers_lock = threading.Lock()
+_overflow_hook_lock = threading.Lock()
+_overflow_hook_installed = False
+
+
+def _on_events_lost(reason: str) -> None:
+    """Drop the history of every watcher; their next checkpoint does a full scan."""
+    with _watchers_lock:
+        watchers = list(_watchers.values())
+    for watcher in watchers:
+        agent_logger.info(
+            "Workdir watcher lost events, next checkpoint does a full scan",
+            project=str(watcher.project_root),
+            reason=reason,
+        )
+        watcher.invalidate()
+
+
+def _install_overflow_hook() -> None:
+    """Report inotify queue overflows, which watchdog silently skips.
+
+    The kernel signals dropped events with an IN_Q_OVERFLOW record (wd -1) that
+    watchdog's parser yields and its reader discards. Wrapping the parser is
+    the only place it is visible; the record does not say which watch it came
+    from, so every watcher is invalidated.
+    """
+    global _overflow_hook_installed
+    with _overflow_hook_lock:
+        if _overflow_hook_installed:
+            return
+        _overflow_hook_installed = True
+        try:
+            from watchdog.observers.inotify_c import Inotify, InotifyConstants
+        except Exception:
+            return  # not Linux: no inotify backend
+
+        parse = Inotify._parse_event_buffer
+
+        def parse_event_buffer(
+            event_buffer: bytes,
+        ) -> Iterator[tuple[int, int, int, bytes]]:
+            for wd, mask, cookie, name in parse(event_buffer):
+                if wd == -1 and mask & InotifyConstants.IN_Q_OVERFLOW:
+                    _on_events_lost("inotify queue overflow")
+                yield wd, mask, cookie, name
+
+        Inotify._parse_event_buffer = staticmethod(  # type: ignore[method-assign,assignment]
+            parse_event_buffer
+        )
+
+
+def get_workdir_watcher(project_root: Path) -> WorkdirWatcher | None:
+    """Return the running watcher for a project, if any."""
+    with _watchers_lock:
+        watcher = _watchers.get(str(project_root.resolve()))
+    if watcher is None or not watcher.running:
+        return None
+    return watcher
+
+
+def start_workdir_watcher(project_root: Path) -> WorkdirWatcher | None:
+    """Start (or return the already running) watcher for a project.
+
+    Returns None if the platform cannot watch the directory; callers then keep
+    using full scans.
+    """
+    key = str(project_root.resolve())
+    with _watchers_lock:
+        watcher = _watchers.get(key)
+        if watcher is not None and watcher.running:
+            return watcher
+        watcher = WorkdirWatcher(project_root)
+        try:
+            watcher.start()
+        except Exception as e:
+            agent_logger.warning(
+                "Workdir watcher unavailable, using full scans",
+                project=key,
+                error=str(e),
+            )
+            return None
+        _watchers[key] = watcher
+    agent_logger.info("Started workdir watcher", project=key)
+    return watcher
+
+
+def stop_workdir_watchers() -> None:
+    """Stop all project watchers (server shutdown)."""
+    with _watchers_lock:
+        watchers = list(_watchers.values())
+        _watchers.clear()
+    for watcher in watchers:
+        watcher.stop()
@@ -9,7 +9,7 @@ from typing import Any, Literal, TypedDict
 from pydantic import BaseModel, Field
 
 from agentsmithy.domain.events import EventType
-from agentsmithy.services.versioning import VersioningTracker
+from agentsmithy.services.versioning import get_versioning_tracker
 from agentsmithy.tools.core.types import ToolError, parse_tool_result
 from agentsmithy.tools.registry import register_summary_for
 
@@ -64,8 +64,7 @@ class DeleteFileTool(BaseTool):
         else:
             file_path = (Path(project_root) / input_path).resolve()
 
-        tracker = VersioningTracker(project_root, dialog_id=self._dialog_id)
-        tracker.ensure_repo()
+        tracker = get_versioning_tracker(project_root, self._dialog_id)
         tracker.start_edit([str(file_path)])
 
         try:
@@ -101,9 +100,11 @@ class DeleteFileTool(BaseTool):
                     # File is outside project root, use absolute path
                     index_path = str(file_path)
 
-                # Remove from vector store
+                # Remove from vector store, and make sure a queued reindex
+                # of the file does not bring it back
                 vector_store = self._project.get_vector_store()
-                vector_store.delete_by_source(index_path)
+                await vector_store.adelete_by_source(index_path)
+                vector_store.index_queue.enqueue_removal(index_path)
         except Exception:
             # Silently ignore RAG deletion errors
             pass
@@ -96,21 +96,18 @@ class ListFilesTool(BaseTool):
                     details={"path": str(base)},
                 )
 
-            if recursive:
-                for p in base.rglob("*"):
-                    # Check if path should be ignored relative to base (not workspace)
-                    # This allows listing .github contents when explicitly requested
-                    if restrictions.is_ignored_relative_to(p, base):
-                        continue
-                    # Check if hidden files should be included relative to base
-                    # This allows listing .github contents when explicitly requested
-                    if not restrictions.should_include_hidden_relative_to(
-                        p, base, include_hidden
-                    ):
-                        continue
-                    items.append(str(p))
-            else:
-                for p in base.glob("*"):
+            # Walk directory by directory so ignored and hidden directories are
+            # pruned instead of listed and filtered entry by entry
+            pending = [base]
+            while pending:
+                directory = pending.pop()
+                try:
+                    children = list(directory.iterdir())
+                except PermissionError:
+                    if directory == base:
+                        raise
+                    continue
+                for p in children:
                     # Check if path should be ignored relative to base (not workspace)
                     # This allows listing .github contents when explicitly requested
                     if restrictions.is_ignored_relative_to(p, base):
@@ -122,6 +119,8 @@ class ListFilesTool(BaseTool):
                     ):
                         continue
                     items.append(str(p))
+                    if recursive and p.is_dir() and not p.is_symlink():
+                        pending.append(p)
 
             return {
                 "type": "list_files_result",
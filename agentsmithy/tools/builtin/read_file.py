@@ -94,15 +94,10 @@ class ReadFileTool(BaseTool):
                         # File is outside project root, use absolute path
                         index_path = str(file_path)
 
-                    # Index in vector store (async, non-blocking)
-                    from agentsmithy.core.background_tasks import get_background_manager
-
+                    # Queue for indexing: repeated writes coalesce, files share
+                    # embeddings requests (see agentsmithy/rag/index_queue.py)
                     vector_store = self._project.get_vector_store()
-                    # Run in background with proper task tracking
-                    get_background_manager().create_task(
-                        vector_store.index_file(index_path, content),
-                        name=f"rag_index:{index_path}",
-                    )
+                    vector_store.index_queue.enqueue(index_path, content)
             except Exception:
                 # Silently ignore RAG indexing errors
                 pass
@@ -9,6 +9,7 @@ from pydantic import BaseModel, Field
 
 from agentsmithy.platforms import get_os_adapter
 from agentsmithy.platforms.base import LocaleEnvBuilder
+from agentsmithy.services.workdir_scan import invalidate_workdir_scans
 from agentsmithy.tools.core import result as result_factory
 from agentsmithy.tools.core.types import ToolError, parse_tool_result
 from agentsmithy.tools.registry import register_summary_for
@@ -191,6 +192,10 @@ class RunCommandTool(BaseTool):
                         "os": _os_context(),
                     },
                 )
+            finally:
+                # The command may have written project files
+                if self._project_root:
+                    invalidate_workdir_scans(self._project_root)
 
             duration_ms = int((time.perf_counter() - start) * 1000)
 
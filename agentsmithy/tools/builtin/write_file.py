@@ -9,7 +9,7 @@ from typing import Any, Literal, TypedDict
 from pydantic import BaseModel, Field
 
 from agentsmithy.domain.events import EventType
-from agentsmithy.services.versioning import VersioningTracker
+from agentsmithy.services.versioning import get_versioning_tracker
 from agentsmithy.tools.core.types import ToolError, parse_tool_result
 from agentsmithy.tools.registry import register_summary_for
 
@@ -66,8 +66,7 @@ class WriteFileTool(BaseTool):
         else:
             file_path = (Path(project_root) / input_path).resolve()
 
-        tracker = VersioningTracker(project_root, dialog_id=self._dialog_id)
-        tracker.ensure_repo()
+        tracker = get_versioning_tracker(project_root, self._dialog_id)
         tracker.start_edit([str(file_path)])
         file_path.parent.mkdir(parents=True, exist_ok=True)
         try:
@@ -97,15 +96,10 @@ class WriteFileTool(BaseTool):
                     # File is outside project root, use absolute path
                     index_path = str(file_path)
 
-                # Index in vector store (async, non-blocking)
-                from agentsmithy.core.background_tasks import get_background_manager
-
+                # Queue for indexing: repeated writes coalesce, files share
+                # embeddings requests (see agentsmithy/rag/index_queue.py)
                 vector_store = self._project.get_vector_store()
-                # Run in background with proper task tracking
-                get_background_manager().create_task(
-                    vector_store.index_file(index_path, kwargs["content"]),
-                    name=f"rag_index:{index_path}",
-                )
+                vector_store.index_queue.enqueue(index_path, kwargs["content"])
         except Exception:
             # Silently ignore RAG indexing errors
             pass
@@ -1,6 +1,7 @@
 """
 File restrictions module for controlling access to files and directories.
-Contains hardcoded patterns for ignored directories.
+Contains hardcoded patterns for ignored directories and honours the project's
+.gitignore files through the shared ignore matcher.
 """
 
 from __future__ import annotations
@@ -8,6 +9,12 @@ from __future__ import annotations
 from pathlib import Path
 from typing import Any
 
+from agentsmithy.services.ignore_matcher import (
+    GITIGNORE_FILENAME,
+    IgnoreMatcher,
+    get_ignore_matcher,
+)
+
 
 class FileRestrictions:
     """Controls file/directory access by enforcing ignore patterns."""
@@ -42,6 +49,35 @@ class FileRestrictions:
     def __init__(self, workspace_root: str | Path):
         """Initialize FileRestrictions with a workspace root."""
         self.workspace_root = Path(workspace_root).resolve()
+        self.ignore_matcher: IgnoreMatcher = get_ignore_matcher(
+            self.workspace_root, include_defaults=False
+        )
+        self._base_gitignored: dict[Path, bool] = {}
+
+    def refresh_ignore_patterns(self) -> None:
+        """Pick up .gitignore changes (once per tool call, not per path)."""
+        self.ignore_matcher = get_ignore_matcher(
+            self.workspace_root, include_defaults=False
+        )
+        self._base_gitignored = {}
+
+    def _rel_posix(self, path: Path) -> str | None:
+        """Path relative to the workspace root, or None if outside it."""
+        try:
+            rel = path.relative_to(self.workspace_root).as_posix()
+        except ValueError:
+            return None
+        return None if rel == "." else rel
+
+    def is_gitignored(self, path: Path) -> bool:
+        """Check if a .gitignore file of the workspace excludes the path.
+
+        Parent directories count: a file in an ignored directory is ignored.
+        """
+        rel = self._rel_posix(path)
+        if rel is None:
+            return False
+        return not self.ignore_matcher.is_visible(rel, is_dir=path.is_dir())
 
     def _is_dir_name_ignored(self, dir_name: str) -> bool:
         """Check if a directory name (not full path) should be ignored."""
@@ -104,7 +140,7 @@ class FileRestrictions:
         if path.is_dir() and self.is_ignored_directory(path):
             return True
 
-        return False
+        return self.is_gitignored(path)
 
     def is_ignored_relative_to(self, path: Path, base: Path) -> bool:
         """
@@ -135,6 +171,14 @@ class FileRestrictions:
         if path.is_dir() and self._is_dir_name_ignored(path.name):
             return True
 
+        # .gitignore rules apply unless the base itself is excluded by them
+        # (an explicitly requested directory is listed like .github above)
+        base_ignored = self._base_gitignored.get(base)
+        if base_ignored is None:
+            base_ignored = self._base_gitignored[base] = self.is_gitignored(base)
+        if path != base and not base_ignored:
+            return self.is_gitignored(path)
+
         return False
 
     def filter_paths(
@@ -236,7 +280,7 @@ class FileRestrictions:
         """Get information about current ignore patterns."""
         return {
             "default_ignored_dirs": sorted(list(self.DEFAULT_IGNORE_DIRS)),
-            "has_ignore_file": False,
+            "has_ignore_file": (self.workspace_root / GITIGNORE_FILENAME).exists(),
         }
 
 
@@ -256,5 +300,7 @@ def get_file_restrictions(workspace_root: str | Path) -> FileRestrictions:
         or _restrictions_instance.workspace_root != workspace_root
     ):
         _restrictions_instance = FileRestrictions(workspace_root)
+    else:
+        _restrictions_instance.refresh_ignore_patterns()
 
     return _restrictions_instance
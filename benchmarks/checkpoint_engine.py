@@ -0,0 +1,470 @@
+"""Benchmark suite for the checkpoint engine (VersioningTracker).
+
+Generates synthetic projects of a given size (mixed file sizes, nested
+directories, a .gitignore, optionally a project .git) and times the operations
+the API performs on every chat turn:
+
+    create_checkpoint        cold, on an untouched project
+    has_uncommitted_changes  after a batch of edits
+    get_staged_files         include_diff=True, edits staged like the file tools
+    create_checkpoint        incremental, after the edits
+    restore_checkpoint       back to the cold checkpoint
+    approve_all
+
+For each operation wall time, peak RSS and the number of objects written to
+the shadow repo and the shared object store are recorded. Results are written
+as JSON; ``--thresholds`` turns them into a local regression gate.
+
+Usage:
+    python -m benchmarks.checkpoint_engine --sizes 1000 10000 --output bench.json
+    python -m benchmarks.checkpoint_engine --thresholds benchmarks/thresholds.json
+    python -m benchmarks.checkpoint_engine --baseline old.json --tolerance 0.25
+
+Each scenario runs in its own subprocess so memory from one project size does
+not leak into the next.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from queue import Empty
+from typing import Any
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+DEFAULT_SEED = 1234
+
+# Share of files touched between the cold and the incremental checkpoint
+EDIT_RATIO = 0.01
+MIN_EDITS = 10
+
+# (size in bytes, weight): mostly small sources, some medium, a few large files
+_FILE_SIZES = ((400, 60), (4_000, 30), (64_000, 9), (1_000_000, 1))
+_FILES_PER_DIR = 50
+
+_WORDS = (
+    "def class return import self value result config path items index "
+    "update create delete async await lambda yield None True False"
+).split()
+
+
+@dataclass
+class OperationResult:
+    """Measurements of a single benchmarked operation."""
+
+    scenario: str
+    files: int
+    project_git: bool
+    operation: str
+    wall_s: float
+    peak_rss_mb: float | None
+    objects_written: int
+
+
+# ---- synthetic projects ----
+
+
+def _text(rng: random.Random, size: int) -> bytes:
+    words: list[str] = []
+    length = 0
+    while length < size:
+        line = " ".join(rng.choices(_WORDS, k=rng.randint(3, 12)))
+        words.append(line)
+        length += len(line) + 1
+    return ("\n".join(words)[:size] + "\n").encode()
+
+
+def generate_project(root: Path, files: int, seed: int = DEFAULT_SEED) -> list[str]:
+    """Create a synthetic project and return its tracked relative paths.
+
+    Content is derived from ``seed`` so runs are reproducible. Ignored
+    directories (node_modules, build output) are created as well, since the
+    scanner has to skip them.
+    """
+    rng = random.Random(seed)
+    sizes = [s for s, _ in _FILE_SIZES]
+    weights = [w for _, w in _FILE_SIZES]
+    # Reuse a small pool of contents per size class: real projects rarely have
+    # 100k distinct 1MB files and generation should stay fast
+    pools = {s: [_text(rng, s) for _ in range(8)] for s in sizes}
+
+    root.mkdir(parents=True, exist_ok=True)
+    (root / ".gitignore").write_text(".agentsmithy/\nnode_modules/\nbuild/\n*.log\n")
+
+    paths: list[str] = []
+    for i in range(files):
+        d = i // _FILES_PER_DIR
+        rel = f"src/pkg{d // 20}/mod{d % 20}/file{i}.py"
+        size = rng.choices(sizes, weights)[0]
+        content = rng.choice(pools[size]) + f"# {i}\n".encode()
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+        paths.append(rel)
+
+    for i in range(max(1, files // 100)):
+        ignored = root / "node_modules" / f"dep{i // 50}" / f"index{i}.js"
+        ignored.parent.mkdir(parents=True, exist_ok=True)
+        ignored.write_bytes(b"module.exports = {};\n")
+    return paths
+
+
+def init_project_git(root: Path) -> bool:
+    """Commit the project to its own git repo; False if git is unavailable."""
+    git = shutil.which("git")
+    if git is None:
+        return False
+    env = {
+        **os.environ,
+        "GIT_AUTHOR_NAME": "bench",
+        "GIT_AUTHOR_EMAIL": "bench@example.com",
+        "GIT_COMMITTER_NAME": "bench",
+        "GIT_COMMITTER_EMAIL": "bench@example.com",
+    }
+    for args in (["init", "-q"], ["add", "-A"], ["commit", "-q", "-m", "initial"]):
+        subprocess.run([git, *args], cwd=root, env=env, check=True)
+    return True
+
+
+def edit_project(
+    root: Path, paths: list[str], seed: int = DEFAULT_SEED
+) -> tuple[list[str], list[str], list[str]]:
+    """Modify, add and delete a small share of files.
+
+    Returns:
+        Tuple of (modified, added, deleted) relative paths
+    """
+    rng = random.Random(seed + 1)
+    count = max(MIN_EDITS, int(len(paths) * EDIT_RATIO))
+    touched = rng.sample(paths, min(len(paths), count + count // 5))
+    modified, deleted = touched[:count], touched[count:]
+
+    for rel in modified:
+        path = root / rel
+        path.write_bytes(path.read_bytes() + b"# edited\n")
+    for rel in deleted:
+        (root / rel).unlink()
+    added = [f"src/new/file{i}.py" for i in range(count // 5 or 1)]
+    for rel in added:
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(_text(rng, 2_000))
+    return modified, added, deleted
+
+
+# ---- measurement ----
+
+
+def _reset_peak_rss() -> bool:
+    """Reset the kernel's peak RSS counter (Linux only)."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss_mb(reset_ok: bool) -> float | None:
+    """Peak RSS since the last reset, or of the whole process if unsupported."""
+    if reset_ok:
+        try:
+            with open("/proc/self/status") as f:
+                for line in f:
+                    if line.startswith("VmHWM:"):
+                        return int(line.split()[1]) / 1024
+        except OSError:
+            pass
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _object_count(tracker: Any) -> int:
+    total = 0
+    for stats in (tracker.get_storage_stats(), tracker.get_shared_storage_stats()):
+        total += stats["loose_objects"] + stats["packed_objects"]
+    return total
+
+
+def _measure(
+    results: list[OperationResult],
+    scenario: dict[str, Any],
+    tracker: Any,
+    operation: str,
+    func: Callable[[], Any],
+) -> Any:
+    objects_before = _object_count(tracker)
+    reset_ok = _reset_peak_rss()
+    start = time.perf_counter()
+    value = func()
+    wall = time.perf_counter() - start
+    peak = _peak_rss_mb(reset_ok)
+    results.append(
+        OperationResult(
+            scenario=scenario["name"],
+            files=scenario["files"],
+            project_git=scenario["project_git"],
+            operation=operation,
+            wall_s=round(wall, 4),
+            peak_rss_mb=round(peak, 1) if peak is not None else None,
+            objects_written=_object_count(tracker) - objects_before,
+        )
+    )
+    return value
+
+
+def run_scenario(
+    files: int, project_git: bool, workdir: Path, seed: int = DEFAULT_SEED
+) -> list[OperationResult]:
+    """Generate one synthetic project and benchmark the checkpoint operations."""
+    from agentsmithy.db.sessions import create_initial_session
+    from agentsmithy.services.versioning import VersioningTracker
+
+    name = f"{files}-{'git' if project_git else 'nogit'}"
+    root = workdir / name
+    paths = generate_project(root, files, seed)
+    if project_git and not init_project_git(root):
+        raise RuntimeError("git binary not found; cannot build project .git")
+
+    tracker = VersioningTracker(str(root), "bench")
+    create_initial_session(tracker._get_db_path())
+    scenario = {"name": name, "files": files, "project_git": project_git}
+    results: list[OperationResult] = []
+
+    initial = _measure(
+        results,
+        scenario,
+        tracker,
+        "create_checkpoint_cold",
+        lambda: tracker.create_checkpoint("initial"),
+    )
+
+    modified, added, deleted = edit_project(root, paths, seed)
+    for rel in modified + added:
+        tracker.stage_file(rel)
+    for rel in deleted:
+        tracker.stage_file_deletion(rel)
+
+    _measure(
+        results,
+        scenario,
+        tracker,
+        "has_uncommitted_changes",
+        tracker.has_uncommitted_changes,
+    )
+    session = tracker._get_active_session_name()
+    _measure(
+        results,
+        scenario,
+        tracker,
+        "get_staged_files",
+        lambda: tracker.get_staged_files(session, include_diff=True),
+    )
+    _measure(
+        results,
+        scenario,
+        tracker,
+        "create_checkpoint_incremental",
+        lambda: tracker.create_checkpoint("edits"),
+    )
+    _measure(
+        results,
+        scenario,
+        tracker,
+        "restore_checkpoint",
+        lambda: tracker.restore_checkpoint(initial.commit_id),
+    )
+    _measure(results, scenario, tracker, "approve_all", tracker.approve_all)
+    return results
+
+
+def _scenario_worker(
+    files: int, project_git: bool, workdir: str, seed: int, queue: Any
+) -> None:
+    try:
+        results = run_scenario(files, project_git, Path(workdir), seed)
+        queue.put(("ok", [asdict(r) for r in results]))
+    except Exception as e:  # Reported by the parent
+        queue.put(("error", f"{type(e).__name__}: {e}"))
+
+
+def run_suite(
+    sizes: list[int],
+    git_modes: list[bool],
+    seed: int = DEFAULT_SEED,
+    workdir: Path | None = None,
+    isolate: bool = True,
+) -> dict[str, Any]:
+    """Run every (size, project .git) scenario and return the JSON report."""
+    results: list[dict[str, Any]] = []
+    errors: dict[str, str] = {}
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        for files in sizes:
+            for project_git in git_modes:
+                name = f"{files}-{'git' if project_git else 'nogit'}"
+                if not isolate:
+                    results += [
+                        asdict(r)
+                        for r in run_scenario(files, project_git, Path(tmp), seed)
+                    ]
+                    continue
+                ctx = multiprocessing.get_context("spawn")
+                queue = ctx.Queue()
+                proc = ctx.Process(
+                    target=_scenario_worker,
+                    args=(files, project_git, tmp, seed, queue),
+                )
+                proc.start()
+                while True:
+                    try:
+                        status, payload = queue.get(timeout=1)
+                        break
+                    except Empty:
+                        if not proc.is_alive():
+                            status = "error"
+                            payload = f"worker exited with code {proc.exitcode}"
+                            break
+                proc.join()
+                if status == "ok":
+                    results += payload
+                else:
+                    errors[name] = payload
+                shutil.rmtree(Path(tmp) / name, ignore_errors=True)
+
+    return {
+        "meta": {
+            "created_at": datetime.now(UTC).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "seed": seed,
+        },
+        "results": results,
+        "errors": errors,
+    }
+
+
+# ---- regression gate ----
+
+
+def check_thresholds(report: dict[str, Any], thresholds: dict[str, Any]) -> list[str]:
+    """Compare a report against absolute limits.
+
+    ``thresholds`` maps ``"<scenario>/<operation>"`` (``*`` matches any
+    scenario; scenario-specific entries override it per metric) to limits for
+    ``wall_s``, ``peak_rss_mb`` and ``objects_written``.
+
+    Returns:
+        Human-readable violations (empty if the run passes)
+    """
+    violations: list[str] = []
+    limits_by_key = thresholds.get("limits", thresholds)
+    for result in report["results"]:
+        # Scenario-specific limits override the wildcard ones
+        limits = {
+            **limits_by_key.get(f"*/{result['operation']}", {}),
+            **limits_by_key.get(f"{result['scenario']}/{result['operation']}", {}),
+        }
+        for metric, limit in limits.items():
+            value = result.get(metric)
+            if value is not None and value > limit:
+                violations.append(
+                    f"{result['scenario']}/{result['operation']}: "
+                    f"{metric}={value} exceeds {limit}"
+                )
+    for name, error in report.get("errors", {}).items():
+        violations.append(f"{name}: failed ({error})")
+    return violations
+
+
+def compare_to_baseline(
+    report: dict[str, Any], baseline: dict[str, Any], tolerance: float
+) -> list[str]:
+    """Flag operations that got slower than a previous run by more than tolerance.
+
+    Timings below 50ms are ignored; they are dominated by noise.
+    """
+    previous = {
+        f"{r['scenario']}/{r['operation']}": r for r in baseline.get("results", [])
+    }
+    violations: list[str] = []
+    for result in report["results"]:
+        key = f"{result['scenario']}/{result['operation']}"
+        old = previous.get(key)
+        if old is None or max(old["wall_s"], result["wall_s"]) < 0.05:
+            continue
+        if result["wall_s"] > old["wall_s"] * (1 + tolerance):
+            violations.append(
+                f"{key}: wall_s={result['wall_s']} vs baseline {old['wall_s']} "
+                f"(+{(result['wall_s'] / old['wall_s'] - 1) * 100:.0f}%)"
+            )
+    return violations
+
+
+def _print_table(report: dict[str, Any]) -> None:
+    print(f"{'scenario':<14} {'operation':<30} {'wall_s':>9} {'rss_mb':>8} {'objs':>8}")
+    for r in report["results"]:
+        rss = "-" if r["peak_rss_mb"] is None else f"{r['peak_rss_mb']:.1f}"
+        print(
+            f"{r['scenario']:<14} {r['operation']:<30} {r['wall_s']:>9.3f} "
+            f"{rss:>8} {r['objects_written']:>8}"
+        )
+    for name, error in report["errors"].items():
+        print(f"{name:<14} FAILED: {error}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument(
+        "--git",
+        choices=("both", "with", "without"),
+        default="both",
+        help="Benchmark projects with a project .git, without, or both",
+    )
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--workdir", type=Path, help="Where to generate projects")
+    parser.add_argument("--output", type=Path, help="Write the JSON report here")
+    parser.add_argument("--thresholds", type=Path, help="Fail on absolute limits")
+    parser.add_argument("--baseline", type=Path, help="Fail on slowdowns vs a report")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    git_modes = {"both": [False, True], "with": [True], "without": [False]}[args.git]
+    report = run_suite(args.sizes, git_modes, args.seed, args.workdir)
+
+    _print_table(report)
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+
+    violations: list[str] = []
+    if args.thresholds:
+        violations += check_thresholds(report, json.loads(args.thresholds.read_text()))
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        violations += compare_to_baseline(report, baseline, args.tolerance)
+    for violation in violations:
+        print(f"REGRESSION {violation}", file=sys.stderr)
+    return 1 if violations or report["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
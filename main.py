@@ -9,6 +9,7 @@ Requires --workdir path and proper configuration (model and API key).
 
 import argparse
 import asyncio
+import multiprocessing
 import os
 import shutil
 import signal
@@ -22,6 +23,9 @@ sys.path.insert(0, str(Path(__file__).parent))
 shutdown_event = asyncio.Event()
 
 if __name__ == "__main__":
+    # Checkpoint hashing workers are spawned; frozen builds must dispatch them here
+    multiprocessing.freeze_support()
+
     # Parse arguments FIRST (before any config validation) so --help works always
     parser = argparse.ArgumentParser(description="Start AgentSmithy server")
     parser.add_argument(
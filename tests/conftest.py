@@ -31,6 +31,16 @@ def cleanup_background_tasks():
         pass
 
 
+@pytest.fixture(autouse=True)
+def cleanup_vector_stores():
+    """Drop shared vector store managers so each test starts with fresh clients."""
+    yield
+
+    from agentsmithy.rag.vector_store import shutdown_vector_stores
+
+    shutdown_vector_stores()
+
+
 @pytest.fixture(autouse=True)
 def temp_global_config_dir(monkeypatch, tmp_path_factory):
     """Use a temporary directory for global config during tests."""
@@ -0,0 +1,78 @@
+"""Smoke tests for the checkpoint engine benchmark suite.
+
+Runs a tiny scenario in-process to make sure the suite keeps working as the
+checkpoint engine evolves, and checks the regression gate logic.
+"""
+
+import json
+from pathlib import Path
+
+from benchmarks.checkpoint_engine import (
+    check_thresholds,
+    compare_to_baseline,
+    run_suite,
+)
+
+OPERATIONS = [
+    "create_checkpoint_cold",
+    "has_uncommitted_changes",
+    "get_staged_files",
+    "create_checkpoint_incremental",
+    "restore_checkpoint",
+    "approve_all",
+]
+
+
+def test_suite_reports_every_operation(tmp_path: Path):
+    report = run_suite([60], [False], workdir=tmp_path, isolate=False)
+
+    assert report["errors"] == {}
+    results = {r["operation"]: r for r in report["results"]}
+    assert list(results) == OPERATIONS
+    assert all(r["scenario"] == "60-nogit" for r in results.values())
+    assert all(r["wall_s"] >= 0 for r in results.values())
+
+    # 60 files + .gitignore, plus trees and the commit
+    assert results["create_checkpoint_cold"]["objects_written"] > 61
+    # Only the edited files are written again; restore writes nothing
+    assert 0 < results["create_checkpoint_incremental"]["objects_written"] < 61
+    assert results["restore_checkpoint"]["objects_written"] == 0
+
+    # Report is machine-readable
+    assert json.loads(json.dumps(report)) == report
+
+
+def test_thresholds_gate():
+    report = {
+        "results": [
+            {
+                "scenario": "1000-git",
+                "operation": "restore_checkpoint",
+                "wall_s": 2.5,
+                "peak_rss_mb": 90.0,
+                "objects_written": 3,
+            }
+        ],
+        "errors": {},
+    }
+    thresholds = {
+        "limits": {
+            "*/restore_checkpoint": {"wall_s": 10.0, "objects_written": 0},
+            "1000-git/restore_checkpoint": {"wall_s": 1.0},
+        }
+    }
+
+    violations = check_thresholds(report, thresholds)
+    assert len(violations) == 2
+    assert any("wall_s=2.5 exceeds 1.0" in v for v in violations)
+    assert any("objects_written=3 exceeds 0" in v for v in violations)
+
+    baseline = {"results": [{**report["results"][0], "wall_s": 1.0}]}
+    assert compare_to_baseline(report, baseline, tolerance=0.25)
+    assert not compare_to_baseline(report, baseline, tolerance=2.0)
+
+
+def test_shipped_thresholds_name_known_operations():
+    path = Path(__file__).parent.parent / "benchmarks" / "thresholds.json"
+    limits = json.loads(path.read_text())["limits"]
+    assert {key.split("/", 1)[1] for key in limits} <= set(OPERATIONS)
@@ -0,0 +1,185 @@
+"""Tests for content-defined chunking of large files in checkpoints.
+
+Verifies that:
+1. Chunk boundaries after an insertion are unchanged
+2. Chunked files restore, diff and compare like plain blobs
+3. Unchanged chunks are shared between checkpoints and survive maintenance
+4. A project file named like the manifest marker never makes a manifest
+"""
+
+import io
+from pathlib import Path
+
+import pytest
+from dulwich.objects import Blob, Tree
+
+from agentsmithy.services import chunked_files
+from agentsmithy.services.chunked_files import (
+    is_manifest,
+    iter_content_chunks,
+    read_manifest_info,
+)
+from agentsmithy.services.versioning import FileChangeStatus, VersioningTracker
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    """Smaller chunks keep the files (and maintenance repacks) small."""
+    monkeypatch.setattr(chunked_files, "CHUNK_MIN_SIZE", 2048)
+    monkeypatch.setattr(chunked_files, "CHUNK_MAX_SIZE", 16384)
+    monkeypatch.setattr(chunked_files, "CHUNK_BOUNDARY_BITS", 5)
+
+
+def _dump(rows: range, extra: dict[int, str] | None = None) -> bytes:
+    lines = []
+    for i in rows:
+        lines.append(f"INSERT INTO t VALUES ({i}, 'row {i * 7919 % 10007}');\n")
+        if extra and i in extra:
+            lines.append(extra[i])
+    return "".join(lines).encode()
+
+
+def _tracker(tmp_path: Path, rows: int = 2000) -> tuple[VersioningTracker, Path]:
+    project_root = tmp_path / "project"
+    project_root.mkdir()
+    (project_root / "small.txt").write_text("small\n")
+    (project_root / "dump.sql").write_bytes(_dump(range(rows)))
+    tracker = VersioningTracker(str(project_root), "dialog", chunk_min_size=1024)
+    return tracker, project_root
+
+
+def _manifest(tracker: VersioningTracker, commit_id: str, path: bytes) -> Tree:
+    repo = tracker.ensure_repo()
+    _mode, sha = repo[repo[commit_id.encode()].tree][path]
+    return repo[sha]
+
+
+def test_chunks_after_insertion_are_unchanged():
+    data = _dump(range(2000))
+    edited = _dump(range(2000), {100: "-- inserted line\n"})
+
+    before = list(iter_content_chunks(io.BytesIO(data)))
+    after = list(iter_content_chunks(io.BytesIO(edited)))
+
+    assert b"".join(before) == data and b"".join(after) == edited
+    assert len(before) > 3
+    assert all(len(chunk) <= chunked_files.CHUNK_MAX_SIZE for chunk in before)
+    # Only the chunk holding the insertion differs
+    assert len(set(after) - set(before)) == 1
+    assert len(after) == len(before)
+
+
+def test_large_file_is_stored_chunked(tmp_path: Path):
+    tracker, project_root = _tracker(tmp_path)
+    cp = tracker.create_checkpoint("first")
+
+    repo = tracker.ensure_repo()
+    manifest = _manifest(tracker, cp.commit_id, b"dump.sql")
+    assert is_manifest(repo.object_store, manifest)
+    data = (project_root / "dump.sql").read_bytes()
+    info = read_manifest_info(repo.object_store, manifest)
+    assert info.size == len(data)
+    assert info.blob_sha == Blob.from_string(data).id
+    # Small files stay plain blobs
+    _mode, small_sha = repo[repo[cp.commit_id.encode()].tree][b"small.txt"]
+    assert isinstance(repo[small_sha], Blob)
+
+    assert tracker.has_uncommitted_changes() is False
+
+
+def test_unchanged_chunks_are_shared(tmp_path: Path):
+    tracker, project_root = _tracker(tmp_path)
+    cp1 = tracker.create_checkpoint("first")
+    (project_root / "dump.sql").write_bytes(
+        _dump(range(2000), {100: "-- inserted line\n"})
+    )
+    assert tracker.has_uncommitted_changes() is True
+    cp2 = tracker.create_checkpoint("second")
+
+    first = {
+        sha
+        for _name, _mode, sha in _manifest(tracker, cp1.commit_id, b"dump.sql").items()
+    }
+    second = {
+        sha
+        for _name, _mode, sha in _manifest(tracker, cp2.commit_id, b"dump.sql").items()
+    }
+    # Marker and the edited chunk are new, every other chunk is reused
+    assert len(second - first) == 2
+
+
+def test_restore_and_diff_chunked_file(tmp_path: Path):
+    tracker, project_root = _tracker(tmp_path)
+    original = (project_root / "dump.sql").read_bytes()
+    cp1 = tracker.create_checkpoint("first")
+    repo = tracker.ensure_repo()
+    repo.refs[b"refs/heads/base"] = cp1.commit_id.encode()
+
+    (project_root / "dump.sql").write_bytes(
+        _dump(range(2000), {1000: "-- inserted line\n"})
+    )
+    cp2 = tracker.create_checkpoint("second")
+    repo.refs[b"refs/heads/head"] = cp2.commit_id.encode()
+
+    changes = tracker.get_tree_diff("base", "head", include_diff=False)
+    assert [(c["path"], c["status"]) for c in changes] == [
+        ("dump.sql", FileChangeStatus.MODIFIED)
+    ]
+    assert changes[0]["additions"] == 1
+    assert changes[0]["deletions"] == 0
+
+    tracker.restore_checkpoint(cp1.commit_id)
+    assert (project_root / "dump.sql").read_bytes() == original
+    assert tracker.has_uncommitted_changes() is True
+
+
+def test_staged_copy_of_chunked_file_is_not_a_change(tmp_path: Path):
+    tracker, _project_root = _tracker(tmp_path)
+    tracker.create_checkpoint("first")
+
+    tracker.stage_file("dump.sql")
+
+    assert tracker.get_staged_files() == []
+
+
+def test_maintenance_keeps_chunks(tmp_path: Path):
+    # Pure-Python deltification makes repacks slow: keep the file small
+    tracker, project_root = _tracker(tmp_path, rows=300)
+    original = (project_root / "dump.sql").read_bytes()
+    cp1 = tracker.create_checkpoint("first")
+    (project_root / "dump.sql").write_bytes(_dump(range(250)))
+    tracker.create_checkpoint("second")
+
+    tracker.run_maintenance()
+    tracker.run_shared_maintenance()
+
+    tracker.restore_checkpoint(cp1.commit_id)
+    assert (project_root / "dump.sql").read_bytes() == original
+
+
+def test_real_marker_file_is_not_a_manifest(tmp_path: Path):
+    tracker, project_root = _tracker(tmp_path)
+    data_dir = project_root / "data"
+    data_dir.mkdir()
+    (data_dir / "notes.txt").write_text("notes\n")
+    (data_dir / ".asm-chunked").write_bytes(b"agentsmithy-chunked 1\nsize 6\n")
+    cp1 = tracker.create_checkpoint("first")
+
+    repo = tracker.ensure_repo()
+    _mode, data_sha = repo[repo[cp1.commit_id.encode()].tree][b"data"]
+    assert chunked_files.MANIFEST_MARKER not in repo[data_sha]
+    assert tracker.has_uncommitted_changes() is False
+
+    (data_dir / "notes.txt").write_text("edited\n")
+    tracker.restore_checkpoint(cp1.commit_id)
+    assert (data_dir / "notes.txt").read_text() == "notes\n"
+    assert (data_dir / ".asm-chunked").exists()
+
+    # Directories of older checkpoints holding such a file stay directories
+    marker = Blob.from_string(b"user data\n")
+    notes = Blob.from_string(b"notes\n")
+    tree = Tree()
+    tree.add(chunked_files.MANIFEST_MARKER, 0o100644, marker.id)
+    tree.add(b"notes.txt", 0o100644, notes.id)
+    repo.object_store.add_objects([(marker, None), (notes, None), (tree, None)])
+    assert not is_manifest(repo.object_store, tree)
@@ -0,0 +1,77 @@
+"""Tests for incremental, diff-based checkpoint restore.
+
+Verifies that:
+1. Files already matching the target blob are not rewritten
+2. The result lists exactly the written and deleted paths
+3. Only parents of deleted files are pruned when empty
+"""
+
+from pathlib import Path
+from unittest.mock import patch
+
+from agentsmithy.services.versioning import VersioningTracker
+
+
+def _project(tmp_path: Path) -> Path:
+    project_root = tmp_path / "project"
+    project_root.mkdir()
+    return project_root
+
+
+def test_restore_writes_only_changed_files(tmp_path: Path):
+    project_root = _project(tmp_path)
+    for i in range(5):
+        (project_root / f"f{i}.txt").write_text(f"v1 {i}")
+    tracker = VersioningTracker(str(project_root), "dialog")
+    cp1 = tracker.create_checkpoint("first")
+
+    (project_root / "f0.txt").write_text("v2 0")
+    tracker.create_checkpoint("second")
+    # Uncommitted edit of a file identical in HEAD and target
+    (project_root / "f1.txt").write_text("dirty")
+
+    written: list[str] = []
+    original_write_bytes = Path.write_bytes
+
+    def tracked_write_bytes(self, data):
+        written.append(self.name)
+        return original_write_bytes(self, data)
+
+    with patch.object(Path, "write_bytes", tracked_write_bytes):
+        changed = tracker.restore_checkpoint(cp1.commit_id)
+
+    assert sorted(written) == ["f0.txt", "f1.txt"]
+    assert sorted(changed) == ["f0.txt", "f1.txt"]
+    assert (project_root / "f0.txt").read_text() == "v1 0"
+    assert (project_root / "f1.txt").read_text() == "v1 1"
+
+
+def test_restore_reports_deleted_and_prunes_only_their_parents(tmp_path: Path):
+    project_root = _project(tmp_path)
+    (project_root / "keep.txt").write_text("keep")
+    tracker = VersioningTracker(str(project_root), "dialog")
+    cp1 = tracker.create_checkpoint("first")
+
+    nested = project_root / "new" / "deep"
+    nested.mkdir(parents=True)
+    (nested / "added.py").write_text("x = 1")
+    tracker.create_checkpoint("second")
+
+    # Unrelated empty directory must survive the restore
+    (project_root / "empty_user_dir").mkdir()
+
+    changed = tracker.restore_checkpoint(cp1.commit_id)
+
+    assert changed == ["new/deep/added.py"]
+    assert not (project_root / "new").exists()
+    assert (project_root / "empty_user_dir").is_dir()
+    assert (project_root / "keep.txt").read_text() == "keep"
+
+
+def test_restore_without_changes_is_noop(tmp_path: Path):
+    project_root = _project(tmp_path)
+    (project_root / "a.txt").write_text("a")
+    tracker = VersioningTracker(str(project_root), "dialog")
+    cp = tracker.create_checkpoint("first")
+
+    assert tracker.restore_checkpoint(cp.commit_id) == []
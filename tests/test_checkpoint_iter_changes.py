@@ -0,0 +1,120 @@
+"""Tests for the streaming working-directory comparison (iter_changes).
+
+Verifies that:
+1. Added, modified and deleted files are reported with their status
+2. The generator is lazy: the first change is yielded before the walk ends
+3. Blob sizes are read from object headers, including deltified pack entries
+4. Files are hashed in a streaming fashion with git's blob SHA
+5. has_uncommitted_changes() does not hide failures as "no changes"
+"""
+
+import random
+from pathlib import Path
+from unittest.mock import patch
+
+from dulwich.objects import Blob
+from dulwich.repo import Repo
+
+from agentsmithy.services.checkpoint_maintenance import (
+    ObjectSizeReader,
+    repack_repository,
+)
+from agentsmithy.services.versioning import (
+    FileChangeStatus,
+    VersioningTracker,
+    _hash_file_as_blob,
+)
+
+
+def _project(tmp_path: Path) -> Path:
+    project_root = tmp_path / "project"
+    (project_root / "src").mkdir(parents=True)
+    (project_root / "src" / "a.py").write_text("A = 1\n")
+    (project_root / "src" / "b.py").write_text("B = 1\n")
+    (project_root / "README.md").write_text("# readme\n")
+    return project_root
+
+
+def test_iter_changes_reports_each_status(tmp_path: Path):
+    project_root = _project(tmp_path)
+    tracker = VersioningTracker(str(project_root), "dialog")
+    tracker.create_checkpoint("initial")
+    assert list(tracker.iter_changes()) == []
+
+    (project_root / "src" / "a.py").write_text("A = 2\n")  # same size
+    (project_root / "README.md").unlink()
+    (project_root / "src" / "c.py").write_text("C = 1\n")
+
+    changes = dict(tracker.iter_changes())
+    assert changes == {
+        "src/a.py": FileChangeStatus.MODIFIED,
+        "README.md": FileChangeStatus.DELETED,
+        "src/c.py": FileChangeStatus.ADDED,
+    }
+
+    only_deleted = list(tracker.iter_changes(statuses={FileChangeStatus.DELETED}))
+    assert only_deleted == [("README.md", FileChangeStatus.DELETED)]
+
+
+def test_iter_changes_is_lazy(tmp_path: Path):
+    project_root = _project(tmp_path)
+    for i in range(20):
+        (project_root / "src" / f"extra{i}.py").write_text(f"X = {i}\n")
+    tracker = VersioningTracker(str(project_root), "dialog")
+    tracker.create_checkpoint("initial")
+    (project_root / "new.txt").write_text("new")
+
+    walked: list[str] = []
+    original = VersioningTracker._iter_workdir_files
+
+    def tracking_walk(self, ignore_spec, start=""):
+        for item in original(self, ignore_spec, start):
+            walked.append(item[0])
+            yield item
+
+    with patch.object(VersioningTracker, "_iter_workdir_files", tracking_walk):
+        assert tracker.has_uncommitted_changes() is True
+
+    # The root directory is listed first, src/ is never entered
+    assert "new.txt" in walked
+    assert not any(path.startswith("src/") for path in walked)
+
+
+def test_object_size_reader_reads_headers(tmp_path: Path):
+    repo = Repo.init(str(tmp_path), mkdir=False)
+    base = bytes(random.Random(0).getrandbits(8) for _ in range(4000))
+    blobs = [Blob.from_string(base + bytes([i]) * i) for i in range(1, 5)]
+    loose = Blob.from_string(b"x" * 1234)
+    repo.object_store.add_object(loose)
+    repo.object_store.add_objects([(blob, None) for blob in blobs])
+
+    with ObjectSizeReader(repo.object_store) as sizes:
+        assert sizes.size(loose.id) == 1234
+        assert [sizes.size(b.id) for b in blobs] == [len(b.data) for b in blobs]
+        assert sizes.size(b"0" * 40) is None
+
+    # Repacking deltifies the similar blobs; sizes come from delta headers
+    repack_repository(repo, extra_roots=[b.id for b in [*blobs, loose]], prune=False)
+    with ObjectSizeReader(repo.object_store) as sizes:
+        assert [sizes.size(b.id) for b in blobs] == [len(b.data) for b in blobs]
+
+
+def test_streaming_hash_matches_blob_id(tmp_path: Path):
+    target = tmp_path / "data.bin"
+    content = bytes(range(256)) * 5000
+    target.write_bytes(content)
+
+    assert _hash_file_as_blob(target, len(content)) == Blob.from_string(content).id
+    assert _hash_file_as_blob(target, len(content) - 1) is None
+
+
+def test_has_uncommitted_changes_surfaces_errors(tmp_path: Path):
+    project_root = _project(tmp_path)
+    tracker = VersioningTracker(str(project_root), "dialog")
+    tracker.create_checkpoint("initial")
+    assert tracker.has_uncommitted_changes() is False
+
+    with patch.object(
+        VersioningTracker, "_collect_tree_entries", side_effect=RuntimeError("boom")
+    ):
+        assert tracker.has_uncommitted_changes() is True
@@ -0,0 +1,125 @@
+"""Tests for checkpoint metadata stored in the dialog journal.
+
+Verifies that:
+1. Listings follow session lineage (approved kept, abandoned hidden) without
+   walking the commit graph
+2. Cursor pagination returns every checkpoint exactly once, newest page first
+3. Page queries are index range scans, never full table scans
+4. Dialogs with only legacy metadata.json are imported on first listing
+"""
+
+import json
+import sqlite3
+from pathlib import Path
+from unittest.mock import patch
+
+from dulwich.repo import Repo
+
+from agentsmithy.db import checkpoints as checkpoints_db
+from agentsmithy.db.checkpoints import ensure_checkpoints_table
+from agentsmithy.db.sessions import create_initial_session
+from agentsmithy.services.versioning import VersioningTracker
+
+
+def _tracker(tmp_path: Path) -> tuple[Path, VersioningTracker]:
+    project_root = tmp_path / "project"
+    project_root.mkdir()
+    tracker = VersioningTracker(str(project_root), "dialog")
+    create_initial_session(tracker._get_db_path())
+    return project_root, tracker
+
+
+def test_listing_follows_session_lineage(tmp_path: Path):
+    project_root, tracker = _tracker(tmp_path)
+    (project_root / "a.txt").write_text("1")
+    first = tracker.create_checkpoint("first")
+    (project_root / "a.txt").write_text("2")
+    second = tracker.create_checkpoint("second")
+    approval = tracker.approve_all()
+
+    (project_root / "a.txt").write_text("3")
+    abandoned = tracker.create_checkpoint("abandoned")
+    tracker.reset_to_approved()
+
+    # No commit object is read: the journal alone answers
+    with patch.object(Repo, "__getitem__") as get_object:
+        ids = [cp.commit_id for cp in tracker.list_checkpoints()]
+        assert tracker.has_checkpoint(second.commit_id)
+        assert not tracker.has_checkpoint(abandoned.commit_id)
+    get_object.assert_not_called()
+
+    assert ids == [first.commit_id, second.commit_id, approval["approved_commit"]]
+
+    (project_root / "a.txt").write_text("4")
+    latest = tracker.create_checkpoint("latest")
+    messages = [cp.message for cp in tracker.list_checkpoints()]
+    assert messages[-1] == "latest"
+    assert tracker.has_checkpoint(latest.commit_id)
+
+
+def test_pagination_is_newest_first(tmp_path: Path):
+    project_root, tracker = _tracker(tmp_path)
+    created = []
+    for i in range(7):
+        (project_root / "a.txt").write_text(str(i))
+        created.append(tracker.create_checkpoint(f"cp {i}").commit_id)
+
+    page, has_more = tracker.list_checkpoints_page(limit=3)
+    assert [cp.commit_id for cp in page] == created[4:]
+    assert has_more
+
+    seen = [cp.commit_id for cp in page]
+    while has_more:
+        page, has_more = tracker.list_checkpoints_page(limit=3, before=page[0].seq)
+        seen = [cp.commit_id for cp in page] + seen
+    assert seen == created
+    assert all(cp.created_at for cp in tracker.list_checkpoints())
+
+
+def test_page_query_uses_indexes(tmp_path: Path):
+    db_path = tmp_path / "journal.sqlite"
+    ensure_checkpoints_table(db_path)
+
+    captured: list[str] = []
+    real_connect = sqlite3.connect
+
+    def recording_connect(*args, **kwargs):
+        conn = real_connect(*args, **kwargs)
+        conn.set_trace_callback(captured.append)
+        return conn
+
+    with patch.object(checkpoints_db.sqlite3, "connect", recording_connect):
+        checkpoints_db.list_checkpoints(db_path, "session_1", limit=20, before=500)
+    query = next(q for q in captured if q.lstrip().startswith("SELECT"))
+
+    with real_connect(str(db_path)) as conn:
+        plan = conn.execute(f"EXPLAIN QUERY PLAN {query}").fetchall()
+    details = [row[-1] for row in plan]
+    assert not any(d.startswith("SCAN checkpoints") for d in details), details
+
+
+def test_legacy_metadata_is_imported(tmp_path: Path):
+    project_root, tracker = _tracker(tmp_path)
+    (project_root / "a.txt").write_text("1")
+    first = tracker.create_checkpoint("first")
+    (project_root / "a.txt").write_text("2")
+    second = tracker.create_checkpoint("second")
+
+    # Simulate a dialog created before checkpoints were journaled
+    with sqlite3.connect(str(tracker._get_db_path())) as conn:
+        conn.execute("DELETE FROM checkpoints")
+    (tracker.shadow_root / "metadata.json").write_text(
+        json.dumps({first.commit_id: {"message": "legacy message"}})
+    )
+
+    listed = tracker.list_checkpoints()
+    assert [(cp.commit_id, cp.message) for cp in listed] == [
+        (first.commit_id, "legacy message"),
+        (second.commit_id, "second"),
+    ]
+
+    # Imported once: the next listing reads the journal only
+    (tracker.shadow_root / "metadata.json").unlink()
+    with patch.object(Repo, "__getitem__") as get_object:
+        assert tracker.list_checkpoints() == listed
+    get_object.assert_not_called()
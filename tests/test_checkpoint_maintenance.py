@@ -0,0 +1,175 @@
+"""Tests for checkpoint packfile writing and background maintenance.
+
+Verifies that:
+1. Each checkpoint writes its new objects as a single packfile
+2. Maintenance consolidates packs without losing history
+3. Old unreachable objects are pruned while staged and recent ones are kept
+4. Repacks do not restart the grace period of unreachable objects
+5. Background runs for a project are spaced out, and a forced run leaves the
+   shared store to its thresholds
+"""
+
+import os
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from dulwich.objects import Blob
+
+from agentsmithy.services import checkpoint_maintenance
+from agentsmithy.services.checkpoint_maintenance import (
+    claim_background_maintenance,
+    repack_repository,
+    run_maintenance_background,
+)
+from agentsmithy.services.versioning import VersioningTracker
+
+
+def _tracker(tmp_path: Path) -> tuple[VersioningTracker, Path]:
+    project_root = tmp_path / "project"
+    (project_root / "src").mkdir(parents=True)
+    for i in range(5):
+        (project_root / "src" / f"m{i}.py").write_text(f"value = {i}\n" * 20)
+    return VersioningTracker(str(project_root), "dialog"), project_root
+
+
+def _add_loose_blob(tracker: VersioningTracker, data: bytes, age: int = 0) -> bytes:
+    repo = tracker.ensure_repo()
+    blob = Blob.from_string(data)
+    repo.object_store.add_object(blob)
+    if age:
+        path = repo.object_store._get_shafile_path(blob.id)
+        old = time.time() - age
+        os.utime(path, (old, old))
+    return blob.id
+
+
+def test_checkpoint_writes_single_pack(tmp_path: Path):
+    tracker, project_root = _tracker(tmp_path)
+    tracker.create_checkpoint("first")
+    before = tracker.get_shared_storage_stats()
+
+    (project_root / "src" / "m0.py").write_text("changed\n")
+    (project_root / "new.txt").write_text("new")
+    tracker.create_checkpoint("second")
+    after = tracker.get_shared_storage_stats()
+
+    # Blobs and trees land in one shared pack; only the commit is dialog-local
+    assert after["packs"] == before["packs"] + 1
+    assert after["loose_objects"] == before["loose_objects"]
+
+
+def test_maintenance_consolidates_packs(tmp_path: Path):
+    tracker, project_root = _tracker(tmp_path)
+    first = tracker.create_checkpoint("v0")
+    for i in range(4):
+        (project_root / "src" / "m0.py").write_text(f"value = {i}\n" * 21)
+        tracker.create_checkpoint(f"v{i + 1}")
+    assert tracker.get_shared_storage_stats()["packs"] >= 5
+    assert tracker.get_storage_stats()["loose_objects"] >= 5
+
+    result = tracker.run_maintenance()
+    tracker.run_shared_maintenance()
+
+    assert result["before"]["loose_objects"] >= 5
+    stats = tracker.get_storage_stats()
+    assert stats["packs"] == 1
+    assert stats["loose_objects"] == 0
+    shared = tracker.get_shared_storage_stats()
+    assert shared["packs"] == 1
+    assert shared["loose_objects"] == 0
+    assert len(tracker.list_checkpoints()) >= 5
+
+    tracker.restore_checkpoint(first.commit_id)
+    assert (project_root / "src" / "m0.py").read_text() == "value = 0\n" * 20
+
+
+def test_maintenance_prunes_only_old_unreachable(tmp_path: Path):
+    tracker, project_root = _tracker(tmp_path)
+    tracker.create_checkpoint("first")
+
+    old_garbage = _add_loose_blob(tracker, b"aborted edit", age=7200)
+    fresh_garbage = _add_loose_blob(tracker, b"in-flight edit")
+    (project_root / "staged.txt").write_text("staged content")
+    tracker.stage_file("staged.txt")
+    staged_sha = Blob.from_string(b"staged content").id
+    os.utime(
+        tracker.ensure_repo().object_store._get_shafile_path(staged_sha),
+        (time.time() - 7200,) * 2,
+    )
+
+    result = tracker.run_maintenance()
+
+    store = tracker.ensure_repo().object_store
+    assert result["pruned"] == 1
+    assert old_garbage not in store
+    assert fresh_garbage in store
+    assert staged_sha in store
+
+
+def test_repacks_keep_the_age_of_unreachable_objects(tmp_path: Path):
+    tracker, project_root = _tracker(tmp_path)
+    tracker.create_checkpoint("first")
+    store = tracker.ensure_repo().object_store
+
+    loose_orphan = _add_loose_blob(tracker, b"orphaned by a reset", age=1800)
+    # Packed while still referenced, e.g. by a checkpoint a reset dropped
+    packed_orphan = Blob.from_string(b"superseded")
+    pack = store.add_objects([(packed_orphan, None)])
+    old = time.time() - 1800
+    os.utime(pack.data.path, (old, old))
+
+    # Repacks far more often than the grace period
+    for i in range(3):
+        (project_root / "src" / "m0.py").write_text(f"edit {i}\n")
+        tracker.create_checkpoint(f"edit {i}")
+        result = tracker.run_maintenance()
+        assert result["pruned"] == 0
+        assert result["kept_loose"] == 2
+        for sha in (loose_orphan, packed_orphan.id):
+            assert store.contains_loose(sha)
+            assert time.time() - store.get_object_mtime(sha) >= 1800
+
+    result = repack_repository(tracker.ensure_repo(), grace_period=1000)
+    assert result["pruned"] == 2
+    store = tracker.ensure_repo().object_store
+    assert loose_orphan not in store
+    assert packed_orphan.id not in store
+
+
+@pytest.mark.asyncio
+async def test_background_runs_are_spaced_out(tmp_path: Path):
+    _tracker(tmp_path)
+    project_root = str(tmp_path / "project")
+    last_run = checkpoint_maintenance._last_run
+    key = str(Path(project_root).resolve())
+    interval = checkpoint_maintenance.MAINTENANCE_MIN_INTERVAL_SECONDS
+
+    assert claim_background_maintenance(project_root)
+    assert not claim_background_maintenance(project_root)
+
+    # The interval also counts from the end of the run
+    last_run[key] -= interval
+    await run_maintenance_background(project_root, "dialog")
+    assert not claim_background_maintenance(project_root)
+
+    last_run[key] -= interval
+    assert claim_background_maintenance(project_root)
+
+
+@pytest.mark.asyncio
+async def test_forced_run_only_forces_the_dialog_repo(tmp_path: Path):
+    tracker, _project_root = _tracker(tmp_path)
+    tracker.create_checkpoint("first")
+
+    with (
+        patch.object(VersioningTracker, "run_maintenance") as dialog_run,
+        patch.object(VersioningTracker, "run_shared_maintenance") as shared_run,
+    ):
+        await run_maintenance_background(
+            str(tmp_path / "project"), "dialog", force=True
+        )
+
+    dialog_run.assert_called_once()
+    shared_run.assert_not_called()
@@ -0,0 +1,110 @@
+"""Tests for nested checkpoint trees.
+
+Verifies that:
+1. Checkpoints are stored as git-style nested trees (one tree per directory)
+2. Unchanged directories keep the same subtree SHA across checkpoints
+3. Diffs and restores work across nested and legacy flat trees
+"""
+
+import time
+from pathlib import Path
+
+from dulwich.objects import Blob, Commit, Tree, parse_timezone
+
+from agentsmithy.services.versioning import VersioningTracker
+
+
+def _root_tree(tracker: VersioningTracker, commit_id: str) -> Tree:
+    repo = tracker.ensure_repo()
+    return repo[repo[commit_id.encode()].tree]
+
+
+def _tag(tracker: VersioningTracker, name: str, commit_id: str) -> str:
+    """Point a branch at a commit so it can be passed to get_tree_diff."""
+    tracker.ensure_repo().refs[f"refs/heads/{name}".encode()] = commit_id.encode()
+    return name
+
+
+def _make_project(tmp_path: Path) -> Path:
+    project_root = tmp_path / "project"
+    (project_root / "src" / "pkg").mkdir(parents=True)
+    (project_root / "docs").mkdir()
+    (project_root / "README.md").write_text("readme")
+    (project_root / "src" / "pkg" / "mod.py").write_text("x = 1\n")
+    (project_root / "docs" / "guide.md").write_text("guide")
+    return project_root
+
+
+def test_checkpoint_writes_nested_trees(tmp_path: Path):
+    project_root = _make_project(tmp_path)
+    tracker = VersioningTracker(str(project_root), "dialog")
+    cp = tracker.create_checkpoint("first")
+
+    repo = tracker.ensure_repo()
+    root = _root_tree(tracker, cp.commit_id)
+    names = {name.decode() for name, _mode, _sha in root.items()}
+    assert names == {"README.md", "src", "docs"}
+
+    _mode, src_sha = root[b"src"]
+    assert isinstance(repo[src_sha], Tree)
+    _mode, blob_sha = root.lookup_path(repo.__getitem__, b"src/pkg/mod.py")
+    assert repo[blob_sha].data == b"x = 1\n"
+
+
+def test_unchanged_subtree_is_reused(tmp_path: Path):
+    project_root = _make_project(tmp_path)
+    tracker = VersioningTracker(str(project_root), "dialog")
+    cp1 = tracker.create_checkpoint("first")
+
+    (project_root / "src" / "pkg" / "mod.py").write_text("x = 2\n")
+    cp2 = tracker.create_checkpoint("second")
+
+    root1 = _root_tree(tracker, cp1.commit_id)
+    root2 = _root_tree(tracker, cp2.commit_id)
+    assert root1[b"docs"] == root2[b"docs"]
+    assert root1[b"src"] != root2[b"src"]
+
+    changes = tracker.get_tree_diff(
+        _tag(tracker, "a", cp1.commit_id), _tag(tracker, "b", cp2.commit_id)
+    )
+    assert [c["path"] for c in changes] == ["src/pkg/mod.py"]
+    assert changes[0]["status"] == "modified"
+
+
+def test_diff_and_restore_from_legacy_flat_tree(tmp_path: Path):
+    project_root = tmp_path / "project"
+    (project_root / "src").mkdir(parents=True)
+    (project_root / "src" / "a.py").write_text("old")
+    (project_root / "b.txt").write_text("b")
+
+    tracker = VersioningTracker(str(project_root), "dialog")
+    repo = tracker.ensure_repo()
+
+    # Older checkpoints stored every file in the root tree with "/" in the name
+    blob_a = Blob.from_string(b"old")
+    blob_b = Blob.from_string(b"b")
+    flat = Tree()
+    flat.add(b"src/a.py", 0o100644, blob_a.id)
+    flat.add(b"b.txt", 0o100644, blob_b.id)
+    commit = Commit()
+    commit.tree = flat.id
+    commit.parents = []
+    commit.author = commit.committer = b"Test <test@test.com>"
+    commit.commit_time = commit.author_time = int(time.time())
+    commit.commit_timezone = commit.author_timezone = parse_timezone(b"+0000")[0]
+    commit.message = b"legacy"
+    repo.object_store.add_objects(
+        [(blob_a, None), (blob_b, None), (flat, None), (commit, None)]
+    )
+    legacy_id = commit.id.decode()
+
+    (project_root / "src" / "a.py").write_text("new")
+    cp = tracker.create_checkpoint("nested")
+
+    changes = tracker.get_tree_diff(
+        _tag(tracker, "legacy", legacy_id), _tag(tracker, "nested", cp.commit_id)
+    )
+    assert [(c["path"], c["status"]) for c in changes] == [("src/a.py", "modified")]
+
+    tracker.restore_checkpoint(legacy_id)
+    assert (project_root / "src" / "a.py").read_text() == "old"
@@ -0,0 +1,91 @@
+"""Tests for the project-wide object store shared by dialog shadow repos.
+
+Verifies that:
+1. A new dialog's first checkpoint reuses content stored by another dialog
+2. Dialog repos reference the shared store through a relative alternate
+3. Shared maintenance keeps content referenced by any live dialog only
+"""
+
+import os
+import shutil
+import time
+from pathlib import Path
+
+from dulwich.objects import Blob
+
+from agentsmithy.services.checkpoint_maintenance import _iter_loose_shas
+from agentsmithy.services.versioning import VersioningTracker
+
+
+def _own_object_types(tracker: VersioningTracker) -> set[type]:
+    store = tracker.ensure_repo().object_store
+    shas = set(_iter_loose_shas(Path(store.path)))
+    for pack in store.packs:
+        shas.update(pack)
+    return {type(store[sha]) for sha in shas}
+
+
+def _project(tmp_path: Path) -> Path:
+    project_root = tmp_path / "project"
+    (project_root / "src").mkdir(parents=True)
+    for i in range(10):
+        (project_root / "src" / f"m{i}.py").write_text(f"value = {i}\n")
+    return project_root
+
+
+def test_new_dialog_reuses_shared_content(tmp_path: Path):
+    project_root = _project(tmp_path)
+    first = VersioningTracker(str(project_root), "dialog-a")
+    first.create_checkpoint("a")
+    shared_before = first.get_shared_storage_stats()
+
+    second = VersioningTracker(str(project_root), "dialog-b")
+    cp = second.create_checkpoint("b")
+
+    # Same content: nothing new in the shared store, no blobs in the dialog repo
+    assert second.get_shared_storage_stats()["packs"] == shared_before["packs"]
+    assert Blob not in _own_object_types(second)
+
+    (project_root / "src" / "m0.py").write_text("changed")
+    second.restore_checkpoint(cp.commit_id)
+    assert (project_root / "src" / "m0.py").read_text() == "value = 0\n"
+
+
+def test_alternate_is_relative(tmp_path: Path):
+    project_root = _project(tmp_path)
+    tracker = VersioningTracker(str(project_root), "dialog")
+    repo = tracker.ensure_repo()
+    tracker.ensure_repo()  # linking is idempotent
+
+    alternates = Path(repo.object_store.path) / "info" / "alternates"
+    lines = alternates.read_text().splitlines()
+    assert len(lines) == 1
+    assert not os.path.isabs(lines[0])
+
+
+def test_shared_maintenance_drops_content_of_deleted_dialog(tmp_path: Path):
+    project_root = _project(tmp_path)
+    keeper = VersioningTracker(str(project_root), "keeper")
+    keeper.create_checkpoint("shared content")
+
+    doomed = VersioningTracker(str(project_root), "doomed")
+    (project_root / "only_doomed.txt").write_text("unique to doomed dialog")
+    doomed.create_checkpoint("unique content")
+    (project_root / "only_doomed.txt").unlink()
+    unique_sha = Blob.from_string(b"unique to doomed dialog").id
+
+    # Delete the dialog and age the shared packs past the grace period
+    shutil.rmtree(doomed.shadow_root.parent)
+    old = time.time() - 7200
+    for pack_file in (keeper._shared_objects_path / "pack").iterdir():
+        os.utime(pack_file, (old, old))
+
+    result = keeper.run_shared_maintenance()
+
+    store = keeper.ensure_repo().object_store
+    assert result["pruned"] >= 1
+    assert unique_sha not in store
+    assert keeper.get_shared_storage_stats()["packs"] == 1
+    assert (project_root / "src" / "m3.py").read_text() == "value = 3\n"
+    assert len(keeper.list_checkpoints()) >= 1
+    keeper.restore_checkpoint(keeper.list_checkpoints()[-1].commit_id)
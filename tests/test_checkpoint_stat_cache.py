@@ -0,0 +1,119 @@
+"""Tests for the persistent per-dialog stat cache used by checkpoint scans.
+
+Verifies that:
+1. Files with an unchanged stat tuple are not opened on later checkpoints
+2. Same-size edits are still detected (stat tuple changes)
+3. Racily-clean entries (mtime not older than the cache) are re-hashed
+"""
+
+import os
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+from agentsmithy.services.stat_cache import STAT_CACHE_FILENAME, StatCache
+from agentsmithy.services.versioning import VersioningTracker
+
+HOUR_NS = 3600 * 1_000_000_000
+
+
+def _age(path: Path, seconds: int = 3600) -> None:
+    """Move file mtime into the past so cache entries are not racy."""
+    old = time.time_ns() - seconds * 1_000_000_000
+    os.utime(path, ns=(old, old))
+
+
+def _track_reads():
+    original_read_bytes = Path.read_bytes
+    original_open = open
+    reads: list[str] = []
+
+    def tracked_read_bytes(self):
+        reads.append(str(self))
+        return original_read_bytes(self)
+
+    def tracked_open(file_path, *args, **kwargs):
+        reads.append(str(file_path))
+        return original_open(file_path, *args, **kwargs)
+
+    return reads, tracked_read_bytes, tracked_open
+
+
+def _blob_content(tracker: VersioningTracker, commit_id: str, name: str) -> bytes:
+    repo = tracker.ensure_repo()
+    tree = repo[repo[commit_id.encode()].tree]
+    _mode, sha = tree.lookup_path(repo.__getitem__, name.encode())
+    return repo[sha].data
+
+
+def test_second_checkpoint_skips_unchanged_files(tmp_path: Path):
+    project_root = tmp_path / "project"
+    project_root.mkdir()
+    for i in range(5):
+        f = project_root / f"file{i}.txt"
+        f.write_text(f"content {i}")
+        _age(f)
+
+    tracker = VersioningTracker(str(project_root), "dialog")
+    tracker.create_checkpoint("first")
+    assert (tracker.shadow_root / STAT_CACHE_FILENAME).exists()
+
+    (project_root / "file0.txt").write_text("changed content")
+
+    reads, tracked_read_bytes, tracked_open = _track_reads()
+    with patch.object(Path, "read_bytes", tracked_read_bytes):
+        with patch("builtins.open", tracked_open):
+            cp = tracker.create_checkpoint("second")
+
+    touched = {Path(r).name for r in reads}
+    assert "file0.txt" in touched
+    for i in range(1, 5):
+        assert f"file{i}.txt" not in touched
+    assert _blob_content(tracker, cp.commit_id, "file0.txt") == b"changed content"
+    assert _blob_content(tracker, cp.commit_id, "file3.txt") == b"content 3"
+
+
+def test_same_size_edit_is_detected(tmp_path: Path):
+    project_root = tmp_path / "project"
+    project_root.mkdir()
+    target = project_root / "code.py"
+    target.write_text("x = 1234567")
+    _age(target, seconds=7200)
+
+    tracker = VersioningTracker(str(project_root), "dialog")
+    tracker.create_checkpoint("first")
+
+    # Same size, different content; mtime moves but stays well in the past
+    target.write_text("y = 7654321")
+    _age(target)
+
+    cp = tracker.create_checkpoint("second")
+    assert _blob_content(tracker, cp.commit_id, "code.py") == b"y = 7654321"
+
+
+def test_racy_entries_are_rehashed(tmp_path: Path):
+    project_root = tmp_path / "project"
+    project_root.mkdir()
+    target = project_root / "racy.txt"
+    target.write_text("aaaa")
+    future = time.time_ns() + HOUR_NS
+    os.utime(target, ns=(future, future))
+
+    tracker = VersioningTracker(str(project_root), "dialog")
+    tracker.create_checkpoint("first")
+
+    cache = StatCache.load(tracker.shadow_root / STAT_CACHE_FILENAME)
+    assert cache.lookup("racy.txt", target.stat()) is None
+
+
+def test_corrupt_cache_is_ignored(tmp_path: Path):
+    project_root = tmp_path / "project"
+    project_root.mkdir()
+    (project_root / "a.txt").write_text("hello")
+
+    tracker = VersioningTracker(str(project_root), "dialog")
+    (tracker.shadow_root / STAT_CACHE_FILENAME).write_text("{not json")
+
+    cp = tracker.create_checkpoint("first")
+    assert _blob_content(tracker, cp.commit_id, "a.txt") == b"hello"
+    assert len(StatCache.load(tracker.shadow_root / STAT_CACHE_FILENAME)) == 1
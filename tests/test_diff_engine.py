@@ -0,0 +1,121 @@
+"""Tests for the checkpoint diff engine and its blob-pair cache.
+
+Verifies that:
+1. Count-only diffs agree with the counts of the unified diff text
+2. Rendered diff text keeps the existing unified diff format
+3. Repeated diffs of the same blob pair are served from the cache
+4. The cache never downgrades a stored diff body and stays bounded
+"""
+
+import difflib
+import random
+from pathlib import Path
+from unittest.mock import patch
+
+from agentsmithy.services import diff_engine
+from agentsmithy.services.diff_engine import (
+    DiffCache,
+    DiffResult,
+    diff_texts,
+    unified_diff_text,
+)
+from agentsmithy.services.versioning import VersioningTracker
+
+
+def _mutate(lines: list[str], rng: random.Random) -> list[str]:
+    result = list(lines)
+    for _ in range(rng.randint(1, 8)):
+        op = rng.choice(["insert", "delete", "replace"])
+        pos = rng.randrange(len(result) + 1)
+        if op == "insert" or not result:
+            result.insert(pos, f"new line {rng.random()}\n")
+        elif op == "delete":
+            del result[min(pos, len(result) - 1)]
+        else:
+            result[min(pos, len(result) - 1)] = f"changed {rng.random()}\n"
+    return result
+
+
+def test_count_only_matches_unified_diff():
+    rng = random.Random(42)
+    base = [f"line {i % 17}\n" for i in range(200)]
+    for _ in range(25):
+        old = "".join(_mutate(base, rng))
+        new = "".join(_mutate(base, rng))
+        counts = diff_texts(old, new, include_text=False)
+        full = diff_texts(old, new, include_text=True)
+        assert (counts.additions, counts.deletions) == (
+            full.additions,
+            full.deletions,
+        )
+
+
+def test_rendered_text_matches_previous_format():
+    old = "a\nb\nc\n-- sql comment\n"
+    new = "a\nB\nc\n"
+    result = diff_texts(old, new, include_text=True)
+
+    expected = "\n".join(
+        difflib.unified_diff(
+            old.splitlines(keepends=True),
+            new.splitlines(keepends=True),
+            fromfile="a/q.sql",
+            tofile="b/q.sql",
+            lineterm="",
+        )
+    )
+    assert unified_diff_text(result, "q.sql") == expected
+    # Removed line starting with "--" is counted (it is not a file header)
+    assert (result.additions, result.deletions) == (1, 2)
+
+
+def test_repeated_tree_diff_uses_cache(tmp_path: Path):
+    project_root = tmp_path / "project"
+    project_root.mkdir()
+    for i in range(5):
+        (project_root / f"f{i}.py").write_text(f"x = {i}\ny = 0\n")
+
+    tracker = VersioningTracker(str(project_root), "dialog")
+    first = tracker.create_checkpoint("first")
+    repo = tracker.ensure_repo()
+    repo.refs[b"refs/heads/base"] = first.commit_id.encode()
+    for i in range(5):
+        (project_root / f"f{i}.py").write_text(f"x = {i}\ny = 1\nz = 2\n")
+    second = tracker.create_checkpoint("second")
+    repo.refs[b"refs/heads/head"] = second.commit_id.encode()
+
+    initial = tracker.get_tree_diff("base", "head", include_diff=True)
+    assert {(c["additions"], c["deletions"]) for c in initial} == {(2, 1)}
+
+    with patch(
+        "agentsmithy.services.versioning.diff_texts",
+        side_effect=AssertionError("recomputed"),
+    ):
+        cached = tracker.get_tree_diff("base", "head", include_diff=True)
+        counts_only = tracker.get_tree_diff("base", "head", include_diff=False)
+
+    assert cached == initial
+    assert {(c["additions"], c["deletions"]) for c in counts_only} == {(2, 1)}
+
+
+def test_cache_keeps_text_and_evicts_oldest(tmp_path: Path):
+    cache = DiffCache(tmp_path / "diff.sqlite", max_entries=3)
+    sha_a, sha_b = b"a" * 40, b"b" * 40
+
+    cache.put(sha_a, sha_b, DiffResult(1, 2, "@@ -1 +1 @@\n-x\n+y"), with_text=True)
+    cache.put(sha_a, sha_b, DiffResult(1, 2), with_text=False)
+    stored = cache.get(sha_a, sha_b, with_text=True)
+    assert stored == DiffResult(1, 2, "@@ -1 +1 @@\n-x\n+y")
+
+    cache.put(sha_b, sha_a, DiffResult(2, 1), with_text=False)
+    assert cache.get(sha_b, sha_a, with_text=True) is None
+    assert cache.get(sha_b, sha_a, with_text=False) == DiffResult(2, 1)
+
+    with patch.object(diff_engine, "_EVICT_EVERY", 1):
+        for i in range(10):
+            cache.put_lines(f"{i:040d}".encode(), i)
+    conn = cache._connect()
+    (count,) = conn.execute("SELECT COUNT(*) FROM diff_stats").fetchone()
+    assert count == 3
+    assert cache.get_lines(f"{9:040d}".encode()) == 9
+    cache.close()
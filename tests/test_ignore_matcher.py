@@ -0,0 +1,178 @@
+"""Tests for the shared, precompiled ignore matcher.
+
+Verifies that:
+1. Compiled pattern lists give the same answers as pathspec
+2. Nested .gitignore files apply relative to their directory
+3. Ignored directories are pruned from checkpoint walks unless a path negation
+   can re-include something inside them
+4. Matchers are cached and recompiled only when a .gitignore changes
+5. list_files and RAG indexing honour the same rules
+"""
+
+import os
+import random
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pathspec
+import pytest
+
+from agentsmithy.services import ignore_matcher
+from agentsmithy.services.ignore_matcher import (
+    DEFAULT_EXCLUDES,
+    _CompiledPatterns,
+    get_ignore_matcher,
+)
+from agentsmithy.services.versioning import VersioningTracker
+from agentsmithy.tools.builtin.list_files import ListFilesTool
+
+
+def _write(root: Path, rel: str, content: str = "x") -> None:
+    path = root / rel
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+
+
+def test_compiled_patterns_match_pathspec():
+    patterns = [
+        "node_modules/",
+        "*.log",
+        "!keep.log",
+        "/config.json",
+        "**/test/**",
+        "docs/*.md",
+        "!docs/README.md",
+        "[Dd]ebug/",
+        *DEFAULT_EXCLUDES,
+    ]
+    spec = pathspec.PathSpec.from_lines("gitwildmatch", patterns)
+    compiled = _CompiledPatterns(patterns)
+    names = [
+        "node_modules", "a", "b.log", "keep.log", "config.json", "test", "docs",
+        "README.md", "x.md", ".idea", "workspace.xml", ".github", "workflows",
+        "Cargo.lock", "foo.xcassets", ".gitignore", "bin", "src", "x.pyc",
+        "Debug", "debug", ".prettierrc", "a~", "codeStyles",
+    ]  # fmt: skip
+
+    rng = random.Random(0)
+    for _ in range(5000):
+        path = "/".join(rng.choice(names) for _ in range(rng.randint(1, 4)))
+        if rng.random() < 0.3:
+            path += "/"
+        assert bool(compiled.check(path)) == spec.match_file(path), path
+
+
+def test_nested_gitignore(tmp_path: Path):
+    _write(tmp_path, ".gitignore", "*.tmp\n")
+    _write(tmp_path, "pkg/.gitignore", "generated/\n/local.cfg\n!keep.tmp\n")
+    matcher = get_ignore_matcher(tmp_path, include_defaults=False)
+
+    assert matcher.is_ignored("a.tmp")
+    assert matcher.is_ignored("pkg/sub/a.tmp")
+    # Deeper .gitignore overrides the root one
+    assert not matcher.is_ignored("pkg/keep.tmp")
+    assert matcher.is_ignored("keep.tmp")
+    # Unanchored patterns match anywhere below their directory, not outside it
+    assert not matcher.is_visible("pkg/sub/generated/out.js")
+    assert matcher.is_visible("generated/out.js")
+    # Anchored patterns only match next to the .gitignore
+    assert matcher.is_ignored("pkg/local.cfg")
+    assert not matcher.is_ignored("pkg/sub/local.cfg")
+
+
+def test_walk_prunes_ignored_directories(tmp_path: Path):
+    _write(tmp_path, "src/main.py")
+    _write(tmp_path, "node_modules/dep/index.js")
+    _write(tmp_path, "node_modules/dep/.gitignore", "dist/\n")
+    _write(tmp_path, ".idea/workspace.xml", "<xml>")
+    _write(tmp_path, ".idea/cache.bin")
+    _write(tmp_path, "pkg/.gitignore", "out/\n")
+    _write(tmp_path, "pkg/out/build.js")
+    tracker = VersioningTracker(str(tmp_path))
+
+    listed: list[str] = []
+    original = os.scandir
+
+    def recording_scandir(path):
+        listed.append(Path(path).relative_to(tmp_path).as_posix())
+        return original(path)
+
+    with patch.object(os, "scandir", recording_scandir):
+        files = {
+            rel for rel, _, _ in tracker._iter_workdir_files(tracker._get_ignore_spec())
+        }
+
+    assert files == {
+        "src/main.py",
+        ".idea/workspace.xml",
+        "pkg/.gitignore",
+    }
+    assert "node_modules" not in listed
+    assert "pkg/out" not in listed
+    # !.idea/workspace.xml keeps .idea walkable
+    assert ".idea" in listed
+
+
+def test_matcher_is_cached_until_gitignore_changes(tmp_path: Path):
+    _write(tmp_path, ".gitignore", "*.log\n")
+    compiled = []
+    original = ignore_matcher._CompiledPatterns
+
+    def counting(patterns):
+        compiled.append(list(patterns))
+        return original(patterns)
+
+    with patch.object(ignore_matcher, "_CompiledPatterns", counting):
+        first = get_ignore_matcher(tmp_path, include_defaults=False)
+        before = len(compiled)
+        second = get_ignore_matcher(tmp_path, include_defaults=False)
+        assert second is first
+        assert len(compiled) == before
+        assert first.is_ignored("a.log")
+
+        _write(tmp_path, ".gitignore", "*.txt\n")
+        st = (tmp_path / ".gitignore").stat()
+        os.utime(tmp_path / ".gitignore", ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        third = get_ignore_matcher(tmp_path, include_defaults=False)
+
+    assert third is first
+    assert compiled[-1] == ["*.txt"]
+    assert not third.is_ignored("a.log")
+    assert third.is_ignored("a.txt")
+
+
+@pytest.mark.asyncio
+async def test_list_files_honours_gitignore(tmp_path: Path):
+    _write(tmp_path, ".gitignore", "generated/\n*.log\n")
+    _write(tmp_path, "src/app.py")
+    _write(tmp_path, "src/debug.log")
+    _write(tmp_path, "generated/api.py")
+
+    tool = ListFilesTool()
+    result = await tool._arun(path=str(tmp_path), recursive=True)
+    items = {Path(p).relative_to(tmp_path).as_posix() for p in result["items"]}
+    assert items == {"src", "src/app.py"}
+
+    # Explicitly requested ignored directory is still listed
+    result = await tool._arun(path=str(tmp_path / "generated"), recursive=True)
+    assert [Path(p).name for p in result["items"]] == ["api.py"]
+
+
+@pytest.mark.asyncio
+async def test_rag_skips_ignored_files(tmp_path: Path):
+    from agentsmithy.rag.vector_store import VectorStoreManager
+
+    _write(tmp_path, ".gitignore", "secrets/\n")
+    manager = VectorStoreManager.__new__(VectorStoreManager)
+    manager.project = MagicMock(root=tmp_path)
+    manager._vectorstore = MagicMock()
+
+    assert manager.is_ignored("secrets/key.txt")
+    assert manager.is_ignored("node_modules/dep/index.js")  # DEFAULT_EXCLUDES
+    assert manager.is_ignored(str(tmp_path / "secrets" / "key.txt"))
+    assert not manager.is_ignored("src/app.py")
+    assert not manager.is_ignored("/elsewhere/file.py")
+
+    with patch.object(VectorStoreManager, "add_documents") as add_documents:
+        assert await manager.index_file("secrets/key.txt", "token") == []
+    add_documents.assert_not_called()
@@ -0,0 +1,168 @@
+"""Tests for the offline hashing embeddings provider.
+
+Verifies that:
+1. Vectors are deterministic, fixed-size and unit length
+2. Related code and prose land closer than unrelated text
+3. A models.embeddings workload on a "local" provider selects it
+4. RAG indexing and search work with it end to end, without a network
+5. Switching embeddings models drops the index built by the previous one,
+   including an unstamped index built before models were recorded
+"""
+
+from contextlib import contextmanager
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from agentsmithy.llm.providers.local import HashingEmbeddings
+from agentsmithy.rag import vector_store
+from agentsmithy.rag.embeddings import EmbeddingsManager
+from agentsmithy.rag.vector_store import shutdown_vector_stores
+
+
+@contextmanager
+def _local_settings(options: dict | None = None):
+    config = {
+        "models.embeddings": {"workload": "local-hashing"},
+        "providers.local": {"type": "local", "options": {}},
+    }
+    workload = {
+        "provider": "local",
+        "model": "local-hashing",
+        "kind": "embeddings",
+        "options": options or {},
+    }
+    mock_settings = MagicMock()
+    mock_settings._get.side_effect = lambda key, default=None: config.get(key, default)
+    mock_settings._get_workload_config.side_effect = lambda name: (
+        workload if name == "local-hashing" else None
+    )
+    with (
+        patch("agentsmithy.rag.embeddings.settings", mock_settings),
+        patch(
+            "agentsmithy.llm.providers.local.provider_embeddings.settings",
+            mock_settings,
+        ),
+    ):
+        yield mock_settings
+
+
+@pytest.fixture
+def local_settings():
+    with _local_settings() as mock_settings:
+        yield mock_settings
+
+
+def test_vectors_are_deterministic_and_normalized():
+    embeddings = HashingEmbeddings(dimensions=256)
+
+    first = embeddings.embed_documents(["def load(path): return path", ""])
+    second = HashingEmbeddings(dimensions=256).embed_documents(
+        ["def load(path): return path", ""]
+    )
+
+    assert first == second
+    assert len(first[0]) == 256
+    assert np.linalg.norm(first[0]) == pytest.approx(1.0, abs=1e-5)
+    assert not any(first[1])
+
+
+def test_related_texts_are_closer():
+    embeddings = HashingEmbeddings()
+    query = np.array(embeddings.embed_query("send an http request"))
+    related, unrelated = np.array(
+        embeddings.embed_documents(
+            [
+                "def sendRequest(url):\n    return http_client.get(url)",
+                "class ColorPalette:\n    primary = '#ff0000'",
+            ]
+        )
+    )
+
+    assert query @ related > query @ unrelated
+
+
+def test_workload_selects_local_provider(local_settings):
+    embeddings = EmbeddingsManager().embeddings
+
+    assert isinstance(embeddings, HashingEmbeddings)
+    assert embeddings.dimensions == 1024
+
+
+def test_workload_options_set_dimensions():
+    with _local_settings({"dimensions": 64}):
+        assert len(EmbeddingsManager().embeddings.embed_query("x")) == 64
+
+
+@pytest.mark.asyncio
+async def test_rag_runs_offline(temp_project, local_settings):
+    manager = temp_project.get_vector_store()
+    await manager.index_file(
+        "staging.py", "def stage_file_deletion(path):\n    return path\n"
+    )
+    await manager.index_file(
+        "palette.py", "class ColorPalette:\n    primary = '#ff0000'\n"
+    )
+
+    docs = await manager.similarity_search("stage a file for deletion", k=1)
+
+    assert docs[0].metadata["source"] == "staging.py"
+
+
+@pytest.mark.asyncio
+async def test_model_switch_drops_index(temp_project, mock_embeddings):
+    manager = temp_project.get_vector_store()
+    await manager.index_file("a.py", "a = 1\n")
+    assert await manager.has_file("a.py")
+    shutdown_vector_stores()
+
+    # 5-dimensional mock vectors in the collection; the local model has 1024
+    with patch.object(vector_store, "embeddings_model_key", return_value="local-model"):
+        manager = temp_project.get_vector_store()
+        assert not await manager.has_file("a.py")
+        await manager.index_file("b.py", "b = 2\n")
+
+        assert (
+            manager.vectorstore.get()["ids"] == manager.manifest.get("b.py").chunk_ids
+        )
+        assert not manager.lexical_index.search(["a"])
+
+
+def _legacy_collection(project, embeddings) -> None:
+    """Index a.py the way releases before the model stamp did (no metadata)."""
+    from chromadb.config import Settings
+    from langchain_chroma import Chroma
+
+    Chroma(
+        collection_name="agentsmithy_docs",
+        embedding_function=embeddings,
+        persist_directory=str(project.state_dir / "rag" / "chroma_db"),
+        client_settings=Settings(anonymized_telemetry=False),
+    ).add_texts(["a = 1"], metadatas=[{"source": "a.py"}])
+
+
+@pytest.mark.asyncio
+async def test_unstamped_index_is_dropped_for_local_model(
+    temp_project, mock_embeddings
+):
+    _legacy_collection(temp_project, mock_embeddings)
+
+    with _local_settings():
+        manager = temp_project.get_vector_store()
+        assert not await manager.has_file("a.py")
+        await manager.index_file("b.py", "b = 2\n")
+        docs = await manager.similarity_search("b", k=1)
+
+    assert docs[0].metadata["source"] == "b.py"
+    metadata = manager.vectorstore._collection.metadata
+    assert metadata[vector_store.EMBEDDINGS_MODEL_METADATA_KEY] == (
+        manager.embeddings_model
+    )
+
+
+@pytest.mark.asyncio
+async def test_unstamped_index_is_kept_for_openai_model(temp_project, mock_embeddings):
+    _legacy_collection(temp_project, mock_embeddings)
+
+    assert await temp_project.get_vector_store().has_file("a.py")
@@ -0,0 +1,86 @@
+"""Tests for hashing and compressing checkpoint blobs in worker processes.
+
+Verifies that:
+1. Encoded blobs carry the same SHA and content as dulwich blobs
+2. Encoded objects are written into a readable pack with a valid index
+3. Large checkpoints use the process pool and restore correctly
+"""
+
+import zlib
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from dulwich.objects import Blob, Tree
+
+from agentsmithy.services import object_encoder
+from agentsmithy.services.checkpoint_maintenance import write_objects_pack
+from agentsmithy.services.object_encoder import (
+    encode_file,
+    get_object_encoder,
+    shutdown_object_encoder,
+)
+from agentsmithy.services.versioning import VersioningTracker
+
+
+@pytest.fixture(autouse=True)
+def stop_workers():
+    yield
+    shutdown_object_encoder()
+
+
+def test_encode_file_matches_blob(tmp_path: Path):
+    path = tmp_path / "data.txt"
+    path.write_bytes(b"hello\n" * 1000)
+
+    encoded = encode_file(str(path))
+
+    blob = Blob.from_string(path.read_bytes())
+    assert encoded.id == blob.id
+    assert encoded.raw_length == len(blob.data)
+    assert zlib.decompress(encoded.compressed) == blob.data
+
+
+def test_encoded_objects_are_packed(tmp_path: Path):
+    tracker = VersioningTracker(str(tmp_path), "dialog")
+    store = tracker.ensure_repo().object_store
+    (tmp_path / "a.txt").write_bytes(b"alpha\n")
+    encoded = encode_file(str(tmp_path / "a.txt"))
+    tree = Tree()
+    tree.add(b"a.txt", 0o100644, encoded.id)
+
+    written = write_objects_pack(store, [encoded, tree, encoded])
+
+    assert written == 2
+    assert store[encoded.id].data == b"alpha\n"
+    assert store[tree.id].items() == tree.items()
+    # Nothing new to write the second time
+    assert write_objects_pack(store, [encoded, tree]) == 0
+
+
+def test_pool_disabled_for_single_process():
+    assert get_object_encoder(1) is None
+    assert get_object_encoder(2) is get_object_encoder(2)
+
+
+def test_large_checkpoint_uses_worker_processes(tmp_path: Path):
+    root = tmp_path / "project"
+    (root / "src").mkdir(parents=True)
+    for i in range(20):
+        (root / "src" / f"m{i}.py").write_text(f"VALUE = {i}\n" * 50)
+    tracker = VersioningTracker(str(root), "dialog", hash_processes=2)
+
+    pool = get_object_encoder(2)
+    assert pool is not None
+    with (
+        patch.object(object_encoder, "PROCESS_POOL_MIN_BYTES", 0),
+        patch.object(pool, "encode_file", wraps=pool.encode_file) as encode,
+    ):
+        cp = tracker.create_checkpoint("first")
+
+    assert encode.call_count == 20
+    assert tracker.has_uncommitted_changes() is False
+
+    (root / "src" / "m3.py").write_text("changed\n")
+    tracker.restore_checkpoint(cp.commit_id)
+    assert (root / "src" / "m3.py").read_text() == "VALUE = 3\n" * 50
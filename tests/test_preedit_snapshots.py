@@ -0,0 +1,65 @@
+"""Tests for pre-edit snapshots kept by start_edit()/abort_edit().
+
+Verifies that:
+1. Small files are snapshotted in memory
+2. Files above PREEDIT_MEMORY_LIMIT are snapshotted to disk, not memory
+3. abort_edit() restores both kinds and removes the temp dir
+"""
+
+from pathlib import Path
+from unittest.mock import patch
+
+from agentsmithy.services import versioning
+from agentsmithy.services.versioning import VersioningTracker
+
+
+def test_small_file_snapshot_in_memory(tmp_path: Path):
+    tracker = VersioningTracker(str(tmp_path), "dialog")
+    target = tmp_path / "small.txt"
+    target.write_text("original\n")
+
+    tracker.start_edit(["small.txt"])
+    assert tracker._preedit_snapshots[target.resolve()] == b"original\n"
+    assert tracker._tmp_dir is None
+
+    target.write_text("broken\n")
+    tracker.abort_edit()
+
+    assert target.read_text() == "original\n"
+
+
+def test_large_file_snapshot_on_disk(tmp_path: Path):
+    tracker = VersioningTracker(str(tmp_path), "dialog")
+    target = tmp_path / "package-lock.json"
+    target.write_bytes(b"x" * 1000)
+
+    with patch.object(versioning, "PREEDIT_MEMORY_LIMIT", 100):
+        tracker.start_edit(["package-lock.json"])
+
+    snapshot = tracker._preedit_snapshots[target.resolve()]
+    assert isinstance(snapshot, Path)
+    assert snapshot.read_bytes() == b"x" * 1000
+    tmp_dir = tracker._tmp_dir
+    assert tmp_dir is not None and tmp_dir.is_relative_to(tracker.shadow_root)
+
+    target.write_bytes(b"partial")
+    tracker.abort_edit()
+
+    assert target.read_bytes() == b"x" * 1000
+    assert not tmp_dir.exists()
+    assert not tracker._preedit_snapshots
+
+
+def test_finalize_keeps_edit_and_removes_snapshots(tmp_path: Path):
+    tracker = VersioningTracker(str(tmp_path), "dialog")
+    target = tmp_path / "big.bin"
+    target.write_bytes(b"a" * 500)
+
+    with patch.object(versioning, "PREEDIT_MEMORY_LIMIT", 100):
+        tracker.start_edit(["big.bin"])
+    tmp_dir = tracker._tmp_dir
+    target.write_bytes(b"b" * 500)
+    tracker.finalize_edit()
+
+    assert target.read_bytes() == b"b" * 500
+    assert tmp_dir is not None and not tmp_dir.exists()
@@ -0,0 +1,134 @@
+"""Tests for the code-aware RAG chunker.
+
+Verifies that:
+1. Python files split on functions and classes, with symbols and line ranges
+2. Large classes split into methods, oversized units into line windows
+3. Other languages split on top-level blocks found by the bracket scanner
+4. Indexed chunks carry language/symbol/line metadata, shown in prompts
+"""
+
+import pytest
+
+from agentsmithy.rag.chunker import split_code
+from agentsmithy.rag.context_builder import ContextBuilder
+
+PYTHON = '''"""Module docstring."""
+
+import os
+
+
+# Reads the config
+@cache
+def load(path):
+    return open(path).read()
+
+
+class Store:
+    def get(self, key):
+        return key
+'''
+
+
+def test_python_functions_and_classes():
+    chunks = split_code(PYTHON, "python", max_chars=80)
+
+    assert [(c.symbol, c.start_line, c.end_line) for c in chunks] == [
+        ("", 1, 3),
+        ("load", 6, 9),
+        ("Store", 12, 14),
+    ]
+    # Decorators and leading comments stay with their function
+    assert chunks[1].text.startswith("# Reads the config\n@cache\ndef load")
+
+
+def test_small_units_are_merged():
+    chunks = split_code(PYTHON, "python")
+
+    assert len(chunks) == 1
+    assert chunks[0].symbol == "load, Store"
+    assert (chunks[0].start_line, chunks[0].end_line) == (1, 14)
+
+
+def test_large_class_split_into_methods():
+    methods = "".join(
+        f"    def method_{i}(self):\n        return {'x' * 40!r}\n\n" for i in range(6)
+    )
+    source = f"class Big:\n    '''Doc.'''\n\n{methods}"
+
+    chunks = split_code(source, "python", max_chars=200)
+
+    symbols = [c.symbol for c in chunks]
+    assert symbols[0].startswith("Big")
+    assert "Big.method_5" in symbols[-1]
+    assert all(len(c.text) <= 200 for c in chunks)
+
+
+def test_oversized_function_is_windowed():
+    body = "".join(f"    x{i} = {i}\n" for i in range(100))
+    chunks = split_code(f"def long():\n{body}", "python", max_chars=300)
+
+    assert len(chunks) > 1
+    assert {c.symbol for c in chunks} == {"long"}
+    assert chunks[0].start_line == 1
+    assert chunks[-1].end_line == 101
+    assert all(len(c.text) <= 300 for c in chunks)
+
+
+def test_minified_line_is_cut():
+    chunks = split_code("var a=" + "1+" * 1000 + "1;\n", "javascript", max_chars=500)
+
+    assert len(chunks) == 5
+    assert all(c.start_line == c.end_line == 1 for c in chunks)
+
+
+def test_brace_language_blocks():
+    source = """import { a } from "./a";
+
+// Adds numbers
+export function add(x, y) {
+  const s = "}{";
+  return x + y;
+}
+export const mul = (x, y) => {
+  return x * y;
+};
+
+func (s *Server) Start(port int) error {
+	return nil
+}
+"""
+    chunks = split_code(source, "javascript", max_chars=90)
+
+    assert [(c.symbol, c.start_line) for c in chunks] == [
+        ("", 1),
+        ("add", 3),
+        ("mul", 8),
+        ("Start", 12),
+    ]
+
+
+def test_python_syntax_error_uses_scanner():
+    chunks = split_code("def broken(:\n    pass\n", "python")
+
+    assert len(chunks) == 1
+    assert chunks[0].symbol == "broken"
+
+
+@pytest.mark.asyncio
+async def test_indexed_chunks_carry_symbol_metadata(temp_project, mock_embeddings):
+    manager = temp_project.get_vector_store()
+    await manager.index_file("store.py", PYTHON)
+    await manager.index_file("README.md", "# Title\n\nSome text.\n")
+
+    code = manager.vectorstore.get(where={"source": "store.py"})["metadatas"][0]
+    assert code["language"] == "python"
+    assert code["symbol"] == "load, Store"
+    assert (code["start_line"], code["end_line"]) == (1, 14)
+    text = manager.vectorstore.get(where={"source": "README.md"})["metadatas"][0]
+    assert text["language"] == "text"
+    assert (text["start_line"], text["end_line"]) == (1, 3)
+
+    prompt = ContextBuilder(manager).format_context_for_prompt(
+        {"relevant_documents": [{"content": "...", "metadata": code}]}
+    )
+    assert "Source: store.py:1-14 (load, Store)" in prompt
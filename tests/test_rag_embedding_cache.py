@@ -0,0 +1,138 @@
+"""Tests for chunk-level reindexing and the persistent embedding cache.
+
+Verifies that:
+1. Reindexing an edited file only embeds the chunks that changed
+2. Content that returns (restore, reset) is served from the embedding cache
+3. The cache is keyed by model, deduplicates texts and stays bounded
+4. Cache keys hold no credentials and survive an API key rotation
+"""
+
+import sqlite3
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from agentsmithy.rag import embedding_cache, embeddings
+from agentsmithy.rag.embedding_cache import CachedEmbeddings, EmbeddingCache
+
+
+def _embedded_texts(mock_embeddings) -> int:
+    return sum(len(c.args[0]) for c in mock_embeddings.embed_documents.call_args_list)
+
+
+def _module(edited: int | None = None) -> str:
+    blocks = []
+    for i in range(120):
+        body = f"    return {i}" if i != edited else "    return -1  # edited"
+        blocks.append(
+            f"def function_{i}(value):\n    '''Return the value of step {i}.'''\n{body}\n"
+        )
+    return "\n\n".join(blocks)
+
+
+@pytest.mark.asyncio
+async def test_edit_embeds_only_changed_chunks(temp_project, mock_embeddings):
+    manager = temp_project.get_vector_store()
+    ids = await manager.index_file("module.py", _module())
+    assert len(ids) > 3
+    before = _embedded_texts(mock_embeddings)
+
+    new_ids = await manager.index_file("module.py", _module(edited=60))
+
+    assert 1 <= _embedded_texts(mock_embeddings) - before <= 2
+    assert len(set(new_ids) - set(ids)) <= 2
+    assert manager.manifest.get("module.py").chunk_ids == new_ids
+    stored = manager.vectorstore.get(where={"source": "module.py"})
+    assert sorted(stored["ids"]) == sorted(new_ids)
+    assert "return -1" in "".join(stored["documents"])
+
+
+@pytest.mark.asyncio
+async def test_restored_content_is_not_embedded_again(temp_project, mock_embeddings):
+    manager = temp_project.get_vector_store()
+    await manager.index_file("a.py", "original = True\n")
+    await manager.index_file("a.py", "changed = True\n")
+    calls = mock_embeddings.embed_documents.call_count
+
+    # Back to the first version (e.g. a checkpoint restore), and into a new file
+    await manager.index_file("a.py", "original = True\n")
+    await manager.index_file("copy.py", "changed = True\n")
+
+    assert mock_embeddings.embed_documents.call_count == calls
+    assert await manager.has_file("copy.py")
+    assert manager.vectorstore.get(where={"source": "a.py"})["documents"] == [
+        "original = True"
+    ]
+
+
+def test_cache_is_keyed_by_model(tmp_path: Path):
+    inner = MagicMock()
+    inner.embed_documents.side_effect = lambda texts: [[float(len(t))] for t in texts]
+    cache = EmbeddingCache(tmp_path / "cache.db")
+
+    first = CachedEmbeddings(inner, cache, "model-a")
+    assert first.embed_documents(["aa", "bbb", "aa"]) == [[2.0], [3.0], [2.0]]
+    # Repeated text in one request is embedded once
+    assert inner.embed_documents.call_args.args[0] == ["aa", "bbb"]
+
+    assert first.embed_documents(["bbb"]) == [[3.0]]
+    assert inner.embed_documents.call_count == 1
+
+    CachedEmbeddings(inner, cache, "model-b").embed_documents(["bbb"])
+    assert inner.embed_documents.call_count == 2
+
+
+def _config_with_key(api_key: str):
+    return (
+        {"workload": "embed"},
+        {"provider": "openai", "model": "text-embedding-3-small"},
+        {"type": "openai", "api_key": api_key, "base_url": "https://example.test"},
+    )
+
+
+@pytest.mark.asyncio
+async def test_cache_key_holds_no_credentials(temp_project, mock_embeddings):
+    with patch.object(
+        embeddings, "_embeddings_config_chain", return_value=_config_with_key("sk-1")
+    ):
+        await temp_project.get_vector_store().index_file("a.py", "a = 1\n")
+    calls = mock_embeddings.embed_documents.call_count
+
+    db = temp_project.state_dir / "rag" / embedding_cache.EMBEDDING_CACHE_FILENAME
+    with sqlite3.connect(db) as conn:
+        models = {row[0] for row in conn.execute("SELECT model FROM embeddings")}
+    assert len(models) == 1
+    assert not any("sk-1" in m or "example.test" in m for m in models)
+
+    # Entries keyed by the full configuration are purged
+    with sqlite3.connect(db) as conn:
+        conn.execute(
+            "INSERT INTO embeddings VALUES (?, 'h', x'00000000')",
+            (embeddings.embeddings_config_fingerprint(),),
+        )
+    embedding_cache._initialized.clear()
+    EmbeddingCache(db)
+    with sqlite3.connect(db) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM embeddings").fetchone() == (1,)
+
+    # A rotated key still finds the cached vectors
+    with patch.object(
+        embeddings, "_embeddings_config_chain", return_value=_config_with_key("sk-2")
+    ):
+        await temp_project.get_vector_store().index_file("b.py", "a = 1\n")
+    assert mock_embeddings.embed_documents.call_count == calls
+
+
+def test_cache_drops_oldest_entries(tmp_path: Path):
+    cache = EmbeddingCache(tmp_path / "cache.db")
+
+    with patch.object(embedding_cache, "EMBEDDING_CACHE_MAX_ENTRIES", 3):
+        for i in range(5):
+            cache.put_many("m", {f"h{i}": [float(i)]})
+
+    assert sorted(cache.get_many("m", [f"h{i}" for i in range(5)])) == [
+        "h2",
+        "h3",
+        "h4",
+    ]
@@ -0,0 +1,107 @@
+"""Tests for the RAG file manifest.
+
+Verifies that:
+1. Sync checks freshness from the manifest without querying Chroma
+2. Files indexed from tool content are hashed once, then checked by stat
+3. Collections indexed before the manifest existed are backfilled
+4. Deleting a file drops its manifest row
+"""
+
+from unittest.mock import patch
+
+import pytest
+from langchain_core.documents import Document
+
+from agentsmithy.rag.file_manifest import ManifestEntry
+
+
+@pytest.mark.asyncio
+async def test_sync_does_not_query_chroma(temp_project, mock_embeddings):
+    manager = temp_project.get_vector_store()
+    (temp_project.root / "a.py").write_text("a = 1\n")
+    await manager.index_file("a.py")
+
+    entry = manager.manifest.get("a.py")
+    assert entry is not None
+    assert entry.mtime_ns == (temp_project.root / "a.py").stat().st_mtime_ns
+    assert len(entry.chunk_ids) == 1
+
+    with patch.object(manager.vectorstore, "get", side_effect=AssertionError):
+        stats = await manager.sync_files_if_needed()
+
+    assert stats == {"checked": 1, "reindexed": 0, "removed": 0, "skipped": 1}
+
+
+@pytest.mark.asyncio
+async def test_many_unchanged_files_are_not_read(temp_project, mock_embeddings):
+    manager = temp_project.get_vector_store()
+    entries = {}
+    for i in range(2000):
+        path = temp_project.root / f"m{i}.py"
+        path.write_text(f"VALUE = {i}\n")
+        st = path.stat()
+        entries[f"m{i}.py"] = ManifestEntry("hash", st.st_size, st.st_mtime_ns)
+    manager.manifest.record(entries)
+
+    with patch.object(manager, "_check_and_reindex_file") as check:
+        stats = await manager.sync_files_if_needed()
+
+    assert check.call_count == 0
+    assert stats["checked"] == 2000
+    assert stats["skipped"] == 2000
+
+
+@pytest.mark.asyncio
+async def test_tool_content_is_hashed_once(temp_project, mock_embeddings):
+    manager = temp_project.get_vector_store()
+    (temp_project.root / "tool.py").write_text("written = True\n")
+    # Tools pass the content they wrote; its stat is not known yet
+    await manager.index_file("tool.py", "written = True\n")
+    assert manager.manifest.get("tool.py").mtime_ns == 0
+
+    with patch.object(
+        manager, "_check_and_reindex_file", wraps=manager._check_and_reindex_file
+    ) as check:
+        first = await manager.sync_files_if_needed()
+        second = await manager.sync_files_if_needed()
+
+    assert check.call_count == 1
+    assert first["skipped"] == second["skipped"] == 1
+    assert first["reindexed"] == 0
+
+
+@pytest.mark.asyncio
+async def test_existing_collection_is_backfilled(temp_project, mock_embeddings):
+    manager = temp_project.get_vector_store()
+    (temp_project.root / "old.py").write_text("old = 1\n")
+    # Chunks stored before the manifest existed
+    manager.vectorstore.add_documents(
+        [
+            Document(
+                page_content="old = 1", metadata={"source": "old.py", "hash": "x"}
+            ),
+            Document(page_content="more", metadata={"source": "old.py", "hash": "x"}),
+        ]
+    )
+
+    assert manager.get_indexed_files() == {"old.py": "x"}
+    assert len(manager.manifest.get("old.py").chunk_ids) == 2
+
+    # Stored hash does not match the file: reindexed from disk
+    stats = await manager.sync_files_if_needed()
+    assert stats["reindexed"] == 1
+    assert len(manager.manifest.get("old.py").chunk_ids) == 1
+
+
+@pytest.mark.asyncio
+async def test_removed_file_leaves_manifest(temp_project, mock_embeddings):
+    manager = temp_project.get_vector_store()
+    (temp_project.root / "gone.py").write_text("gone = 1\n")
+    await manager.index_file("gone.py")
+
+    (temp_project.root / "gone.py").unlink()
+    stats = await manager.sync_files_if_needed()
+
+    assert stats["removed"] == 1
+    assert manager.manifest.get("gone.py") is None
+    assert not manager.vectorstore.get(where={"source": "gone.py"})["ids"]
@@ -0,0 +1,183 @@
+"""Tests for the coalescing RAG indexing queue.
+
+Verifies that:
+1. Repeated writes of a path are indexed once, with the latest content
+2. Chunks of many files share one embeddings request, within the batch limits
+3. A queued removal drops the file and any pending reindex
+4. Queue depth and lag are reported
+5. Files of a failed round are retried, unless newer requests replaced them
+6. A drain cancelled before it ran does not stop later enqueues
+"""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from agentsmithy.core.background_tasks import get_background_manager
+from agentsmithy.rag import index_queue
+from agentsmithy.rag.vector_store import get_index_queue_stats
+
+
+@pytest.mark.asyncio
+async def test_repeated_writes_coalesce(temp_project, mock_embeddings):
+    manager = temp_project.get_vector_store()
+    queue = manager.index_queue
+
+    for version in range(5):
+        queue.enqueue("app.py", f"version = {version}\n")
+    assert await queue.flush(timeout=5)
+
+    assert mock_embeddings.embed_documents.call_count == 1
+    stored = manager.vectorstore.get(where={"source": "app.py"})
+    assert stored["documents"] == ["version = 4"]
+    stats = queue.stats()
+    assert stats["files_indexed"] == 1
+    assert stats["files_coalesced"] == 4
+
+
+@pytest.mark.asyncio
+async def test_files_share_embeddings_requests(temp_project, mock_embeddings):
+    manager = temp_project.get_vector_store()
+    queue = manager.index_queue
+
+    for i in range(10):
+        queue.enqueue(f"m{i}.py", f"VALUE = {i}\n")
+    assert await queue.flush(timeout=5)
+
+    assert mock_embeddings.embed_documents.call_count == 1
+    assert len(manager.get_indexed_files()) == 10
+
+
+@pytest.mark.asyncio
+async def test_batches_respect_limits(temp_project, mock_embeddings):
+    queue = temp_project.get_vector_store().index_queue
+
+    with patch.object(index_queue, "EMBED_BATCH_MAX_CHUNKS", 2):
+        for i in range(5):
+            queue.enqueue(f"m{i}.py", f"VALUE = {i}\n")
+        assert await queue.flush(timeout=5)
+
+    assert mock_embeddings.embed_documents.call_count == 3
+    assert queue.stats()["batches"] == 3
+
+
+@pytest.mark.asyncio
+async def test_removal_drops_pending_index(temp_project, mock_embeddings):
+    manager = temp_project.get_vector_store()
+    queue = manager.index_queue
+    await manager.index_file("old.py", "old = True\n")
+
+    queue.enqueue("old.py", "old = False\n")
+    queue.enqueue_removal("old.py")
+    assert await queue.flush(timeout=5)
+
+    assert not await manager.has_file("old.py")
+
+
+@pytest.mark.asyncio
+async def test_stats_report_depth(temp_project, mock_embeddings):
+    assert get_index_queue_stats(temp_project) is None
+    queue = temp_project.get_vector_store().index_queue
+
+    queue.enqueue("a.py", "a = 1\n")
+    queue.enqueue("b.py", "b = 1\n")
+    stats = get_index_queue_stats(temp_project)
+    assert stats is not None
+    assert stats["depth"] == 2
+    assert stats["oldest_pending_seconds"] is not None
+
+    assert await queue.flush(timeout=5)
+    stats = queue.stats()
+    assert stats["depth"] == 0
+    assert stats["last_lag_seconds"] >= index_queue.INDEX_DEBOUNCE_SECONDS
+
+
+@pytest.fixture
+def fast_retry(monkeypatch):
+    monkeypatch.setattr(index_queue, "INDEX_RETRY_DELAY_SECONDS", 0.01)
+
+
+@pytest.mark.asyncio
+async def test_failed_round_is_retried(temp_project, mock_embeddings, fast_retry):
+    manager = temp_project.get_vector_store()
+    queue = manager.index_queue
+    update_file_chunks = manager.update_file_chunks
+    calls = 0
+
+    def flaky(*args):
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise RuntimeError("store down")
+        return update_file_chunks(*args)
+
+    with patch.object(manager, "update_file_chunks", side_effect=flaky):
+        queue.enqueue("app.py", "app = 1\n")
+        assert await queue.flush(timeout=5)
+
+    assert await manager.has_file("app.py")
+    stats = queue.stats()
+    assert (stats["failed_rounds"], stats["files_dropped"]) == (1, 0)
+
+
+@pytest.mark.asyncio
+async def test_newer_request_replaces_failed_one(
+    temp_project, mock_embeddings, fast_retry
+):
+    manager = temp_project.get_vector_store()
+    queue = manager.index_queue
+    update_file_chunks = manager.update_file_chunks
+    loop = asyncio.get_running_loop()
+    calls = 0
+
+    def edited_while_failing(*args):
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            loop.call_soon_threadsafe(queue.enqueue, "app.py", "app = 2\n")
+            raise RuntimeError("store down")
+        return update_file_chunks(*args)
+
+    with patch.object(manager, "update_file_chunks", side_effect=edited_while_failing):
+        queue.enqueue("app.py", "app = 1\n")
+        # Let the retried round start before waiting for the queue to go idle
+        await asyncio.sleep(0.3)
+        assert await queue.flush(timeout=5)
+
+    stored = manager.vectorstore.get(where={"source": "app.py"})
+    assert stored["documents"] == ["app = 2"]
+
+
+@pytest.mark.asyncio
+async def test_failing_file_is_given_up(temp_project, mock_embeddings, fast_retry):
+    manager = temp_project.get_vector_store()
+    queue = manager.index_queue
+
+    with patch.object(
+        manager, "update_file_chunks", side_effect=RuntimeError("store down")
+    ):
+        queue.enqueue("app.py", "app = 1\n")
+        assert await queue.flush(timeout=5)
+
+    stats = queue.stats()
+    assert stats["failed_rounds"] == index_queue.INDEX_MAX_ATTEMPTS
+    assert stats["files_dropped"] == 1
+    assert stats["depth"] == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_drain_does_not_wedge_queue(temp_project, mock_embeddings):
+    manager = temp_project.get_vector_store()
+    queue = manager.index_queue
+
+    queue.enqueue("a.py", "a = 1\n")
+    # Cancelled before the drain task ran (e.g. on shutdown)
+    get_background_manager().cancel_all()
+    await asyncio.sleep(0.01)
+    assert queue.stats()["depth"] == 1
+
+    queue.enqueue("b.py", "b = 1\n")
+    assert await queue.flush(timeout=5)
+
+    assert set(manager.get_indexed_files()) == {"a.py", "b.py"}
@@ -0,0 +1,151 @@
+"""Tests for the lexical (BM25) index and hybrid retrieval.
+
+Verifies that:
+1. Queries naming identifiers are answered without an embeddings request
+2. Identifier parts (snake_case, camelCase) match prose queries
+3. Lexical and vector hits are merged; lexical hits survive a provider failure
+4. Reindexing, deleting and backfilling keep the lexical index in sync
+"""
+
+from unittest.mock import patch
+
+import pytest
+from langchain_core.documents import Document
+
+from agentsmithy.rag.lexical_index import (
+    query_identifiers,
+    query_terms,
+    reciprocal_rank_fusion,
+    subtokens,
+)
+
+STAGING = '''def stage_file_deletion(path):
+    """Stage a file for deletion in the next checkpoint."""
+    return path
+
+
+def restore_checkpoint(checkpoint_id):
+    return checkpoint_id
+'''
+
+CLIENT = """export class HttpClient {
+  sendRequest(url) {
+    return fetch(url);
+  }
+}
+"""
+
+
+def test_query_identifiers_and_terms():
+    assert query_identifiers("where is `stage_file_deletion` called?") == [
+        "stage_file_deletion"
+    ]
+    assert query_identifiers("who calls sendRequest") == ["sendRequest"]
+    assert query_identifiers("how does the checkpoint restore work") == []
+
+    assert query_terms("how does stage_file_deletion work") == [
+        "stage_file_deletion",
+        "stage",
+        "file",
+        "deletion",
+        "work",
+    ]
+    assert set(subtokens("class HTTPServer: parse_url = x").split()) == {
+        "http",
+        "server",
+        "parse",
+        "url",
+    }
+
+
+def test_reciprocal_rank_fusion_prefers_shared_hits():
+    a, b, c = (Document(page_content=x, id=x) for x in "abc")
+
+    merged = reciprocal_rank_fusion([[a, b], [c, b]], k=3)
+
+    assert [d.id for d in merged] == ["b", "a", "c"]
+
+
+@pytest.mark.asyncio
+async def test_identifier_query_skips_embeddings(temp_project, mock_embeddings):
+    manager = temp_project.get_vector_store()
+    await manager.index_file("staging.py", STAGING)
+    await manager.index_file("client.ts", CLIENT)
+    mock_embeddings.embed_query.reset_mock()
+
+    docs = await manager.hybrid_search("where is `stage_file_deletion` called?")
+
+    assert [d.metadata["source"] for d in docs] == ["staging.py"]
+    assert docs[0].metadata["lexical_score"] > 0
+    mock_embeddings.embed_query.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_camel_case_parts_match_prose(temp_project, mock_embeddings):
+    manager = temp_project.get_vector_store()
+    await manager.index_file("staging.py", STAGING)
+    await manager.index_file("client.ts", CLIENT)
+
+    docs = manager.lexical_index.search(query_terms("send a request"), k=4)
+
+    assert [d.metadata["source"] for d in docs] == ["client.ts"]
+    assert docs[0].metadata["symbol"] == "HttpClient"
+
+
+@pytest.mark.asyncio
+async def test_prose_query_merges_lexical_and_vector(temp_project, mock_embeddings):
+    manager = temp_project.get_vector_store()
+    await manager.index_file("staging.py", STAGING)
+    await manager.index_file("client.ts", CLIENT)
+
+    docs = await manager.hybrid_search("how is a checkpoint restored", k=2)
+
+    mock_embeddings.embed_query.assert_called()
+    assert {d.metadata["source"] for d in docs} == {"staging.py", "client.ts"}
+    # Matched by both retrievers, so ranked first
+    assert docs[0].metadata["source"] == "staging.py"
+
+
+@pytest.mark.asyncio
+async def test_provider_failure_falls_back_to_lexical(temp_project, mock_embeddings):
+    manager = temp_project.get_vector_store()
+    await manager.index_file("staging.py", STAGING)
+
+    with patch.object(
+        manager, "similarity_search", side_effect=RuntimeError("provider down")
+    ):
+        docs = await manager.hybrid_search("checkpoint restore")
+
+    assert [d.metadata["source"] for d in docs] == ["staging.py"]
+
+
+@pytest.mark.asyncio
+async def test_reindex_and_delete_update_lexical_index(temp_project, mock_embeddings):
+    manager = temp_project.get_vector_store()
+    await manager.index_file("staging.py", STAGING)
+
+    await manager.index_file("staging.py", "def unstage_all():\n    pass\n")
+    assert not manager.lexical_index.search(["stage_file_deletion"])
+    assert manager.lexical_index.search(["unstage_all"])
+
+    manager.delete_by_source("staging.py")
+    assert not manager.lexical_index.search(["unstage_all"])
+
+
+@pytest.mark.asyncio
+async def test_existing_collection_is_backfilled(temp_project, mock_embeddings):
+    manager = temp_project.get_vector_store()
+    # Chunks stored before the lexical index existed
+    manager.vectorstore.add_documents(
+        [
+            Document(
+                page_content="def legacy_helper(): pass",
+                metadata={"source": "old.py", "hash": "x"},
+            )
+        ]
+    )
+
+    docs = manager.lexical_index.search(["legacy_helper"])
+
+    assert [d.metadata["source"] for d in docs] == ["old.py"]
+    assert docs[0].id
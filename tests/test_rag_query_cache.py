@@ -0,0 +1,100 @@
+"""Tests for the RAG query embedding and retrieval caches.
+
+Verifies that:
+1. A repeated question is embedded and searched once
+2. Queries differing only in whitespace share an embedding
+3. Any index write invalidates cached results; k and filter are part of the key
+4. Scored searches share the query embedding and have their own result cache
+5. The LRU cache keeps the most recently used entries
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from agentsmithy.rag.context_builder import ContextBuilder
+from agentsmithy.rag.query_cache import LRUCache
+
+
+@pytest.mark.asyncio
+async def test_repeated_question_is_embedded_and_searched_once(
+    temp_project, mock_embeddings
+):
+    manager = temp_project.get_vector_store()
+    await manager.index_file("notes.md", "Checkpoints are restored on request.\n")
+    builder = ContextBuilder(manager)
+    mock_embeddings.embed_query.reset_mock()
+
+    with patch.object(
+        manager.vectorstore,
+        "similarity_search_by_vector",
+        wraps=manager.vectorstore.similarity_search_by_vector,
+    ) as search:
+        first = await builder.build_context("how are checkpoints restored")
+        # Regenerated message, asked by another agent
+        second = await ContextBuilder(manager).build_context(
+            "how are  checkpoints restored "
+        )
+
+    assert mock_embeddings.embed_query.call_count == 1
+    assert search.call_count == 1
+    assert first["relevant_documents"] == second["relevant_documents"]
+    assert first["relevant_documents"][0]["metadata"]["source"] == "notes.md"
+
+
+@pytest.mark.asyncio
+async def test_index_write_invalidates_results(temp_project, mock_embeddings):
+    manager = temp_project.get_vector_store()
+    await manager.index_file("a.md", "First document.\n")
+    assert len(await manager.similarity_search("document", k=4)) == 1
+    generation = manager.index_generation
+
+    await manager.index_file("b.md", "Second document.\n")
+
+    assert manager.index_generation > generation
+    assert len(await manager.similarity_search("document", k=4)) == 2
+    manager.delete_by_source("a.md")
+    assert len(await manager.similarity_search("document", k=4)) == 1
+    # The query itself was embedded once
+    assert mock_embeddings.embed_query.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_k_and_filter_are_part_of_the_key(temp_project, mock_embeddings):
+    manager = temp_project.get_vector_store()
+    await manager.index_file("a.md", "First document.\n")
+    await manager.index_file("b.md", "Second document.\n")
+
+    assert len(await manager.similarity_search("document", k=1)) == 1
+    assert len(await manager.similarity_search("document", k=2)) == 2
+    filtered = await manager.similarity_search(
+        "document", k=2, filter={"source": "b.md"}
+    )
+    assert [d.metadata["source"] for d in filtered] == ["b.md"]
+
+
+@pytest.mark.asyncio
+async def test_scored_search_uses_the_caches(temp_project, mock_embeddings):
+    manager = temp_project.get_vector_store()
+    await manager.index_file("a.md", "First document.\n")
+    docs = await manager.similarity_search("document")
+
+    first = await manager.asimilarity_search_with_score("document")
+    second = await manager.asimilarity_search_with_score("document")
+
+    assert mock_embeddings.embed_query.call_count == 1
+    assert [doc for doc, _score in first] == docs
+    assert first == second
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache: LRUCache[str, int] = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert (cache.hits, cache.misses) == (3, 1)
@@ -0,0 +1,83 @@
+"""Tests for the vector store executor.
+
+Verifies that:
+1. Searches and indexing run on the store threads, not the event loop
+2. The event loop keeps running during a slow embeddings request
+3. Calls are timed per operation, failures included
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from agentsmithy.rag.store_executor import run_in_store, store_stats
+
+
+@pytest.mark.asyncio
+async def test_store_calls_leave_event_loop(temp_project, mock_embeddings):
+    threads: list[str] = []
+
+    def embed(texts):
+        threads.append(threading.current_thread().name)
+        return [[0.1, 0.2, 0.3, 0.4, 0.5] for _ in texts]
+
+    def embed_query(text):
+        threads.append(threading.current_thread().name)
+        return [0.1, 0.2, 0.3, 0.4, 0.5]
+
+    mock_embeddings.embed_documents.side_effect = embed
+    mock_embeddings.embed_query.side_effect = embed_query
+    manager = temp_project.get_vector_store()
+
+    await manager.index_file("a.py", "a = 1\n")
+    docs = await manager.similarity_search("a")
+
+    assert docs[0].metadata["source"] == "a.py"
+    assert len(threads) == 2
+    assert all(name.startswith("rag-store") for name in threads)
+
+
+@pytest.mark.asyncio
+async def test_slow_embeddings_do_not_block_loop(temp_project, mock_embeddings):
+    def slow_embed(texts):
+        time.sleep(0.3)
+        return [[0.1, 0.2, 0.3, 0.4, 0.5] for _ in texts]
+
+    mock_embeddings.embed_documents.side_effect = slow_embed
+    manager = temp_project.get_vector_store()
+    gaps: list[float] = []
+
+    async def ticker():
+        last = time.perf_counter()
+        while True:
+            await asyncio.sleep(0.01)
+            now = time.perf_counter()
+            gaps.append(now - last)
+            last = now
+
+    task = asyncio.create_task(ticker())
+    try:
+        await manager.index_file("slow.py", "x = 1\n")
+    finally:
+        task.cancel()
+
+    assert len(gaps) > 10
+    assert max(gaps) < 0.2
+
+
+@pytest.mark.asyncio
+async def test_operations_are_timed():
+    def fail():
+        raise RuntimeError("store down")
+
+    await run_in_store("test_timed", time.sleep, 0.02)
+    with pytest.raises(RuntimeError):
+        await run_in_store("test_timed", fail)
+
+    stats = store_stats()["test_timed"]
+    assert stats["calls"] == 2
+    assert stats["errors"] == 1
+    assert stats["max_ms"] >= 20
+    assert stats["avg_ms"] > 0
@@ -0,0 +1,127 @@
+"""Tests for the shared per-dialog tracker and its buffered staging index.
+
+Verifies that:
+1. get_versioning_tracker() returns one tracker per dialog that keeps its repo open
+2. Staging many files writes the index once (debounce or transaction end)
+3. Anything reading the index sees buffered changes
+4. Deleting a dialog drops buffered changes instead of writing them
+"""
+
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from dulwich.index import Index
+from dulwich.repo import Repo
+
+from agentsmithy.core.project import Project
+from agentsmithy.services import versioning
+from agentsmithy.services.versioning import (
+    VersioningTracker,
+    get_versioning_tracker,
+    release_versioning_tracker,
+)
+from agentsmithy.tools.builtin.write_file import WriteFileTool
+
+
+@pytest.fixture
+def project(tmp_path: Path) -> Project:
+    root = tmp_path / "project"
+    root.mkdir()
+    project = Project(name="test", root=root, state_dir=root / ".agentsmithy")
+    project.ensure_state_dir()
+    return project
+
+
+def _index_paths(tracker: VersioningTracker) -> set[str]:
+    index = Index(str(tracker.shadow_root / ".git" / "index"))
+    return {path.decode() for path in index.paths()}
+
+
+def test_shared_tracker_is_reused(project: Project):
+    dialog_id = project.create_dialog(title="Test")
+    tracker = get_versioning_tracker(project.root, dialog_id)
+
+    assert get_versioning_tracker(str(project.root), dialog_id) is tracker
+    assert tracker.ensure_repo() is tracker.ensure_repo()
+
+
+@pytest.mark.asyncio
+async def test_write_tool_calls_share_one_index_write(project: Project):
+    dialog_id = project.create_dialog(title="Test")
+    tool = WriteFileTool()
+    tool.set_context(None, dialog_id)
+    tool._project_root = str(project.root)
+
+    with (
+        patch.object(versioning, "STAGING_FLUSH_DELAY", 60),
+        patch.object(Index, "write", autospec=True, side_effect=Index.write) as write,
+        patch.object(
+            Repo, "__init__", autospec=True, side_effect=Repo.__init__
+        ) as opens,
+    ):
+        release_versioning_tracker(project.root, dialog_id)
+        for i in range(50):
+            await tool._arun(path=f"src/file{i}.py", content=f"x = {i}\n")
+
+        tracker = get_versioning_tracker(project.root, dialog_id)
+        assert write.call_count == 0
+        assert opens.call_count == 1
+
+        # Readers flush first
+        staged = {f["path"] for f in tracker.get_staged_files()}
+        assert {f"src/file{i}.py" for i in range(50)} <= staged
+        assert write.call_count == 1
+
+
+def test_debounce_writes_index(project: Project):
+    dialog_id = project.create_dialog(title="Test")
+    tracker = VersioningTracker(str(project.root), dialog_id, staging_flush_delay=0.05)
+    (project.root / "a.py").write_text("a\n")
+    (project.root / "b.py").write_text("b\n")
+
+    tracker.stage_file("a.py")
+    tracker.stage_file("b.py")
+    timer = tracker._staging_timer
+    assert timer is not None
+    assert _index_paths(tracker) == set()
+    timer.join(timeout=5)
+
+    assert {"a.py", "b.py"} <= _index_paths(tracker)
+
+
+def test_transaction_flushes_on_commit(project: Project):
+    dialog_id = project.create_dialog(title="Test")
+    tracker = VersioningTracker(str(project.root), dialog_id)
+    ignored = project.root / "node_modules" / "patched.js"
+    ignored.parent.mkdir()
+    ignored.write_text("patched\n")
+
+    tracker.begin_transaction()
+    tracker.stage_file("node_modules/patched.js")
+    tracker.track_file_change("node_modules/patched.js", "write")
+    assert "node_modules/patched.js" not in _index_paths(tracker)
+
+    checkpoint = tracker.commit_transaction()
+
+    assert checkpoint is not None
+    assert "node_modules/patched.js" in _index_paths(tracker)
+    repo = tracker.ensure_repo()
+    commit = repo[checkpoint.commit_id.encode()]
+    tree = repo[commit.tree]
+    assert b"node_modules" in tree
+
+
+def test_deleting_dialog_discards_buffered_staging(project: Project):
+    dialog_id = project.create_dialog(title="Test")
+    (project.root / "a.py").write_text("a\n")
+
+    with patch.object(versioning, "STAGING_FLUSH_DELAY", 60):
+        release_versioning_tracker(project.root, dialog_id)
+        tracker = get_versioning_tracker(project.root, dialog_id)
+        tracker.stage_file("a.py")
+        project.delete_dialog(dialog_id)
+
+    assert not tracker._pending_staging
+    tracker.flush_staging()
+    assert not project.get_dialog_dir(dialog_id).exists()
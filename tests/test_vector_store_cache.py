@@ -0,0 +1,63 @@
+"""Tests for the shared per-project VectorStoreManager.
+
+Verifies that:
+1. get_vector_store() returns one manager per (project, collection)
+2. A change of the embeddings configuration rebuilds the manager
+3. The indexing queue of a replaced manager moves to its replacement
+4. shutdown_vector_stores() drops the shared managers
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from agentsmithy.rag import vector_store
+from agentsmithy.rag.vector_store import shutdown_vector_stores
+
+
+def test_manager_is_shared(temp_project, mock_embeddings):
+    first = temp_project.get_vector_store()
+    second = temp_project.get_vector_store()
+    other = temp_project.get_vector_store("other_collection")
+
+    assert first is second
+    assert other is not first
+    assert first.vectorstore is second.vectorstore
+
+
+def test_embeddings_config_change_rebuilds(temp_project, mock_embeddings):
+    first = temp_project.get_vector_store()
+    assert first.vectorstore is not None
+
+    with patch.object(
+        vector_store, "embeddings_config_fingerprint", return_value="changed"
+    ):
+        second = temp_project.get_vector_store()
+        assert temp_project.get_vector_store() is second
+
+    assert second is not first
+    assert first._vectorstore is None
+
+
+@pytest.mark.asyncio
+async def test_replaced_manager_hands_over_queue(temp_project, mock_embeddings):
+    first = temp_project.get_vector_store()
+    first.index_queue.enqueue("a.py", "a = 1\n")
+
+    with patch.object(
+        vector_store, "embeddings_config_fingerprint", return_value="changed"
+    ):
+        second = temp_project.get_vector_store()
+        assert second.index_queue is first.index_queue
+        assert await second.index_queue.flush(timeout=5)
+
+        assert await second.has_file("a.py")
+    assert first._vectorstore is None
+
+
+def test_shutdown_drops_managers(temp_project, mock_embeddings):
+    first = temp_project.get_vector_store()
+
+    shutdown_vector_stores()
+
+    assert temp_project.get_vector_store() is not first
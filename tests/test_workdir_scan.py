@@ -0,0 +1,122 @@
+"""Tests for the workdir walk shared by approve, reset and the change checks.
+
+Verifies that:
+1. approve_all() and reset_to_approved() walk the project once
+2. Outside shared_scan() every operation walks anew
+3. A write tool (stage_file) or an expired window forces a new walk
+4. A partially consumed walk is replayed and continued, not restarted
+"""
+
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from agentsmithy.core.project import Project
+from agentsmithy.services import workdir_scan
+from agentsmithy.services.versioning import VersioningTracker
+
+
+@pytest.fixture
+def project(tmp_path: Path) -> Project:
+    root = tmp_path / "project"
+    (root / "src").mkdir(parents=True)
+    for i in range(10):
+        (root / "src" / f"m{i}.py").write_text(f"X = {i}\n")
+    project = Project(name="test", root=root, state_dir=root / ".agentsmithy")
+    project.ensure_state_dir()
+    return project
+
+
+class WalkCounter:
+    def __init__(self) -> None:
+        self.walks = 0
+        self.files: list[str] = []
+        self._original = VersioningTracker._iter_workdir_files
+
+    def __enter__(self) -> "WalkCounter":
+        counter = self
+
+        def counting_walk(tracker, ignore_spec, start=""):
+            counter.walks += 1
+            for item in counter._original(tracker, ignore_spec, start):
+                counter.files.append(item[0])
+                yield item
+
+        self._patch = patch.object(
+            VersioningTracker, "_iter_workdir_files", counting_walk
+        )
+        self._patch.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._patch.stop()
+
+
+def test_approve_walks_once(project: Project):
+    dialog_id = project.create_dialog(title="Test")
+    tracker = VersioningTracker(str(project.root), dialog_id)
+    (project.root / "src" / "m0.py").write_text("X = 100\n")
+
+    with WalkCounter() as counter:
+        result = tracker.approve_all()
+
+    assert result["commits_approved"] == 1
+    assert counter.walks == 1
+    # The early-exit change check and the checkpoint shared the same entries
+    assert len(counter.files) == len(set(counter.files))
+
+
+def test_reset_walks_once(project: Project):
+    dialog_id = project.create_dialog(title="Test")
+    tracker = VersioningTracker(str(project.root), dialog_id)
+    (project.root / "new.txt").write_text("new\n")
+
+    with WalkCounter() as counter:
+        result = tracker.reset_to_approved()
+
+    assert "pre_reset_checkpoint" in result
+    assert counter.walks == 1
+
+
+def test_no_sharing_outside_scope(project: Project):
+    dialog_id = project.create_dialog(title="Test")
+    tracker = VersioningTracker(str(project.root), dialog_id)
+
+    with WalkCounter() as counter:
+        assert tracker.has_uncommitted_changes() is False
+        (project.root / "later.txt").write_text("later\n")
+        assert tracker.has_uncommitted_changes() is True
+
+    assert counter.walks == 2
+
+
+def test_stage_file_invalidates_shared_scan(project: Project):
+    dialog_id = project.create_dialog(title="Test")
+    tracker = VersioningTracker(str(project.root), dialog_id)
+
+    with WalkCounter() as counter, tracker.shared_scan():
+        assert tracker.has_uncommitted_changes() is False
+        assert tracker.has_uncommitted_changes() is False
+        assert counter.walks == 1
+
+        (project.root / "written.txt").write_text("tool output\n")
+        tracker.stage_file("written.txt")
+        assert tracker.has_uncommitted_changes() is True
+
+    assert counter.walks == 2
+
+
+def test_expired_scan_is_not_reused(project: Project):
+    dialog_id = project.create_dialog(title="Test")
+    tracker = VersioningTracker(str(project.root), dialog_id)
+
+    with (
+        WalkCounter() as counter,
+        tracker.shared_scan(),
+        patch.object(workdir_scan, "WORKDIR_SCAN_TTL", 0),
+    ):
+        tracker.has_uncommitted_changes()
+        tracker.has_uncommitted_changes()
+
+    assert counter.walks == 2
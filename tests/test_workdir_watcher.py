@@ -0,0 +1,276 @@
+"""Tests for the workdir watcher that lets checkpoints skip full project walks.
+
+Verifies that:
+1. Touched paths are reported after a token, and overflow forces a full scan
+2. A checkpoint with a valid baseline only examines dirty paths
+3. The incremental tree is identical to the one a full scan produces
+4. has_uncommitted_changes() and get_staged_files() agree with full scans
+5. changes_since() flushes pending events, and lost events force a full rescan
+"""
+
+import struct
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from agentsmithy.services import workdir_watcher as watcher_module
+from agentsmithy.services.versioning import VersioningTracker
+from agentsmithy.services.workdir_watcher import (
+    get_workdir_watcher,
+    start_workdir_watcher,
+    stop_workdir_watchers,
+)
+
+
+@pytest.fixture
+def project_root(tmp_path: Path):
+    root = tmp_path / "project"
+    (root / "src").mkdir(parents=True)
+    (root / "src" / "main.py").write_text("print('hello')\n")
+    (root / "src" / "util.py").write_text("X = 1\n")
+    (root / "README.md").write_text("# readme\n")
+    if start_workdir_watcher(root) is None:
+        pytest.skip("filesystem watcher not available")
+    yield root
+    stop_workdir_watchers()
+
+
+def _wait_for(root: Path, token: int, rel_path: str) -> None:
+    """Block until the watcher has reported rel_path (events are async)."""
+    watcher = get_workdir_watcher(root)
+    assert watcher is not None
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        dirty = watcher.changes_since(token)
+        if dirty is not None and dirty.covers(rel_path):
+            return
+        time.sleep(0.02)
+    raise AssertionError(f"watcher did not report {rel_path}")
+
+
+def _tree_id(tracker: VersioningTracker, commit_id: str) -> bytes:
+    repo = tracker.ensure_repo()
+    return repo[commit_id.encode()].tree
+
+
+def test_changes_since_token_and_overflow(project_root: Path):
+    watcher = get_workdir_watcher(project_root)
+    assert watcher is not None
+    token = watcher.token()
+
+    (project_root / "src" / "util.py").write_text("X = 2\n")
+    (project_root / "new_dir").mkdir()
+    _wait_for(project_root, token, "src/util.py")
+    _wait_for(project_root, token, "new_dir/anything")
+
+    later = watcher.token()
+    assert later > token
+    assert watcher.changes_since(later) is not None
+    assert not watcher.changes_since(later)
+
+    with patch.object(watcher_module, "MAX_TRACKED_PATHS", 1):
+        (project_root / "a.txt").write_text("a")
+        (project_root / "b.txt").write_text("b")
+        deadline = time.monotonic() + 5
+        while watcher.changes_since(token) is not None:
+            assert time.monotonic() < deadline
+            time.sleep(0.02)
+    assert watcher.changes_since(later) is None
+
+
+def test_incremental_checkpoint_only_examines_dirty_paths(project_root: Path):
+    tracker = VersioningTracker(str(project_root), "dialog")
+    tracker.create_checkpoint("first")
+
+    watcher = get_workdir_watcher(project_root)
+    assert watcher is not None
+    token = watcher.token()
+    (project_root / "src" / "util.py").write_text("X = 2\n")
+    (project_root / "README.md").unlink()
+    (project_root / "pkg").mkdir()
+    (project_root / "pkg" / "mod.py").write_text("Y = 1\n")
+    _wait_for(project_root, token, "src/util.py")
+    _wait_for(project_root, token, "README.md")
+    _wait_for(project_root, token, "pkg/mod.py")
+
+    walked: list[str] = []
+    original = VersioningTracker._iter_workdir_files
+
+    def tracking_walk(self, ignore_spec, start=""):
+        walked.append(start)
+        return original(self, ignore_spec, start)
+
+    with patch.object(VersioningTracker, "_iter_workdir_files", tracking_walk):
+        second = tracker.create_checkpoint("second")
+
+    # Only the new directory is walked, never the project root
+    assert walked == ["pkg"]
+
+    repo = tracker.ensure_repo()
+    tree = repo[_tree_id(tracker, second.commit_id)]
+    _mode, util_sha = tree.lookup_path(repo.__getitem__, b"src/util.py")
+    assert repo[util_sha].data == b"X = 2\n"
+
+    # A full scan of the unchanged workdir produces the very same tree
+    watcher.invalidate()
+    third = tracker.create_checkpoint("third")
+    assert _tree_id(tracker, third.commit_id) == _tree_id(tracker, second.commit_id)
+
+
+def test_gitignore_change_forces_full_scan(project_root: Path):
+    tracker = VersioningTracker(str(project_root), "dialog")
+    tracker.create_checkpoint("first")
+
+    watcher = get_workdir_watcher(project_root)
+    assert watcher is not None
+    token = watcher.token()
+    (project_root / ".gitignore").write_text("src/util.py\n")
+    _wait_for(project_root, token, ".gitignore")
+
+    walked: list[str] = []
+    original = VersioningTracker._iter_workdir_files
+
+    def tracking_walk(self, ignore_spec, start=""):
+        walked.append(start)
+        return original(self, ignore_spec, start)
+
+    with patch.object(VersioningTracker, "_iter_workdir_files", tracking_walk):
+        cp = tracker.create_checkpoint("second")
+
+    assert walked == [""]
+    repo = tracker.ensure_repo()
+    tree = repo[_tree_id(tracker, cp.commit_id)]
+    with pytest.raises(KeyError):
+        tree.lookup_path(repo.__getitem__, b"src/util.py")
+
+
+def test_uncommitted_and_deleted_files_use_dirty_set(project_root: Path):
+    tracker = VersioningTracker(str(project_root), "dialog")
+    tracker.create_checkpoint("first")
+
+    with patch("os.walk") as walk:
+        assert tracker.has_uncommitted_changes() is False
+    walk.assert_not_called()
+
+    watcher = get_workdir_watcher(project_root)
+    assert watcher is not None
+    token = watcher.token()
+    (project_root / "src" / "main.py").unlink()
+    _wait_for(project_root, token, "src/main.py")
+
+    with patch("os.walk") as walk:
+        assert tracker.has_uncommitted_changes() is True
+        staged = tracker.get_staged_files(tracker._get_active_session_name())
+    walk.assert_not_called()
+
+    assert staged == [
+        {
+            "path": "src/main.py",
+            "status": "deleted",
+            "additions": 0,
+            "deletions": 0,
+            "diff": None,
+            "base_content": None,
+            "is_binary": False,
+            "is_too_large": False,
+        }
+    ]
+
+
+def _lose_events(watcher):
+    """Drop every event the watcher receives, as if the kernel had lost them."""
+    return patch.object(watcher, "_handle_event", lambda event: None)
+
+
+def _assert_full_rescan(tracker: VersioningTracker) -> str:
+    walked: list[str] = []
+    original = VersioningTracker._iter_workdir_files
+
+    def tracking_walk(self, ignore_spec, start=""):
+        walked.append(start)
+        return original(self, ignore_spec, start)
+
+    with patch.object(VersioningTracker, "_iter_workdir_files", tracking_walk):
+        cp = tracker.create_checkpoint("after lost events")
+    assert walked == [""]
+    return cp.commit_id
+
+
+def test_changes_since_flushes_pending_events(project_root: Path):
+    watcher = get_workdir_watcher(project_root)
+    assert watcher is not None
+    token = watcher.token()
+
+    (project_root / "src" / "util.py").write_text("X = 2\n")
+
+    # No polling: the barrier waits for the event still in flight
+    dirty = watcher.changes_since(token)
+    assert dirty is not None and dirty.covers("src/util.py")
+    assert not list((project_root / ".agentsmithy").glob("watch-barrier-*"))
+
+
+def test_kernel_overflow_forces_full_rescan(project_root: Path):
+    inotify_c = pytest.importorskip("watchdog.observers.inotify_c")
+    tracker = VersioningTracker(str(project_root), "dialog")
+    tracker.create_checkpoint("first")
+    watcher = get_workdir_watcher(project_root)
+    assert watcher is not None
+
+    with _lose_events(watcher):
+        (project_root / "src" / "util.py").write_text("X = 2\n")
+        time.sleep(0.2)
+    assert not watcher.changes_since(watcher.get_baseline(tracker._watch_key).token)
+
+    # The IN_Q_OVERFLOW record watchdog skips is reported to the watcher
+    overflow = struct.pack("iIII", -1, inotify_c.InotifyConstants.IN_Q_OVERFLOW, 0, 0)
+    list(inotify_c.Inotify._parse_event_buffer(overflow))
+
+    commit_id = _assert_full_rescan(tracker)
+    repo = tracker.ensure_repo()
+    tree = repo[_tree_id(tracker, commit_id)]
+    _mode, util_sha = tree.lookup_path(repo.__getitem__, b"src/util.py")
+    assert repo[util_sha].data == b"X = 2\n"
+
+
+def test_lost_barrier_forces_full_rescan(project_root: Path):
+    tracker = VersioningTracker(str(project_root), "dialog")
+    tracker.create_checkpoint("first")
+    watcher = get_workdir_watcher(project_root)
+    assert watcher is not None
+    token = watcher.token()
+
+    with (
+        _lose_events(watcher),
+        patch.object(watcher_module, "BARRIER_TIMEOUT_SECONDS", 0.2),
+    ):
+        (project_root / "src" / "util.py").write_text("X = 2\n")
+        assert watcher.changes_since(token) is None
+    assert watcher.running
+
+    commit_id = _assert_full_rescan(tracker)
+    repo = tracker.ensure_repo()
+    tree = repo[_tree_id(tracker, commit_id)]
+    _mode, util_sha = tree.lookup_path(repo.__getitem__, b"src/util.py")
+    assert repo[util_sha].data == b"X = 2\n"
+
+    # A watcher that never delivers its barrier is stopped as broken
+    with (
+        _lose_events(watcher),
+        patch.object(watcher_module, "BARRIER_TIMEOUT_SECONDS", 0.05),
+    ):
+        for _ in range(watcher_module.MAX_BARRIER_FAILURES):
+            watcher.changes_since(watcher.token())
+    assert get_workdir_watcher(project_root) is None
+
+
+def test_dead_emitter_stops_watcher(project_root: Path):
+    watcher = get_workdir_watcher(project_root)
+    assert watcher is not None
+    emitter = next(iter(watcher._observer.emitters))
+    emitter.stop()
+    emitter.join(timeout=5)
+
+    assert get_workdir_watcher(project_root) is None
+    assert watcher.changes_since(watcher.token()) is None